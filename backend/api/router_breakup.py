@@ -0,0 +1,115 @@
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Dict, List, Optional
+from service.breakup_service import breakup_service, MAX_FRAGMENTS
+
+router = APIRouter(prefix="/breakup", tags=["Breakup"])
+
+MAX_SIMULATION_HOURS = 7 * 24.0
+MIN_STEP_S = 1.0
+MAX_SIMULATION_STEPS = 20160  # 7 gün, 30 s adım
+
+
+class BreakupRequest(BaseModel):
+    norad_id: Optional[int] = None
+    sat_id: Optional[int] = None  # NORAD numarası yerine raw_tles id'si de verilebilir
+    breakup_time: Optional[datetime] = None  # verilmezse şimdi
+    n_fragments: int = 2000
+    seed: int = 0  # aynı seed ve katalogla aynı bulut
+    distribution: str = "lognormal"  # 'lognormal' (|Δv| log-normal, izotropik) veya 'gaussian_ric'
+    dv_median_m_s: float = 100.0
+    dv_log10_sigma: float = 0.4
+    dv_sigma_ric_m_s: Optional[List[float]] = None  # 'gaussian_ric' için RIC 1σ (m/s)
+    hours: float = 24.0
+    step_s: float = 30.0
+    threshold_km: float = 5.0
+    flux_radius_km: float = 50.0
+    bin_minutes: float = 60.0
+
+
+class BreakupParent(BaseModel):
+    sat_id: int
+    norad_id: int
+    name: Optional[str] = None
+
+
+class BreakupTimelineBin(BaseModel):
+    bin_start: str
+    fragments_alive: int
+    catalog_conjunctions: int
+    watchlist_conjunctions: int
+    flux_per_m2_yr: Dict[str, float]  # izlenen nesne NORAD -> kova ortalaması
+
+
+class BreakupAssetFlux(BaseModel):
+    norad_id: int
+    name: Optional[str] = None
+    mean_flux_per_m2_yr: float
+    peak_flux_per_m2_yr: float
+    max_fragments_nearby: int  # flux_radius_km küresindeki en fazla parça
+
+
+class BreakupConjunction(BaseModel):
+    fragment_index: int  # üretilen buluttaki sıra (0..n_fragments-1)
+    asset_norad_id: int
+    asset_name: Optional[str] = None
+    tca: str
+    miss_distance_km: float
+    rel_velocity_km_s: float
+
+
+class BreakupResponse(BaseModel):
+    parent: BreakupParent
+    breakup_time: str
+    window_end: str
+    n_fragments: int
+    fragments_in_orbit: int
+    catalog_objects: int  # irtifa bandı filtresinden geçip taranan katalog nesneleri
+    assets: int
+    seed: int
+    step_s: float
+    catalog_conjunctions: int
+    watchlist_conjunctions: int
+    timeline: List[BreakupTimelineBin]
+    asset_flux: List[BreakupAssetFlux]
+    conjunctions: List[BreakupConjunction]  # izlenen nesnelerle geçişler, en yakından
+    stage_timings_s: Dict[str, float] = {}
+
+
+@router.post("/simulate", response_model=BreakupResponse)
+def simulate_breakup(req: BreakupRequest):
+    """
+    Bir katalog nesnesinin parçalanmasını canlandırır ve enkaz bulutunu kataloğa ve izleme listesine karşı tarar.
+    Uzun sürebilir, iş parçacığı havuzunda çalışır.
+    """
+    if req.norad_id is None and req.sat_id is None:
+        raise HTTPException(status_code=422, detail="norad_id veya sat_id belirtilmeli")
+    if not 0 < req.n_fragments <= MAX_FRAGMENTS:
+        raise HTTPException(status_code=422, detail=f"n_fragments 1 ile {MAX_FRAGMENTS} arasında olmalı")
+    if not 0 < req.hours <= MAX_SIMULATION_HOURS:
+        raise HTTPException(status_code=422, detail=f"hours 0 ile {MAX_SIMULATION_HOURS} arasında olmalı")
+    if min(req.step_s, req.threshold_km, req.flux_radius_km, req.bin_minutes, req.dv_median_m_s) <= 0 \
+            or req.dv_log10_sigma < 0:
+        raise HTTPException(status_code=422, detail="Adım, eşik, yarıçap, kova ve Δv parametreleri pozitif olmalı")
+    # Adım sayısı parça x adım bellek ve süresini belirler
+    if req.step_s < MIN_STEP_S or req.hours * 3600.0 / req.step_s > MAX_SIMULATION_STEPS:
+        raise HTTPException(status_code=422, detail=f"step_s en az {MIN_STEP_S} s ve adım sayısı "
+                                                    f"(hours * 3600 / step_s) en fazla {MAX_SIMULATION_STEPS} olmalı")
+    if req.distribution not in ("lognormal", "gaussian_ric"):
+        raise HTTPException(status_code=422, detail="distribution 'lognormal' veya 'gaussian_ric' olmalı")
+    kwargs = {}
+    if req.dv_sigma_ric_m_s is not None:
+        if len(req.dv_sigma_ric_m_s) != 3 or min(req.dv_sigma_ric_m_s) < 0:
+            raise HTTPException(status_code=422, detail="dv_sigma_ric_m_s: 3 negatif olmayan değer")
+        kwargs["dv_sigma_ric_m_s"] = tuple(req.dv_sigma_ric_m_s)
+    try:
+        return breakup_service.simulate(
+            sat_id=req.sat_id, norad_id=req.norad_id, breakup_time=req.breakup_time, n_fragments=req.n_fragments,
+            seed=req.seed, distribution=req.distribution, dv_median_m_s=req.dv_median_m_s,
+            dv_log10_sigma=req.dv_log10_sigma, hours=req.hours, step_s=req.step_s,
+            threshold_km=req.threshold_km, flux_radius_km=req.flux_radius_km, bin_minutes=req.bin_minutes, **kwargs)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -1,8 +1,12 @@
-from fastapi import APIRouter, HTTPException
+import json
+import numpy as np
+from fastapi import APIRouter, HTTPException, Header
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import List
+from typing import Dict, List, Optional
 from datetime import datetime
-from service.conjunction_service import conjunction_service
+from backend.events import alert_broker
+from service.conjunction_service import conjunction_service, MC_MAX_SAMPLES
 
 router = APIRouter(prefix="/conjunctions", tags=["Conjunction Analysis"])
 
@@ -19,26 +23,93 @@ class ConjunctionAlertSchema(BaseModel):
     score: float
     created_at: str
     event_type: str
+    run_id: Optional[int] = None  # alarmı üreten tarama
+    pc: Optional[float] = None  # çarpışma olasılığı (varsayılan kovaryans ve HBR ile)
+
+
+class CollisionProbabilityRequest(BaseModel):
+    alert_ids: Optional[List[int]] = None  # verilmezse tüm güncel çarpışma alarmları
+    # Konum belirsizliği: RIC (radyal, in-track, cross-track) 1σ değerleri (km) veya tam 3x3 kovaryans (km²)
+    sigma1_ric_km: Optional[List[float]] = None
+    sigma2_ric_km: Optional[List[float]] = None
+    cov1_ric_km2: Optional[List[List[float]]] = None
+    cov2_ric_km2: Optional[List[List[float]]] = None
+    hbr_m: float = 20.0  # birleşik sert cisim yarıçapı
+    method: str = "foster"  # 'foster' veya 'chan'
+
+
+class CollisionProbabilityResult(BaseModel):
+    alert_id: int
+    sat1_id: int
+    sat2_id: int
+    tca: str
+    pc: Optional[float] = None
+    stored_pc: Optional[float] = None
+
+
+class MonteCarloRequest(BaseModel):
+    n_samples: int = 10000
+    seed: Optional[int] = None  # aynı seed ile aynı örnekler (tekrarlanabilir)
+    sigma1_ric_km: Optional[List[float]] = None  # epoch anındaki RIC 1σ (km); verilmezse varsayılan
+    sigma2_ric_km: Optional[List[float]] = None
+    intrack_growth_km_per_day: float = 1.0  # yörünge boyunca hatanın TLE yaşıyla büyümesi (1σ)
+    hbr_m: float = 20.0
+
+
+class MonteCarloResponse(BaseModel):
+    alert_id: int
+    sat1_id: int
+    sat2_id: int
+    tca: str
+    n_samples: int
+    valid_samples: int  # SGP4 hatası vermeyen örnekler
+    outside_window: int  # en yakın geçişi zaman penceresinin kenarına düşen örnekler
+    hits: int  # HBR içinde kalan örnekler
+    pc: Optional[float] = None  # ampirik Pc = hits / valid_samples
+    pc_std_err: Optional[float] = None
+    pc_upper_95: Optional[float] = None  # hiç isabet yoksa 3/N
+    analytic_pc: Optional[float] = None  # aynı σ ile Foster
+    stored_pc: Optional[float] = None
+    nominal_miss_km: float
+    miss_km: Dict[str, Optional[float]]  # mean, std, min, p05, p50, p95
+    tca_offset_s: Dict[str, Optional[float]]  # nominal TCA'ya göre
+    histogram: Dict[str, List[float]]  # edges_km, counts
+    hbr_km: float
+    seed: Optional[int] = None
+    chunks: int
+    window_half_width_s: float
+    step_s: float
+    elapsed_s: float
 
 
 class ScreeningResponse(BaseModel):
     status: str
     processed_pairs: int
     alerts_saved: int
+    shards: int = 1  # taramanın bölündüğü irtifa kabuğu sayısı (1: tek süreç)
+    run_id: Optional[int] = None
+    cached: bool = False  # aynı katalog ve parametrelerle saklanan sonuç sunuldu
+    stage_timings_s: Dict[str, float] = {}  # aşama -> saniye (tle_load, propagation, refinement, ...)
 
 
 @router.post("/run-screening", response_model=ScreeningResponse)
-async def run_screening():
+def run_screening(force: bool = False):
     """
     Manuel olarak çarpışma taramasını tetikler.
-    O anki zamandan itibaren 2 saatlik pencereyi tarar.
+    O anki zamandan (10 dakikalık dilimin başından) itibaren 2 saatlik pencereyi tarar.
+    Aynı katalog ve dilim için tamamlanmış tarama varsa sonucu hemen döner; force=true ile yeniden hesaplanır.
+    Tarama iş parçacığı havuzunda çalışır; ilerleme ve alarmlar /conjunctions/stream'den izlenebilir.
     """
     try:
-        result = conjunction_service.run_conjunction_screening()
+        result = conjunction_service.run_conjunction_screening(use_cache=not force)
         return {
             "status": "completed",
             "processed_pairs": result["processed_pairs"],
-            "alerts_saved": result["alerts_saved"]
+            "alerts_saved": result["alerts_saved"],
+            "shards": result.get("shards", 1),
+            "run_id": result.get("run_id"),
+            "cached": result.get("cached", False),
+            "stage_timings_s": result.get("stage_timings_s", {})
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -51,3 +122,94 @@ async def get_latest_alerts(limit: int = 20, type: str = "COLLISION"):
     type param: 'COLLISION' veya 'DOCKING'
     """
     return conjunction_service.get_alerts(limit, event_type=type)
+
+
+def _covariance(sigma: Optional[List[float]], cov: Optional[List[List[float]]], name: str):
+    """ İstekteki belirsizliği (3, 3) RIC kovaryansına çevirir; hatalıysa 422. """
+    if cov is not None:
+        matrix = np.asarray(cov, dtype=float)
+        if matrix.shape != (3, 3) or not np.allclose(matrix, matrix.T) or np.any(np.linalg.eigvalsh(matrix) < 0):
+            raise HTTPException(status_code=422, detail=f"{name}: simetrik, pozitif yarı tanımlı 3x3 matris olmalı")
+        return matrix
+    if sigma is not None:
+        if len(sigma) != 3 or min(sigma) <= 0:
+            raise HTTPException(status_code=422, detail=f"{name}: 3 pozitif değer (radyal, in-track, cross-track)")
+        return np.diag(np.square(sigma))
+    return None
+
+
+@router.post("/pc", response_model=List[CollisionProbabilityResult])
+def compute_collision_probability(req: CollisionProbabilityRequest):
+    """
+    Güncel alarmların çarpışma olasılığını verilen kovaryans ve sert cisim yarıçapıyla yeniden hesaplar.
+    Sonuç kaydedilmez; taramada kaydedilen Pc varsayılan kovaryansla hesaplanır (stored_pc).
+    """
+    if req.hbr_m <= 0:
+        raise HTTPException(status_code=422, detail="hbr_m pozitif olmalı")
+    if req.method not in ("foster", "chan"):
+        raise HTTPException(status_code=422, detail="method 'foster' veya 'chan' olmalı")
+    cov1 = _covariance(req.sigma1_ric_km, req.cov1_ric_km2, "1. nesne")
+    cov2 = _covariance(req.sigma2_ric_km, req.cov2_ric_km2, "2. nesne")
+    try:
+        return conjunction_service.compute_collision_probability(
+            alert_ids=req.alert_ids, cov1_ric_km2=cov1, cov2_ric_km2=cov2, hbr_km=req.hbr_m / 1000.0,
+            method=req.method)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def _format_sse(event) -> str:
+    if event is None:
+        return ": keep-alive\n\n"  # yorum satırı, istemci yok sayar
+    return f"id: {alert_broker.format_id(event['id'])}\nevent: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+
+
+@router.get("/stream")
+async def stream_alerts(last_event_id: Optional[str] = None,
+                        last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID")):
+    """
+    Server-Sent Events: tarama ilerlemesi ve yeni alarmlar üretildikleri anda.
+    Olaylar: screening_started, screening_progress, alert, screening_completed, screening_failed, resync.
+    alert olayları taramanın run_id'siyle geçicidir (provisional): veritabanına tarama bitince topluca yazılır.
+    screening_completed taramayı kesinleştirir; screening_failed veya resync gelirse geçici alarmlar atılıp
+    güncel durum /conjunctions/alerts'ten yeniden çekilmelidir.
+    Yeniden bağlanan EventSource Last-Event-ID başlığını gönderir, kaçırılan olaylar tekrar iletilir.
+    Kimlik sunucunun önceki bir sürecine aitse (yeniden başlatma) kaçırılanlar yerine resync gönderilir.
+    """
+    after = last_event_id or last_event_id_header or None
+
+    async def body():
+        yield "retry: 3000\n\n"
+        async for event in alert_broker.subscribe(after_id=after):
+            yield _format_sse(event)
+
+    return StreamingResponse(body(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@router.post("/{alert_id}/monte-carlo", response_model=MonteCarloResponse)
+def run_monte_carlo(alert_id: int, req: MonteCarloRequest):
+    """
+    TLE belirsizliği Monte Carlo'su: alarmın iki nesnesinin elemanları n_samples kez bozulur, örnekler
+    toplu SGP4 ile TCA çevresinde yayılır. Iskalama mesafesi ve TCA dağılımları ile ampirik Pc döner.
+    """
+    if not 0 < req.n_samples <= MC_MAX_SAMPLES:
+        raise HTTPException(status_code=422, detail=f"n_samples 1 ile {MC_MAX_SAMPLES} arasında olmalı")
+    if req.hbr_m <= 0 or req.intrack_growth_km_per_day < 0:
+        raise HTTPException(status_code=422, detail="hbr_m pozitif, intrack_growth_km_per_day negatif olmayan olmalı")
+    sigmas = {}
+    for name, sigma in (("sigma1_ric_km", req.sigma1_ric_km), ("sigma2_ric_km", req.sigma2_ric_km)):
+        if sigma is not None:
+            if len(sigma) != 3 or min(sigma) <= 0:
+                raise HTTPException(status_code=422, detail=f"{name}: 3 pozitif değer (radyal, in-track, cross-track)")
+            sigmas[name] = tuple(sigma)
+    try:
+        return conjunction_service.run_monte_carlo(
+            alert_id, n_samples=req.n_samples, seed=req.seed, hbr_km=req.hbr_m / 1000.0,
+            intrack_growth_km_per_day=req.intrack_growth_km_per_day, **sigmas)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -1,7 +1,10 @@
+import json
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from datetime import datetime
-from service.maneuver_service import maneuver_service
+from typing import List, Optional, Dict
+from service.maneuver_service import maneuver_service, MAX_TRADE_STUDY_CASES
 
 router = APIRouter(prefix="/maneuver", tags=["Maneuver Optimization"])
 
@@ -11,6 +14,18 @@ class ManeuverRequest(BaseModel):
     sat_id_secondary: int
     tca: datetime
     target_miss_km: float = 1.0
+    rescreen: bool = True
+    rescreen_window_hours: float = 6.0
+    rescreen_threshold_km: float = 10.0
+
+
+class PostManeuverConjunction(BaseModel):
+    sat_id: int
+    sat_name: str
+    tca: str
+    miss_distance_km: float
+    rel_velocity_km_s: float
+    nominal_miss_km: Optional[float] = None  # manevrasız yörüngede aynı geçişin mesafesi (yoksa None)
 
 
 class ManeuverResponse(BaseModel):
@@ -21,22 +36,184 @@ class ManeuverResponse(BaseModel):
     dv_vector_m_s: list
     dv_magnitude_m_s: float
     message: str
+    new_conjunctions: List[PostManeuverConjunction] = []
+    rescreen_status: str = "skipped"  # completed, failed, skipped (istenmedi veya ateşleme yok)
+    rescreen_error: Optional[str] = None
+
+
+class RobustnessRequest(BaseModel):
+    sat_id_primary: int
+    sat_id_secondary: int
+    tca: datetime
+    dv_vector_m_s: List[float]
+    burn_time: Optional[datetime] = None  # verilmezse TCA - 1 saat
+    target_miss_km: float = 1.0
+    magnitude_sigma_pct: float = 2.0  # büyüklük hatası (1-sigma, %)
+    pointing_sigma_deg: float = 1.0  # yönelim hatası (1-sigma, derece)
+    n_samples: int = 5000
+    confidence: float = 0.99
+    seed: Optional[int] = None
+
+
+class RobustnessResponse(BaseModel):
+    burn_time: str
+    tca_original: str
+    n_samples: int
+    nominal_miss_km: float
+    confidence: float
+    miss_at_confidence_km: float
+    probability_below_target: float
+    miss_percentiles_km: Dict[str, float]
+    rel_velocity_mean_km_s: float
+
+
+class BatchManeuverRequest(BaseModel):
+    alert_ids: Optional[List[int]] = None  # verilmezse min_score kullanılır
+    min_score: Optional[float] = None  # bu skorun üzerindeki tüm COLLISION alarmları
+    target_miss_km: float = 1.0
+    rescreen: bool = True
+    rescreen_window_hours: float = 6.0
+    rescreen_threshold_km: float = 10.0
+    limit: int = 100
+
+
+class TradeStudyRequest(BaseModel):
+    sat_id_primary: int
+    sat_id_secondary: int
+    tca: datetime
+    target_miss_km: List[float] = [1.0, 2.0, 5.0]
+    min_lead_minutes: float = 10.0
+    max_lead_orbits: float = 2.0
+    step_minutes: float = 5.0
+    dv_bound_m_s: float = 2.0
+
+
+class TradeStudyCaseSchema(BaseModel):
+    lead_time_minutes: float
+    burn_time: str
+    target_miss_km: float
+    predicted_miss_km: float
+    dv_vector_m_s: list
+    dv_magnitude_m_s: float
+    success: bool
+    pareto_optimal: bool
+
+
+class TradeStudyResponse(BaseModel):
+    tca_original: str
+    orbit_period_minutes: float
+    cases: List[TradeStudyCaseSchema]
+    pareto_front: List[TradeStudyCaseSchema]
 
 
 @router.post("/calculate", response_model=ManeuverResponse)
-async def calculate_maneuver(req: ManeuverRequest):
+def calculate_maneuver(req: ManeuverRequest):
     """
     Çarpışma uyarısı için optimal kaçınma manevrası (deltav) hesaplar.
+    Hesaplama olay döngüsünü bekletmemek için iş parçacığı havuzunda çalışır.
     """
     try:
         result = maneuver_service.calculate_avoidance_maneuver(
             sat_id_primary=req.sat_id_primary,
             sat_id_secondary=req.sat_id_secondary,
             tca=req.tca,
-            target_miss_km=req.target_miss_km
+            target_miss_km=req.target_miss_km,
+            rescreen=req.rescreen,
+            rescreen_window_hours=req.rescreen_window_hours,
+            rescreen_threshold_km=req.rescreen_threshold_km
         )
         return result
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Optimization failed: {str(e)}")
+
+
+@router.post("/trade-study", response_model=TradeStudyResponse)
+def run_trade_study(req: TradeStudyRequest):
+    """
+    Farklı ateşleme zamanları ve hedef mesafeler için manevra takas çalışması yapar.
+    DeltaV - lead time - miss distance Pareto cephesini döner.
+    Senaryo sayısı (ateşleme zamanı x hedef mesafe) MAX_TRADE_STUDY_CASES ile sınırlıdır.
+    İş parçacığı havuzunda çalışır.
+    """
+    if req.step_minutes <= 0:
+        raise HTTPException(status_code=422, detail="step_minutes pozitif olmalı")
+    if not req.target_miss_km or min(req.target_miss_km) <= 0:
+        raise HTTPException(status_code=422, detail="target_miss_km pozitif değerlerden oluşmalı")
+    try:
+        n_cases = maneuver_service.count_trade_study_cases(req.sat_id_primary, len(req.target_miss_km),
+                                                           req.min_lead_minutes, req.max_lead_orbits,
+                                                           req.step_minutes)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    if n_cases > MAX_TRADE_STUDY_CASES:
+        raise HTTPException(status_code=422, detail=f"Senaryo sayısı {n_cases}; en fazla {MAX_TRADE_STUDY_CASES} "
+                                                    f"(step_minutes'i büyütün veya hedef sayısını azaltın)")
+    try:
+        return maneuver_service.run_trade_study(
+            sat_id_primary=req.sat_id_primary,
+            sat_id_secondary=req.sat_id_secondary,
+            tca=req.tca,
+            target_misses_km=req.target_miss_km,
+            min_lead_minutes=req.min_lead_minutes,
+            max_lead_orbits=req.max_lead_orbits,
+            step_minutes=req.step_minutes,
+            dv_bound_m_s=req.dv_bound_m_s
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Trade study failed: {str(e)}")
+
+
+@router.post("/calculate-batch")
+async def calculate_maneuver_batch(req: BatchManeuverRequest):
+    """
+    Birden fazla alarm için manevra planlarını süreç havuzunda paralel hesaplar.
+    Sonuçlar tamamlandıkça satır satır JSON (NDJSON) olarak akış halinde gönderilir.
+    Daha önce aynı parametrelerle hesaplanmış planlar veritabanından döner (cached: true).
+    """
+    if not req.alert_ids and req.min_score is None:
+        raise HTTPException(status_code=422, detail="alert_ids veya min_score belirtilmeli")
+
+    results = maneuver_service.plan_batch(
+        alert_ids=req.alert_ids,
+        min_score=req.min_score,
+        target_miss_km=req.target_miss_km,
+        rescreen=req.rescreen,
+        rescreen_window_hours=req.rescreen_window_hours,
+        rescreen_threshold_km=req.rescreen_threshold_km,
+        limit=req.limit
+    )
+    return StreamingResponse((json.dumps(item) + "\n" for item in results), media_type="application/x-ndjson")
+
+
+@router.post("/robustness", response_model=RobustnessResponse)
+def assess_robustness(req: RobustnessRequest):
+    """
+    Bir manevranın ateşleme icra hatalarına (büyüklük ve yönelim) karşı dayanıklılığını
+    Monte Carlo simülasyonu ile değerlendirir. İş parçacığı havuzunda çalışır.
+    """
+    if len(req.dv_vector_m_s) != 3:
+        raise HTTPException(status_code=422, detail="dv_vector_m_s 3 elemanlı olmalı")
+    if not 0.0 < req.confidence < 1.0 or not 0 < req.n_samples <= 200000:
+        raise HTTPException(status_code=422, detail="Geçersiz confidence veya n_samples")
+    try:
+        return maneuver_service.assess_burn_robustness(
+            sat_id_primary=req.sat_id_primary,
+            sat_id_secondary=req.sat_id_secondary,
+            tca=req.tca,
+            dv_vector_m_s=req.dv_vector_m_s,
+            burn_time=req.burn_time,
+            target_miss_km=req.target_miss_km,
+            magnitude_sigma_pct=req.magnitude_sigma_pct,
+            pointing_sigma_deg=req.pointing_sigma_deg,
+            n_samples=req.n_samples,
+            confidence=req.confidence,
+            seed=req.seed
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Robustness analysis failed: {str(e)}")
@@ -1,8 +1,10 @@
-from fastapi import APIRouter, HTTPException, Query
+import asyncio
+from fastapi import APIRouter, HTTPException, Query, WebSocket, WebSocketDisconnect
 from pydantic import BaseModel
 from typing import List, Optional
 from datetime import datetime, timedelta, timezone
 from service.propagation_service import propagation_service
+from service.live_position_service import live_position_service, LiveSubscriber
 
 router = APIRouter(prefix="/orbit", tags=["Orbit Propagation & Viz"])
 
@@ -37,4 +39,47 @@ async def propagate_satellite_path(
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.websocket("/live")
+async def live_positions(websocket: WebSocket):
+    """
+    Canlı konum akışı. İstemci JSON metin mesajıyla abone olur ve aboneliğini istediği an değiştirir:
+        {"subscribe": [12, 45, 78], "interval_s": 1}   veya   {"subscribe": "all"}
+    Sunucu her tikte processing.position_codec formatında ikili çerçeve gönderir.
+    """
+    await websocket.accept()
+    subscriber = LiveSubscriber()
+
+    async def send_frames():
+        while True:
+            await websocket.send_bytes(await subscriber.queue.get())
+
+    sender = asyncio.create_task(send_frames())
+    try:
+        while True:
+            try:
+                message = await websocket.receive_json()
+            except (ValueError, KeyError):
+                # Çözülemeyen metin veya ikili mesaj aboneliği düşürmez
+                await websocket.send_json({"type": "error", "detail": "Geçersiz JSON mesajı"})
+                continue
+            try:
+                target = message.get("subscribe")
+                sat_ids = None if target == "all" else [int(i) for i in target]
+                interval_s = float(message["interval_s"]) if message.get("interval_s") else None
+                live_position_service.subscribe(subscriber, sat_ids, interval_s)
+            except (ValueError, TypeError, AttributeError) as e:
+                await websocket.send_json({"type": "error", "detail": str(e) or "Geçersiz abonelik mesajı"})
+                continue
+            await websocket.send_json({
+                "type": "subscribed",
+                "objects": "all" if sat_ids is None else len(set(sat_ids)),
+                "interval_s": live_position_service.interval_to_every(interval_s) / live_position_service.rate_hz,
+            })
+    except WebSocketDisconnect:
+        pass
+    finally:
+        sender.cancel()
+        live_position_service.unsubscribe(subscriber)
@@ -1,20 +1,103 @@
+import json
+from typing import Optional
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from service.ssa_service import ssa_service
+from service.ssa_training import training_manager
+from service.reference_service import reference_service
 from backend.models.db import get_conn  # Veritabanı bağlantısı için
 
 router = APIRouter(prefix="/ssa", tags=["SSA Intelligence"])
 
 
 @router.post("/train")
-async def train_ssa():
-    msg = ssa_service.train_model()
-    return {"message": msg}
+async def train_ssa(n_folds: int = 5):
+    """
+    Eğitimi arka planda başlatır ve hemen döner.
+    İlerleme: GET /ssa/train/jobs/{job_id} veya /ssa/train/jobs/{job_id}/stream
+    Veri hazırlığı da arka planda yapılır; hatası işin 'failed' olayıyla bildirilir.
+    """
+    try:
+        job = ssa_service.start_training_job(n_folds=n_folds)
+    except RuntimeError as e:
+        active = training_manager.active_job()
+        raise HTTPException(status_code=409, detail={"message": str(e), "job_id": active.job_id if active else None})
+    return {"message": "Eğitim başlatıldı", "job_id": job.job_id, "status": job.status}
+
+
+@router.get("/train/jobs/{job_id}")
+async def get_training_job(job_id: str):
+    job = training_manager.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Eğitim işi bulunamadı")
+    return job.snapshot()
+
+
+@router.get("/train/jobs/{job_id}/stream")
+async def stream_training_job(job_id: str, start: int = 0):
+    """İşin ilerleme ve katman (fold) metriklerini NDJSON olarak akıtır, iş bitince akış kapanır."""
+    if not training_manager.get(job_id):
+        raise HTTPException(status_code=404, detail="Eğitim işi bulunamadı")
+    events = training_manager.iter_events(job_id, start=start)
+    return StreamingResponse((json.dumps(e) + "\n" for e in events), media_type="application/x-ndjson")
+
+
+@router.get("/models")
+async def list_models():
+    """Kayıtlı model sürümleri ve metadataları (etkin sürüm işaretli)."""
+    return ssa_service.registry.list_versions()
+
+
+@router.post("/models/{version}/activate")
+def activate_model(version: str):
+    """Bir model sürümünü etkinleştirir; devam eden analizler eski sürümle tamamlanır."""
+    try:
+        bundle = ssa_service.registry.activate(version)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return {"active_version": bundle.version}
 
 
 @router.post("/run-analysis")
-async def run_analysis():
-    count = ssa_service.analyze_all_satellites()
-    return {"status": "Analysis completed", "processed_satellites": count}
+def run_analysis(force: bool = False):
+    # Varsayılan olarak sadece değişen TLE'ler yeniden skorlanır, force=true tüm katalog
+    count = ssa_service.analyze_all_satellites(force=force)
+    return {"status": "Analysis completed", "processed_satellites": count, "details": ssa_service.last_analysis}
+
+
+@router.post("/update-lifetimes")
+def update_lifetimes():
+    """Analiz edilmiş nesnelerin yörünge ömrü ve atmosfere giriş penceresi tahminini yeniler."""
+    updated = ssa_service.update_lifetimes()
+    return {"status": "Lifetime estimation completed", "updated": updated}
+
+
+@router.get("/reentries")
+async def get_reentries(max_days: float = 365.0, limit: int = 100):
+    """Tahmini ömrü max_days'ten kısa nesneler ve giriş tarih pencereleri."""
+    if max_days <= 0 or limit <= 0:
+        raise HTTPException(status_code=422, detail="max_days ve limit pozitif olmalıdır.")
+    return ssa_service.get_reentry_forecast(max_days=max_days, limit=limit)
+
+
+@router.post("/detect-maneuvers")
+def detect_maneuvers(full: bool = False):
+    """TLE geçmişinde manevra tespiti (varsayılan: sadece yeni eleman setleri)."""
+    inserted = ssa_service.detect_maneuvers(full=full)
+    return {"status": "Detection completed", "new_events": inserted}
+
+
+@router.get("/maneuvers")
+async def get_maneuvers(norad_id: Optional[int] = None, limit: int = 100):
+    """Tespit edilen manevra olayları (en yeniden eskiye)."""
+    return ssa_service.get_maneuver_events(norad_id=norad_id, limit=limit)
+
+
+@router.post("/auto-analysis")
+async def set_auto_analysis(enabled: bool = True):
+    """TLE güncellemesinden sonra artımlı analizin otomatik çalışmasını açar/kapatır."""
+    ssa_service.set_auto_analysis(enabled)
+    return {"auto_analyze_on_ingest": enabled}
 
 
 @router.get("/results")
@@ -23,9 +106,11 @@ async def get_ssa_results(limit: int = 50):
     cur = conn.cursor()
     query = """
         SELECT s.sat_name, si.predicted_category, si.confidence, 
-               si.cluster_id, si.is_anomaly, si.predicted_country, si.decay_risk
+               si.cluster_id, si.is_anomaly, si.predicted_country, si.decay_risk, si.model_version,
+               si.lifetime_days, si.reentry_window_start, si.reentry_window_end
         FROM satellite_intelligence si
         JOIN raw_tles s ON si.sat_id = s.id
+        WHERE si.predicted_category IS NOT NULL
         ORDER BY si.predicted_at DESC LIMIT ?
     """
     cur.execute(query, (limit,))
@@ -45,7 +130,7 @@ async def get_ssa_prediction(sat_id: int):
     conn = get_conn()
     cur = conn.cursor()
     cur.execute(
-        "SELECT predicted_category as category, confidence FROM satellite_intelligence WHERE sat_id = ? ORDER BY predicted_at DESC LIMIT 1",
+        "SELECT predicted_category as category, confidence, model_version FROM satellite_intelligence WHERE sat_id = ? ORDER BY predicted_at DESC LIMIT 1",
         (sat_id,))
     row = cur.fetchone()
     conn.close()
@@ -54,9 +139,25 @@ async def get_ssa_prediction(sat_id: int):
     return dict(row)
 
 
+@router.get("/reference/{norad_id}")
+async def get_reference_info(norad_id: int):
+    """UCS veri setindeki ülke, operatör, amaç ve kütle bilgisi."""
+    info = reference_service.lookup(norad_id)
+    if not info:
+        raise HTTPException(status_code=404, detail="UCS veri setinde kayıt bulunamadı.")
+    return info
+
+
 @router.get("/heatmap")
-async def get_heatmap():
-    return ssa_service.get_regime_heatmap_data()
+async def get_heatmap(incl_bin_deg: float = 1.0, alt_bin_km: float = 50.0,
+                      min_alt_km: float = 200.0, max_alt_km: float = 40000.0):
+    """Eğim x irtifa 2D histogramı (sadece dolu hücreler)."""
+    if incl_bin_deg <= 0 or alt_bin_km <= 0 or max_alt_km <= min_alt_km:
+        raise HTTPException(status_code=422, detail="Geçersiz bin ayarları")
+    # Hücre sayısı sınırı: çok küçük binler yanıtı katalog kadar büyütür
+    if (180.0 / incl_bin_deg) * ((max_alt_km - min_alt_km) / alt_bin_km) > 1_000_000:
+        raise HTTPException(status_code=422, detail="Bin boyutları çok küçük")
+    return ssa_service.get_regime_heatmap_data(incl_bin_deg, alt_bin_km, min_alt_km, max_alt_km)
 
 
 @router.get("/performance-report")
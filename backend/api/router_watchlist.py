@@ -0,0 +1,100 @@
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Dict, List, Optional
+from service.watchlist_service import watchlist_service
+
+router = APIRouter(prefix="/watchlist", tags=["Watchlist"])
+
+MAX_SCREEN_DAYS = 30.0
+
+
+class WatchlistEntry(BaseModel):
+    norad_id: int
+    label: Optional[str] = None
+    added_at: Optional[str] = None
+    sat_id: Optional[int] = None  # katalogdaki güncel kayıt (yoksa None)
+    sat_name: Optional[str] = None
+
+
+class WatchlistAddRequest(BaseModel):
+    norad_id: Optional[int] = None
+    sat_id: Optional[int] = None  # NORAD numarası yerine raw_tles id'si de verilebilir
+    label: Optional[str] = None
+
+
+class WatchlistScreenRequest(BaseModel):
+    start_time: Optional[datetime] = None  # verilmezse şimdi
+    days: float = 7.0
+    step_s: float = 60.0
+    threshold_km: float = 10.0
+
+
+class WatchlistConjunction(BaseModel):
+    asset_norad_id: int
+    asset_sat_id: int
+    asset_name: Optional[str] = None
+    other_sat_id: int
+    other_norad_id: int
+    other_name: Optional[str] = None
+    tca: str
+    miss_distance_km: float
+    rel_velocity_km_s: float
+
+
+class WatchlistScreenResponse(BaseModel):
+    assets: int
+    catalog_objects: int  # irtifa bandı filtresinden geçip yayılan katalog nesneleri
+    window_start: str
+    window_end: str
+    conjunctions: List[WatchlistConjunction]
+    stage_timings_s: Dict[str, float] = {}
+
+
+@router.get("", response_model=List[WatchlistEntry])
+async def get_watchlist():
+    return watchlist_service.get_watchlist()
+
+
+@router.post("", response_model=WatchlistEntry)
+async def add_to_watchlist(req: WatchlistAddRequest):
+    if req.norad_id is None and req.sat_id is None:
+        raise HTTPException(status_code=422, detail="norad_id veya sat_id belirtilmeli")
+    try:
+        return watchlist_service.add(norad_id=req.norad_id, sat_id=req.sat_id, label=req.label)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.delete("/{norad_id}")
+async def remove_from_watchlist(norad_id: int):
+    try:
+        watchlist_service.remove(norad_id)
+        return {"removed": norad_id}
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.post("/screen", response_model=WatchlistScreenResponse)
+def screen_watchlist(req: WatchlistScreenRequest):
+    """
+    İzleme listesindeki uyduları tüm kataloğa karşı çok günlük pencerede tarar (tek-herkese).
+    Uzun sürebilir, iş parçacığı havuzunda çalışır.
+    """
+    if not 0 < req.days <= MAX_SCREEN_DAYS:
+        raise HTTPException(status_code=422, detail=f"days 0 ile {MAX_SCREEN_DAYS} arasında olmalı")
+    if req.step_s <= 0 or req.threshold_km <= 0:
+        raise HTTPException(status_code=422, detail="step_s ve threshold_km pozitif olmalı")
+    try:
+        return watchlist_service.screen(start_time=req.start_time, days=req.days, step_s=req.step_s,
+                                        threshold_km=req.threshold_km)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/conjunctions", response_model=List[WatchlistConjunction])
+async def get_watchlist_conjunctions(norad_id: Optional[int] = None, limit: int = 100):
+    """ Son izleme listesi taramasının sonuçları. """
+    return watchlist_service.get_conjunctions(norad_id=norad_id, limit=limit)
@@ -0,0 +1,122 @@
+import asyncio
+import secrets
+import threading
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Set, Tuple, Union
+
+from backend.metrics import metrics
+
+"""
+Süreç içi yayın/abone (pub/sub) kanalı.
+
+Olaylar artan sıra numarasıyla tek bir halka tampona (ring buffer) yazılır; tüm aboneler aynı tampondan
+kendi konumlarına göre okur. Yayıncı (ör. tarama iş parçacığı) abone sayısından bağımsız olarak tek bir
+ekleme yapar, abone başına kopya veya veritabanı sorgusu yoktur. Asenkron aboneler olay döngüsünde
+bekler, iş parçacığı havuzunu işgal etmez.
+
+Yavaş bir abone tamponun gerisinde kalırsa kaybolan olayların yerine tek bir 'resync' olayı alır ve
+güncel durumu REST uç noktasından yeniden çekmesi gerekir.
+
+Sıra numaraları süreçle birlikte sıfırlanır; istemciye giden olay kimliği süreç başına rastgele bir dönem
+(epoch) içerir ("<epoch>-<sıra>"). Önceki süreçten kalan veya sayacın ilerisindeki bir kimlikle yeniden
+bağlanan istemci de 'resync' alır ve akışı güncel sıradan izler.
+"""
+
+STREAM_SUBSCRIBERS = metrics.gauge("stream_subscribers", "Canlı akışa bağlı istemci sayısı", ("stream",))
+STREAM_EVENTS = metrics.counter("stream_events_total", "Yayınlanan canlı akış olayları", ("stream", "event"))
+
+Event = Dict[str, Any]  # {"id": int, "event": str, "data": dict, "time": float}
+
+
+class EventBroker:
+
+    def __init__(self, name: str, buffer_size: int = 1000):
+        self.name = name
+        self._events: Deque[Event] = deque(maxlen=buffer_size)
+        self._next_id = 1
+        self._lock = threading.Lock()
+        self._waiters: Set[Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = set()
+        self.epoch = secrets.token_hex(4)
+
+    @property
+    def last_id(self) -> int:
+        return self._next_id - 1
+
+    def format_id(self, event_id: int) -> str:
+        """ İstemciye gönderilen olay kimliği (SSE id alanı). """
+        return f"{self.epoch}-{event_id}"
+
+    def parse_id(self, value: Union[int, str]) -> Optional[int]:
+        """ İstemcinin son gördüğü olay kimliğinin sıra numarası; başka süreçten veya okunamıyorsa None. """
+        if isinstance(value, int):
+            return value
+        epoch, _, seq = value.rpartition("-")
+        if not seq.isdigit() or epoch not in ("", self.epoch):
+            return None
+        return int(seq)
+
+    def publish(self, event: str, data: Dict[str, Any]) -> int:
+        """ Herhangi bir iş parçacığından çağrılabilir; olayın sıra numarasını döner. """
+        with self._lock:
+            event_id = self._next_id
+            self._next_id += 1
+            self._events.append({"id": event_id, "event": event, "data": data, "time": time.time()})
+            waiters = list(self._waiters)
+        STREAM_EVENTS.inc(stream=self.name, event=event)
+
+        for loop, wakeup in waiters:
+            try:
+                loop.call_soon_threadsafe(wakeup.set)
+            except RuntimeError:
+                pass  # olay döngüsü kapanmış, abone zaten düşecek
+        return event_id
+
+    def events_after(self, after_id: int) -> Tuple[List[Event], bool]:
+        """ after_id'den sonraki olaylar ve aradaki olayların tampondan düşüp düşmediği. """
+        with self._lock:
+            if not self._events or after_id >= self._events[-1]["id"]:
+                return [], False
+            first_id = self._events[0]["id"]
+            start = max(after_id + 1 - first_id, 0)
+            return list(self._events)[start:], after_id + 1 < first_id
+
+    async def subscribe(self, after_id: Optional[Union[int, str]] = None,
+                        heartbeat_s: float = 15.0) -> AsyncIterator[Optional[Event]]:
+        """
+        Olayları sırayla üretir. after_id verilmezse yalnızca abone olunduktan sonraki olaylar gelir
+        (yeniden bağlanan istemci son gördüğü olay kimliğini verir, aradaki olaylar tekrar gönderilir).
+        Kimlik bu sürece ait değilse (yeniden başlatma) önce 'resync' üretilir, akış güncel sıradan sürer.
+        heartbeat_s boyunca olay olmazsa None üretir (bağlantıyı canlı tutmak için).
+        """
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        cursor = self.last_id if after_id is None else self.parse_id(after_id)
+        with self._lock:
+            self._waiters.add(waiter)
+        STREAM_SUBSCRIBERS.inc(stream=self.name)
+        try:
+            if cursor is None or cursor > self.last_id:
+                cursor = self.last_id
+                yield {"id": cursor, "event": "resync", "data": {"reason": "restart"}, "time": time.time()}
+            while True:
+                waiter[1].clear()
+                events, lost = self.events_after(cursor)
+                if lost:
+                    yield {"id": cursor, "event": "resync", "data": {"reason": "buffer_overrun"}, "time": time.time()}
+                for event in events:
+                    cursor = event["id"]
+                    yield event
+                if events:
+                    continue
+                try:
+                    await asyncio.wait_for(waiter[1].wait(), timeout=heartbeat_s)
+                except asyncio.TimeoutError:
+                    yield None
+        finally:
+            with self._lock:
+                self._waiters.discard(waiter)
+            STREAM_SUBSCRIBERS.dec(stream=self.name)
+
+
+# Yakınlaşma taraması: ilerleme ve yeni alarmlar (tüm panolar aynı kanalı dinler)
+alert_broker = EventBroker("alerts")
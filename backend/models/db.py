@@ -1,17 +1,77 @@
 from pathlib import Path
 import sqlite3
+import time
+from backend.metrics import DB_QUERY_SECONDS, sql_operation
 
 # Proje dizin yapısına göre veritabanı yolunu ayarla
 DB_PATH = Path(__file__).resolve().parents[2] / "data" / "astm.db"
 DB_PATH.parent.mkdir(parents=True, exist_ok=True)
 
 
+class _TimedCursor(sqlite3.Cursor):
+    """Sorgu ve okuma sürelerini db_query_duration_seconds metriğine yazar."""
+    _operation = "UNKNOWN"
+
+    def _observe(self, phase: str, start: float):
+        DB_QUERY_SECONDS.observe(time.perf_counter() - start, operation=self._operation, phase=phase)
+
+    def execute(self, sql, parameters=()):
+        self._operation = sql_operation(sql)
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self._observe("execute", start)
+
+    def executemany(self, sql, seq_of_parameters):
+        self._operation = sql_operation(sql)
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            self._observe("execute", start)
+
+    def fetchone(self):
+        start = time.perf_counter()
+        try:
+            return super().fetchone()
+        finally:
+            self._observe("fetch", start)
+
+    def fetchall(self):
+        start = time.perf_counter()
+        try:
+            return super().fetchall()
+        finally:
+            self._observe("fetch", start)
+
+
+class _TimedConnection(sqlite3.Connection):
+
+    def cursor(self, factory=_TimedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
 def get_conn():
-    conn = sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(DB_PATH, factory=_TimedConnection)
     conn.row_factory = sqlite3.Row
     return conn
 
 
+def _ensure_columns(curr, table: str, columns: dict):
+    """Tabloda olmayan sütunları ekler (CREATE TABLE IF NOT EXISTS mevcut tabloyu değiştirmez)."""
+    existing = {row[1] for row in curr.execute(f"PRAGMA table_info({table})").fetchall()}
+    for name, col_type in columns.items():
+        if name not in existing:
+            curr.execute(f"ALTER TABLE {table} ADD COLUMN {name} {col_type}")
+
+
 def init_db():
     conn = get_conn()
     curr = conn.cursor()
@@ -42,9 +102,52 @@ def init_db():
             rel_velocity_km_s REAL,
             score REAL,
             event_type TEXT DEFAULT 'COLLISION', 
-            created_at TEXT
+            created_at TEXT,
+            run_id INTEGER,
+            pc REAL
         )
         """)
+    # Alarmı üreten tarama (screening_runs.id) ve çarpışma olasılığı (processing/collision_probability.py)
+    _ensure_columns(curr, "conjunction_alerts", {"run_id": "INTEGER", "pc": "REAL"})
+
+    # Tarama çalıştırmaları: katalog özeti + başlangıç zaman dilimi + parametrelerden türeyen run_key ile
+    # içerik adreslidir, aynı istek tekrar gelirse sonuç yeniden hesaplanmaz
+    curr.execute("""
+        CREATE TABLE IF NOT EXISTS screening_runs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            run_key TEXT UNIQUE,
+            catalog_hash TEXT,
+            analysis_start_time TEXT,
+            params_json TEXT,
+            status TEXT,
+            processed_pairs INTEGER,
+            alerts_saved INTEGER,
+            shards INTEGER,
+            created_at TEXT,
+            completed_at TEXT
+        )
+    """)
+
+    # Güncel olmayan taramaların alarmları (id'ler korunur, maneuver_plans.alert_id geçerli kalır)
+    curr.execute("""
+        CREATE TABLE IF NOT EXISTS conjunction_alerts_archive (
+            id INTEGER PRIMARY KEY,
+            sat1_id INTEGER,
+            sat2_id INTEGER,
+            tca TEXT,
+            miss_distance_km REAL,
+            rel_velocity_km_s REAL,
+            score REAL,
+            event_type TEXT,
+            created_at TEXT,
+            run_id INTEGER,
+            pc REAL,
+            archived_at TEXT
+        )
+    """)
+    _ensure_columns(curr, "conjunction_alerts_archive", {"pc": "REAL"})
+    curr.execute("CREATE INDEX IF NOT EXISTS idx_conjunction_alerts_archive_run "
+                 "ON conjunction_alerts_archive (run_id)")
 
     curr.execute("""
         CREATE TABLE IF NOT EXISTS satellite_intelligence (
@@ -57,9 +160,137 @@ def init_db():
             is_anomaly INTEGER,
             decay_risk TEXT, 
             predicted_at TEXT,
+            tle_version TEXT,
+            model_version TEXT,
+            lifetime_days REAL,
+            reentry_epoch TEXT,
+            reentry_window_start TEXT,
+            reentry_window_end TEXT,
+            lifetime_at TEXT,
             FOREIGN KEY (sat_id) REFERENCES raw_tles(id)
         )
     """)
+    # Eski veritabanları için: tahminin hangi TLE ve model sürümünden üretildiği
+    _ensure_columns(curr, "satellite_intelligence", {"tle_version": "TEXT", "model_version": "TEXT"})
+    # Yörünge ömrü tahmini (processing/lifetime.py), model tahminlerinden bağımsız güncellenir
+    _ensure_columns(curr, "satellite_intelligence", {
+        "lifetime_days": "REAL", "reentry_epoch": "TEXT", "reentry_window_start": "TEXT",
+        "reentry_window_end": "TEXT", "lifetime_at": "TEXT"})
+    curr.execute("CREATE INDEX IF NOT EXISTS idx_satellite_intelligence_tle_version "
+                 "ON satellite_intelligence (tle_version)")
+
+    # Manevra planları
+    # Toplu planlama sonuçları burada saklanır, aynı istek tekrar gelirse yeniden hesaplanmaz
+    # params_key: hedef mesafe, tarama parametreleri ve iki uydunun TLE sürümlerinden türeyen özet (hash).
+    # Alarm başına yalnızca son anahtarın planı tutulur (eskiler yeni plan yazılırken silinir)
+    curr.execute("""
+        CREATE TABLE IF NOT EXISTS maneuver_plans (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            alert_id INTEGER,
+            sat1_id INTEGER,
+            sat2_id INTEGER,
+            tca TEXT,
+            params_key TEXT,
+            result_json TEXT,
+            created_at TEXT,
+            UNIQUE (alert_id, params_key)
+        )
+    """)
+    # Önceki sürümlerde birikmiş eski anahtarlı planlar
+    curr.execute("DELETE FROM maneuver_plans WHERE id NOT IN (SELECT MAX(id) FROM maneuver_plans GROUP BY alert_id)")
+
+    # TLE geçmişinden tespit edilen manevralar (ardışık iki eleman seti arasındaki sıçramalar)
+    # components: toleransı aşan elemanlar (a, incl, raan, ecc)
+    curr.execute("""
+        CREATE TABLE IF NOT EXISTS maneuver_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            norad_id INTEGER,
+            sat_id INTEGER,
+            prev_sat_id INTEGER,
+            epoch TEXT,
+            prev_epoch TEXT,
+            dt_days REAL,
+            delta_a_km REAL,
+            delta_incl_deg REAL,
+            delta_raan_deg REAL,
+            delta_ecc REAL,
+            score REAL,
+            components TEXT,
+            detected_at TEXT,
+            UNIQUE (prev_sat_id, sat_id)
+        )
+    """)
+    curr.execute("CREATE INDEX IF NOT EXISTS idx_maneuver_events_norad ON maneuver_events (norad_id, epoch)")
+
+    # Artımlı işlemlerin kaldığı yer (ör. en son işlenen raw_tles.id)
+    curr.execute("""
+        CREATE TABLE IF NOT EXISTS processing_state (
+            name TEXT PRIMARY KEY,
+            last_id INTEGER,
+            updated_at TEXT
+        )
+    """)
+
+    # UCS referans verisi
+    # CSV dosyası bir kez ayrıştırılıp burada saklanır, NORAD numarası ile indekslidir
+    curr.execute("""
+        CREATE TABLE IF NOT EXISTS ucs_satellites (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            norad_id INTEGER,
+            name TEXT,
+            country TEXT,
+            operator TEXT,
+            purpose TEXT,
+            launch_mass_kg REAL,
+            inclination_deg REAL,
+            eccentricity REAL,
+            period_min REAL,
+            perigee_km REAL,
+            apogee_km REAL
+        )
+    """)
+    curr.execute("CREATE INDEX IF NOT EXISTS idx_ucs_satellites_norad ON ucs_satellites (norad_id)")
+
+    # Referans veri kaynaklarının durumu: dosya değişti mi? (mtime, boyut, sha1)
+    curr.execute("""
+        CREATE TABLE IF NOT EXISTS reference_sources (
+            name TEXT PRIMARY KEY,
+            path TEXT,
+            mtime_ns INTEGER,
+            size INTEGER,
+            sha1 TEXT,
+            row_count INTEGER,
+            loaded_at TEXT
+        )
+    """)
+
+    # İzleme listesi: kendi uydularımız (NORAD numarasıyla, yeni TLE'ler gelse de geçerli kalır)
+    curr.execute("""
+        CREATE TABLE IF NOT EXISTS watchlist (
+            norad_id INTEGER PRIMARY KEY,
+            label TEXT,
+            added_at TEXT
+        )
+    """)
+
+    # İzleme listesi taramasının son sonuçları (her taramada taranan nesnelerin kayıtları yenilenir)
+    curr.execute("""
+        CREATE TABLE IF NOT EXISTS watchlist_conjunctions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            asset_norad_id INTEGER,
+            asset_sat_id INTEGER,
+            other_sat_id INTEGER,
+            other_norad_id INTEGER,
+            tca TEXT,
+            miss_distance_km REAL,
+            rel_velocity_km_s REAL,
+            window_start TEXT,
+            window_end TEXT,
+            screened_at TEXT
+        )
+    """)
+    curr.execute("CREATE INDEX IF NOT EXISTS idx_watchlist_conjunctions_asset "
+                 "ON watchlist_conjunctions (asset_norad_id, tca)")
 
     conn.commit()
     conn.close()
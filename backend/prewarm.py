@@ -0,0 +1,48 @@
+import importlib
+import threading
+import time
+from typing import Dict, Optional
+
+"""
+Ağır bağımlılıkların arka planda önceden yüklenmesi.
+Uygulama açılışında scipy, astropy, poliastro, pandas ve scikit-learn içe aktarılmaz; ilgili alt sistem
+ilk kullanıldığında yüklenir. Ön ısıtma bu yüklemeyi açılıştan hemen sonra ayrı bir iş parçacığında
+yapar, ilk istek beklemez. Geliştirmede (uvicorn --reload) ASTM_PREWARM=0 ile kapatılabilir.
+"""
+
+# Alt sistem -> ilk kullanımda yüklenen modüller
+HEAVY_MODULES = {
+    "screening": ("scipy.spatial", "scipy.optimize"),
+    "maneuver": ("astropy.time", "astropy.units", "poliastro.bodies", "poliastro.twobody"),
+    "propagation": ("astropy.coordinates",),
+    "ssa": ("pandas", "sklearn.ensemble", "sklearn.cluster", "sklearn.preprocessing"),
+}
+
+_thread: Optional[threading.Thread] = None
+last_timings: Dict[str, float] = {}  # modül -> yükleme süresi (s), son ön ısıtmadan
+
+
+def _prewarm():
+    for modules in HEAVY_MODULES.values():
+        for name in modules:
+            start = time.perf_counter()
+            try:
+                importlib.import_module(name)
+            except Exception as e:
+                print(f">>> Ön yükleme hatası ({name}): {e}")
+                continue
+            last_timings[name] = round(time.perf_counter() - start, 3)
+
+    # Modüller hazır olduktan sonra etkin SSA modeli yüklenir
+    from service.model_registry import model_registry
+    model_registry.warm_up(background=False)
+    print(f">>> Ön yükleme tamamlandı ({sum(last_timings.values()):.2f} s)")
+
+
+def start_prewarm() -> threading.Thread:
+    """ Ön ısıtmayı daemon iş parçacığında başlatır (zaten çalışıyorsa yenisini açmaz). """
+    global _thread
+    if _thread is None or not _thread.is_alive():
+        _thread = threading.Thread(target=_prewarm, name="astm-prewarm", daemon=True)
+        _thread.start()
+    return _thread
@@ -0,0 +1,348 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import json
+import time
+import warnings
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List
+
+import numpy as np
+
+"""
+Hızlı yolların referans uygulamalara karşı doğruluk regresyon testi.
+
+Her kontrol rastgele (ama seed ile tekrarlanabilir), tamamen çevrimdışı vakalar üretir, hızlı motoru ve
+referans karşılığını aynı vakalar üzerinde çalıştırır; hata istatistiğini belgelenmiş toleranslarla
+karşılaştırır ve hızlanma oranını hatanın yanında raporlar:
+
+    propagation     propagate_satrec_array (SatrecArray)  <->  propagate_satrec_single döngüsü, skyfield
+    geodetic        teme_to_latlon_array (NumPy GMST)      <->  teme_pos_to_latlon (astropy)
+    tca_refinement  screen_trajectories (Hermite, 60 s)    <->  refine_tca_with_propagator (minimize_scalar)
+    maneuver        find_minimal_dv (Kepler/STM)           <->  poliastro yayılımı + SLSQP
+
+Kullanım:
+    python benchmarks/accuracy.py --cases 2000 --output accuracy.json
+Tolerans aşılırsa 1 ile çıkar. tests/test_accuracy.py aynı kontrolleri az sayıda vaka ile çalıştırır.
+"""
+
+# Toleranslar (en büyük mutlak hata). Değerler fiziksel sınırlardan seçilmiştir, ölçülen hatanın
+# birkaç katıdır; bir hızlı yol bunları aşıyorsa davranışı değişmiştir.
+TOLERANCES: Dict[str, Dict[str, float]] = {
+    # Aynı SGP4 C çekirdeği: fark yalnızca kayan nokta sırası kadar (1 mm)
+    "propagation": {"position_km": 1e-6, "position_vs_single_km": 1e-6},
+    # UT1-UTC (|dUT1| <= 0.9 s) ve kutup hareketi ihmali: 0.9 s * 7.29e-5 rad/s * 8400 km ~ 0.55 km
+    "geodetic": {"horizontal_km": 0.6, "alt_km": 1e-6},
+    # Referans xatol = 0.01 s; 60 s Hermite ara değerlemesinin konum hatası LEO'da metre altı
+    "tca_refinement": {"tca_s": 0.05, "miss_km": 1e-3, "rel_velocity_km_s": 1e-3},
+    # İki cisim çözücüleri (evrensel değişken vs poliastro) mm mertebesinde uyuşur;
+    # deltaV referanstan en fazla %0.1 büyük olabilir, hedef mesafe 1 m'den fazla kaçırılamaz.
+    # deltaV kutu sınırına dayanan çözümlerde kapalı form kullanılamaz, kısıtlı problem SLSQP ile çözülür
+    # (ayrı metrik, aynı tolerans)
+    "maneuver": {"position_km": 1e-4, "miss_km": 1e-4, "dv_excess_ratio": 1e-3, "dv_excess_ratio_bounded": 1e-3,
+                 "target_shortfall_km": 1e-3},
+}
+
+DEFAULT_CASES = {"propagation": 5000, "geodetic": 2000, "tca_refinement": 2000, "maneuver": 300}
+EPOCH = datetime(2025, 1, 1, tzinfo=timezone.utc)
+DV_BOUND_KM_S = 0.001  # find_minimal_dv varsayılan eksen başına deltaV sınırı
+
+
+@dataclass
+class CheckResult:
+    name: str
+    fast: str
+    reference: str
+    cases: int
+    errors: Dict[str, np.ndarray] = field(repr=False)  # metrik -> vaka başına hata
+    tolerances: Dict[str, float]
+    fast_s: float
+    reference_s: float
+
+    @property
+    def max_errors(self) -> Dict[str, float]:
+        return {k: float(np.max(v)) if len(v) else 0.0 for k, v in self.errors.items()}
+
+    @property
+    def speedup(self) -> float:
+        return self.reference_s / self.fast_s if self.fast_s > 0 else float("inf")
+
+    @property
+    def failures(self) -> List[str]:
+        # NaN (ör. bulunamayan geçiş) her zaman hatadır
+        return [k for k, v in self.errors.items()
+                if not np.all(np.isfinite(v)) or float(np.max(v, initial=0.0)) > self.tolerances[k]]
+
+    @property
+    def passed(self) -> bool:
+        return not self.failures
+
+    def to_dict(self) -> Dict:
+        return {
+            "check": self.name,
+            "fast": self.fast,
+            "reference": self.reference,
+            "cases": self.cases,
+            "max_error": self.max_errors,
+            "p99_error": {k: float(np.percentile(v, 99)) if len(v) else 0.0 for k, v in self.errors.items()},
+            "tolerance": self.tolerances,
+            "fast_s": round(self.fast_s, 4),
+            "reference_s": round(self.reference_s, 4),
+            "speedup": round(self.speedup, 1),
+            "passed": self.passed,
+        }
+
+
+def _timed(func: Callable):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def check_propagation(n_cases: int, seed: int = 0) -> CheckResult:
+    from skyfield.api import load, EarthSatellite
+    from skyfield.sgp4lib import TEME
+    from benchmarks.synthetic_catalog import generate_catalog
+    from processing.propagator import tle_to_satrec, propagate_satrec_array
+    from processing.propagate_wrapper import propagate_satrec_single
+
+    n_times = 10
+    catalog = generate_catalog(max(n_cases // n_times, 2), seed=seed, n_planted=0)
+    rng = np.random.default_rng(seed)
+    times = [catalog.epoch + timedelta(seconds=float(s)) for s in rng.uniform(-3 * 86400, 3 * 86400, n_times)]
+    sats = [tle_to_satrec(l1, l2) for _, l1, l2 in catalog.tles]
+
+    def reference():
+        out = np.full((len(sats), n_times, 3), np.nan)
+        for i, sat in enumerate(sats):
+            for k, t in enumerate(times):
+                try:
+                    out[i, k] = propagate_satrec_single(sat, t)
+                except RuntimeError:
+                    pass
+        return out
+
+    propagate_satrec_array(sats[:1], times[:1])
+    fast_s, (r, _, err) = _timed(lambda: propagate_satrec_array(sats, times))
+    ref_s, r_single = _timed(reference)
+
+    ts = load.timescale(builtin=True)
+    t_sf = ts.from_datetimes(times)
+    r_sky = np.stack([EarthSatellite(l1, l2, name, ts).at(t_sf).frame_xyz(TEME).km.T for name, l1, l2 in catalog.tles])
+
+    ok = err == 0
+    return CheckResult(
+        name="propagation", fast="propagate_satrec_array", reference="propagate_satrec_single, skyfield",
+        cases=int(ok.sum()),
+        errors={"position_km": np.linalg.norm(r - r_sky, axis=-1)[ok],
+                "position_vs_single_km": np.linalg.norm(r - r_single, axis=-1)[ok]},
+        tolerances=TOLERANCES["propagation"], fast_s=fast_s, reference_s=ref_s)
+
+
+def _unit_vectors(lat_deg, lon_deg) -> np.ndarray:
+    lat, lon = np.radians(lat_deg), np.radians(lon_deg)
+    return np.stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)], axis=-1)
+
+
+def check_geodetic(n_cases: int, seed: int = 0) -> CheckResult:
+    from processing.coord_utils import teme_pos_to_latlon, teme_to_latlon_array
+
+    rng = np.random.default_rng(seed)
+    direction = rng.normal(size=(n_cases, 3))
+    r = direction / np.linalg.norm(direction, axis=1)[:, None] * rng.uniform(6578.0, 8378.0, n_cases)[:, None]
+    start = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    times = [start + timedelta(seconds=float(s)) for s in rng.uniform(0.0, 5 * 365.25 * 86400, n_cases)]
+
+    with warnings.catch_warnings():
+        # IERS tablosu dışındaki zamanlar için astropy uyarısı (dUT1 = 0 kullanılır)
+        warnings.simplefilter("ignore")
+        teme_pos_to_latlon(r[0], times[0])
+        teme_to_latlon_array(r[:1], times[:1])
+        fast_s, (lat, lon, alt) = _timed(lambda: teme_to_latlon_array(r, times))
+        ref_s, ref = _timed(lambda: np.array([teme_pos_to_latlon(ri, t) for ri, t in zip(r, times)], dtype=float))
+
+    radius = np.linalg.norm(r, axis=1)
+    horizontal = radius * np.linalg.norm(_unit_vectors(lat, lon) - _unit_vectors(ref[:, 0], ref[:, 1]), axis=1)
+    return CheckResult(
+        name="geodetic", fast="teme_to_latlon_array", reference="teme_pos_to_latlon (astropy)", cases=n_cases,
+        errors={"horizontal_km": horizontal, "alt_km": np.abs(alt - ref[:, 2])},
+        tolerances=TOLERANCES["geodetic"], fast_s=fast_s, reference_s=ref_s)
+
+
+def _crossing_cases(n_cases: int, rng, t_ca_range=(20.0, 100.0), offset_range=(0.0, 5.0)):
+    """ Düğümde kesişen rastgele yörünge çiftleri: (sat_a, sat_b, planlanan t_ca saniye). """
+    from benchmarks.synthetic_catalog import crossing_pair
+
+    cases = []
+    for i in range(n_cases):
+        incl_a = rng.uniform(20.0, 100.0)
+        incl_b = np.clip(incl_a + rng.choice([-1.0, 1.0]) * rng.uniform(10.0, 60.0), 1.0, 179.0)
+        t_ca_min = rng.uniform(*t_ca_range)
+        sat_a, sat_b = crossing_pair(20000 + 2 * i, EPOCH, rng.uniform(400.0, 1200.0), incl_a, incl_b,
+                                     rng.uniform(0.0, 360.0), rng.uniform(*offset_range), t_ca_min)
+        cases.append((sat_a, sat_b, t_ca_min * 60.0))
+    return cases
+
+
+def check_tca_refinement(n_cases: int, seed: int = 0) -> CheckResult:
+    from processing.conjunction import refine_tca_with_propagator
+    from processing.propagate_wrapper import propagate_satrec_single
+    from processing.propagator import propagate_satrec_array
+    from processing.screening import screen_trajectories
+
+    rng = np.random.default_rng(seed)
+    cases = _crossing_cases(n_cases, rng)
+    t_est = np.array([c[2] for c in cases]) + rng.uniform(-120.0, 120.0, n_cases)
+    search_radius, step_s, threshold_km = 600.0, 60.0, 200.0
+
+    def reference():
+        return [refine_tca_with_propagator(a, b, EPOCH, t, propagate_satrec_single, search_radius=search_radius)
+                for (a, b, _), t in zip(cases, t_est)]
+
+    def fast():
+        # Tüm nesneler ortak ızgarada tek çağrıda, her çift kendi arama penceresinde taranır
+        n_steps = int((t_est.max() + search_radius) / step_s) + 2
+        times = [EPOCH + timedelta(seconds=k * step_s) for k in range(n_steps)]
+        r, v, _ = propagate_satrec_array([s for a, b, _ in cases for s in (a, b)], times)
+        out = []
+        for i, t in enumerate(t_est):
+            k0 = max(int((t - search_radius) // step_s), 0)
+            k1 = min(int((t + search_radius) // step_s) + 2, n_steps)
+            events = screen_trajectories(r[2 * i, k0:k1][None], v[2 * i, k0:k1][None], r[2 * i + 1, k0:k1][None],
+                                         v[2 * i + 1, k0:k1][None], times[k0], step_s, threshold_km)
+            target = EPOCH + timedelta(seconds=float(t))
+            events = [e for e in events if abs((e.tca - target).total_seconds()) <= search_radius]
+            out.append(min(events, key=lambda e: e.miss_distance_km) if events else None)
+        return out
+
+    refine_tca_with_propagator(cases[0][0], cases[0][1], EPOCH, t_est[0], propagate_satrec_single)
+    ref_s, ref = _timed(reference)
+    fast_s, found = _timed(fast)
+
+    missing = np.array([e is None for e in found])
+    d_tca = np.array([abs((e.tca - tca).total_seconds()) if e else np.nan for e, (tca, _, _) in zip(found, ref)])
+    d_miss = np.array([abs(e.miss_distance_km - m) if e else np.nan for e, (_, m, _) in zip(found, ref)])
+    d_vel = np.array([abs(e.rel_velocity_km_s - rv) if e else np.nan for e, (_, _, rv) in zip(found, ref)])
+    # Referansın da bir şey bulamadığı (eşik dışı) vakalar karşılaştırılmaz
+    valid = ~(missing & (np.array([m for _, m, _ in ref]) > threshold_km))
+    return CheckResult(
+        name="tca_refinement", fast="screen_trajectories (Hermite, 60 s)",
+        reference="refine_tca_with_propagator (minimize_scalar)", cases=int(valid.sum()),
+        errors={"tca_s": d_tca[valid], "miss_km": d_miss[valid], "rel_velocity_km_s": d_vel[valid]},
+        tolerances=TOLERANCES["tca_refinement"], fast_s=fast_s, reference_s=ref_s)
+
+
+def _reference_min_dv(sat_target, sat_our, burn_time, tca, target_miss_km):
+    """ poliastro ile yayılan yörünge üzerinde kısıtlı minimum deltaV (SLSQP, m/s ölçeğinde). """
+    from scipy.optimize import minimize
+    from planner.optimizer import compute_miss_distance_after_burn
+    from processing.propagate_wrapper import propagate_satrec_single
+
+    def miss(x):
+        return compute_miss_distance_after_burn(sat_target, sat_our, burn_time, x / 1000.0, tca,
+                                                propagate_satrec_single)[0]
+
+    res = minimize(lambda x: float(x @ x), np.zeros(3), jac=lambda x: 2.0 * x, method="SLSQP",
+                   bounds=[(-DV_BOUND_KM_S * 1000.0, DV_BOUND_KM_S * 1000.0)] * 3,
+                   constraints=[{"type": "ineq", "fun": lambda x: miss(x) - target_miss_km}],
+                   options={"ftol": 1e-12, "maxiter": 200})
+    return res.x / 1000.0
+
+
+def check_maneuver(n_cases: int, seed: int = 0) -> CheckResult:
+    from planner.optimizer import (compute_miss_distance_after_burn, find_minimal_dv, linearize_burn,
+                                   propagate_orbit_to, rv_to_orbit)
+    from processing.conjunction import refine_tca_with_propagator
+    from processing.kepler import propagate_kepler
+    from processing.propagate_wrapper import propagate_satrec_single
+
+    rng = np.random.default_rng(seed)
+    setups = []
+    for sat_a, sat_b, t_ca in _crossing_cases(n_cases, rng, t_ca_range=(40.0, 100.0), offset_range=(0.0, 1.0)):
+        tca, _, _ = refine_tca_with_propagator(sat_a, sat_b, EPOCH, t_ca, propagate_satrec_single)
+        burn_time = EPOCH + timedelta(seconds=float(t_ca * rng.uniform(0.1, 0.6)))
+        # Hedef, modelin manevrasız mesafesinin üstünde seçilir: iki cisim modeli ile SGP4 arasındaki
+        # J2 farkı (saatte onlarca km) her iki yolda da aynıdır ve bu kontrolün konusu değildir
+        lin = linearize_burn(sat_b, sat_a, burn_time, tca, propagate_satrec_single)
+        setups.append((sat_b, sat_a, burn_time, tca, float(np.linalg.norm(lin.rho0_km)) + rng.uniform(0.5, 2.0)))
+
+    def fast(s):
+        lin = linearize_burn(s[0], s[1], s[2], s[3], propagate_satrec_single)
+        return lin, find_minimal_dv(s[0], s[1], s[2], s[3], propagate_satrec_single, target_miss_km=s[4],
+                                    linearization=lin)
+
+    fast(setups[0])
+    _reference_min_dv(*setups[0])
+    fast_s, proposals = _timed(lambda: [fast(s) for s in setups])
+    ref_s, dv_ref = _timed(lambda: [_reference_min_dv(*s) for s in setups])
+
+    position, miss_err, excess, bounded, shortfall = [], [], [], [], []
+    for s, (lin, proposal), ref in zip(setups, proposals, dv_ref):
+        target_sat, our_sat, burn_time, tca, target_miss = s
+        dv = proposal.dv_km_s
+        r_fast, _ = propagate_kepler(lin.r_burn_km, lin.v_burn_km_s + dv, lin.tof_s)
+        r_poli = propagate_orbit_to(rv_to_orbit(lin.r_burn_km, lin.v_burn_km_s + dv, burn_time), tca)
+        miss_poli, _ = compute_miss_distance_after_burn(target_sat, our_sat, burn_time, dv, tca,
+                                                        propagate_satrec_single)
+        # Referans da hedefe ulaşamıyorsa (deltaV sınırı) ulaştığı mesafe esas alınır
+        miss_ref, _ = compute_miss_distance_after_burn(target_sat, our_sat, burn_time, ref, tca,
+                                                       propagate_satrec_single)
+        ref_mag = float(np.linalg.norm(ref))
+        position.append(np.linalg.norm(r_fast - r_poli))
+        miss_err.append(abs(proposal.predicted_miss_km - miss_poli))
+        excess.append(max(proposal.dv_mag_km_s / ref_mag - 1.0, 0.0) if ref_mag > 0 else proposal.dv_mag_km_s * np.inf)
+        bounded.append(bool(np.any(np.abs(ref) >= DV_BOUND_KM_S * (1.0 - 1e-6))))
+        shortfall.append(max(min(target_miss, miss_ref) - miss_poli, 0.0))
+
+    excess, bounded = np.array(excess), np.array(bounded)
+
+    return CheckResult(
+        name="maneuver", fast="find_minimal_dv (Kepler/STM)", reference="poliastro + SLSQP", cases=len(setups),
+        errors={"position_km": np.array(position), "miss_km": np.array(miss_err),
+                "dv_excess_ratio": excess[~bounded], "dv_excess_ratio_bounded": excess[bounded],
+                "target_shortfall_km": np.array(shortfall)},
+        tolerances=TOLERANCES["maneuver"], fast_s=fast_s, reference_s=ref_s)
+
+
+CHECKS: Dict[str, Callable[[int, int], CheckResult]] = {
+    "propagation": check_propagation,
+    "geodetic": check_geodetic,
+    "tca_refinement": check_tca_refinement,
+    "maneuver": check_maneuver,
+}
+
+
+def run_checks(names=None, cases: int = None, seed: int = 0) -> List[CheckResult]:
+    """ :param cases: tüm kontroller için vaka sayısı (verilmezse DEFAULT_CASES) """
+    return [CHECKS[name](cases or DEFAULT_CASES[name], seed) for name in (names or CHECKS)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hızlı yollar için doğruluk regresyon testi")
+    parser.add_argument("--checks", nargs="+", choices=list(CHECKS), default=None)
+    parser.add_argument("--cases", type=int, default=None, help="kontrol başına vaka sayısı")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="JSON rapor dosyası")
+    args = parser.parse_args()
+
+    results = run_checks(args.checks, args.cases, args.seed)
+    for res in results:
+        status = "OK" if res.passed else "HATA: " + ", ".join(res.failures)
+        print(f"{res.name:<16} {res.cases:>6} vaka  hızlanma x{res.speedup:<8.1f} {status}")
+        for metric, err in res.max_errors.items():
+            print(f"    {metric:<24} en büyük {err:.3g}  (tolerans {res.tolerances[metric]:.3g})")
+
+    if args.output:
+        report = {"created_at": datetime.now(timezone.utc).isoformat(), "seed": args.seed,
+                  "checks": [r.to_dict() for r in results]}
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    sys.exit(0 if all(r.passed for r in results) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+"""
+Uygulama açılış (import) süresi ölçümü.
+'import main' her tekrarda yeni bir Python sürecinde çalıştırılır (modül önbelleği sıcak kalmasın diye)
+ve -X importtime çıktısından en pahalı modüller çıkarılır. Sonuç JSON olarak yazdırılır.
+
+Kullanım:
+    python benchmarks/import_time.py --repeat 5 --max-seconds 1.5
+--max-seconds aşılırsa veya açılışta ağır bir bağımlılık yüklenmişse çıkış kodu 1 olur (CI için).
+"""
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Açılışta yüklenmemesi gereken modüller (bkz. backend/prewarm.py)
+FORBIDDEN_AT_STARTUP = ("astropy", "poliastro", "scipy", "pandas", "sklearn", "joblib", "skyfield")
+
+_PROBE = """
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+heavy = sorted({{m.split('.')[0] for m in sys.modules}} & set({forbidden!r}))
+print('RESULT', elapsed, ','.join(heavy))
+"""
+
+_IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure_once(module: str):
+    env = dict(os.environ, ASTM_PREWARM="0")
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c",
+                           _PROBE.format(module=module, forbidden=FORBIDDEN_AT_STARTUP)],
+                          cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    result = [line for line in proc.stdout.splitlines() if line.startswith("RESULT")][-1].split(" ")
+    heavy = [m for m in (result[2] if len(result) > 2 else "").split(",") if m]
+
+    # Ölçülen modülün doğrudan içe aktardıklarının kümülatif süreleri. importtime çocukları
+    # ebeveynden önce yazar: seviye 1 (3 boşluk) satırlar, modülün kendi satırına kadar biriktirilir.
+    children, direct = {}, {}
+    for line in proc.stderr.splitlines():
+        m = _IMPORTTIME_LINE.match(line)
+        if not m:
+            continue
+        depth = (len(m.group(3)) - 1) // 2
+        if depth == 1:
+            children[m.group(4)] = int(m.group(2)) / 1e6
+        elif depth == 0:
+            if m.group(4) == module:
+                direct = children
+            children = {}
+    return float(result[1]), heavy, direct
+
+
+def main():
+    parser = argparse.ArgumentParser(description="main.py import süresi ölçümü")
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--max-seconds", type=float, default=None, help="medyan süre için üst sınır")
+    args = parser.parse_args()
+
+    runs = [measure_once(args.module) for _ in range(args.repeat)]
+    times = [r[0] for r in runs]
+    heavy = sorted({m for r in runs for m in r[1]})
+    top = sorted(runs[-1][2].items(), key=lambda kv: kv[1], reverse=True)[:args.top]
+
+    report = {
+        "module": args.module,
+        "repeat": args.repeat,
+        "median_s": round(statistics.median(times), 4),
+        "min_s": round(min(times), 4),
+        "max_s": round(max(times), 4),
+        "heavy_modules_loaded": heavy,
+        "slowest_direct_imports_s": {name: round(sec, 4) for name, sec in top},
+    }
+    print(json.dumps(report, indent=2))
+
+    failed = bool(heavy) or (args.max_seconds is not None and report["median_s"] > args.max_seconds)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
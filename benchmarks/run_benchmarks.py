@@ -0,0 +1,310 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import json
+import platform
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows: en yüksek bellek ölçülmez
+    resource = None
+
+"""
+Ölçeklenme benchmark'ı: sentetik katalog üzerinde tarama aşamaları, yörünge yayılımı, SSA analizi
+manevra planlama ve parçalanma (enkaz bulutu) senaryosu süreleri, işlem hızı (throughput) ve en yüksek bellek kullanımı.
+
+Her katalog boyutu ayrı bir Python sürecinde, geçici bir veritabanı ve model registry ile çalışır
+(en yüksek RSS boyutlar arasında karışmaz, gerçek data/ dizinine dokunulmaz).
+
+Kullanım:
+    python benchmarks/run_benchmarks.py run --sizes 1000 5000 20000 50000 --output bench.json
+    python benchmarks/run_benchmarks.py compare eski.json yeni.json --threshold 0.25
+compare, süresi veya belleği eşikten fazla artan ölçümleri ve yeni sonuçta eksik ya da hatalı olan
+boyut ve ölçümleri listeler; bu durumda 1 ile çıkar.
+"""
+
+DEFAULT_SIZES = (1000, 5000, 20000, 50000)
+PROPAGATION_STEPS = 90  # 90 dk, 60 s adım
+MANEUVER_PLANS = 3
+MANEUVER_TARGET_MARGIN_KM = 2.0  # hedef: modelin manevrasız mesafesinin bu kadar üstü
+BREAKUP_FRAGMENTS = 1000  # parçalanma yük senaryosu: 3 saat, 30 s adım
+BREAKUP_HOURS = 3.0
+
+
+def _peak_rss_mb():
+    if resource is None:
+        return None
+    # ru_maxrss Linux'ta KB, macOS'ta bayt cinsindendir
+    scale = 1024.0 * 1024.0 if sys.platform == "darwin" else 1024.0
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale, 1)
+
+
+class _Recorder:
+
+    def __init__(self):
+        self.stages: Dict[str, Dict[str, Any]] = {}
+
+    def run(self, name: str, func, count: int = None, unit: str = None):
+        start = time.perf_counter()
+        result = func()
+        seconds = time.perf_counter() - start
+        entry = {"seconds": round(seconds, 4), "peak_rss_mb": _peak_rss_mb()}
+        if count is not None and seconds > 0:
+            entry["throughput"] = round(count / seconds, 1)
+            entry["unit"] = unit
+        self.stages[name] = entry
+        return result
+
+
+def _train_benchmark_model(catalog, registry):
+    """ Kabuk adlarını etiket kabul eden küçük bir model (analiz süresini ölçmek için yeterli). """
+    import pandas as pd
+    from sklearn.cluster import KMeans
+    from sklearn.ensemble import RandomForestClassifier, IsolationForest
+    from sklearn.preprocessing import LabelEncoder, StandardScaler
+    from processing.tle_arrays import parse_tle_arrays
+    from service.ssa_service import ssa_service
+
+    el = parse_tle_arrays([t[1] for t in catalog.tles], [t[2] for t in catalog.tles])
+    alt = el.altitude_km
+    X = pd.DataFrame(np.column_stack([el.inclination_deg, el.eccentricity, el.period_min, alt, alt]),
+                     columns=ssa_service.features)
+    label_encoder = LabelEncoder()
+    y = label_encoder.fit_transform(catalog.shells)
+    model = RandomForestClassifier(n_estimators=50, max_depth=12, random_state=0, n_jobs=1).fit(X, y)
+    scaler = StandardScaler()
+    Xs = scaler.fit_transform(X)
+    kmeans = KMeans(n_clusters=4, n_init=3, random_state=0).fit(Xs)
+    iso_forest = IsolationForest(n_estimators=50, random_state=0).fit(Xs)
+    registry.publish((model, label_encoder, scaler, kmeans, iso_forest), {"features": ssa_service.features})
+
+
+def run_single(n: int, seed: int, workdir: Path) -> Dict[str, Any]:
+    import backend.models.db as db
+    db.DB_PATH = workdir / "bench.db"
+
+    from benchmarks.synthetic_catalog import generate_catalog
+    from ingest.tle_fetcher import save_tles
+    from planner.optimizer import linearize_burn
+    from processing.propagate_wrapper import propagate_satrec_single
+    from processing.propagator import propagate_satrec_array
+    from service.conjunction_service import conjunction_service, SCREENING_CATALOG_LIMIT
+    from service.maneuver_service import maneuver_service, BURN_LEAD_TIME_S
+    from service.breakup_service import breakup_service
+    from service.model_registry import ModelRegistry
+    from service.ssa_service import ssa_service
+    from service.tle_service import tle_service
+
+    rec = _Recorder()
+    db.init_db()
+    catalog = rec.run("generate_catalog", lambda: generate_catalog(n, seed=seed), n, "objects/s")
+    rec.run("ingest", lambda: save_tles(catalog.tles, source="benchmark"), n, "objects/s")
+
+    # Tarama (aşama süreleri StageTimer'dan)
+    screening = rec.run("screening", lambda: conjunction_service.run_conjunction_screening(
+        analysis_start_time=catalog.epoch))
+
+    # Taramanın seçtiği nesneler (servisle aynı seçim)
+    screened = {int(s["line2"][2:7]) for s in tle_service.get_all_satellites(limit=SCREENING_CATALOG_LIMIT)}
+    conn = db.get_conn()
+    alerts = conn.execute("""
+        SELECT s1.line2 AS l1, s2.line2 AS l2 FROM conjunction_alerts a
+        JOIN raw_tles s1 ON a.sat1_id = s1.id JOIN raw_tles s2 ON a.sat2_id = s2.id
+    """).fetchall()
+    ids_by_norad = {int(r["line2"][2:7]): r["id"] for r in conn.execute("SELECT id, line2 FROM raw_tles")}
+    conn.close()
+    found = {frozenset((int(r["l1"][2:7]), int(r["l2"][2:7]))) for r in alerts}
+    in_scope = [p for p in catalog.planted if p.norad_a in screened and p.norad_b in screened]
+    detected = [p for p in in_scope if frozenset((p.norad_a, p.norad_b)) in found]
+
+    # Yörünge yayılımı: tüm katalog, ortak zaman ızgarası
+    snapshot = rec.run("catalog_load", tle_service.get_catalog, n, "objects/s")
+    times = [catalog.epoch + timedelta(seconds=60.0 * k) for k in range(PROPAGATION_STEPS)]
+    rec.run("propagation", lambda: propagate_satrec_array(snapshot.satrecs, times),
+            len(snapshot.satrecs) * PROPAGATION_STEPS, "states/s")
+
+    # SSA: model eğitimi ölçüme dahil değil
+    ssa_service.registry = ModelRegistry(workdir / "models", legacy_path=workdir / "none.joblib")
+    _train_benchmark_model(catalog, ssa_service.registry)
+    rec.run("ssa_analysis", lambda: ssa_service.analyze_all_satellites(force=True), n, "objects/s")
+    rec.run("lifetime_estimation", ssa_service.update_lifetimes, n, "objects/s")
+    rec.run("maneuver_detection", lambda: ssa_service.detect_maneuvers(full=True), n, "objects/s")
+
+    # Manevra planlama (tüm katalog yeniden taraması dahil). Hedef, iki cisim modelinin manevrasız
+    # mesafesinin üstünde seçilir (bkz. benchmarks/accuracy.py): model J2 farkı yüzünden zaten onlarca km
+    # ıskalama öngörebilir, sabit bir hedef hiç ateşleme gerektirmeyen planları ölçerdi
+    plans = []
+    for p in catalog.planted[:MANEUVER_PLANS]:
+        lin = linearize_burn(tle_service.get_satrec_by_id(ids_by_norad[p.norad_b]),
+                             tle_service.get_satrec_by_id(ids_by_norad[p.norad_a]),
+                             p.tca - timedelta(seconds=BURN_LEAD_TIME_S), p.tca, propagate_satrec_single)
+        plans.append((p, float(np.linalg.norm(lin.rho0_km)) + MANEUVER_TARGET_MARGIN_KM))
+    planned = rec.run("maneuver_planning", lambda: [maneuver_service.calculate_avoidance_maneuver(
+        ids_by_norad[p.norad_a], ids_by_norad[p.norad_b], p.tca, target_miss_km=target) for p, target in plans],
+            len(plans), "plans/s")
+    if any(r["dv_magnitude_m_s"] <= 0.0 for r in planned):
+        raise RuntimeError("Manevra planlama ölçümü ateşlemesiz plan içeriyor")
+
+    # Parçalanma: en kalabalık kabuktaki bir nesnenin enkaz bulutu tüm kataloğa karşı (sabit seed)
+    parent = int(snapshot.norad_ids[np.argmin(np.abs(snapshot.perigee_km - 550.0))])
+    breakup = rec.run("breakup_screening", lambda: breakup_service.simulate(
+        norad_id=parent, breakup_time=catalog.epoch, n_fragments=BREAKUP_FRAGMENTS, seed=seed,
+        hours=BREAKUP_HOURS), BREAKUP_FRAGMENTS, "fragments/s")
+
+    return {
+        "n_objects": n,
+        "seed": seed,
+        "stages": rec.stages,
+        "screening_stages_s": screening.get("stage_timings_s", {}),
+        "screening": {
+            "objects_screened": len(screened),
+            "processed_pairs": screening.get("processed_pairs", 0),
+            "alerts_saved": screening.get("alerts_saved", 0),
+            "planted_in_scope": len(in_scope),
+            "planted_detected": len(detected),
+        },
+        "breakup": {
+            "catalog_objects": breakup["catalog_objects"],
+            "fragments_in_orbit": breakup["fragments_in_orbit"],
+            "catalog_conjunctions": breakup["catalog_conjunctions"],
+            "stages_s": breakup["stage_timings_s"],
+        },
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(__file__)).stdout.strip()
+    except OSError:
+        return ""
+
+
+def run_all(sizes, seed: int) -> Dict[str, Any]:
+    results = {}
+    for n in sizes:
+        print(f">>> Benchmark: {n} nesne", file=sys.stderr)
+        proc = subprocess.run([sys.executable, os.path.abspath(__file__), "single", str(n), "--seed", str(seed)],
+                              capture_output=True, text=True)
+        if proc.returncode != 0:
+            results[str(n)] = {"error": proc.stderr.strip().splitlines()[-1] if proc.stderr else "failed"}
+            continue
+        results[str(n)] = json.loads(proc.stdout.strip().splitlines()[-1])
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+        },
+        "results": results,
+    }
+
+
+def _flatten(result: Dict[str, Any]) -> Dict[str, float]:
+    """ Karşılaştırılacak ölçümler: aşama süreleri, tarama alt aşamaları, en yüksek bellek. """
+    flat = {f"{name}.seconds": s["seconds"] for name, s in result.get("stages", {}).items()}
+    flat.update({f"screening.{name}.seconds": v for name, v in result.get("screening_stages_s", {}).items()})
+    flat.update({f"breakup.{name}.seconds": v for name, v in result.get("breakup", {}).get("stages_s", {}).items()})
+    if result.get("peak_rss_mb") is not None:
+        flat["peak_rss_mb"] = result["peak_rss_mb"]
+    return flat
+
+
+def compare(base: Dict[str, Any], new: Dict[str, Any], threshold: float, min_seconds: float, min_mb: float):
+    """
+    Temel sonuçtaki her boyut ve ölçüm yeni sonuçta aranır. Yeni sonuçta eksik veya hatalı çalışmış
+    boyutlar ile eksik ölçümler de gerileme sayılır (new ve ratio boş, nedeni 'missing' alanında).
+    Temelde hatalı olan boyutlar karşılaştırılamaz.
+    """
+    regressions, rows = [], []
+    new_results = new.get("results", {})
+    for size, base_result in base.get("results", {}).items():
+        if not base_result or "error" in base_result:
+            continue
+        new_result = new_results.get(size)
+        if not new_result or "error" in new_result:
+            row = {"size": int(size), "metric": "*", "base": None, "new": None, "ratio": None, "regression": True,
+                   "missing": (new_result or {}).get("error", "boyut çalıştırılmadı")}
+            rows.append(row)
+            regressions.append(row)
+            continue
+        old, cur = _flatten(base_result), _flatten(new_result)
+        for key in sorted(set(old) - set(cur)):
+            row = {"size": int(size), "metric": key, "base": old[key], "new": None, "ratio": None,
+                   "regression": True, "missing": "ölçüm yok"}
+            rows.append(row)
+            regressions.append(row)
+        for key in sorted(set(old) & set(cur)):
+            before, after = old[key], cur[key]
+            ratio = after / before if before > 0 else float("inf")
+            floor = min_mb if key.endswith("_mb") else min_seconds
+            regressed = after > before * (1.0 + threshold) and after - before > floor
+            row = {"size": int(size), "metric": key, "base": before, "new": after, "ratio": round(ratio, 3),
+                   "regression": regressed}
+            rows.append(row)
+            if regressed:
+                regressions.append(row)
+    return rows, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ASTM ölçeklenme benchmark'ı")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_run = sub.add_parser("run", help="tüm boyutları çalıştır, JSON yaz")
+    p_run.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    p_run.add_argument("--seed", type=int, default=0)
+    p_run.add_argument("--output", default=None, help="JSON dosyası (verilmezse stdout)")
+
+    p_single = sub.add_parser("single", help="tek boyut (run tarafından alt süreçte çağrılır)")
+    p_single.add_argument("size", type=int)
+    p_single.add_argument("--seed", type=int, default=0)
+
+    p_cmp = sub.add_parser("compare", help="iki sonucu karşılaştır, gerilemeleri işaretle")
+    p_cmp.add_argument("base")
+    p_cmp.add_argument("new")
+    p_cmp.add_argument("--threshold", type=float, default=0.25, help="izin verilen göreli artış")
+    p_cmp.add_argument("--min-seconds", type=float, default=0.05, help="bundan küçük süre artışları gürültü sayılır")
+    p_cmp.add_argument("--min-mb", type=float, default=25.0)
+    args = parser.parse_args()
+
+    if args.command == "single":
+        with tempfile.TemporaryDirectory(prefix="astm-bench-") as tmp:
+            print(json.dumps(run_single(args.size, args.seed, Path(tmp))))
+    elif args.command == "run":
+        report = json.dumps(run_all(args.sizes, args.seed), indent=2)
+        if args.output:
+            Path(args.output).write_text(report, encoding="utf-8")
+        else:
+            print(report)
+    else:
+        base = json.loads(Path(args.base).read_text(encoding="utf-8"))
+        new = json.loads(Path(args.new).read_text(encoding="utf-8"))
+        rows, regressions = compare(base, new, args.threshold, args.min_seconds, args.min_mb)
+        for r in rows:
+            if r["new"] is None:
+                print(f"{r['size']:>7} {r['metric']:<40} EKSİK ({r['missing']})  GERİLEME")
+                continue
+            flag = "  GERİLEME" if r["regression"] else ""
+            print(f"{r['size']:>7} {r['metric']:<40} {r['base']:>10.4g} -> {r['new']:>10.4g} (x{r['ratio']}){flag}")
+        print(json.dumps({"compared": len(rows), "regressions": regressions}, indent=2))
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import List, Tuple
+import numpy as np
+from sgp4.api import Satrec, SatrecArray, WGS72, jday
+from sgp4.exporter import export_tle
+
+"""
+Çevrimdışı sentetik TLE kataloğu üretici (benchmark ve doğruluk testleri için).
+
+Nesneler gerçek LEO dağılımına benzer irtifa/eğim kabuklarında (mega takımyıldızlar, güneş eşzamanlı
+bölge, enkaz bulutu) kümelenir. Ayrıca bilinen zamanda yakın geçiş yapan çiftler eklenir: iki dairesel
+yörünge aynı düğüm çizgisini farklı eğimlerle aynı anda keser. Gerçek en yakın geçiş (TCA ve mesafe)
+SGP4 ile 10 ms'lik ızgarada ölçülür ve beklenen sonuç olarak döner.
+Aynı (n, seed, epoch) her zaman aynı kataloğu üretir.
+"""
+
+MU_EARTH_KM3_S2 = 398600.8  # WGS72 (sgp4init ile tutarlı)
+R_EARTH_KM = 6378.135
+SGP4_EPOCH0 = datetime(1949, 12, 31, tzinfo=timezone.utc)
+DEFAULT_EPOCH = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+# (ad, irtifa km, irtifa yayılımı km, eğim derece, eğim yayılımı, ağırlık, en büyük basıklık)
+SHELLS = [
+    ("starlink-550", 550.0, 5.0, 53.0, 0.2, 0.30, 2e-4),
+    ("starlink-540", 540.0, 5.0, 53.2, 0.2, 0.10, 2e-4),
+    ("starlink-570", 570.0, 5.0, 70.0, 0.2, 0.05, 2e-4),
+    ("sso", 650.0, 150.0, 97.8, 0.5, 0.20, 2e-3),
+    ("oneweb", 1200.0, 10.0, 87.9, 0.2, 0.08, 2e-4),
+    ("iss-region", 420.0, 20.0, 51.6, 0.5, 0.02, 1e-3),
+    ("debris", 800.0, 80.0, 98.5, 4.0, 0.15, 2e-2),
+    ("low-leo", 350.0, 30.0, 43.0, 10.0, 0.10, 5e-3),
+]
+
+
+@dataclass
+class PlantedApproach:
+    norad_a: int
+    norad_b: int
+    tca: datetime  # ölçülen gerçek TCA
+    miss_distance_km: float  # ölçülen gerçek mesafe
+
+
+@dataclass
+class SyntheticCatalog:
+    epoch: datetime
+    tles: List[Tuple[str, str, str]]  # (isim, satır 1, satır 2)
+    shells: List[str]  # nesne başına kabuk adı (eğitim etiketi olarak da kullanılır)
+    planted: List[PlantedApproach]
+
+    def __len__(self):
+        return len(self.tles)
+
+
+def _mean_motion_rad_min(alt_km):
+    a = R_EARTH_KM + np.asarray(alt_km, dtype=float)
+    return np.sqrt(MU_EARTH_KM3_S2 / a ** 3) * 60.0
+
+
+def _satrec(norad: int, epoch: datetime, alt_km, incl_deg, raan_deg, ecc, argp_deg, mean_anom_deg, bstar) -> Satrec:
+    sat = Satrec()
+    sat.sgp4init(WGS72, 'i', int(norad), (epoch - SGP4_EPOCH0).total_seconds() / 86400.0, float(bstar), 0.0, 0.0,
+                 float(ecc), np.radians(argp_deg), np.radians(incl_deg), np.radians(mean_anom_deg),
+                 float(_mean_motion_rad_min(alt_km)), np.radians(raan_deg))
+    return sat
+
+
+def _measure_approach(sat_a: Satrec, sat_b: Satrec, around: datetime, half_window_s: float = 300.0,
+                      step_s: float = 1.0):
+    """ İki nesnenin 'around' çevresinde step_s ızgarasında en yakın geçişi. """
+    times = [around + timedelta(seconds=float(s)) for s in np.arange(-half_window_s, half_window_s + step_s, step_s)]
+    jd_fr = np.array([jday(t.year, t.month, t.day, t.hour, t.minute, t.second + t.microsecond * 1e-6)
+                      for t in times])
+    _, r, _ = SatrecArray([sat_a, sat_b]).sgp4(jd_fr[:, 0].copy(), jd_fr[:, 1].copy())
+    dist = np.linalg.norm(r[0] - r[1], axis=1)
+    k = int(np.argmin(dist))
+    return times[k], float(dist[k])
+
+
+def crossing_pair(norad: int, epoch: datetime, alt_km: float, incl_a: float, incl_b: float, raan: float,
+                  offset_km: float, t_ca_min: float, mean_anom_shift_deg: float = 0.0) -> Tuple[Satrec, Satrec]:
+    """
+    Aynı RAAN'lı iki dairesel yörünge; ikisi de yaklaşık t_ca_min dakika sonra çıkış düğümündedir.
+    B'nin irtifası offset_km kadar yüksektir. J2 etkisiyle gerçek geçiş mesafesi birkaç km sapabilir.
+    """
+    def build(k, incl, d_alt, d_m):
+        m0 = (np.degrees(-_mean_motion_rad_min(alt_km + d_alt) * t_ca_min) + d_m) % 360.0
+        return _satrec(norad + k, epoch, alt_km + d_alt, incl, raan, 1e-4, 0.0, m0, 5e-5)
+
+    return build(0, incl_a, 0.0, 0.0), build(1, incl_b, offset_km, mean_anom_shift_deg)
+
+
+def _aligned_pair(norad: int, epoch: datetime, alt_km: float, incl_a: float, incl_b: float, raan: float,
+                  offset_km: float, t_ca_min: float):
+    """
+    crossing_pair ile düğümde buluşan iki yörünge. J2 kaynaklı ortalama anomali hızı eğime bağlı olduğundan
+    nesneler düğüme birkaç saniye farkla varır; B'nin başlangıç anomalisi kaba-ince tarama ile düzeltilir.
+    """
+    def pair(d_m):
+        return crossing_pair(norad, epoch, alt_km, incl_a, incl_b, raan, offset_km, t_ca_min, d_m)
+
+    sat_a = pair(0.0)[0]
+    around = epoch + timedelta(minutes=float(t_ca_min))
+    best_dm, best = 0.0, None
+    for span in (1.0, 0.1, 0.01):
+        center = best_dm
+        for d_m in center + np.linspace(-span, span, 11):
+            tca, miss = _measure_approach(sat_a, pair(d_m)[1], around)
+            if best is None or miss < best[1]:
+                best_dm, best = d_m, (tca, miss)
+    sat_b = pair(best_dm)[1]
+    # Beklenen sonuç 10 ms ızgarada ölçülür
+    return sat_a, sat_b, _measure_approach(sat_a, sat_b, best[0], half_window_s=2.0, step_s=0.01)
+
+
+def generate_catalog(n: int, seed: int = 0, epoch: datetime = DEFAULT_EPOCH, n_planted: int = None,
+                     first_norad: int = 10000) -> SyntheticCatalog:
+    """
+    :param n: Toplam nesne sayısı (yakın geçiş çiftleri dahil)
+    :param n_planted: Eklenecek yakın geçiş çifti sayısı (varsayılan: 10 + n / 1000)
+    """
+    rng = np.random.default_rng(seed)
+    if n_planted is None:
+        n_planted = 10 + n // 1000
+    n_planted = min(n_planted, n // 2)
+    n_background = n - 2 * n_planted
+
+    weights = np.array([s[5] for s in SHELLS])
+    shell_idx = rng.choice(len(SHELLS), size=n_background, p=weights / weights.sum())
+    shell = [SHELLS[i] for i in shell_idx]
+    alt = np.array([s[1] for s in shell]) + rng.normal(0.0, 1.0, n_background) * np.array([s[2] for s in shell])
+    incl = np.array([s[3] for s in shell]) + rng.normal(0.0, 1.0, n_background) * np.array([s[4] for s in shell])
+    ecc = rng.uniform(0.0, 1.0, n_background) * np.array([s[6] for s in shell])
+    # Perigee 200 km'nin altına inmesin
+    alt = np.maximum(alt, 200.0 + ecc * (R_EARTH_KM + alt))
+    raan = rng.uniform(0.0, 360.0, n_background)
+    argp = rng.uniform(0.0, 360.0, n_background)
+    mean_anom = rng.uniform(0.0, 360.0, n_background)
+    bstar = rng.lognormal(np.log(1e-4), 1.0, n_background) * np.where(alt < 600, 3.0, 1.0)
+
+    tles, shells = [], []
+    norad = first_norad
+    for i in range(n_background):
+        sat = _satrec(norad, epoch, alt[i], np.clip(incl[i], 0.0, 179.0), raan[i], ecc[i], argp[i], mean_anom[i],
+                      bstar[i])
+        line1, line2 = export_tle(sat)
+        tles.append((f"SYN {shell[i][0].upper()} {norad}", line1, line2))
+        shells.append(shell[i][0])
+        norad += 1
+
+    # Yakın geçiş çiftleri: dairesel, aynı RAAN, argp = 0; ikisi de t_ca anında çıkış düğümünde
+    planted = []
+    for _ in range(n_planted):
+        p_alt = rng.uniform(450.0, 900.0)
+        incl_a = rng.uniform(30.0, 100.0)
+        incl_b = incl_a + rng.choice([-1.0, 1.0]) * rng.uniform(15.0, 40.0)
+        raan_p = rng.uniform(0.0, 360.0)
+        t_ca_min = rng.uniform(10.0, 100.0)
+        offset_km = rng.uniform(0.0, 2.0)  # irtifa farkı ~ planlanan mesafe
+        sat_a, sat_b, (tca, miss) = _aligned_pair(norad, epoch, p_alt, np.clip(incl_a, 1.0, 179.0),
+                                                  np.clip(incl_b, 1.0, 179.0), raan_p, offset_km, t_ca_min)
+        for sat in (sat_a, sat_b):
+            line1, line2 = export_tle(sat)
+            tles.append((f"SYN PLANTED {sat.satnum}", line1, line2))
+            shells.append("planted")
+        planted.append(PlantedApproach(norad, norad + 1, tca, miss))
+        norad += 2
+
+    return SyntheticCatalog(epoch=epoch, tles=tles, shells=shells, planted=planted)
@@ -18,6 +18,8 @@
             initMap();
             loadDashboardStats();
             loadSatellites();
+            connectAlertStream();
+            connectLiveFeed();
         });
 
         function showSection(id, btn) {
@@ -136,6 +138,7 @@ const CLUSTER_COLORS = {
                     .bindPopup(`<strong>${name}</strong><br>Lat: ${endPt[0].toFixed(2)}, Lon: ${endPt[1].toFixed(2)}`);
 
                 activeLayers[id] = { polyline, marker, color, meta, pathData };
+                sendLiveSubscription();
                 updateActiveSatList();
                 map.fitBounds(polyline.getBounds(), {padding: [50, 50]});
                 showSatDetails(id);
@@ -152,6 +155,7 @@ const CLUSTER_COLORS = {
                 map.removeLayer(activeLayers[id].polyline);
                 map.removeLayer(activeLayers[id].marker);
                 delete activeLayers[id];
+                sendLiveSubscription();
                 updateActiveSatList();
                 document.getElementById('sat-details-panel').classList.add('d-none');
             }
@@ -168,6 +172,76 @@ const CLUSTER_COLORS = {
             updateActiveSatList();
         }
 
+        // Canlı konum akışı (WebSocket, ikili çerçeve): haritadaki uyduların işaretçileri her tikte
+        // güncel konuma taşınır. Çerçeve formatı: processing/position_codec.py
+        const LIVE_FRAME_KEY = 1, LIVE_FRAME_DELTA8 = 2, LIVE_HEADER_SIZE = 20;
+        let liveSocket = null;
+        let liveState = null;  // { ids: Uint32Array, q: Uint16Array [enlem N | boylam N | irtifa N] }
+
+        function connectLiveFeed() {
+            const ws = new WebSocket(`${API_BASE.replace(/^http/, 'ws')}/orbit/live`);
+            ws.binaryType = 'arraybuffer';
+            ws.onopen = () => sendLiveSubscription();
+            ws.onmessage = (e) => {
+                if (typeof e.data === 'string') {
+                    const msg = JSON.parse(e.data);
+                    if (msg.type === 'error') console.error("Canlı konum:", msg.detail);
+                    return;
+                }
+                applyLiveFrame(e.data);
+            };
+            ws.onclose = () => {
+                liveSocket = null;
+                liveState = null;
+                setTimeout(connectLiveFeed, 3000);
+            };
+            liveSocket = ws;
+        }
+
+        function sendLiveSubscription() {
+            if (!liveSocket || liveSocket.readyState !== WebSocket.OPEN) return;
+            liveSocket.send(JSON.stringify({ subscribe: Object.keys(activeLayers).map(Number), interval_s: 1 }));
+        }
+
+        function applyLiveFrame(buf) {
+            const view = new DataView(buf);
+            const type = view.getUint8(0);
+            const n = view.getUint32(8, true);
+
+            if (type === LIVE_FRAME_KEY) {
+                liveState = {
+                    ids: new Uint32Array(buf, LIVE_HEADER_SIZE, n),
+                    q: new Uint16Array(buf.slice(LIVE_HEADER_SIZE + 4 * n, LIVE_HEADER_SIZE + 10 * n))
+                };
+            } else {
+                if (!liveState || liveState.ids.length !== n) return;  // anahtar çerçeve bekleniyor
+                const q = liveState.q;
+                if (type === LIVE_FRAME_DELTA8) {
+                    // -128: değer int8'e sığmadı, sıradaki int16 kaçış değeri kullanılır
+                    const d = new Int8Array(buf, LIVE_HEADER_SIZE, 3 * n);
+                    let esc = LIVE_HEADER_SIZE + 3 * n + (3 * n) % 2;
+                    for (let k = 0; k < 3 * n; k++) {
+                        if (d[k] === -128) { q[k] += view.getInt16(esc, true); esc += 2; }
+                        else q[k] += d[k];
+                    }
+                } else {
+                    const d = new Int16Array(buf, LIVE_HEADER_SIZE, 3 * n);
+                    for (let k = 0; k < 3 * n; k++) q[k] += d[k];  // Uint16Array 65536'da kendiliğinden sarar
+                }
+            }
+
+            const { ids, q } = liveState;
+            for (let k = 0; k < n; k++) {
+                const layer = activeLayers[ids[k]];
+                const latRaw = q[k] > 32767 ? q[k] - 65536 : q[k];
+                if (!layer || latRaw === -32768) continue;
+                const lat = latRaw * 90 / 32767;
+                const lon = q[n + k] * 360 / 65536;  // /orbit/propagate ile aynı [0, 360) aralığı
+                layer.marker.setLatLng([lat, lon]);
+                layer.marker.setPopupContent(`<strong>${layer.meta.sat_name}</strong><br>Lat: ${lat.toFixed(2)}, Lon: ${lon.toFixed(2)}<br>Alt: ${q[2 * n + k]} km`);
+            }
+        }
+
         function updateActiveSatList() {
             const list = document.getElementById('active-sat-list');
             const ids = Object.keys(activeLayers);
@@ -349,6 +423,44 @@ const CLUSTER_COLORS = {
             loadAlerts();
         }
 
+        function renderAlertRow(a) {
+            let badgeClass = 'bg-danger';
+            if (a.event_type === 'DOCKING') {
+                badgeClass = 'bg-info text-dark';
+            } else if (a.score < 0.4) {
+                badgeClass = 'bg-success';
+            } else if (a.score < 0.8) {
+                badgeClass = 'bg-warning text-dark';
+            }
+
+            const actionButtons = a.event_type === 'DOCKING'
+                ? `<button class="btn btn-sm btn-outline-info" onclick="visualizeConjunction(${a.sat1_id}, '${a.sat1_name}', ${a.sat2_id}, '${a.sat2_name}', '${a.tca}')"><i class="fas fa-eye me-1"></i> İzle</button>`
+                : `<div class="btn-group">
+                        <button class="btn btn-sm btn-outline-info" onclick="visualizeConjunction(${a.sat1_id}, '${a.sat1_name}', ${a.sat2_id}, '${a.sat2_name}', '${a.tca}')"><i class="fas fa-eye"></i></button>
+                        <button class="btn btn-sm btn-outline-warning" onclick='openManeuverModal(${JSON.stringify(a)})'><i class="fas fa-tools"></i></button>
+                   </div>`;
+
+            return `
+                <tr class="animate__animated animate__fadeIn">
+                    <td>
+                        <span class="badge ${badgeClass}">${a.event_type === 'DOCKING' ? 'FORMASYON' : (a.score * 100).toFixed(0) + '%'}</span>
+                        ${a.pc != null ? `<div class="small font-mono text-muted">Pc ${a.pc.toExponential(1)}</div>` : ''}
+                    </td>
+                    <td>
+                        <div class="fw-bold">${a.sat1_name}</div>
+                        <div class="small font-mono">${a.sat1_id}</div>
+                    </td>
+                    <td>
+                        <div class="fw-bold">${a.sat2_name}</div>
+                        <div class="small  font-mono">${a.sat2_id}</div>
+                    </td>
+                    <td class="font-mono small">${new Date(a.tca).toLocaleString()}</td>
+                    <td class="fw-bold ${a.event_type === 'DOCKING' ? 'text-info' : 'text-danger'} font-mono">${a.miss_distance_km.toFixed(4)} km</td>
+                    <td>${actionButtons}</td>
+                </tr>
+            `;
+        }
+
         async function loadAlerts() {
             try {
                 const res = await fetch(`${API_BASE}/conjunctions/alerts?limit=100&type=${currentAlertType}`);
@@ -361,40 +473,7 @@ const CLUSTER_COLORS = {
                     return;
                 }
 
-                data.forEach(a => {
-                    let badgeClass = 'bg-danger';
-                    if (a.event_type === 'DOCKING') {
-                        badgeClass = 'bg-info text-dark';
-                    } else if (a.score < 0.4) {
-                        badgeClass = 'bg-success';
-                    } else if (a.score < 0.8) {
-                        badgeClass = 'bg-warning text-dark';
-                    }
-
-                    const actionButtons = a.event_type === 'DOCKING'
-                        ? `<button class="btn btn-sm btn-outline-info" onclick="visualizeConjunction(${a.sat1_id}, '${a.sat1_name}', ${a.sat2_id}, '${a.sat2_name}', '${a.tca}')"><i class="fas fa-eye me-1"></i> İzle</button>`
-                        : `<div class="btn-group">
-                                <button class="btn btn-sm btn-outline-info" onclick="visualizeConjunction(${a.sat1_id}, '${a.sat1_name}', ${a.sat2_id}, '${a.sat2_name}', '${a.tca}')"><i class="fas fa-eye"></i></button>
-                                <button class="btn btn-sm btn-outline-warning" onclick='openManeuverModal(${JSON.stringify(a)})'><i class="fas fa-tools"></i></button>
-                           </div>`;
-
-                    tbody.innerHTML += `
-                        <tr class="animate__animated animate__fadeIn">
-                            <td><span class="badge ${badgeClass}">${a.event_type === 'DOCKING' ? 'FORMASYON' : (a.score * 100).toFixed(0) + '%'}</span></td>
-                            <td>
-                                <div class="fw-bold">${a.sat1_name}</div>
-                                <div class="small font-mono">${a.sat1_id}</div>
-                            </td>
-                            <td>
-                                <div class="fw-bold">${a.sat2_name}</div>
-                                <div class="small  font-mono">${a.sat2_id}</div>
-                            </td>
-                            <td class="font-mono small">${new Date(a.tca).toLocaleString()}</td>
-                            <td class="fw-bold ${a.event_type === 'DOCKING' ? 'text-info' : 'text-danger'} font-mono">${a.miss_distance_km.toFixed(4)} km</td>
-                            <td>${actionButtons}</td>
-                        </tr>
-                    `;
-                });
+                tbody.innerHTML = data.map(renderAlertRow).join('');
             } catch(e) { console.error(e); }
         }
 
@@ -476,6 +555,57 @@ async function calculateManeuver() {
             finally { showLoading(false); }
         }
 
+        // Canlı tarama akışı (SSE): ilerleme ve yeni alarmlar anlık gelir, tablo yeniden çekilmez.
+        // Tarayıcı bağlantı koparsa son olay numarasıyla (Last-Event-ID) kendiliğinden yeniden bağlanır.
+        function connectAlertStream() {
+            const source = new EventSource(`${API_BASE}/conjunctions/stream`);
+            let liveAlertCount = null;
+
+            source.addEventListener('screening_started', () => {
+                liveAlertCount = 0;
+                document.getElementById('loadingText').innerText = "Tarama Başlatıldı...";
+            });
+
+            source.addEventListener('screening_progress', (e) => {
+                const p = JSON.parse(e.data);
+                // Kabuklara bölünmüş taramada toplam çift sayısı baştan bilinmez, biten kabuklar sayılır
+                const pct = p.total ? Math.round(100 * p.processed / p.total)
+                    : p.shards ? Math.round(100 * p.shards_done / p.shards) : 100;
+                document.getElementById('loadingText').innerText = `Taranıyor... %${pct} (${p.alerts} uyarı)`;
+            });
+
+            source.addEventListener('alert', (e) => {
+                const a = JSON.parse(e.data);
+                if (liveAlertCount !== null) {
+                    liveAlertCount += 1;
+                    document.getElementById('stat-alert-count').innerText = liveAlertCount;
+                }
+
+                const dash = document.getElementById('dashboard-alerts-body');
+                if (dash.rows.length === 1 && dash.rows[0].cells.length === 1) dash.innerHTML = "";
+                dash.insertAdjacentHTML('afterbegin', `
+                    <tr class="animate__animated animate__fadeIn">
+                        <td class="text-info">${a.sat1_name}</td>
+                        <td class="text-warning">${a.sat2_name}</td>
+                        <td class="font-mono small">${new Date(a.tca).toLocaleTimeString()}</td>
+                        <td><span class="badge bg-danger">${a.miss_distance_km.toFixed(2)} km</span></td>
+                    </tr>`);
+                while (dash.rows.length > 5) dash.deleteRow(-1);
+
+                if (a.event_type === currentAlertType) {
+                    const tbody = document.getElementById('conj-table-body');
+                    if (tbody.rows.length === 1 && tbody.rows[0].cells.length === 1) tbody.innerHTML = "";
+                    tbody.insertAdjacentHTML('afterbegin', renderAlertRow(a));
+                }
+            });
+
+            // Tarama bitti veya akış gerisinde kalındı: kesin durumu REST'ten yeniden çek
+            const refresh = () => { liveAlertCount = null; loadAlerts(); loadDashboardStats(); };
+            source.addEventListener('screening_completed', refresh);
+            source.addEventListener('screening_failed', refresh);
+            source.addEventListener('resync', refresh);
+        }
+
         async function loadDashboardStats() {
             try {
                 const healthRes = await fetch(`${API_BASE}/health`);
@@ -535,7 +665,35 @@ async function calculateManeuver() {
                 method: 'POST'
             });
             const data = await res.json();
-            alert("Başarılı: " + data.message);
+            if (!res.ok) {
+                alert("Eğitim başlatılamadı: " + JSON.stringify(data.detail));
+                return;
+            }
+
+            // Eğitim arka planda çalışır, ilerleme NDJSON akışından okunur
+            const stream = await fetch(`${API_BASE}/ssa/train/jobs/${data.job_id}/stream`);
+            const reader = stream.body.getReader();
+            const decoder = new TextDecoder();
+            let buffer = "", last = null;
+            while (true) {
+                const { value, done } = await reader.read();
+                if (done) break;
+                buffer += decoder.decode(value, { stream: true });
+                const lines = buffer.split("\n");
+                buffer = lines.pop();
+                for (const line of lines) {
+                    if (!line.trim()) continue;
+                    last = JSON.parse(line);
+                    if (last.total) {
+                        showLoading(true, `Model Eğitiliyor... ${last.done || 0}/${last.total} görev`);
+                    }
+                }
+            }
+            if (last && last.type === "completed") {
+                alert(`Başarılı: Model ${last.version} yayınlandı. Doğruluk: %${(last.metrics.accuracy * 100).toFixed(1)}`);
+            } else {
+                alert("Eğitim Hatası: " + (last && last.error ? last.error : "bilinmiyor"));
+            }
         } catch (e) {
             console.error("Eğitim Hatası:", e);
             alert("Model eğitilirken bir hata oluştu. Backend loglarını kontrol edin.");
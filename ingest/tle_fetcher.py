@@ -5,7 +5,6 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from datetime import datetime
 from typing import List, Tuple
-import httpx
 from backend.models.db import get_conn, init_db
 
 # URL yapısı: gp.php?GROUP=<istenen grup>&FORMAT=tle
@@ -13,6 +12,8 @@ CELESTRAK_STATIONS = "https://celestrak.org/NORAD/elements/gp.php?GROUP=stations
 
 
 def fetch_tle_text(url: str) -> str:
+    import httpx
+
     # Belli bir istek sayısından sonra (timeout'a rağmen) hata verdiğinden geçici olarak eklenmiştir
     headers = {
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36 (ASTM-Prototype-Project/1.0)',
@@ -1,15 +1,17 @@
-from fastapi import FastAPI
+import os
+import time
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 # Statik dosyaları servis etmek için gerekli kütüphaneler
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import HTMLResponse
 from pathlib import Path
 
-from backend.api import router_conjunctions, router_maneuver, router_tle, router_propagate, router_ssa
+from backend.api import router_conjunctions, router_maneuver, router_tle, router_propagate, router_ssa, router_metrics, \
+    router_watchlist, router_breakup
+from backend.metrics import HTTP_REQUEST_SECONDS
 from backend.models.db import init_db
-
-# Uygulama başladığında DByi kur
-init_db()
+from backend.prewarm import start_prewarm
 
 app = FastAPI(
     title="ASTM Prototype API",
@@ -26,11 +28,39 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.middleware("http")
+async def observe_request_latency(request: Request, call_next):
+    # Etiket olarak URL yerine route şablonu (/tle/{sat_id}) kullanılır, kardinalite sınırlı kalır
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        HTTP_REQUEST_SECONDS.observe(time.perf_counter() - start, method=request.method,
+                                     route=getattr(route, "path", "unmatched"), status=status)
+
+
+@app.on_event("startup")
+async def on_startup():
+    # DB kurulumu import sırasında değil, uygulama başlarken yapılır (main'i içe aktarmak yan etkisizdir)
+    init_db()
+    # Ağır kütüphaneler ve SSA modeli arka planda yüklenir, ilk istekler yükleme süresini beklemez
+    if os.environ.get("ASTM_PREWARM", "1") != "0":
+        start_prewarm()
+
+
 app.include_router(router_tle.router)
 app.include_router(router_conjunctions.router)
 app.include_router(router_maneuver.router)
 app.include_router(router_propagate.router)
 app.include_router(router_ssa.router)
+app.include_router(router_metrics.router)
+app.include_router(router_watchlist.router)
+app.include_router(router_breakup.router)
 
 # Statik dosyaları kök dizinine göre ayarla
 app.mount("/assets", StaticFiles(directory="dashboard/assets"), name="assets")
@@ -1,12 +1,13 @@
+import itertools
 from dataclasses import dataclass
 from datetime import datetime, timezone, timedelta
-from typing import Tuple, Callable
+from typing import Tuple, Callable, Optional, TYPE_CHECKING
 import numpy as np
-from scipy.optimize import minimize
-from astropy.time import Time
-import astropy.units as u
-from poliastro.bodies import Earth
-from poliastro.twobody import Orbit
+from processing.kepler import propagate_kepler, kepler_stm
+
+# scipy.optimize, astropy ve poliastro içe aktarımı saniyeler sürer; kullanıldıkları fonksiyonlarda yüklenir
+if TYPE_CHECKING:
+    from poliastro.twobody import Orbit
 
 """
 Eğer şu an motorları ateşleyip hız vektörüne X kadar ekleme yapsaydık, 
@@ -27,29 +28,71 @@ class ManeuverProposal:
     predicted_rel_vel_km_s: float
     success: bool  # başarı durumu
     message: str  # açıklama
+    n_evaluations: int = 0  # optimizasyon sırasında yapılan simülasyon sayısı
+
+
+@dataclass
+class BurnLinearization:
+    """
+    Ateşleme anındaki deltaV ile TCA anındaki bağıl konum arasındaki doğrusal ilişki.
+    rho(dv) ~= rho0 + phi_rv @ dv
+    """
+    r_burn_km: np.ndarray  # ateşleme anındaki konumumuz
+    v_burn_km_s: np.ndarray  # ateşleme anındaki hızımız (manevrasız)
+    tof_s: float  # ateşlemeden TCA'ya kadar geçen süre
+    r_target_tca_km: np.ndarray  # diğer uydunun TCA anındaki konumu
+    r_target_tca_next_km: np.ndarray  # diğer uydunun TCA + 1 sn anındaki konumu (bağıl hız için)
+    r_our_tca_km: np.ndarray  # manevrasız durumda TCA anındaki konumumuz
+    phi_rv: np.ndarray  # 3x3, d(r_tca) / d(dv) (durum geçiş matrisinin konum-hız bloğu)
+
+    @property
+    def rho0_km(self) -> np.ndarray:
+        """Manevrasız durumda TCA anındaki bağıl konum vektörü (biz - diğer)."""
+        return self.r_our_tca_km - self.r_target_tca_km
 
 
-def rv_to_orbit(r_km: np.ndarray, v_km_s: np.ndarray, epoch_dt: datetime) -> Orbit:
+def rv_to_orbit(r_km: np.ndarray, v_km_s: np.ndarray, epoch_dt: datetime) -> "Orbit":
     """
     Konum (r) ve Hız (v) vektörlerinden bir 'poliastro.Orbit' nesnesi oluşturur.
     Manevra sonrası yörüngeyi iki cisim problemi olarak çözmek için kullanılır.
     """
+    from astropy.time import Time
+    import astropy.units as u
+    from poliastro.bodies import Earth
+    from poliastro.twobody import Orbit
+
     t = Time(epoch_dt.replace(tzinfo=None).strftime('%Y-%m-%dT%H:%M:%S.%f'), format="isot", scale="utc")
     # Vektörleri birimli hale getirip Dünya merkezli yörünge nesnesi oluştur
     return Orbit.from_vectors(Earth, r_km * u.km, v_km_s * u.km / u.s, epoch=t)
 
 
-def propagate_orbit_to(orbit: Orbit, target_dt: datetime) -> np.ndarray:
+def propagate_orbit_to(orbit: "Orbit", target_dt: datetime) -> np.ndarray:
     """
     Verilen bir yörüngeyi (bizim durumumuzda Orbit nesnesini),
     hedef zamana (target_dt) kadar ilerletir ve yeni konumu döndürür.
     """
+    from astropy.time import Time
+    import astropy.units as u
+
     t_target = Time(target_dt.replace(tzinfo=None).strftime('%Y-%m-%dT%H:%M:%S.%f'), format="isot", scale="utc")
     tof = (t_target - orbit.epoch).to(u.s)  # time of flight
     new_orbit = orbit.propagate(tof)
     return np.array(new_orbit.r.to(u.km).value, dtype=float)
 
 
+def state_at_burn(satrec_our, burn_time: datetime,
+                   propagate_func: Callable[[object, datetime], np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Ateşleme anındaki mevcut konum ve hızın bulunması.
+    Hız vektörünü bulmak için 1 saniye arayla iki konum alıp farkını alıyoruz (basit türev).
+    Not: SGP4 kütüphanesinin kendi hız çıktısı da kullanılabilir ama bu yöntem genel geçerdir.
+    """
+    r_b = np.array(propagate_func(satrec_our, burn_time), dtype=float)
+    r_b1 = np.array(propagate_func(satrec_our, burn_time + timedelta(seconds=1)), dtype=float)
+    v_b = (r_b1 - r_b) / 1.0
+    return r_b, v_b
+
+
 # Simülasyon Kısmı
 def compute_miss_distance_after_burn(
         satrec_target, satrec_our, burn_time: datetime,
@@ -65,11 +108,7 @@ def compute_miss_distance_after_burn(
     """
 
     # ateşleme anındaki mevcut konum ve hızın bulunması
-    # hız vektörünü bulmak için 1 saniye arayla iki konum alıp farkını alıyoruz (basit türev)
-    # Not: SGP4 kütüphanesinin kendi hız çıktısı da kullanılabilir ama bu yöntem genel geçerdir.
-    r_b = np.array(propagate_func(satrec_our, burn_time), dtype=float)
-    r_b1 = np.array(propagate_func(satrec_our, burn_time + timedelta(seconds=1)), dtype=float)
-    v_b = (r_b1 - r_b) / 1.0
+    r_b, v_b = state_at_burn(satrec_our, burn_time, propagate_func)
 
     # Manevra v' = v + deltav işlemi
     v_new = v_b + np.array(dv_km_s, dtype=float)
@@ -92,6 +131,227 @@ def compute_miss_distance_after_burn(
     return miss, rel_vel
 
 
+# Doğrusallaştırma (State Transition Matrix)
+def linearize_burn(
+        satrec_target, satrec_our, burn_time: datetime, tca_time: datetime,
+        propagate_func: Callable[[object, datetime], np.ndarray]
+) -> BurnLinearization:
+    """
+    Ateşleme anındaki deltaV'nin TCA anındaki konuma etkisini doğrusallaştırır.
+    SGP4 çağrıları (ateşleme durumu ve diğer uydunun TCA konumu) burada bir kez yapılır,
+    sonraki tüm deltaV denemeleri sadece iki cisim yayılımı ile değerlendirilir.
+    """
+    r_b, v_b = state_at_burn(satrec_our, burn_time, propagate_func)
+    tof = (tca_time - burn_time).total_seconds()
+    r_tca, _, phi = kepler_stm(r_b, v_b, tof)
+
+    return BurnLinearization(
+        r_burn_km=r_b,
+        v_burn_km_s=v_b,
+        tof_s=tof,
+        r_target_tca_km=np.array(propagate_func(satrec_target, tca_time), dtype=float),
+        r_target_tca_next_km=np.array(propagate_func(satrec_target, tca_time + timedelta(seconds=1)), dtype=float),
+        r_our_tca_km=r_tca,
+        phi_rv=phi[:3, 3:]
+    )
+
+
+def solve_linear_min_dv(rho0_km: np.ndarray, phi_rv: np.ndarray, target_miss_km: float) -> np.ndarray:
+    """
+    Doğrusal modelde kapalı form minimum deltaV çözümü:
+        min |dv|  öyle ki  |rho0 + phi_rv @ dv| >= target_miss_km
+
+    phi_rv = U diag(s) V^T tekil değer ayrışımı ile problem, TCA anındaki bağıl konum z için
+    küre üzerinde en yakın nokta problemine dönüşür. Lagrange çarpanı t tek değişkenli
+    sekular denklemden (secular equation) bulunur:
+        sum_i (c_i / (1 - t s_i^2))^2 = target^2,   c = U^T rho0,  0 <= t < 1/s_max^2
+    rho0 ~ 0 ise (tam çarpışma) çözüm en büyük tekil değer yönüne düşer (hard case).
+    """
+    rho0 = np.asarray(rho0_km, dtype=float)
+    if np.linalg.norm(rho0) >= target_miss_km:
+        return np.zeros(3)  # zaten güvenli mesafedeyiz
+
+    u_mat, s, vt = np.linalg.svd(phi_rv)  # s azalan sırada
+    c = u_mat.T @ rho0
+    s2 = s ** 2
+    t_hi = (1.0 / s2[0]) * (1.0 - 1e-12)
+
+    def secular(t):
+        return float(np.sum((c / (1.0 - t * s2)) ** 2) - target_miss_km ** 2)
+
+    if secular(t_hi) < 0.0:
+        # Hard case: bağıl konumun en verimli yöndeki bileşeni sıfıra çok yakın
+        z = np.zeros(3)
+        z[1:] = c[1:] / (1.0 - s2[1:] / s2[0])
+        rest = max(target_miss_km ** 2 - float(np.sum(z[1:] ** 2)), 0.0)
+        z[0] = np.copysign(np.sqrt(rest), c[0] if c[0] != 0.0 else 1.0)
+    else:
+        from scipy.optimize import brentq
+        t = brentq(secular, 0.0, t_hi, xtol=1e-30, rtol=1e-14)
+        z = c / (1.0 - t * s2)
+
+    # z, U tabanında TCA bağıl konumu. Gereken konum değişimi y = z - c, dv = V diag(1/s) U^T y
+    return vt.T @ ((z - c) / s)
+
+
+def _miss_and_gradient(lin: BurnLinearization, dv: np.ndarray) -> Tuple[float, np.ndarray]:
+    """
+    Doğrusal olmayan (iki cisim) miss distance ve deltaV'ye göre kesin türevi.
+    d(miss)/d(dv) = Phi_rv(dv)^T rho / |rho|
+    """
+    r_tca, _, phi = kepler_stm(lin.r_burn_km, lin.v_burn_km_s + dv, lin.tof_s)
+    rho = r_tca - lin.r_target_tca_km
+    miss = float(np.linalg.norm(rho))
+    if miss == 0.0:
+        return 0.0, np.zeros(3)
+    return miss, phi[:3, 3:].T @ rho / miss
+
+
+def _simulate_linearized(lin: BurnLinearization, dv: np.ndarray) -> Tuple[float, float]:
+    """
+    compute_miss_distance_after_burn ile aynı büyüklükleri (miss, bağıl hız) hızlı yoldan verir.
+    Bağıl hız yine TCA ve TCA + 1 sn konum farkından hesaplanır.
+    """
+    r_our, _ = propagate_kepler(lin.r_burn_km, lin.v_burn_km_s + dv, np.array([lin.tof_s, lin.tof_s + 1.0]))
+    miss = float(np.linalg.norm(lin.r_target_tca_km - r_our[0]))
+    rel_vel = float(np.linalg.norm((lin.r_target_tca_next_km - lin.r_target_tca_km) - (r_our[1] - r_our[0])))
+    return miss, rel_vel
+
+
+def _polish_successive_linearization(lin: BurnLinearization, target_miss_km: float,
+                                    max_iter: int = 10, tol_km_s: float = 1e-12) -> Tuple[np.ndarray, int]:
+    """
+    Kapalı form çözümü doğrusal olmayan modele göre düzeltir.
+    Her adımda mevcut dv etrafında yeniden doğrusallaştırılır:
+        rho(w) ~= [rho(dv) - Phi(dv) @ dv] + Phi(dv) @ w
+    ve bu model için kapalı form minimum |w| çözülür (Gauss-Newton benzeri sabit nokta iterasyonu).
+    :return: (dv, yapılan simülasyon sayısı)
+    """
+    dv = solve_linear_min_dv(lin.rho0_km, lin.phi_rv, target_miss_km)
+    n_eval = 0
+    for _ in range(max_iter):
+        r_tca, _, phi = kepler_stm(lin.r_burn_km, lin.v_burn_km_s + dv, lin.tof_s)
+        n_eval += 1
+        phi_rv = phi[:3, 3:]
+        rho_affine = (r_tca - lin.r_target_tca_km) - phi_rv @ dv
+        dv_new = solve_linear_min_dv(rho_affine, phi_rv, target_miss_km)
+        converged = np.linalg.norm(dv_new - dv) < tol_km_s
+        dv = dv_new
+        if converged:
+            break
+    return dv, n_eval
+
+
+def post_burn_ephemeris(r_nominal_km: np.ndarray, v_nominal_km_s: np.ndarray, offsets_s: np.ndarray,
+                        r_burn_km: np.ndarray, v_burn_km_s: np.ndarray, dv_km_s: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Manevra sonrası efemeris: SGP4 nominal yörüngesine manevranın iki cisim farkı eklenir.
+        r_post(t) = r_sgp4(t) + [kepler(r_b, v_b + dv, t) - kepler(r_b, v_b, t)]
+    Saatler süren pencerelerde saf iki cisim yayılımı J2 nedeniyle onlarca km sapar,
+    bu yüzden sadece manevranın etkisi iki cisim modelinden alınır.
+
+    :param r_nominal_km: (T, 3) manevrasız SGP4 konumları
+    :param v_nominal_km_s: (T, 3) manevrasız SGP4 hızları
+    :param offsets_s: (T,) ateşleme anından itibaren geçen süre, negatifse manevra öncesi
+    """
+    offsets = np.asarray(offsets_s, dtype=float)
+    dt = np.maximum(offsets, 0.0)
+    r_b = np.asarray(r_burn_km, dtype=float)
+    v_b = np.asarray(v_burn_km_s, dtype=float)
+    r_new, v_new = propagate_kepler(r_b, v_b + dv_km_s, dt)
+    r_ref, v_ref = propagate_kepler(r_b, v_b, dt)
+    after = (offsets >= 0.0)[:, None]
+    return (r_nominal_km + np.where(after, r_new - r_ref, 0.0),
+            v_nominal_km_s + np.where(after, v_new - v_ref, 0.0))
+
+
+# Toplu Simülasyon (Monte Carlo)
+def sample_burn_errors(n_samples: int, magnitude_sigma: float = 0.0, pointing_sigma_rad: float = 0.0,
+                       seed: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Ateşleme icra hatası örnekleri üretir.
+    :param magnitude_sigma: büyüklük hatasının 1-sigma değeri (oransal, ör. 0.02 = %2)
+    :param pointing_sigma_rad: yönelim hatasının eksen başına 1-sigma değeri (radyan)
+    :return: magnitude_errors (S,) oransal hata, pointing_errors_rad (S, 2) -> (sapma açısı, azimut)
+    """
+    rng = np.random.default_rng(seed)
+    magnitude_errors = rng.normal(0.0, magnitude_sigma, n_samples)
+    # İki eksenli normal dağılımdan sapma açısı (Rayleigh) ve rastgele azimut
+    tilt = rng.normal(0.0, pointing_sigma_rad, (n_samples, 2))
+    pointing = np.stack([np.hypot(tilt[:, 0], tilt[:, 1]), np.arctan2(tilt[:, 1], tilt[:, 0])], axis=1)
+    return magnitude_errors, pointing
+
+
+def apply_burn_errors(dv_km_s: np.ndarray, magnitude_errors: np.ndarray,
+                      pointing_errors_rad: np.ndarray) -> np.ndarray:
+    """
+    (K, 3) nominal deltaV vektörlerine S adet icra hatası uygular.
+        dv' = |dv| (1 + dm) [cos(a) u + sin(a) (cos(b) e1 + sin(b) e2)]
+    u: nominal yön, (e1, e2): u'ya dik birim vektörler, a: sapma açısı, b: azimut.
+    :return: (K, S, 3)
+    """
+    dv = np.atleast_2d(np.asarray(dv_km_s, dtype=float))
+    mag = np.linalg.norm(dv, axis=1)
+    u = np.where(mag[:, None] > 0.0, dv / np.where(mag > 0.0, mag, 1.0)[:, None], np.array([1.0, 0.0, 0.0]))
+
+    # u'ya dik taban: u ile en az paralel eksenden başla
+    helper = np.eye(3)[np.argmin(np.abs(u), axis=1)]
+    e1 = np.cross(u, helper)
+    e1 /= np.linalg.norm(e1, axis=1)[:, None]
+    e2 = np.cross(u, e1)
+
+    a = pointing_errors_rad[:, 0][None, :, None]
+    b = pointing_errors_rad[:, 1][None, :, None]
+    direction = np.cos(a) * u[:, None, :] + np.sin(a) * (np.cos(b) * e1[:, None, :] + np.sin(b) * e2[:, None, :])
+    return (mag[:, None, None] * (1.0 + magnitude_errors[None, :, None])) * direction
+
+
+def simulate_burns_batch(lin: BurnLinearization, dv_km_s: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    compute_miss_distance_after_burn'ün vektörel karşılığı.
+    (..., 3) şeklindeki tüm deltaV vektörleri için manevra sonrası durumlar tek çağrıda
+    iki cisim modeliyle TCA ve TCA + 1 sn anına ilerletilir.
+    :return: miss_km (...), rel_vel_km_s (...)
+    """
+    dv = np.asarray(dv_km_s, dtype=float)
+    r_our, _ = propagate_kepler(lin.r_burn_km, (lin.v_burn_km_s + dv)[..., None, :],
+                                np.array([lin.tof_s, lin.tof_s + 1.0]))
+    miss = np.linalg.norm(r_our[..., 0, :] - lin.r_target_tca_km, axis=-1)
+    rel_vel = np.linalg.norm((lin.r_target_tca_next_km - lin.r_target_tca_km) - (r_our[..., 1, :] - r_our[..., 0, :]),
+                             axis=-1)
+    return miss, rel_vel
+
+
+def compute_miss_distances_after_burns(
+        satrec_target, satrec_our, burn_time: datetime,
+        dv_km_s: np.ndarray, tca_time: datetime,
+        propagate_func: Callable[[object, datetime], np.ndarray],
+        magnitude_errors: Optional[np.ndarray] = None,
+        pointing_errors_rad: Optional[np.ndarray] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Birden çok aday deltaV vektörünü (K, 3) ve isteğe bağlı icra hatası örneklerini birlikte simüle eder.
+    SGP4 çağrıları (ateşleme durumu, diğer uydunun TCA konumu) sadece bir kez yapılır.
+
+    :param magnitude_errors: (S,) oransal büyüklük hataları (bkz. sample_burn_errors)
+    :param pointing_errors_rad: (S, 2) yönelim hataları (sapma açısı, azimut)
+    :return: miss_km ve rel_vel_km_s; hata örnekleri verilmişse (K, S), verilmemişse (K,)
+    """
+    lin = linearize_burn(satrec_target, satrec_our, burn_time, tca_time, propagate_func)
+    dv = np.atleast_2d(np.asarray(dv_km_s, dtype=float))
+
+    if magnitude_errors is None and pointing_errors_rad is None:
+        return simulate_burns_batch(lin, dv)
+
+    n_samples = len(magnitude_errors) if magnitude_errors is not None else len(pointing_errors_rad)
+    if magnitude_errors is None:
+        magnitude_errors = np.zeros(n_samples)
+    if pointing_errors_rad is None:
+        pointing_errors_rad = np.zeros((n_samples, 2))
+    return simulate_burns_batch(lin, apply_burn_errors(dv, np.asarray(magnitude_errors, dtype=float),
+                                                       np.asarray(pointing_errors_rad, dtype=float)))
+
+
 # Optimizasyon fonksiyonu
 def find_minimal_dv(
         satrec_target,
@@ -102,65 +362,148 @@ def find_minimal_dv(
         target_miss_km: float = 2.0,  # hedeflenen güvenli mesafe (örn: 2 km)
         dv_bound_km_s: float = 0.001,  # izin verilen max deltav
         penalty_lambda: float = 1e6,  # ceza katsayısı
-        verbose: bool = False
+        verbose: bool = False,
+        warm_start: bool = True,  # doğrusal kapalı form çözümden başla
+        linearization: BurnLinearization = None  # önceden hesaplanmışsa tekrar SGP4 çağrılmaz
 ) -> ManeuverProposal:
     """
-    Hedeflenen 'miss distance'ı sağlamak için gerekli en küçük DeltaV vektörünü bulur.
-    Kısıtlanmamış optimizasyon yöntemini uygular.
+    Hedeflenen 'miss distance'ı sağlamak için gerekli en küçük DeltaV vektörünü bulur:
+    |dv| en küçük, miss(dv) >= target_miss_km, her eksende |dv| <= dv_bound_km_s.
+
+    Başlangıç noktası doğrusal modelin kapalı form çözümüdür ve ardışık doğrusallaştırma ile
+    düzeltilir. Çözüm kutu sınırlarını aşarsa kısıtlı problem SLSQP ile çözülür; miss distance
+    gradyanı STM (durum geçiş matrisi) üzerinden kesin verilir, böylece scipy sonlu farklarla
+    ek simülasyon yapmaz. Hedefe kutu içinde ulaşılamıyorsa en iyi köşeden başlayan cezalı
+    L-BFGS-B (penalty_lambda) mesafeyi en büyütmeye çalışır.
     """
+    try:
+        lin = linearization or linearize_burn(satrec_target, satrec_our, burn_time, tca_time, propagate_func)
+    except Exception as e:
+        return ManeuverProposal(
+            dv_km_s=np.zeros(3), dv_mag_km_s=0.0, dv_mag_m_s=0.0,
+            burn_time=burn_time, predicted_tca=tca_time, predicted_miss_km=0.0,
+            predicted_rel_vel_km_s=0.0, success=False, message=f"Propagation Error: {str(e)}"
+        )
+
+    n_eval = 0
 
-    # Amaç Fonksiyonu
+    # Amaç Fonksiyonu ve Gradyanı
     # Optimizer bu fonksiyonun döndürdüğü değeri sıfıra yaklaştırmaya çalışacak
     def obj_func(dv_flat):
-        dv = np.array(dv_flat)  # anlık deltav değeri
+        nonlocal n_eval
+        n_eval += 1
+        dv = np.array(dv_flat, dtype=float)  # anlık deltav değeri
         # simülasyonu çalıştır, manevra yapılırsa yeni mesafe ne olur ona bak
-        miss, _ = compute_miss_distance_after_burn(
-            satrec_target, satrec_our, burn_time, dv, tca_time, propagate_func
-        )
+        miss, grad_miss = _miss_and_gradient(lin, dv)
         # Maliyet
         norm = float(np.linalg.norm(dv))
+        grad = dv / norm if norm > 0.0 else np.zeros(3)
 
         # Ceza
         # Hedef mesafenin altındaysak devasa ceza uygula
         # Penalty = λ * max(0, Target - Miss) ^ 2
         # Eğer miss > target ise (güvendeyiz), max(0, negatif) -> 0 olur, ceza eklenmez.
         # Sadece yakıt maliyeti (norm) minimize edilir.
-        penalty = penalty_lambda * max(0.0, (target_miss_km - miss)) ** 2
-        return norm + penalty
+        shortfall = max(0.0, target_miss_km - miss)
+        penalty = penalty_lambda * shortfall ** 2
+        grad = grad - 2.0 * penalty_lambda * shortfall * grad_miss
+        return norm + penalty, grad
 
-    # Başlangıç tahmini (0,0,0) - Hiç manevra yapmama durumu
-    x0 = np.zeros(3, dtype=float)
     # Arama sınırları (Bounds): Delta-V her eksende max 'dv_bound_km_s' olabilir.
     bounds = [(-dv_bound_km_s, dv_bound_km_s)] * 3
 
+    # Başlangıç tahmini (0,0,0) - Hiç manevra yapmama durumu
+    from scipy.optimize import minimize, OptimizeResult
+
+    x0 = np.zeros(3, dtype=float)
+    if warm_start:
+        # Doğrusal kapalı form çözüm + ardışık doğrusallaştırma ile düzeltme.
+        # Model neredeyse doğrusal olduğu için birkaç simülasyonda yakınsar.
+        try:
+            x0, n_polish = _polish_successive_linearization(lin, target_miss_km)
+            n_eval += n_polish
+        except Exception:
+            x0 = np.zeros(3, dtype=float)
+
+        if np.all(np.abs(x0) <= dv_bound_km_s) and np.any(x0 != 0.0):
+            res = OptimizeResult(x=x0, success=True, message="Optimization finished")
+        else:
+            x0 = np.clip(x0, -dv_bound_km_s, dv_bound_km_s)
+            res = None
+    else:
+        res = None
+
     # OPTIMIZASYON:
-    try:
-        # L-BFGS-B: Sınırlandırılmış (Box-constrained) optimizasyon algoritması
-        res = minimize(
-            obj_func,
-            x0,
-            bounds=bounds,
-            method="L-BFGS-B",
-            # ftol: Fonksiyon toleransı. Hassasiyet ile hız arasındaki denge.
-            options={"ftol": 1e-9, "maxiter": 1000}
-        )
-    except Exception as e:
-        return ManeuverProposal(
-            dv_km_s=x0, dv_mag_km_s=0.0, dv_mag_m_s=0.0,
-            burn_time=burn_time, predicted_tca=tca_time, predicted_miss_km=0.0,
-            predicted_rel_vel_km_s=0.0, success=False, message=f"Optimizer Error: {str(e)}"
-        )
+    # Kutu sınırları aktifse (veya warm start kapalıysa) kısıtlı problem kesin gradyanla SLSQP ile çözülür:
+    #     min |dv|^2  öyle ki  miss(dv) >= target_miss_km,  |dv_i| <= dv_bound_km_s
+    # Cezalı amaç fonksiyonu optimumun üstünde durabildiğinden yalnızca SLSQP hedefe ulaşamazsa kullanılır.
+    if res is None:
+        last = {}
+
+        def miss_m_s(x):
+            # SLSQP m/s ölçeğinde çalışır (km/s'de |dv|^2 ~ 1e-6, ftol anlamını yitirir); fun ve jac aynı
+            # noktada ayrı çağrılır, son değerlendirme saklanır
+            nonlocal n_eval
+            key = x.tobytes()
+            if last.get("key") != key:
+                n_eval += 1
+                miss, grad_miss = _miss_and_gradient(lin, x / 1000.0)
+                last.update(key=key, miss=miss, grad=grad_miss / 1000.0)
+            return last
+
+        try:
+            res = minimize(
+                lambda x: float(x @ x), x0 * 1000.0, jac=lambda x: 2.0 * x, method="SLSQP",
+                bounds=[(-dv_bound_km_s * 1000.0, dv_bound_km_s * 1000.0)] * 3,
+                constraints=[{"type": "ineq", "fun": lambda x: miss_m_s(x)["miss"] - target_miss_km,
+                              "jac": lambda x: miss_m_s(x)["grad"]}],
+                options={"ftol": 1e-12, "maxiter": 200}
+            )
+            res.x = np.clip(res.x / 1000.0, -dv_bound_km_s, dv_bound_km_s)
+            reached = _miss_and_gradient(lin, res.x)[0] >= target_miss_km - 0.001
+        except Exception:
+            res, reached = None, False
+
+        if not reached:
+            # Hedef sınırlar içinde erişilemiyor: mesafe dv'ye göre yaklaşık konveks olduğundan en büyük
+            # değeri kutunun bir köşesindedir. 8 köşe tek çağrıda değerlendirilir, cezalı amaç fonksiyonu
+            # en iyi köşeden başlatılır.
+            corners = dv_bound_km_s * np.array(list(itertools.product((-1.0, 1.0), repeat=3)))
+            corner_miss, _ = simulate_burns_batch(lin, corners)
+            n_eval += 1
+            try:
+                # L-BFGS-B: Sınırlandırılmış (Box-constrained) optimizasyon algoritması
+                penalized = minimize(
+                    obj_func,
+                    corners[np.argmax(corner_miss)],
+                    jac=True,
+                    bounds=bounds,
+                    method="L-BFGS-B",
+                    # ftol: Fonksiyon toleransı. Hassasiyet ile hız arasındaki denge.
+                    options={"ftol": 1e-9, "maxiter": 1000}
+                )
+            except Exception as e:
+                return ManeuverProposal(
+                    dv_km_s=x0, dv_mag_km_s=0.0, dv_mag_m_s=0.0,
+                    burn_time=burn_time, predicted_tca=tca_time, predicted_miss_km=0.0,
+                    predicted_rel_vel_km_s=0.0, success=False, message=f"Optimizer Error: {str(e)}",
+                    n_evaluations=n_eval
+                )
+            # Daha büyük mesafe sağlayan sonuç kalır
+            if res is None or _miss_and_gradient(lin, penalized.x)[0] > _miss_and_gradient(lin, res.x)[0]:
+                res = penalized
 
     # optimizasyon tammalandı en iyi sonucu alalım
     dv_opt = np.array(res.x, dtype=float)
     # bu en iyi sonuçla son bir kez simülasyon yapıp kesin değerleri al
-    miss_opt, relv_opt = compute_miss_distance_after_burn(
-        satrec_target, satrec_our, burn_time, dv_opt, tca_time, propagate_func
-    )
+    miss_opt, relv_opt = _simulate_linearized(lin, dv_opt)
 
     # Bulunan mesafe hedefe (tolerans dahilinde) ulaştı mı?
     is_success = miss_opt >= (target_miss_km - 0.001)
 
+    if verbose:
+        print(f"[find_minimal_dv] nfev={n_eval} |dv|={np.linalg.norm(dv_opt) * 1000.0:.4f} m/s miss={miss_opt:.4f} km")
+
     return ManeuverProposal(
         dv_km_s=dv_opt,
         dv_mag_km_s=float(np.linalg.norm(dv_opt)),
@@ -170,5 +513,6 @@ def find_minimal_dv(
         predicted_miss_km=miss_opt,
         predicted_rel_vel_km_s=relv_opt,
         success=is_success,
-        message="Optimization finished" if res.success else str(res.message)
+        message="Optimization finished" if res.success else str(res.message),
+        n_evaluations=n_eval
     )
@@ -0,0 +1,127 @@
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, List, Sequence
+import numpy as np
+
+from processing.kepler import propagate_kepler, kepler_stm
+from planner.optimizer import state_at_burn, solve_linear_min_dv
+
+"""
+Ateşleme zamanı (lead time) ve hedef güvenli mesafe için takas (trade) çalışması.
+Tüm durumlar (lead time x hedef mesafe) tek bir NumPy grubunda birlikte çözülür:
+    * Diğer uydunun TCA konumu bir kez SGP4 ile hesaplanır ve tüm durumlarda paylaşılır.
+    * Her lead time için ateşleme durumu bir kez hesaplanır.
+    * STM'ler ve düzeltme adımları bütün durumlar için tek vektörel çağrıyla yapılır.
+Sonuçta operatörün plan seçebilmesi için DeltaV / lead time / miss distance Pareto cephesi döner.
+"""
+
+
+@dataclass
+class TradeStudyCase:
+    lead_time_s: float  # TCA'dan kaç saniye önce ateşleme yapılacağı
+    burn_time: datetime
+    target_miss_km: float
+    dv_km_s: np.ndarray
+    dv_mag_m_s: float
+    predicted_miss_km: float
+    predicted_rel_vel_km_s: float
+    success: bool  # hedef mesafeye ulaşıldı ve deltaV sınırı aşılmadı
+    pareto_optimal: bool = False
+
+
+def pareto_front_mask(dv_mag: np.ndarray, lead_time: np.ndarray, miss: np.ndarray) -> np.ndarray:
+    """
+    Baskın olunmayan (non-dominated) durumların maskesi.
+    Amaçlar: DeltaV küçük, lead time kısa (karar geç verilebilir), miss distance büyük.
+    """
+    obj = np.stack([dv_mag, lead_time, -miss], axis=1)
+    # i, j tarafından baskın mı: j her amaçta <= ve en az birinde < ise
+    le = np.all(obj[None, :, :] <= obj[:, None, :], axis=2)
+    lt = np.any(obj[None, :, :] < obj[:, None, :], axis=2)
+    dominated = np.any(le & lt, axis=1)
+    return ~dominated
+
+
+def run_burn_trade_study(
+        satrec_target,
+        satrec_our,
+        tca_time: datetime,
+        propagate_func: Callable[[object, datetime], np.ndarray],
+        lead_times_s: Sequence[float],
+        target_misses_km: Sequence[float],
+        dv_bound_km_s: float = 0.002,
+        max_iter: int = 10,
+        tol_km_s: float = 1e-12
+) -> List[TradeStudyCase]:
+    """
+    Her (lead time, hedef mesafe) çifti için minimum deltaV çözümü.
+    find_minimal_dv ile aynı modeli (SGP4 ateşleme durumu + iki cisim yayılımı) kullanır.
+    """
+    leads = np.asarray(lead_times_s, dtype=float)
+    targets = np.asarray(target_misses_km, dtype=float)
+    n_lead, n_target = len(leads), len(targets)
+    if n_lead == 0 or n_target == 0:
+        return []
+
+    # Diğer uydu manevra yapmıyor, TCA durumu tüm senaryolar için ortak
+    r_tgt = np.array(propagate_func(satrec_target, tca_time), dtype=float)
+    r_tgt_next = np.array(propagate_func(satrec_target, tca_time + timedelta(seconds=1)), dtype=float)
+
+    burn_times = [tca_time - timedelta(seconds=float(lt)) for lt in leads]
+    states = [state_at_burn(satrec_our, bt, propagate_func) for bt in burn_times]
+    r_b = np.array([st[0] for st in states])[:, None, :]  # (L, 1, 3)
+    v_b = np.array([st[1] for st in states])[:, None, :]
+    tof = leads[:, None] * np.ones((1, n_target))  # (L, M)
+
+    # Doğrusal çözüm (başlangıç noktası): dv = 0 etrafında STM
+    r_tca, _, phi = kepler_stm(r_b[:, 0], v_b[:, 0], leads)
+    dv = np.zeros((n_lead, n_target, 3))
+    for i in range(n_lead):
+        rho0 = r_tca[i] - r_tgt
+        for j in range(n_target):
+            dv[i, j] = solve_linear_min_dv(rho0, phi[i, :3, 3:], targets[j])
+
+    # Ardışık doğrusallaştırma, bütün durumlar aynı anda
+    active = np.ones((n_lead, n_target), dtype=bool)
+    for _ in range(max_iter):
+        if not np.any(active):
+            break
+        r_tca, _, phi = kepler_stm(r_b, v_b + dv, tof)
+        phi_rv = phi[..., :3, 3:]
+        rho_affine = (r_tca - r_tgt) - np.einsum('lmij,lmj->lmi', phi_rv, dv)
+        for i, j in zip(*np.nonzero(active)):
+            dv_new = solve_linear_min_dv(rho_affine[i, j], phi_rv[i, j], targets[j])
+            if np.linalg.norm(dv_new - dv[i, j]) < tol_km_s:
+                active[i, j] = False
+            dv[i, j] = dv_new
+
+    # Son değerlendirme: TCA ve TCA + 1 sn (bağıl hız için)
+    r_fin, _ = propagate_kepler(r_b[..., None, :], (v_b + dv)[..., None, :],
+                                tof[..., None] + np.array([0.0, 1.0]))
+    miss = np.linalg.norm(r_fin[..., 0, :] - r_tgt, axis=-1)
+    rel_vel = np.linalg.norm((r_tgt_next - r_tgt) - (r_fin[..., 1, :] - r_fin[..., 0, :]), axis=-1)
+    dv_mag = np.linalg.norm(dv, axis=-1)
+
+    within_bounds = np.all(np.abs(dv) <= dv_bound_km_s, axis=-1)
+    success = within_bounds & (miss >= targets[None, :] - 0.001)
+
+    lead_grid = np.broadcast_to(leads[:, None], (n_lead, n_target))
+    pareto = np.zeros((n_lead, n_target), dtype=bool)
+    if np.any(success):
+        pareto[success] = pareto_front_mask(dv_mag[success], lead_grid[success], miss[success])
+
+    cases = []
+    for i in range(n_lead):
+        for j in range(n_target):
+            cases.append(TradeStudyCase(
+                lead_time_s=float(leads[i]),
+                burn_time=burn_times[i],
+                target_miss_km=float(targets[j]),
+                dv_km_s=dv[i, j].copy(),
+                dv_mag_m_s=float(dv_mag[i, j] * 1000.0),
+                predicted_miss_km=float(miss[i, j]),
+                predicted_rel_vel_km_s=float(rel_vel[i, j]),
+                success=bool(success[i, j]),
+                pareto_optimal=bool(pareto[i, j])
+            ))
+    return cases
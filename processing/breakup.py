@@ -0,0 +1,126 @@
+from datetime import datetime
+from typing import List, Tuple
+import numpy as np
+from sgp4.api import Satrec, SatrecArray, WGS72
+from processing.collision_probability import ric_rotation
+from processing.kepler import osculating_elements
+from processing.propagator import utc_dt_to_jd
+from processing.screening import find_close_samples
+
+"""
+Parçalanma (breakup) olayı ve enkaz bulutu üretici.
+
+Ana nesnenin parçalanma anındaki durumuna rastgele Δv eklenerek parça durum vektörleri üretilir:
+    - 'lognormal': NASA standart parçalanma modelindeki gibi |Δv| log-normal (log10 ortalaması ve yayılımı),
+      doğrultu izotropik
+    - 'gaussian_ric': RIC eksenlerinde bağımsız normal dağılım (σ_R, σ_I, σ_C)
+Durum vektörleri SGP4 ortalama elemanlarına sabit nokta iterasyonuyla çevrilir: oskülatör elemanlar
+ortalama kabul edilip başlatılır, SGP4'ün epoch anında verdiği durumun elemanlarıyla hedef arasındaki fark
+eklenerek düzeltilir (J2 kısa periyotlu terimleri ve Kozai/Brouwer farkı birkaç iterasyonda söner).
+Böylece parçalar kataloğun geri kalanıyla aynı vektörel SGP4 ve KD-Tree hattında taranabilir.
+Aynı (ana durum, seed, parametreler) her zaman aynı bulutu üretir.
+"""
+
+MU_EARTH_KM3_S2 = 398600.8  # WGS72 (sgp4init ile tutarlı)
+R_EARTH_KM = 6378.135
+SGP4_EPOCH0_JD = 2433281.5  # sgp4init epoch referansı: 1949-12-31 00:00 UT
+
+DEFAULT_DV_MEDIAN_M_S = 100.0
+DEFAULT_DV_LOG10_SIGMA = 0.4
+DEFAULT_DV_SIGMA_RIC_M_S = (20.0, 50.0, 20.0)
+MIN_PERIGEE_ALT_KM = 100.0  # bunun altındaki parçalar ilk turda atmosfere girer
+FIT_ITERATIONS = 4
+
+# 1/(km² s) -> 1/(m² yıl)
+KM2_S_TO_M2_YR = 1e-6 * 365.25 * 86400.0
+
+
+def fragment_delta_v(r: np.ndarray, v: np.ndarray, n_fragments: int, rng: np.random.Generator,
+                     distribution: str = "lognormal", dv_median_m_s: float = DEFAULT_DV_MEDIAN_M_S,
+                     dv_log10_sigma: float = DEFAULT_DV_LOG10_SIGMA,
+                     dv_sigma_ric_m_s: Tuple[float, float, float] = DEFAULT_DV_SIGMA_RIC_M_S) -> np.ndarray:
+    """
+    Parça başına Δv vektörleri (km/s, ECI/TEME).
+
+    :param r, v: (3,) ana nesnenin parçalanma anındaki durumu
+    :param distribution: 'lognormal' veya 'gaussian_ric'
+    :return: (n_fragments, 3)
+    """
+    if distribution == "lognormal":
+        magnitude = 10.0 ** rng.normal(np.log10(dv_median_m_s), dv_log10_sigma, n_fragments) / 1000.0
+        direction = rng.normal(size=(n_fragments, 3))
+        direction /= np.linalg.norm(direction, axis=1, keepdims=True)
+        return direction * magnitude[:, None]
+    if distribution == "gaussian_ric":
+        dv_ric = rng.normal(size=(n_fragments, 3)) * np.asarray(dv_sigma_ric_m_s) / 1000.0
+        return dv_ric @ ric_rotation(np.atleast_2d(r), np.atleast_2d(v))[0].T
+    raise ValueError(f"Bilinmeyen Δv dağılımı: {distribution}")
+
+
+def _wrap(angle: np.ndarray) -> np.ndarray:
+    return (angle + np.pi) % (2.0 * np.pi) - np.pi
+
+
+def _init_satrecs(x: np.ndarray, epoch_days: float, bstar: np.ndarray, first_norad: int) -> List[Satrec]:
+    ecc = np.hypot(x[:, 1], x[:, 2])
+    argp = np.arctan2(x[:, 2], x[:, 1])
+    mean_anom = x[:, 5] - argp
+    no_kozai = np.sqrt(MU_EARTH_KM3_S2 / x[:, 0] ** 3) * 60.0  # rad/dk
+    sats = []
+    for i in range(len(x)):
+        sat = Satrec()
+        sat.sgp4init(WGS72, 'i', first_norad + i, epoch_days, float(bstar[i]), 0.0, 0.0, float(ecc[i]),
+                     float(argp[i] % (2 * np.pi)), float(x[i, 3]), float(mean_anom[i] % (2 * np.pi)),
+                     float(no_kozai[i]), float(x[i, 4] % (2 * np.pi)))
+        sats.append(sat)
+    return sats
+
+
+def fit_satrecs(r: np.ndarray, v: np.ndarray, epoch: datetime, bstar: np.ndarray, first_norad: int,
+                iterations: int = FIT_ITERATIONS) -> Tuple[List[Satrec], np.ndarray]:
+    """
+    Epoch anında verilen durumları (N, 3) veren SGP4 nesneleri.
+    Hiperbolik veya perigee'si MIN_PERIGEE_ALT_KM altında kalan durumlar için nesne oluşturulmaz.
+
+    :return: (geçerli durumların Satrec listesi, (N,) geçerlilik maskesi)
+    """
+    target = osculating_elements(r, v, MU_EARTH_KM3_S2)
+    ecc = np.hypot(target[:, 1], target[:, 2])
+    valid = (target[:, 0] > 0) & (ecc < 1.0) & (target[:, 0] * (1.0 - ecc) > R_EARTH_KM + MIN_PERIGEE_ALT_KM)
+    idx = np.nonzero(valid)[0]
+    if len(idx) == 0:
+        return [], valid
+
+    jd, fr = utc_dt_to_jd(epoch)
+    epoch_days = jd + fr - SGP4_EPOCH0_JD
+    x = target[idx].copy()
+    sats = _init_satrecs(x, epoch_days, bstar[idx], first_norad)
+    for _ in range(iterations):
+        err, r_fit, v_fit = SatrecArray(sats).sgp4(np.array([jd]), np.array([fr]))
+        ok = err[:, 0] == 0
+        delta = target[idx] - osculating_elements(r_fit[:, 0], v_fit[:, 0], MU_EARTH_KM3_S2)
+        delta[:, 3:] = _wrap(delta[:, 3:])
+        x[ok] += delta[ok]
+        sats = _init_satrecs(x, epoch_days, bstar[idx], first_norad)
+    return sats, valid
+
+
+def flux_per_step(asset_r: np.ndarray, asset_v: np.ndarray, frag_r: np.ndarray, frag_v: np.ndarray,
+                  radius_km: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    İzlenen nesnelerin çevresindeki parça akısı (kinetik gaz yaklaşımı).
+    Her adımda radius_km küresi içindeki parçaların bağıl hızları toplanıp küre hacmine bölünür:
+    akı = yoğunluk x ortalama bağıl hız = Σ|v_rel| / V  [1 / (km² s)].
+
+    :param asset_r, asset_v: (W, T, 3)
+    :param frag_r, frag_v: (F, T, 3)
+    :return: (W, T) küre içindeki parça sayısı ve akı
+    """
+    n_assets, n_steps, _ = asset_r.shape
+    w_idx, f_idx, k_idx = find_close_samples(asset_r, frag_r, radius_km)
+    flat = w_idx * n_steps + k_idx
+    count = np.bincount(flat, minlength=n_assets * n_steps).reshape(n_assets, n_steps)
+    rel_speed = np.linalg.norm(frag_v[f_idx, k_idx] - asset_v[w_idx, k_idx], axis=1)
+    volume = 4.0 / 3.0 * np.pi * radius_km ** 3
+    flux = np.bincount(flat, weights=rel_speed, minlength=n_assets * n_steps).reshape(n_assets, n_steps) / volume
+    return count, flux
@@ -0,0 +1,156 @@
+from typing import Optional, Tuple
+import numpy as np
+
+"""
+Çarpışma olasılığı (Probability of Collision, Pc), 2 boyutlu karşılaşma düzlemi yöntemi.
+
+Kısa süreli karşılaşma varsayımı: TCA civarında bağıl hareket doğrusaldır, iki nesnenin konum
+belirsizlikleri birbirinden bağımsız Gauss dağılımlarıdır. Birleşik kovaryans bağıl hıza dik düzleme
+(karşılaşma düzlemi) izdüşürülür; Pc, bu düzlemdeki 2B Gauss yoğunluğunun ıskalama vektörü etrafındaki
+sert cisim yarıçapı (HBR) dairesi üzerindeki integralidir.
+    - Foster: integral asal eksen çerçevesinde erf ile tek boyuta indirilir, Gauss-Legendre ile alınır.
+    - Chan: eşdeğer izotropik dağılım için seri açılımı (Poisson toplamları).
+Fonksiyonlar (N, 3) dizileri üzerinde vektörel çalışır, bir taramanın tüm alarmları tek çağrıda hesaplanır.
+"""
+
+# TLE tabanlı konum belirsizliği (1σ, km): radyal, yörünge boyunca (in-track), yörüngeye dik (cross-track).
+# SGP4 hatası en çok yörünge boyunca büyür.
+DEFAULT_SIGMA_RIC_KM = (0.2, 1.0, 0.2)
+DEFAULT_HBR_KM = 0.02  # iki nesnenin birleşik sert cisim yarıçapı (20 m)
+
+_MIN_REL_SPEED_KM_S = 1e-6  # bunun altında karşılaşma düzlemi tanımsız (kenetlenme/formasyon uçuşu)
+_FOSTER_NODES = 64
+
+
+def ric_rotation(r: np.ndarray, v: np.ndarray) -> np.ndarray:
+    """
+    RIC (radyal, in-track, cross-track) yerel çerçevesinden ECI/TEME çerçevesine dönüşüm matrisleri.
+
+    :param r: (N, 3) konum (km)
+    :param v: (N, 3) hız (km/s)
+    :return: (N, 3, 3) sütunları R, I, C birim vektörleri olan matrisler
+    """
+    r_hat = r / np.linalg.norm(r, axis=-1, keepdims=True)
+    c = np.cross(r, v)
+    c_hat = c / np.linalg.norm(c, axis=-1, keepdims=True)
+    i_hat = np.cross(c_hat, r_hat)
+    return np.stack([r_hat, i_hat, c_hat], axis=-1)
+
+
+def default_covariance(n: int, sigma_ric_km: Tuple[float, float, float] = DEFAULT_SIGMA_RIC_KM) -> np.ndarray:
+    """ (N, 3, 3) köşegen RIC kovaryansları (km²). """
+    return np.broadcast_to(np.diag(np.square(sigma_ric_km)), (n, 3, 3)).copy()
+
+
+def encounter_plane(r1, v1, r2, v2, cov1_ric, cov2_ric) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Karşılaşma düzlemindeki ıskalama vektörü ve birleşik kovaryans.
+    Düzlemin x ekseni ıskalama doğrultusu, z ekseni bağıl hız doğrultusudur.
+
+    :param r1, v1, r2, v2: (N, 3) TCA anındaki durumlar (km, km/s)
+    :param cov1_ric, cov2_ric: (N, 3, 3) nesnelerin kendi RIC çerçevelerindeki kovaryansları (km²)
+    :return: miss_2d (N, 2) km, cov_2d (N, 2, 2) km²
+    """
+    r_rel = r2 - r1
+    v_rel = v2 - v1
+    z_hat = v_rel / np.linalg.norm(v_rel, axis=-1, keepdims=True)
+    r_perp = r_rel - np.sum(r_rel * z_hat, axis=-1, keepdims=True) * z_hat
+    miss = np.linalg.norm(r_perp, axis=-1)
+
+    # Iskalama sıfırsa x ekseni bağıl hıza dik herhangi bir doğrultu olabilir
+    axis = np.where(np.abs(z_hat[:, :1]) < 0.9, [[1.0, 0.0, 0.0]], [[0.0, 1.0, 0.0]])
+    fallback = np.cross(z_hat, axis)
+    x_dir = np.where(miss[:, None] > 1e-12, r_perp, fallback)
+    x_hat = x_dir / np.linalg.norm(x_dir, axis=-1, keepdims=True)
+    y_hat = np.cross(z_hat, x_hat)
+    basis = np.stack([x_hat, y_hat], axis=1)  # (N, 2, 3)
+
+    rot1 = ric_rotation(r1, v1)
+    rot2 = ric_rotation(r2, v2)
+    cov_eci = rot1 @ cov1_ric @ np.swapaxes(rot1, -1, -2) + rot2 @ cov2_ric @ np.swapaxes(rot2, -1, -2)
+    cov_2d = basis @ cov_eci @ np.swapaxes(basis, -1, -2)
+    miss_2d = np.stack([miss, np.zeros_like(miss)], axis=-1)
+    return miss_2d, cov_2d
+
+
+def _principal_axes(miss_2d: np.ndarray, cov_2d: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """ Kovaryansın asal eksen çerçevesinde ıskalama bileşenleri ve standart sapmalar. """
+    eigval, eigvec = np.linalg.eigh(cov_2d)
+    m = np.einsum("nji,nj->ni", eigvec, miss_2d)
+    sigma = np.sqrt(np.maximum(eigval, 1e-300))
+    return m[:, 0], m[:, 1], sigma[:, 0], sigma[:, 1]
+
+
+def pc_foster(miss_2d: np.ndarray, cov_2d: np.ndarray, hbr_km) -> np.ndarray:
+    """
+    Foster yöntemi: 2B Gauss yoğunluğunun HBR dairesi üzerindeki integrali.
+    Asal eksen çerçevesinde y yönündeki integral erf ile kapalı yazılır:
+        Pc = ∫ φ(x; mx, σx) · [Φ((my + h(x)) / σy) - Φ((my - h(x)) / σy)] dx,  h(x) = √(R² - x²)
+    x = R·sin(t) dönüşümü daire kenarındaki karekök tekilliğini kaldırır, integral Gauss-Legendre ile alınır.
+    """
+    from scipy.special import erf
+    mx, my, sx, sy = _principal_axes(miss_2d, cov_2d)
+    hbr = np.broadcast_to(np.asarray(hbr_km, dtype=float), mx.shape)
+
+    nodes, weights = np.polynomial.legendre.leggauss(_FOSTER_NODES)
+    t = nodes * (np.pi / 2.0)
+    x = hbr[:, None] * np.sin(t)  # (N, K)
+    h = hbr[:, None] * np.cos(t)
+    dx = hbr[:, None] * np.cos(t) * (np.pi / 2.0)
+
+    px = np.exp(-0.5 * ((x - mx[:, None]) / sx[:, None]) ** 2) / (sx[:, None] * np.sqrt(2.0 * np.pi))
+    py = 0.5 * (erf((h - my[:, None]) / (sy[:, None] * np.sqrt(2.0)))
+                + erf((h + my[:, None]) / (sy[:, None] * np.sqrt(2.0))))
+    return np.clip(np.sum(weights * px * py * dx, axis=-1), 0.0, 1.0)
+
+
+def pc_chan(miss_2d: np.ndarray, cov_2d: np.ndarray, hbr_km) -> np.ndarray:
+    """
+    Chan yöntemi: dağılım eşdeğer izotropik Gauss ile temsil edilir (σ² = σx·σy), Pc seri açılımla bulunur:
+        Pc = Σ_m Poisson(m; v/2) · P(Poisson(u/2) > m),  u = R² / (σx σy),  v = mx²/σx² + my²/σy²
+    HBR belirsizliğe göre küçük olduğunda Foster ile aynı sonucu verir.
+    """
+    from scipy.special import gammaln, gammainc, xlogy
+    mx, my, sx, sy = _principal_axes(miss_2d, cov_2d)
+    hbr = np.broadcast_to(np.asarray(hbr_km, dtype=float), mx.shape)
+    u = hbr ** 2 / (sx * sy)
+    v = (mx / sx) ** 2 + (my / sy) ** 2
+
+    # P(Poisson(u/2) > m) m, u/2'nin birkaç standart sapma ötesinde sıfırlanır; terim sayısı ıskalamaya
+    # değil HBR/σ oranına bağlıdır (uzak karşılaşmalar terim sayısını büyütmez)
+    n_terms = int(np.max(u / 2.0 + 10.0 * np.sqrt(u / 2.0))) + 30
+    m = np.arange(n_terms)[None, :]
+    lam = v[:, None] / 2.0
+    log_w = xlogy(m, lam) - lam - gammaln(m + 1)
+    # P(Poisson(u/2) > m) = P(m + 1, u/2), düzenli alt eksik gama fonksiyonu
+    tail = gammainc(m + 1, u[:, None] / 2.0)
+    return np.clip(np.sum(np.exp(log_w) * tail, axis=-1), 0.0, 1.0)
+
+
+def collision_probability(r1, v1, r2, v2, cov1_ric: Optional[np.ndarray] = None,
+                          cov2_ric: Optional[np.ndarray] = None, hbr_km=DEFAULT_HBR_KM,
+                          method: str = "foster") -> np.ndarray:
+    """
+    N karşılaşmanın çarpışma olasılığı.
+
+    :param r1, v1, r2, v2: (N, 3) TCA anındaki konum (km) ve hızlar (km/s), ECI/TEME
+    :param cov1_ric, cov2_ric: (N, 3, 3) veya (3, 3) RIC kovaryansları (km²); verilmezse DEFAULT_SIGMA_RIC_KM
+    :param hbr_km: Birleşik sert cisim yarıçapı (km), skaler veya (N,)
+    :param method: 'foster' veya 'chan'
+    :return: (N,) Pc; bağıl hız sıfıra yakınsa (karşılaşma düzlemi tanımsız) NaN
+    """
+    r1, v1, r2, v2 = (np.atleast_2d(np.asarray(a, dtype=float)) for a in (r1, v1, r2, v2))
+    n = len(r1)
+    cov1 = default_covariance(n) if cov1_ric is None else np.broadcast_to(cov1_ric, (n, 3, 3))
+    cov2 = default_covariance(n) if cov2_ric is None else np.broadcast_to(cov2_ric, (n, 3, 3))
+    if method not in ("foster", "chan"):
+        raise ValueError(f"Bilinmeyen Pc yöntemi: {method}")
+
+    pc = np.full(n, np.nan)
+    ok = np.linalg.norm(v2 - v1, axis=-1) > _MIN_REL_SPEED_KM_S
+    if not np.any(ok):
+        return pc
+    hbr = np.broadcast_to(np.asarray(hbr_km, dtype=float), (n,))[ok]
+    miss_2d, cov_2d = encounter_plane(r1[ok], v1[ok], r2[ok], v2[ok], cov1[ok], cov2[ok])
+    pc[ok] = (pc_foster if method == "foster" else pc_chan)(miss_2d, cov_2d, hbr)
+    return pc
@@ -1,7 +1,6 @@
 from typing import Tuple, Optional
 from datetime import datetime, timedelta
 import numpy as np
-from scipy.optimize import minimize_scalar
 from dataclasses import dataclass
 
 
@@ -18,6 +17,7 @@ class Conjunction:
     rel_velocity_km_s: float  # yaklaşma anı bağıl hız km/s
     score: float  # 0.0, 1.0 arası risk skoru
     event_type: str = "COLLISION"  # 'COLLISION' (Çarpışma) veya 'DOCKING' (Kenetlenme)
+    states: Optional[Tuple[np.ndarray, ...]] = None  # TCA anındaki (r1, v1, r2, v2), Pc hesabı için
 
 
 def analytic_tca_and_miss(r1, v1, r2, v2, epoch) -> Tuple[float, float]:
@@ -51,11 +51,13 @@ def analytic_tca_and_miss(r1, v1, r2, v2, epoch) -> Tuple[float, float]:
 
 
 # Refine Aşaması
-def refine_tca_with_propagator(satrec1, satrec2, epoch, t_est_seconds, propagate_func, search_radius=600.0):
+def refine_tca_with_propagator(satrec1, satrec2, epoch, t_est_seconds, propagate_func, search_radius=600.0,
+                               return_states=False):
     """
     Lineer varsayımı düzeltmek için SGP4 ile hassas arama.
     Analitik yöntemle bulunan t* zamanı etrafında,
     gerçek yörünge mekaniğini (SGP4) kullanarak minimum mesafeyi arar.
+    return_states=True ise TCA anındaki (r1, v1, r2, v2) de döner (hata durumunda None).
 
     Neden Gerekli?
     Yörüngeler düz çizgi değil, elipstir. Lineer yöntem 5-10 saniyelik hatalar yapabilir.
@@ -76,6 +78,7 @@ def refine_tca_with_propagator(satrec1, satrec2, epoch, t_est_seconds, propagate
             return 1e9  # Hata durumunda çok uzak mesafe döndür ki orası seçilmesin
 
     # minimize_scalar optimizasyon tekniği kullanımı
+    from scipy.optimize import minimize_scalar
     # Arama Aralığı: tahmin edilen zamanın +/- 600 saniye (10 dk) çevresi
     res = minimize_scalar(dist_sq_offset, bounds=(-search_radius, search_radius), method='bounded',
                           options={'xatol': 0.01})  # 0.01 saniye hassasiyet
@@ -96,8 +99,10 @@ def refine_tca_with_propagator(satrec1, satrec2, epoch, t_est_seconds, propagate
         rel_vel = float(np.linalg.norm((r2_f - r1_f - (r2 - r1)) / dt))
     except Exception:
         # propagasyon hatası olursa güvenli değerler dön
-        return tca, 99999.9, 0.0
+        return (tca, 99999.9, 0.0, None) if return_states else (tca, 99999.9, 0.0)
 
+    if return_states:
+        return tca, miss, rel_vel, (r1, (r1_f - r1) / dt, r2, (r2_f - r2) / dt)
     return tca, miss, rel_vel
 
 
@@ -133,8 +138,8 @@ def compute_conjunction_for_pair(satrec1, satrec2, ref_epoch, r1, v1, r2, v2, pr
             )
 
         # Eğer potansiyel risk varsa, hassas hesaplama (refinement) yap
-        tca, miss_refined, rel_vel = refine_tca_with_propagator(
-            satrec1, satrec2, ref_epoch, tstar, propagate_func, search_radius=600.0
+        tca, miss_refined, rel_vel, states = refine_tca_with_propagator(
+            satrec1, satrec2, ref_epoch, tstar, propagate_func, search_radius=600.0, return_states=True
         )
 
         # Riski skorla
@@ -166,7 +171,8 @@ def compute_conjunction_for_pair(satrec1, satrec2, ref_epoch, r1, v1, r2, v2, pr
             miss_distance_km=miss_refined,
             rel_velocity_km_s=rel_vel,
             score=normalized_score,
-            event_type=final_event_type
+            event_type=final_event_type,
+            states=states
         )
     except Exception as e:
         # Herhangi bir beklenmedik hatada none dön, service katmanı bunu loglayacak
@@ -0,0 +1,166 @@
+from typing import Tuple
+import numpy as np
+
+"""
+İki cisim (Keplerian) yörünge yayılımı, evrensel değişken (universal variable) formülasyonu ile.
+Fonksiyonlar NumPy dizileri üzerinde vektörel çalışır: (N, 3) konum/hız ve (N,) uçuş süresi
+verilerek N farklı durum tek çağrıda ilerletilebilir.
+
+Durum geçiş matrisi (STM) karmaşık adım (complex-step) türevi ile hesaplanır. Bu yöntemde
+sonlu farklardaki çıkarma hatası oluşmaz, türevler makine hassasiyetinde elde edilir.
+"""
+
+MU_EARTH_KM3_S2 = 398600.4418  # poliastro Earth.k ile aynı değer (km^3/s^2)
+
+_SERIES_LIMIT = 1e-2  # |z| bu değerin altındaysa Stumpff fonksiyonları seriyle hesaplanır
+_COMPLEX_STEP = 1e-30
+
+
+def _stumpff(z: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Stumpff C(z) ve S(z) fonksiyonları.
+    Dal seçimi gerçek kısma göre yapılır, böylece karmaşık adım türevi bozulmaz.
+    """
+    c = np.empty_like(z)
+    s = np.empty_like(z)
+
+    pos = z.real > _SERIES_LIMIT  # eliptik
+    neg = z.real < -_SERIES_LIMIT  # hiperbolik
+    small = ~(pos | neg)  # parabolik civarı, seri açılımı
+
+    if np.any(pos):
+        zp = z[pos]
+        sz = np.sqrt(zp)
+        c[pos] = (1.0 - np.cos(sz)) / zp
+        s[pos] = (sz - np.sin(sz)) / sz ** 3
+    if np.any(neg):
+        zn = -z[neg]
+        sz = np.sqrt(zn)
+        c[neg] = (np.cosh(sz) - 1.0) / zn
+        s[neg] = (np.sinh(sz) - sz) / sz ** 3
+    if np.any(small):
+        zs = z[small]
+        # C = sum (-z)^k / (2k+2)!,  S = sum (-z)^k / (2k+3)!
+        c[small] = 1 / 2 - zs / 24 + zs ** 2 / 720 - zs ** 3 / 40320 + zs ** 4 / 3628800
+        s[small] = 1 / 6 - zs / 120 + zs ** 2 / 5040 - zs ** 3 / 362880 + zs ** 4 / 39916800
+    return c, s
+
+
+def propagate_kepler(r0_km, v0_km_s, dt_s, mu: float = MU_EARTH_KM3_S2,
+                     max_iter: int = 50, tol: float = 1e-12) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Konum ve hız vektörlerini iki cisim modeliyle dt_s saniye ilerletir.
+
+    :param r0_km: (..., 3) başlangıç konumu (km)
+    :param v0_km_s: (..., 3) başlangıç hızı (km/s)
+    :param dt_s: (...) uçuş süresi (saniye), r0_km[..., 0] ile yayınlanabilir (broadcast) olmalı
+    :return: (r_km, v_km_s) aynı şekilde diziler
+    """
+    r0 = np.asarray(r0_km)
+    v0 = np.asarray(v0_km_s)
+    dt = np.asarray(dt_s)
+    dtype = np.result_type(r0, v0, dt, float)
+
+    shape = np.broadcast_shapes(r0.shape[:-1], v0.shape[:-1], dt.shape)
+    r0 = np.broadcast_to(r0, shape + (3,)).reshape(-1, 3).astype(dtype)
+    v0 = np.broadcast_to(v0, shape + (3,)).reshape(-1, 3).astype(dtype)
+    dt = np.broadcast_to(dt, shape).reshape(-1).astype(dtype)
+
+    sqrt_mu = np.sqrt(mu)
+    r0n = np.sqrt(np.sum(r0 * r0, axis=1))
+    v0sq = np.sum(v0 * v0, axis=1)
+    vr0 = np.sum(r0 * v0, axis=1) / r0n
+    alpha = 2.0 / r0n - v0sq / mu  # 1/a
+
+    # Newton-Raphson ile evrensel anomali (chi) çözümü
+    chi = sqrt_mu * np.abs(alpha.real) * dt
+    k1 = r0n * vr0 / sqrt_mu
+    k2 = 1.0 - alpha * r0n
+    for _ in range(max_iter):
+        z = alpha * chi ** 2
+        c, s = _stumpff(z)
+        f_val = k1 * chi ** 2 * c + k2 * chi ** 3 * s + r0n * chi - sqrt_mu * dt
+        df_val = k1 * chi * (1.0 - z * s) + k2 * chi ** 2 * c + r0n
+        step = f_val / df_val
+        chi = chi - step
+        if np.all(np.abs(step.real) <= tol * np.maximum(1.0, np.abs(chi.real))):
+            break
+
+    # Yakınsamadan sonra bir adım daha: karmaşık kısım da aynı hassasiyete ulaşsın
+    z = alpha * chi ** 2
+    c, s = _stumpff(z)
+    f_val = k1 * chi ** 2 * c + k2 * chi ** 3 * s + r0n * chi - sqrt_mu * dt
+    df_val = k1 * chi * (1.0 - z * s) + k2 * chi ** 2 * c + r0n
+    chi = chi - f_val / df_val
+    z = alpha * chi ** 2
+    c, s = _stumpff(z)
+
+    # Lagrange katsayıları
+    f = 1.0 - chi ** 2 / r0n * c
+    g = dt - chi ** 3 * s / sqrt_mu
+    r = f[:, None] * r0 + g[:, None] * v0
+    rn = np.sqrt(np.sum(r * r, axis=1))
+    fdot = sqrt_mu / (rn * r0n) * (z * s - 1.0) * chi
+    gdot = 1.0 - chi ** 2 / rn * c
+    v = fdot[:, None] * r0 + gdot[:, None] * v0
+
+    return r.reshape(shape + (3,)), v.reshape(shape + (3,))
+
+
+def kepler_stm(r0_km, v0_km_s, dt_s, mu: float = MU_EARTH_KM3_S2) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    İki cisim yayılımı ve 6x6 durum geçiş matrisi (STM).
+    phi[..., i, j] = d(x_t)_i / d(x_0)_j, x = (rx, ry, rz, vx, vy, vz).
+
+    phi[..., :3, 3:] bloğu (Phi_rv) ateşleme anındaki hız değişiminin (deltaV)
+    son konuma doğrusal etkisini verir: dr(t) ~= Phi_rv @ dv.
+
+    :return: (r_km, v_km_s, phi) -> (..., 3), (..., 3), (..., 6, 6)
+    """
+    r0 = np.asarray(r0_km, dtype=float)
+    v0 = np.asarray(v0_km_s, dtype=float)
+    dt = np.asarray(dt_s, dtype=float)
+    shape = np.broadcast_shapes(r0.shape[:-1], v0.shape[:-1], dt.shape)
+
+    x0 = np.concatenate([np.broadcast_to(r0, shape + (3,)), np.broadcast_to(v0, shape + (3,))], axis=-1)
+    # Her durum için 6 pertürbe kopya: x0 + i*h*e_j
+    xp = x0[..., None, :] + 1j * _COMPLEX_STEP * np.eye(6)
+    dtp = np.broadcast_to(dt, shape)[..., None] * np.ones(6)
+
+    r_c, v_c = propagate_kepler(xp[..., :3], xp[..., 3:], dtp, mu=mu)
+    out = np.concatenate([r_c, v_c], axis=-1)  # (..., 6 pertürbasyon, 6 durum)
+
+    phi = np.swapaxes(out.imag, -1, -2) / _COMPLEX_STEP
+    r = r_c[..., 0, :].real
+    v = v_c[..., 0, :].real
+    return r, v, phi
+
+
+def osculating_elements(r_km, v_km_s, mu: float = MU_EARTH_KM3_S2) -> np.ndarray:
+    """
+    Oskülatör elemanlar (..., 6): a (km), e·cos ω, e·sin ω, eğim, RAAN, ortalama enlem argümanı ω + M (rad).
+    e ≈ 0'da tanımsız olan ω ve M yerine bu bileşenler kullanılır, dairesel yörüngelerde de kararlıdır.
+    """
+    r = np.asarray(r_km, dtype=float)
+    v = np.asarray(v_km_s, dtype=float)
+    rn = np.linalg.norm(r, axis=-1)
+    h = np.cross(r, v)
+    h_hat = h / np.linalg.norm(h, axis=-1, keepdims=True)
+    incl = np.arccos(np.clip(h_hat[..., 2], -1.0, 1.0))
+    raan = np.arctan2(h_hat[..., 0], -h_hat[..., 1])
+    node = np.stack([np.cos(raan), np.sin(raan), np.zeros_like(raan)], axis=-1)
+    node_perp = np.cross(h_hat, node)
+
+    v2 = np.sum(v * v, axis=-1)
+    a = 1.0 / (2.0 / rn - v2 / mu)
+    e_vec = (v2 / mu - 1.0 / rn)[..., None] * r - (np.sum(r * v, axis=-1) / mu)[..., None] * v
+    ex = np.sum(e_vec * node, axis=-1)
+    ey = np.sum(e_vec * node_perp, axis=-1)
+    ecc = np.hypot(ex, ey)
+    argp = np.arctan2(ey, ex)
+    u = np.arctan2(np.sum(r * node_perp, axis=-1), np.sum(r * node, axis=-1))  # gerçek enlem argümanı
+    nu = u - argp
+    ecc_c = np.minimum(ecc, 0.999)
+    ecc_anom = 2.0 * np.arctan(np.sqrt((1.0 - ecc_c) / (1.0 + ecc_c)) * np.tan(nu / 2.0))
+    mean_anom = ecc_anom - ecc_c * np.sin(ecc_anom)
+    return np.stack([a, ex, ey, incl, raan, argp + mean_anom], axis=-1)
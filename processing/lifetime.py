@@ -0,0 +1,115 @@
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Tuple
+import numpy as np
+
+"""
+Yörünge ömrü ve atmosfere giriş (reentry) zaman penceresi tahmini.
+
+Yarı analitik sürüklenme (drag) sönümlemesi: dairesel yakın yörüngede
+    da/dt = -B * rho(h) * sqrt(mu * a),   B = Cd * A / m  (m^2/kg)
+Değişkenler ayrılınca kalan ömür t = G(h) / B olur; G(h), giriş irtifasından h'ye kadar
+1 / (rho * sqrt(mu * a)) integralidir ve nesneden bağımsızdır. G bir kez irtifa ızgarası
+üzerinde hesaplanır, tüm katalog için ömür tek bir np.interp çağrısıdır.
+Atmosfer: parçalı üstel model (Vallado, Tablo 8-4). Güneş aktivitesi kaynaklı yoğunluk
+belirsizliği, yoğunluk çarpanı aralığı üzerinden giriş penceresine yansıtılır.
+"""
+
+MU_EARTH_M3_S2 = 3.986004418e14
+R_EARTH_KM = 6378.137
+SGP4_RHO0 = 0.15696615  # B* = B * rho0 / 2, rho0 (kg/m^2/ER)
+
+REENTRY_ALT_KM = 120.0  # bu irtifanın altında nesne saatler içinde yanar
+MAX_ALT_KM = 2500.0
+HORIZON_DAYS = 365.25 * 100  # daha uzun ömürler "sönümlenmiyor" kabul edilir
+DENSITY_FACTOR_RANGE = (0.6, 1.6)  # güneş minimumu / maksimumu için yoğunluk çarpanı
+
+# (taban irtifa km, taban yoğunluk kg/m^3, ölçek yüksekliği km)
+ATMOSPHERE_TABLE = np.array([
+    (0, 1.225, 7.249), (25, 3.899e-2, 6.349), (30, 1.774e-2, 6.682), (40, 3.972e-3, 7.554),
+    (50, 1.057e-3, 8.382), (60, 3.206e-4, 7.714), (70, 8.770e-5, 6.549), (80, 1.905e-5, 5.799),
+    (90, 3.396e-6, 5.382), (100, 5.297e-7, 5.877), (110, 9.661e-8, 7.263), (120, 2.438e-8, 9.473),
+    (130, 8.484e-9, 12.636), (140, 3.845e-9, 16.149), (150, 2.070e-9, 22.523), (180, 5.464e-10, 29.740),
+    (200, 2.789e-10, 37.105), (250, 7.248e-11, 45.546), (300, 2.418e-11, 53.628), (350, 9.518e-12, 53.298),
+    (400, 3.725e-12, 58.515), (450, 1.585e-12, 60.828), (500, 6.967e-13, 63.822), (600, 1.454e-13, 71.835),
+    (700, 3.614e-14, 88.667), (800, 1.170e-14, 124.64), (900, 5.245e-15, 181.05), (1000, 3.019e-15, 268.00),
+])
+
+
+@dataclass
+class LifetimeEstimate:
+    """ Nesne başına kalan ömür (gün, TLE epoch'undan itibaren). Tahmin yoksa NaN. """
+    lifetime_days: np.ndarray  # nominal
+    early_days: np.ndarray  # yüksek yoğunluk (güneş maksimumu)
+    late_days: np.ndarray  # düşük yoğunluk (güneş minimumu)
+
+    def __len__(self):
+        return len(self.lifetime_days)
+
+
+def density_kg_m3(alt_km: np.ndarray) -> np.ndarray:
+    """ Parçalı üstel atmosfer yoğunluğu. """
+    alt_km = np.asarray(alt_km, dtype=float)
+    band = np.clip(np.searchsorted(ATMOSPHERE_TABLE[:, 0], alt_km, side="right") - 1, 0, len(ATMOSPHERE_TABLE) - 1)
+    h0, rho0, scale = ATMOSPHERE_TABLE[band].T
+    return rho0 * np.exp(-(alt_km - h0) / scale)
+
+
+@lru_cache(maxsize=1)
+def _decay_integral() -> Tuple[np.ndarray, np.ndarray]:
+    """ İrtifa ızgarası (km) ve G(h) (s*m^2/kg); 1 km adımla yamuk kuralı. """
+    alt = np.arange(REENTRY_ALT_KM, MAX_ALT_KM + 1.0, 1.0)
+    integrand = 1.0 / (density_kg_m3(alt) * np.sqrt(MU_EARTH_M3_S2 * (R_EARTH_KM + alt) * 1e3))
+    steps = 0.5 * (integrand[1:] + integrand[:-1]) * 1e3  # km -> m
+    return alt, np.concatenate([[0.0], np.cumsum(steps)])
+
+
+def ballistic_coefficient(bstar: np.ndarray, ndot_half: np.ndarray, mean_motion_rev_day: np.ndarray,
+                          alt_km: np.ndarray) -> np.ndarray:
+    """
+    B = Cd*A/m (m^2/kg). Öncelikle BSTAR'dan; BSTAR sıfır/negatifse (uydurma artefaktı)
+    TLE'deki gözlenen ortalama hareket artışından (ndot) geri çözülür. İkisi de yoksa NaN.
+    """
+    b_from_bstar = 2.0 * bstar / SGP4_RHO0
+
+    # a_dot = -(2/3) * a * n_dot / n  ->  B = -a_dot / (rho * sqrt(mu * a))
+    a_m = (R_EARTH_KM + alt_km) * 1e3
+    with np.errstate(divide="ignore", invalid="ignore"):
+        a_dot = -(2.0 / 3.0) * a_m * (2.0 * ndot_half / 86400.0) / mean_motion_rev_day
+        b_from_ndot = -a_dot / (density_kg_m3(alt_km) * np.sqrt(MU_EARTH_M3_S2 * a_m))
+
+    return np.where(b_from_bstar > 0, b_from_bstar, np.where(b_from_ndot > 0, b_from_ndot, np.nan))
+
+
+def effective_altitude_km(mean_motion_rev_day: np.ndarray, ecc: np.ndarray) -> np.ndarray:
+    """
+    Sürüklenme açısından eşdeğer dairesel irtifa. Basık yörüngelerde sönümleme perigede
+    yoğunlaşır; perige irtifasına, perige ile apoge farkının en fazla bir ölçek yüksekliği
+    kadarı eklenir (dairesel yörüngede ortalama irtifaya eşittir).
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        a_km = (MU_EARTH_M3_S2 / (mean_motion_rev_day * 2 * np.pi / 86400) ** 2) ** (1 / 3) / 1e3
+    perigee = a_km * (1 - ecc) - R_EARTH_KM
+    band = np.clip(np.searchsorted(ATMOSPHERE_TABLE[:, 0], perigee, side="right") - 1, 0, len(ATMOSPHERE_TABLE) - 1)
+    return perigee + 0.5 * np.minimum(2 * a_km * ecc, 2 * ATMOSPHERE_TABLE[band, 2])
+
+
+def estimate_lifetime(mean_motion_rev_day: np.ndarray, ecc: np.ndarray, bstar: np.ndarray,
+                      ndot_half: np.ndarray, horizon_days: float = HORIZON_DAYS) -> LifetimeEstimate:
+    """
+    Tüm nesneler için kalan yörünge ömrü. Sönümleme bilgisi olmayan veya ömrü
+    horizon_days'i aşan nesneler NaN döner.
+    """
+    alt_grid, integral = _decay_integral()
+    alt = effective_altitude_km(mean_motion_rev_day, ecc)
+    b = ballistic_coefficient(bstar, ndot_half, mean_motion_rev_day, alt)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        g = np.interp(np.clip(alt, REENTRY_ALT_KM, MAX_ALT_KM), alt_grid, integral)
+        nominal = g / b / 86400.0
+    nominal = np.where(alt > MAX_ALT_KM, np.nan, nominal)
+    nominal[~np.isfinite(nominal) | (nominal > horizon_days)] = np.nan
+
+    # Ömür yoğunlukla ters orantılı
+    low, high = DENSITY_FACTOR_RANGE
+    return LifetimeEstimate(lifetime_days=nominal, early_days=nominal / high, late_days=nominal / low)
@@ -0,0 +1,133 @@
+from dataclasses import dataclass
+from typing import Dict, Tuple
+import numpy as np
+
+"""
+TLE geçmişinden manevra / davranış değişikliği tespiti.
+
+Her nesnenin ardışık iki eleman seti (TLE) karşılaştırılır. İlk setten doğal pertürbasyonlarla
+beklenen değerler tahmin edilir ve ikinci setteki gerçek değerden farkı (rezidü) alınır:
+    * Yarı büyük eksen: TLE'nin kendi ortalama hareket türevi (ndot/2) ile atmosferik sönümleme trendi.
+    * RAAN: J2 kaynaklı sekuler (düzenli) kayma.
+    * Eğim ve basıklık: kısa aralıklarda sabit kabul edilir.
+Rezidü, TLE gürültüsünü temsil eden ve aradaki süreyle büyüyen toleransı aşarsa olay işaretlenir.
+Tüm katalog tek seferde, NumPy dizileri üzerinde hesaplanır.
+"""
+
+MU_EARTH_KM3_S2 = 398600.44
+R_EARTH_KM = 6378.137
+J2 = 1.08262668e-3
+
+# (sabit tolerans, gün başına artış): TLE'den TLE'ye tipik belirsizlik
+DEFAULT_TOLERANCES: Dict[str, Tuple[float, float]] = {
+    "a_km": (0.5, 0.1),
+    "incl_deg": (0.01, 0.002),
+    "raan_deg": (0.05, 0.01),
+    "ecc": (1e-4, 2e-5),
+}
+MAX_GAP_DAYS = 30.0  # daha uzun aralıklarda tahmin belirsizliği tespit için fazla büyük
+MIN_RAAN_INCL_DEG = 1.0  # ekvatoral yörüngelerde RAAN tanımsıza yakındır, kullanılmaz
+
+
+@dataclass
+class ElementPairs:
+    """ Ardışık eleman seti çiftleri ve rezidüleri (hepsi aynı uzunlukta). """
+    prev_index: np.ndarray  # giriş dizilerinde önceki setin indeksi
+    next_index: np.ndarray  # sonraki setin indeksi
+    dt_days: np.ndarray
+    delta_a_km: np.ndarray
+    delta_incl_deg: np.ndarray
+    delta_raan_deg: np.ndarray
+    delta_ecc: np.ndarray
+    score: np.ndarray  # en büyük |rezidü| / tolerans oranı, > 1 ise manevra
+    components: np.ndarray  # toleransı aşan elemanlar (bit maskesi: 1=a, 2=incl, 4=raan, 8=ecc)
+
+    def __len__(self):
+        return len(self.prev_index)
+
+    @property
+    def flagged(self) -> np.ndarray:
+        return self.score > 1.0
+
+
+COMPONENT_NAMES = ("a", "incl", "raan", "ecc")
+
+
+def component_labels(mask: int) -> str:
+    return ",".join(name for bit, name in enumerate(COMPONENT_NAMES) if mask & (1 << bit))
+
+
+def _wrap_deg(angle: np.ndarray) -> np.ndarray:
+    """ Açıyı [-180, 180) aralığına getirir. """
+    return (angle + 180.0) % 360.0 - 180.0
+
+
+def raan_rate_deg_day(mean_motion_rev_day, ecc, incl_deg) -> np.ndarray:
+    """ J2 kaynaklı RAAN kayma hızı (derece/gün). """
+    n_rad_s = mean_motion_rev_day * 2 * np.pi / 86400
+    a = (MU_EARTH_KM3_S2 / n_rad_s ** 2) ** (1 / 3)
+    p = a * (1 - ecc ** 2)
+    rate_rad_s = -1.5 * n_rad_s * J2 * (R_EARTH_KM / p) ** 2 * np.cos(np.radians(incl_deg))
+    return np.degrees(rate_rad_s) * 86400
+
+
+def consecutive_pairs(norad_id: np.ndarray, epoch_days: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Her nesne için epoch sırasına göre ardışık (önceki, sonraki) indeks çiftleri.
+    Aynı epoch'a sahip tekrar eden kayıtlar (aynı TLE'nin yeniden çekilmesi) atlanır.
+    """
+    order = np.lexsort((epoch_days, norad_id))
+    same_obj = norad_id[order][1:] == norad_id[order][:-1]
+    new_epoch = epoch_days[order][1:] > epoch_days[order][:-1]
+
+    # Tekrar eden epoch'larda ilk kayıt kalır
+    keep = np.ones(len(order), dtype=bool)
+    keep[1:] = ~(same_obj & ~new_epoch)
+    order = order[keep]
+
+    same_obj = norad_id[order][1:] == norad_id[order][:-1]
+    return order[:-1][same_obj], order[1:][same_obj]
+
+
+def evaluate_pairs(prev_idx: np.ndarray, next_idx: np.ndarray, epoch_days, mean_motion_rev_day, ndot_half,
+                   incl_deg, raan_deg, ecc, tolerances: Dict[str, Tuple[float, float]] = None,
+                   max_gap_days: float = MAX_GAP_DAYS) -> ElementPairs:
+    """
+    Verilen eleman seti çiftleri için doğal trendden sapmaları hesaplar.
+    Eleman dizileri tüm katalog için (N,) boyutundadır, çiftler bu dizilere indekstir.
+    """
+    tol = dict(DEFAULT_TOLERANCES, **(tolerances or {}))
+    i0, i1 = prev_idx, next_idx
+    dt = epoch_days[i1] - epoch_days[i0]
+
+    # Yarı büyük eksen: n(t) = n0 + 2 * (ndot/2) * dt
+    n0, n1 = mean_motion_rev_day[i0], mean_motion_rev_day[i1]
+    n_pred = np.maximum(n0 + 2.0 * ndot_half[i0] * dt, 1e-6)
+    to_a = lambda n: (MU_EARTH_KM3_S2 / (n * 2 * np.pi / 86400) ** 2) ** (1 / 3)
+    delta_a = to_a(n1) - to_a(n_pred)
+
+    delta_incl = incl_deg[i1] - incl_deg[i0]
+    delta_ecc = ecc[i1] - ecc[i0]
+
+    rate = raan_rate_deg_day(n0, ecc[i0], incl_deg[i0])
+    delta_raan = _wrap_deg(raan_deg[i1] - (raan_deg[i0] + rate * dt))
+    raan_usable = np.minimum(incl_deg[i0], incl_deg[i1]) >= MIN_RAAN_INCL_DEG
+
+    ratios = np.stack([
+        np.abs(delta_a) / (tol["a_km"][0] + tol["a_km"][1] * dt),
+        np.abs(delta_incl) / (tol["incl_deg"][0] + tol["incl_deg"][1] * dt),
+        np.where(raan_usable, np.abs(delta_raan) / (tol["raan_deg"][0] + tol["raan_deg"][1] * dt), 0.0),
+        np.abs(delta_ecc) / (tol["ecc"][0] + tol["ecc"][1] * dt),
+    ], axis=1)
+    ratios = np.nan_to_num(ratios, nan=0.0)
+
+    # Çok uzun aralıklar değerlendirilmez
+    ratios[(dt > max_gap_days) | (dt <= 0)] = 0.0
+    components = np.sum((ratios > 1.0) * (1 << np.arange(4)), axis=1)
+
+    return ElementPairs(
+        prev_index=i0, next_index=i1, dt_days=dt,
+        delta_a_km=delta_a, delta_incl_deg=delta_incl, delta_raan_deg=delta_raan, delta_ecc=delta_ecc,
+        score=ratios.max(axis=1) if len(ratios) else np.zeros(0),
+        components=components.astype(int)
+    )
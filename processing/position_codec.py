@@ -0,0 +1,134 @@
+import struct
+from typing import Optional, Tuple
+import numpy as np
+
+"""
+Canlı konum akışı için ikili (binary) çerçeve formatı.
+
+Konumlar 16 bitlik tam sayılara nicemlenir (quantization):
+    enlem  : int16, 90 / 32767 derece (~300 m)   -32768 = geçersiz (SGP4 hatası, katalogda yok)
+    boylam : uint16, 360 / 65536 derece (~600 m), [0, 360)
+    irtifa : uint16, 1 km
+Anahtar çerçeve (KEY) nesne kimliklerini ve mutlak değerleri taşır (10 bayt/nesne). Sonraki çerçeveler
+yalnızca bir önceki çerçeveye göre farkları taşır. Farklar 16 bit modüler aritmetikle hesaplanır; boylamın
+360 -> 0 geçişi özel durum gerektirmez ve nicemlenmiş değerler üzerinden çalışıldığı için hata birikmez.
+
+1 s aralıkla LEO nesnelerinin farkları neredeyse hep int8'e sığar (~3 bayt/nesne). Sığmayan az sayıdaki
+değer (ör. kutuplara yakın nesnelerin boylamı) DELTA8'de -128 kaçış koduyla işaretlenir ve int16 olarak
+çerçevenin sonuna eklenir. Kaçışlar çoğaldığında (uzun aralık) DELTA16 daha küçükse o kullanılır.
+WebSocket permessage-deflate sıkıştırması açıksa (tarayıcılar ve uvicorn+websockets varsayılan olarak
+anlaşır) küçük farklar ayrıca sıkıştırılır.
+
+Yerleşim (little-endian, diziler düzlemsel):
+    başlık  : uint8 tür, uint8 bayrak, 2 bayt boşluk, uint32 sıra no, uint32 nesne sayısı N,
+              float64 konum zamanı (Unix saniye)                                        = 20 bayt
+    KEY     : uint32 id[N], int16 enlem[N], uint16 boylam[N], uint16 irtifa[N]
+    DELTA8  : int8 d_enlem[N], int8 d_boylam[N], int8 d_irtifa[N], (3N tekse 1 bayt boşluk),
+              int16 kaçış değerleri[M] (int8 dizisindeki -128'lerle aynı sırada)
+    DELTA16 : int16 d_enlem[N], int16 d_boylam[N], int16 d_irtifa[N]
+"""
+
+FRAME_KEY = 1
+FRAME_DELTA8 = 2
+FRAME_DELTA16 = 3
+
+HEADER = struct.Struct("<BBxxIId")
+LAT_SCALE = 32767.0 / 90.0
+LON_SCALE = 65536.0 / 360.0
+ALT_SCALE = 1.0
+INVALID_LAT = -32768
+DELTA8_ESCAPE = -128
+
+
+def quantize(lat_deg, lon_deg, alt_km, valid=None) -> np.ndarray:
+    """ (3, N) uint16: enlem (int16 bit deseni), boylam, irtifa. """
+    lat_deg, lon_deg, alt_km = (np.asarray(a, dtype=float) for a in (lat_deg, lon_deg, alt_km))
+    invalid = ~(np.isfinite(lat_deg) & np.isfinite(lon_deg) & np.isfinite(alt_km))
+    if valid is not None:
+        invalid |= ~np.asarray(valid, dtype=bool)
+    lat_deg, lon_deg, alt_km = (np.where(invalid, 0.0, a) for a in (lat_deg, lon_deg, alt_km))
+
+    lat = np.clip(np.round(lat_deg * LAT_SCALE), -32767, 32767).astype(np.int16)
+    lon = (np.round(np.mod(lon_deg, 360.0) * LON_SCALE).astype(np.int64) % 65536).astype(np.uint16)
+    alt = np.clip(np.round(alt_km / ALT_SCALE), 0, 65535).astype(np.uint16)
+    lat[invalid] = INVALID_LAT
+    lon[invalid] = 0
+    alt[invalid] = 0
+    return np.stack([lat.view(np.uint16), lon, alt])
+
+
+def _invalid(q: np.ndarray) -> np.ndarray:
+    return q[0].view(np.int16) == INVALID_LAT
+
+
+def dequantize(q: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """ quantize'ın tersi; geçersiz nesneler NaN döner. """
+    invalid = _invalid(q)
+    lat = q[0].view(np.int16) / LAT_SCALE
+    lon = q[1] / LON_SCALE
+    alt = q[2] * ALT_SCALE
+    for arr in (lat, lon, alt):
+        arr[invalid] = np.nan
+    return lat, lon, alt
+
+
+def encode_keyframe(seq: int, t_unix: float, ids, q: np.ndarray) -> bytes:
+    ids = np.asarray(ids, dtype="<u4")
+    return HEADER.pack(FRAME_KEY, 0, seq, len(ids), t_unix) + ids.tobytes() + \
+        q[0].view("<i2").tobytes() + q[1].astype("<u2").tobytes() + q[2].astype("<u2").tobytes()
+
+
+def encode_delta(seq: int, t_unix: float, prev_q: np.ndarray, q: np.ndarray) -> Optional[bytes]:
+    """
+    prev_q'ya göre fark çerçevesi. Nesne sayısı veya geçerlilik değiştiyse None döner
+    (istemcinin anahtar çerçeveye ihtiyacı vardır).
+    """
+    if prev_q.shape != q.shape:
+        return None
+    if not np.array_equal(_invalid(prev_q), _invalid(q)):
+        return None
+
+    delta = ((q.astype(np.int32) - prev_q.astype(np.int32) + 32768) % 65536 - 32768).ravel()
+    escaped = (delta < -127) | (delta > 127)
+    n_escaped = int(escaped.sum())
+    pad = len(delta) % 2
+    if len(delta) + pad + 2 * n_escaped < 2 * len(delta):
+        small = np.where(escaped, DELTA8_ESCAPE, delta).astype(np.int8)
+        frame_type = FRAME_DELTA8
+        body = small.tobytes() + b"\x00" * pad + delta[escaped].astype("<i2").tobytes()
+    else:
+        frame_type, body = FRAME_DELTA16, delta.astype("<i2").tobytes()
+    return HEADER.pack(frame_type, 0, seq, q.shape[1], t_unix) + body
+
+
+class PositionDecoder:
+    """ İstemci tarafı çözücünün Python karşılığı (testler ve Python istemcileri için). """
+
+    def __init__(self):
+        self.ids: Optional[np.ndarray] = None
+        self.q: Optional[np.ndarray] = None
+        self.seq: Optional[int] = None
+        self.time: Optional[float] = None
+
+    def feed(self, frame: bytes):
+        """ Çerçeveyi uygular; (ids, lat, lon, alt) döner. """
+        frame_type, _, seq, n, t_unix = HEADER.unpack_from(frame)
+        body = memoryview(frame)[HEADER.size:]
+        if frame_type == FRAME_KEY:
+            self.ids = np.frombuffer(body[:4 * n], dtype="<u4").copy()
+            values = np.frombuffer(body[4 * n:4 * n + 6 * n], dtype="<u2").reshape(3, n)
+            self.q = values.astype(np.uint16)
+        else:
+            if self.q is None or self.q.shape[1] != n:
+                raise ValueError("Fark çerçevesinden önce anahtar çerçeve gelmedi")
+            if frame_type == FRAME_DELTA8:
+                delta = np.frombuffer(body[:3 * n], dtype=np.int8).astype(np.int32)
+                escaped = delta == DELTA8_ESCAPE
+                start = 3 * n + (3 * n) % 2
+                delta[escaped] = np.frombuffer(body[start:start + 2 * int(escaped.sum())], dtype="<i2")
+                delta = delta.reshape(3, n)
+            else:
+                delta = np.frombuffer(body[:6 * n], dtype="<i2").reshape(3, n).astype(np.int32)
+            self.q = ((self.q.astype(np.int32) + delta) % 65536).astype(np.uint16)
+        self.seq, self.time = seq, t_unix
+        return (self.ids,) + dequantize(self.q)
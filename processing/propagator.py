@@ -1,7 +1,8 @@
-from sgp4.api import Satrec
+from sgp4.api import Satrec, SatrecArray
 from sgp4.api import jday
 from datetime import datetime, timezone
-from typing import List, Tuple
+from typing import List, Tuple, Sequence
+import numpy as np
 
 
 # TLE Dizilerini SGP4 Uydusuna Dönüştürme
@@ -65,4 +66,20 @@ def propagate_satrec(sat: Satrec, times_utc: List[datetime]):
             "r_km": r,  # Konum (km)
             "v_km_s": v  # Hız (km/s)
         })
-    return results
\ No newline at end of file
+    return results
+
+# Toplu (Vektörel) Propagasyon
+def propagate_satrec_array(sats: Sequence[Satrec], times_utc: Sequence[datetime]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    N uyduyu T zaman noktası için tek çağrıda ilerletir (sgp4 SatrecArray, C döngüsü).
+    Hatalı (ör. düşmüş) uydular exception fırlatmaz, hata kodu dizisinde işaretlenir.
+
+    :return: r (N, T, 3) km, v (N, T, 3) km/s, err (N, T) hata kodları (0 = başarılı)
+    """
+    if len(sats) == 0 or len(times_utc) == 0:
+        return np.zeros((len(sats), len(times_utc), 3)), np.zeros((len(sats), len(times_utc), 3)), \
+            np.zeros((len(sats), len(times_utc)), dtype=np.uint8)
+
+    jd_fr = np.array([utc_dt_to_jd(t) for t in times_utc], dtype=float)
+    err, r, v = SatrecArray(list(sats)).sgp4(np.ascontiguousarray(jd_fr[:, 0]), np.ascontiguousarray(jd_fr[:, 1]))
+    return r, v, err
@@ -1,22 +1,28 @@
-from typing import List, Tuple, Dict
+from typing import List, Tuple, Dict, Optional, Set, TYPE_CHECKING
 import numpy as np
-from scipy.spatial import cKDTree
 from datetime import datetime, timedelta, timezone
 
+if TYPE_CHECKING:
+    from scipy.spatial import cKDTree
+
 Vec3 = Tuple[float, float, float]  # # 3 Boyutlu Vektör Tipi (x, y, z)
 
+SHELL_SIZE_SLACK = 0.05  # en kalabalık kabuğun en küçük olası boyutunu aşabileceği oran
+
 
-def build_kdtree(states: Dict[int, Vec3]) -> cKDTree:
+def build_kdtree(states: Dict[int, Vec3]) -> "cKDTree":
     """
     Verilen konum listesinden bir KD-Tree veri yapısı oluşturur.
     KD-Tree, uzayı hiperdüzlemlerle bölerek hızlı arama yapmayı sağlar.
     """
+    from scipy.spatial import cKDTree
     positions = np.array(list(states.values()))
     tree = cKDTree(positions)
     return tree
 
 
-def prune_pairs(states: Dict[int, Vec3], radius_km: float = 100.0) -> List[Tuple[int, int]]:
+def prune_pairs(states: Dict[int, Vec3], radius_km: float = 100.0,
+                tree: Optional["cKDTree"] = None, query_ids: Optional[Set[int]] = None) -> List[Tuple[int, int]]:
     """
     Pruning yani Budama işlemi
     Bu fonksiyon tüm uyduları birbiriyle karşılaştırmak (brute force) yerine,
@@ -25,6 +31,8 @@ def prune_pairs(states: Dict[int, Vec3], radius_km: float = 100.0) -> List[Tuple
     Args:
         states: {sat_id: (x, y, z)} formatında uyduların anlık konumları.
         radius_km: Arama yarıçapı (örn. 100km))
+        tree: build_kdtree(states) ile önceden kurulmuş ağaç (verilmezse burada kurulur)
+        query_ids: Verilirse yalnızca en az bir üyesi bu kümede olan çiftler aranır
 
     Returns:
         List[Tuple[int, int]]: Çarpışma riski taşıyan aday çiftlerin id listesi.
@@ -48,21 +56,72 @@ def prune_pairs(states: Dict[int, Vec3], radius_km: float = 100.0) -> List[Tuple
     # bir epoch için tüm uyduların pozisyon haritası (sat_id → (x,y,z))'tir.
     # Burada pozisyonlar için TEME veya ECEF kullanılabilir. Ama her epoch'da aynı frame kullanıldığına emin olunmalı
 
-    tree = cKDTree(positions)
+    if tree is None:
+        from scipy.spatial import cKDTree
+        tree = cKDTree(positions)
     pairs = set()  # yarıçap içindeki sorgu çiftleri, tekrar olmasın diye set ile
 
+    queried = np.ones(len(sat_ids), dtype=bool) if query_ids is None else \
+        np.array([s in query_ids for s in sat_ids], dtype=bool)
+
     # # Her bir uydu için "Bana x km yakınımdaki komşuları getir" sorusunu soruyoruz
-    for i, pos in enumerate(positions):
-        idxs = tree.query_ball_point(pos, r=radius_km)
+    for i in np.nonzero(queried)[0]:
+        idxs = tree.query_ball_point(positions[i], r=radius_km)
         for j in idxs:
-            if j <= i:
+            if j == i or (j < i and queried[j]):
                 # j == i ise zaten uydunun kendisidir, kontrole gerek yok
                 # j < i ise biz A,B çiftini bulduysak B,A çiftine bir daha bakmaya gerek yok
                 # Bu sayede işlem sayısı yarıya inecektir ve gereksiz kopayalar olmayacaktır
                 continue
-            # # İndeksleri gerçek uydu idlerine (NORAD ID) çevirip listeye ekle
-            pairs.add((sat_ids[i], sat_ids[j]))
-    # Set yapısını listeye çevirip döndür. Artık elimizde sadece
+            # # İndeksleri gerçek uydu idlerine (NORAD ID) çevirip listeye ekle (sıra: states sırası)
+            pairs.add((sat_ids[min(i, j)], sat_ids[max(i, j)]))
+    # Set yapısını sıralı listeye çevirip döndür (sıra tekrarlanabilir olsun). Artık elimizde sadece
     # gerçekten birbirine yakın olan, SGP4 ile incelenmeye değer adaylar var.
-    return list(pairs)
+    return sorted(pairs)
+
+
+def plan_altitude_shells(radii: np.ndarray, n_shells: int, halo_km: float = 0.0) -> List[Tuple[float, float]]:
+    """
+    Kataloğu yarıçapa göre irtifa kabuklarına böler (sharding için kabuk çekirdekleri).
+    Bir kabuk, çekirdeğindeki nesneler ve en üst çekirdek nesnesinin halo_km üstüne kadar olanlardan oluşur.
+    Sınırlar, en kalabalık kabuğun üye sayısını en aza indirecek şekilde seçilir: nesnelerin yoğun olduğu
+    bantlar (ör. 550 km) ince kabuklara, seyrek bantlar geniş kabuklara düşer. Halo üst üste binmesi yüzünden
+    ek kabuklar en kalabalık kabuğu SHELL_SIZE_SLACK oranından fazla küçültmüyorsa daha az kabuk döner.
+    Args:
+        radii: Nesnelerin yer merkezine uzaklıkları (km).
+        n_shells: En fazla kabuk sayısı (aynı yarıçaplı nesneler bölünemediği için daha az dönebilir).
+        halo_km: Kabuğun çekirdeğin üstüne uzandığı mesafe (km).
+
+    Returns:
+        List[Tuple[float, float]]: [lo, hi) çekirdek aralıkları, alttan üste; uçlar -inf/+inf.
+        Her nesne tam olarak bir çekirdeğe düşer.
+    """
+    radii = np.sort(np.asarray(radii, dtype=float))
+    n = len(radii)
+    if n_shells <= 1 or n == 0:
+        return [(-np.inf, np.inf)]
+    # halo_end[j]: j. nesne çekirdeğin en üstündeyse kabuğa giren son nesnenin indeksi + 1
+    halo_end = np.searchsorted(radii, radii + halo_km, side="right")
+
+    def starts_for(cap: int) -> List[int]:
+        # Alttan başlayarak her çekirdeği kabuk üye sayısı cap'i aşmadan olabildiğince genişletir
+        starts, i = [], 0
+        while i < n:
+            starts.append(i)
+            k = int(np.searchsorted(halo_end, i + cap, side="right"))  # ilk sığmayan nesne
+            k = int(np.searchsorted(radii, radii[k], side="left")) if k < n else n  # aynı yarıçap bölünmez
+            i = max(k, int(np.searchsorted(radii, radii[i], side="right")))
+        return starts
 
+    # Kabuk sayısını aşmayan en küçük üye sınırı (ikili arama)
+    lo, hi = 1, n
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if len(starts_for(mid)) <= n_shells:
+            hi = mid
+        else:
+            lo = mid + 1
+    # Sınır biraz gevşetilerek kabuk sayısı azaltılır: halo her kabukta tekrarlandığından,
+    # en kalabalık kabuğu az küçülten ek kabuklar toplam işi artırır
+    bounds = [-np.inf, *(radii[k] for k in starts_for(int(lo * (1.0 + SHELL_SIZE_SLACK)))[1:]), np.inf]
+    return [(float(a), float(b)) for a, b in zip(bounds[:-1], bounds[1:])]
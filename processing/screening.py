@@ -0,0 +1,359 @@
+import itertools
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+import numpy as np
+from processing.kepler import MU_EARTH_KM3_S2
+
+"""
+Yörünge dizileri (ephemeris) üzerinde toplu yakınlaşma taraması.
+Sorgu nesneleri (W adet, ör. manevra yapmış uydumuz) katalogdaki N nesneye karşı
+ortak bir zaman ızgarası (T adım) üzerinde taranır:
+    1. Broad Phase: Her adımda katalog üzerine kurulan KD-Tree, sorgu konumlarıyla sorgulanır;
+       aynı adımda 'radius' içinde kalan örnekler bulunur.
+    2. Narrow Phase: Aday aralıklarda bağıl hareket kübik Hermite polinomu ile ifade edilir
+       ve en yakın geçiş (TCA) vektörel Newton iterasyonu ile bulunur.
+Konum ve hız dizileri vektörel SGP4 (propagate_satrec_array) veya iki cisim yayılımından gelir.
+
+Tüm kataloğun ince ızgarada yayılmasının pahalı olduğu uzun pencerelerde crossing_windows (düğüm geçişi
+zaman filtresi) aday aralıkları seyrek örneklenmiş elemanlardan bulur; screen_runs yalnızca bu aralıklar
+için üretilen bağıl yörünge parçalarını aynı Hermite modeliyle tarar.
+"""
+
+MAX_REL_SPEED_KM_S = 16.0  # LEO'da kafa kafaya geçişte bağıl hızın üst sınırı
+SIEVE_MARGIN_KM = 40.0  # çapa elemanlarının doğrusal ara değerlemesi için pay (J2 kısa periyotlu terimleri, ~20 km)
+SIEVE_SERIES_MAX_ECC = 0.01  # altında düğüm fazı basıklık serisiyle (hata ~1.25·e² rad)
+SIEVE_NODE_ERROR_RAD = 5e-3  # aralık ortası düzlemlerinden hesaplanan düğüm doğrultusunun belirsizliği (x 1/sin θ)
+
+
+@dataclass
+class CloseApproach:
+    query_index: int  # sorgu dizisindeki indeks
+    catalog_index: int  # katalog dizisindeki indeks
+    tca: datetime
+    miss_distance_km: float
+    rel_velocity_km_s: float
+
+
+def radial_band_filter(perigee_km: np.ndarray, apogee_km: np.ndarray,
+                       band_low_km: float, band_high_km: float, margin_km: float) -> np.ndarray:
+    """
+    Perigee/Apogee filtresi (Hoots).
+    İrtifa bantları (margin dahil) kesişmeyen iki nesne hiçbir zaman birbirine yaklaşamaz.
+    """
+    return (np.asarray(perigee_km) - margin_km <= band_high_km) & (np.asarray(apogee_km) + margin_km >= band_low_km)
+
+
+@dataclass
+class _IntervalOrbits:
+    """ Ardışık iki çapa arasındaki aralıkta nesne başına sabit kabul edilen yörünge (dizi şekli (M, J)). """
+    a: np.ndarray
+    ex: np.ndarray  # e·cos ω
+    ey: np.ndarray  # e·sin ω
+    sin_i: np.ndarray
+    cos_i: np.ndarray
+    sin_raan: np.ndarray
+    cos_raan: np.ndarray
+    lam0: np.ndarray  # aralık başında ortalama enlem argümanı
+    lam_dot: np.ndarray  # rad/s
+    valid: np.ndarray
+
+    def take(self, index) -> "_IntervalOrbits":
+        return _IntervalOrbits(*(getattr(self, f)[index] for f in self.__dataclass_fields__))
+
+
+def _wrap(angle):
+    return (angle + np.pi) % (2.0 * np.pi) - np.pi
+
+
+def _interval_orbits(elements: np.ndarray, anchor_s: np.ndarray) -> _IntervalOrbits:
+    """ (M, K, 6) çapa elemanlarından (kepler.osculating_elements) K-1 aralığın yörüngeleri. """
+    el0, el1 = elements[:, :-1], elements[:, 1:]
+    dt = np.diff(anchor_s)
+    a = 0.5 * (el0[..., 0] + el1[..., 0])
+    ex, ey = 0.5 * (el0[..., 1] + el1[..., 1]), 0.5 * (el0[..., 2] + el1[..., 2])
+    incl = 0.5 * (el0[..., 3] + el1[..., 3])
+    raan = el0[..., 4] + 0.5 * _wrap(el1[..., 4] - el0[..., 4])
+    with np.errstate(invalid="ignore"):
+        # Çapalar arasında birkaç tur: tam tur sayısı ortalama hareketten tahmin edilir
+        advance = np.sqrt(MU_EARTH_KM3_S2 / a ** 3) * dt
+        lam_dot = (_wrap(el1[..., 5] - el0[..., 5] - advance) + advance) / dt
+        valid = np.isfinite(el0).all(axis=-1) & np.isfinite(el1).all(axis=-1) & (a > 0) & \
+            (np.hypot(ex, ey) < 1.0) & (lam_dot > 0)
+    return _IntervalOrbits(a=a, ex=ex, ey=ey, sin_i=np.sin(incl), cos_i=np.cos(incl), sin_raan=np.sin(raan),
+                           cos_raan=np.cos(raan), lam0=el0[..., 5], lam_dot=lam_dot, valid=valid)
+
+
+def _node_phase(a, ex, ey, u):
+    """
+    Gerçek enlem argümanı u noktasının ortalama enlem argümanı ve yarıçapı.
+    Basıklığın birinci mertebesinde (M = ν - 2e·sin ν, r = a(1 - e·cos ν)); e >= SIEVE_SERIES_MAX_ECC
+    olan nesnelerde Kepler bağıntısıyla tam hesaplanır.
+    """
+    cos_u, sin_u = np.cos(u), np.sin(u)
+    e_cos, e_sin = ex * cos_u + ey * sin_u, ex * sin_u - ey * cos_u  # e·cos ν, e·sin ν
+    lam, r = u - 2.0 * e_sin, a * (1.0 - e_cos)
+    ecc = np.hypot(ex, ey)
+    exact = np.nonzero(ecc >= SIEVE_SERIES_MAX_ECC)
+    if len(exact[0]):
+        e, argp = ecc[exact], np.arctan2(ey[exact], ex[exact])
+        nu = u[exact] - argp
+        ecc_anom = 2.0 * np.arctan2(np.sqrt(1.0 - e) * np.sin(nu / 2.0), np.sqrt(1.0 + e) * np.cos(nu / 2.0))
+        lam[exact] = argp + ecc_anom - e * np.sin(ecc_anom)
+        r[exact] = a[exact] * (1.0 - e * np.cos(ecc_anom))
+    return lam, r
+
+
+def crossing_windows(query_elements: np.ndarray, catalog_elements: np.ndarray, anchor_s: np.ndarray,
+                     threshold_km: float, pair_mask: Optional[np.ndarray] = None,
+                     margin_km: float = SIEVE_MARGIN_KM) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Düğüm geçişi zaman filtresi (Hoots): tüm nesneleri ince ızgarada yaymadan aday zaman aralıklarını bulur.
+
+    Elemanlar seyrek çapa anlarında (anchor_s, ör. 3 saatte bir) verilir; iki çapa arasında yörünge düzlemi
+    ve şekli sabit, ortalama enlem argümanı doğrusal kabul edilir. İki düzlemin kesişim doğrultusunda (bağıl
+    düğüm) iki nesne ancak (1) bu noktadaki yarıçapları ve (2) düğümden geçiş zamanları yakınsa birbirine
+    yaklaşabilir. Düğüm çevresinde hareket doğrusal alınırsa yatay en yakın mesafe
+    |δ|·v_q·v_c·sin θ / |v_rel| olur (δ geçiş zamanları farkı, θ düzlemler arası açı, v_rel bağıl hız
+    vektörü); bu mesafenin eşik + pay içinde kaldığı geçişler adaydır. Düzlemleri neredeyse çakışan
+    (θ ≈ 0 veya 180°) veya bağıl hızı çok küçük çiftlerde geçiş anı belirsizleşir; bu çiftlerin düğümdeki
+    yarıçapları yakınsa tüm aralık adaydır.
+
+    :param query_elements: (W, K, 6), catalog_elements: (N, K, 6) kepler.osculating_elements çıktıları,
+                           hatalı çapalar NaN
+    :param anchor_s: (K,) çapa anları (pencere başından saniye)
+    :param pair_mask: (W, N) yalnızca True çiftler değerlendirilir (ör. sorgu başına irtifa bandı filtresi)
+    :return: (w_idx, n_idx, tca_s, half_width_s) aday başına tahmini TCA ve incelenecek aralığın yarı genişliği
+    """
+    anchor_s = np.asarray(anchor_s, dtype=float)
+    query = _interval_orbits(query_elements, anchor_s)
+    catalog = _interval_orbits(catalog_elements, anchor_s)
+    t0, dt = anchor_s[:-1], np.diff(anchor_s)
+    reach = threshold_km + margin_km
+    valid_periods = 2.0 * np.pi / catalog.lam_dot[catalog.valid]
+    max_crossings = int(np.ceil(dt.max() / valid_periods.min())) if len(valid_periods) else 0
+
+    w_out, n_out, t_out, h_out = [], [], [], []
+    for w in range(query.a.shape[0]):
+        cols = np.arange(catalog.a.shape[0]) if pair_mask is None else np.nonzero(pair_mask[w])[0]
+        q, c = query.take(w), catalog.take(cols)  # q: (J,), c: (n, J)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            # Küresel üçgen: düzlemler arası açı ve bağıl düğümün iki yörüngedeki enlem argümanı
+            sin_d = c.sin_raan * q.cos_raan - c.cos_raan * q.sin_raan  # sin(Ω_c - Ω_q)
+            cos_d = c.cos_raan * q.cos_raan + c.sin_raan * q.sin_raan
+            cos_t = q.sin_i * c.sin_i * cos_d + q.cos_i * c.cos_i
+            sin_t = np.sqrt(np.maximum(1.0 - cos_t ** 2, 0.0))
+            u_q = np.arctan2(c.sin_i * sin_d, q.cos_i * c.sin_i * cos_d - c.cos_i * q.sin_i)
+            u_c = np.arctan2(q.sin_i * sin_d, q.cos_i * c.sin_i - c.cos_i * q.sin_i * cos_d)
+
+            fallback = np.zeros(c.a.shape, dtype=bool)
+            for node in (0.0, np.pi):
+                lam_q, r_q = _node_phase(np.broadcast_to(q.a, u_q.shape), np.broadcast_to(q.ex, u_q.shape),
+                                         np.broadcast_to(q.ey, u_q.shape), u_q + node)
+                lam_c, r_c = _node_phase(c.a, c.ex, c.ey, u_c + node)
+                v_q = np.sqrt(MU_EARTH_KM3_S2 * (2.0 / r_q - 1.0 / q.a))
+                v_c = np.sqrt(MU_EARTH_KM3_S2 * (2.0 / r_c - 1.0 / c.a))
+                rel = np.sqrt(np.maximum(v_q ** 2 + v_c ** 2 - 2.0 * v_q * v_c * cos_t, 0.0))
+                delta_max = reach * rel / (v_q * v_c * sin_t)
+                # TCA'nın düğümden uzaklığı ve düğüm doğrultusu belirsizliği
+                half = reach / rel + SIEVE_NODE_ERROR_RAD * r_q / (v_q * sin_t)
+                near = c.valid & q.valid & (np.abs(r_q - r_c) <= reach)
+                bounded = (delta_max <= dt / 2.0) & (half <= dt / 2.0)
+                fallback |= near & ~bounded
+
+                n, j = np.nonzero(near & bounded)
+                lam_dot_q, lam_dot_c = q.lam_dot[j], c.lam_dot[n, j]
+                first_q = t0[j] + np.mod(lam_q[n, j] - q.lam0[j], 2.0 * np.pi) / lam_dot_q
+                first_c = t0[j] + np.mod(lam_c[n, j] - c.lam0[n, j], 2.0 * np.pi) / lam_dot_c
+                period_q, period_c = 2.0 * np.pi / lam_dot_q, 2.0 * np.pi / lam_dot_c
+                limit, start, end = delta_max[n, j], t0[j] - period_c / 2.0, t0[j] + dt[j] + period_c / 2.0
+                # Aralık sınırındaki geçiş iki yanda da biraz farklı tahmin edilir: yarım tur taşma payı
+                for m in range(-1, max_crossings + 1):
+                    t_c = first_c + m * period_c
+                    t_q = first_q + np.round((t_c - first_q) / period_q) * period_q
+                    i = np.nonzero((np.abs(t_c - t_q) <= limit) & (t_c >= start) & (t_c < end))[0]
+                    if len(i):
+                        ni, ji, delta = n[i], j[i], t_c[i] - t_q[i]
+                        w_out.append(np.full(len(i), w))
+                        n_out.append(cols[ni])
+                        t_out.append(t_q[i] + v_c[ni, ji] * delta * (v_c[ni, ji] - v_q[ni, ji] * cos_t[ni, ji])
+                                     / rel[ni, ji] ** 2)
+                        h_out.append(half[ni, ji])
+
+        # Geçiş anı belirsiz çiftlerde tüm aralık
+        n, j = np.nonzero(fallback)
+        w_out.append(np.full(len(n), w))
+        n_out.append(cols[n])
+        t_out.append(t0[j] + dt[j] / 2.0)
+        h_out.append(dt[j] / 2.0)
+
+    if not w_out:
+        empty = np.zeros(0)
+        return empty.astype(int), empty.astype(int), empty, empty
+    return np.concatenate(w_out), np.concatenate(n_out), np.concatenate(t_out), np.concatenate(h_out)
+
+
+def find_close_samples(query_r: np.ndarray, catalog_r: np.ndarray,
+                       radius_km: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Aynı zaman adımında birbirine radius_km'den yakın (sorgu, katalog, adım) üçlülerini bulur.
+
+    Her adımda katalog konumları üzerine bir KD-Tree kurulur ve sorgu nesnelerinin o adımdaki
+    konumlarıyla sorgulanır. Maliyet adım başına O(N log N) kurulum + O(W log N) sorgudur; sorgu
+    sayısı (W) az olduğunda tek bir uzay-zaman ağacını N·T noktayla sorgulamaktan birkaç kat hızlıdır.
+    Ağaç her adımda yeniden kurulduğu için dengelenmemiş (balanced_tree=False) kurulur.
+
+    :param query_r: (W, T, 3) sorgu konumları
+    :param catalog_r: (N, T, 3) katalog konumları
+    :return: (w_idx, n_idx, k_idx) dizileri
+    """
+    n_query, n_steps, _ = query_r.shape
+    n_cat = catalog_r.shape[0]
+    empty = np.zeros(0, dtype=int)
+    if n_query == 0 or n_cat == 0 or n_steps == 0:
+        return empty, empty, empty
+
+    from scipy.spatial import cKDTree
+    w_idx, n_idx, k_idx = [], [], []
+    for k in range(n_steps):
+        tree = cKDTree(catalog_r[:, k], leafsize=64, balanced_tree=False, compact_nodes=False)
+        hits = tree.query_ball_point(query_r[:, k], radius_km)
+        counts = np.fromiter((len(h) for h in hits), dtype=int, count=n_query)
+        total = int(counts.sum())
+        if total:
+            w_idx.append(np.repeat(np.arange(n_query), counts))
+            n_idx.append(np.fromiter(itertools.chain.from_iterable(hits), dtype=int, count=total))
+            k_idx.append(np.full(total, k))
+    if not w_idx:
+        return empty, empty, empty
+    return np.concatenate(w_idx), np.concatenate(n_idx), np.concatenate(k_idx)
+
+
+def hermite_min(r0, v0, r1, v1, h, n_newton: int = 8) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    [t_k, t_k + h] aralığında bağıl konumun kübik Hermite modeli üzerinde minimum mesafe.
+    p(s) = a0 + a1 s + a2 s^2 + a3 s^3,  s in [0, 1]
+    :return: (s, miss_km, rel_vel_km_s) her aday aralık için
+    """
+    a0 = r0
+    a1 = h * v0
+    a2 = -3.0 * r0 - 2.0 * h * v0 + 3.0 * r1 - h * v1
+    a3 = 2.0 * r0 + h * v0 - 2.0 * r1 + h * v1
+
+    def p(s):
+        s = s[:, None]
+        return a0 + s * (a1 + s * (a2 + s * a3))
+
+    def dp(s):
+        s = s[:, None]
+        return a1 + s * (2.0 * a2 + 3.0 * s * a3)
+
+    # Kaba başlangıç: birkaç noktadan en yakını
+    grid = np.linspace(0.0, 1.0, 5)
+    d_grid = np.stack([np.sum(p(np.full(len(r0), g)) ** 2, axis=1) for g in grid], axis=1)
+    s = grid[np.argmin(d_grid, axis=1)]
+
+    # Newton: g(s) = p . p' = 0
+    for _ in range(n_newton):
+        ps, dps = p(s), dp(s)
+        ddps = 2.0 * a2 + 6.0 * s[:, None] * a3
+        g = np.sum(ps * dps, axis=1)
+        dg = np.sum(dps * dps, axis=1) + np.sum(ps * ddps, axis=1)
+        step = np.where(dg > 0.0, g / np.where(dg > 0.0, dg, 1.0), 0.0)
+        s = np.clip(s - step, 0.0, 1.0)
+
+    miss = np.linalg.norm(p(s), axis=1)
+    rel_vel = np.linalg.norm(dp(s), axis=1) / h
+    return s, miss, rel_vel
+
+
+def screen_trajectories(query_r: np.ndarray, query_v: np.ndarray,
+                        catalog_r: np.ndarray, catalog_v: np.ndarray,
+                        start_time: datetime, step_s: float, threshold_km: float,
+                        max_rel_speed_km_s: float = MAX_REL_SPEED_KM_S) -> List[CloseApproach]:
+    """
+    Sorgu yörüngelerini katalog yörüngelerine karşı tarar.
+    Tüm diziler aynı zaman ızgarasında olmalıdır: t_k = start_time + k * step_s.
+
+    Örnekleme arasında kaçan geçiş olmaması için KD-Tree yarıçapı
+    threshold + max_rel_speed * step / 2 olarak seçilir (en yakın örnek TCA'ya en fazla step/2 uzaktadır).
+    Her (sorgu, katalog) çifti için ardışık aday aralıklar tek bir olay olarak birleştirilir.
+    """
+    n_steps = query_r.shape[1]
+    if n_steps < 2:
+        return []
+
+    radius = threshold_km + max_rel_speed_km_s * step_s / 2.0
+    w_idx, n_idx, k_idx = find_close_samples(query_r, catalog_r, radius)
+    if len(w_idx) == 0:
+        return []
+
+    # Yakın örneğin iki yanındaki aralıklar aday: [k-1, k] ve [k, k+1]
+    k_start = np.clip(np.concatenate([k_idx - 1, k_idx]), 0, n_steps - 2)
+    w_all = np.concatenate([w_idx, w_idx])
+    n_all = np.concatenate([n_idx, n_idx])
+    cand = np.unique(np.stack([w_all, n_all, k_start], axis=1), axis=0)  # (w, n, k) sıralı
+    w_c, n_c, k_c = cand[:, 0], cand[:, 1], cand[:, 2]
+
+    r0 = catalog_r[n_c, k_c] - query_r[w_c, k_c]
+    v0 = catalog_v[n_c, k_c] - query_v[w_c, k_c]
+    r1 = catalog_r[n_c, k_c + 1] - query_r[w_c, k_c + 1]
+    v1 = catalog_v[n_c, k_c + 1] - query_v[w_c, k_c + 1]
+    s, miss, rel_vel = hermite_min(r0, v0, r1, v1, step_s)
+
+    # Olay gruplama: aynı çift ve ardışık aralıklar -> tek geçiş, en küçük mesafe seçilir
+    new_event = np.ones(len(cand), dtype=bool)
+    new_event[1:] = (w_c[1:] != w_c[:-1]) | (n_c[1:] != n_c[:-1]) | (k_c[1:] - k_c[:-1] > 1)
+    event_id = np.cumsum(new_event) - 1
+    order = np.lexsort((miss, event_id))
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = event_id[order][1:] != event_id[order][:-1]
+    best = order[first]
+
+    results = []
+    for i in best:
+        if miss[i] > threshold_km:
+            continue
+        results.append(CloseApproach(
+            query_index=int(w_c[i]),
+            catalog_index=int(n_c[i]),
+            tca=start_time + timedelta(seconds=float((k_c[i] + s[i]) * step_s)),
+            miss_distance_km=float(miss[i]),
+            rel_velocity_km_s=float(rel_vel[i])
+        ))
+    results.sort(key=lambda a: a.miss_distance_km)
+    return results
+
+
+def screen_runs(rel_r: np.ndarray, rel_v: np.ndarray, run_id: np.ndarray, steps: np.ndarray, step_s: float,
+                threshold_km: float, last_step: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Ortak ızgaradaki kısa bağıl yörünge parçalarında (run) yerel en yakın geçişleri bulur.
+
+    Her aralıkta bağıl hareketin Hermite modeli üzerindeki minimum aranır. Minimum aralığın içindeyse
+    (0 < s < 1) veya iki aralığın ortak örneğine düşüyorsa yerel en yakın geçiştir. Run'ın ucuna düşen
+    minimum gerçek geçişin parçanın dışında kaldığını gösterir ve sayılmaz; yalnızca ızgaranın kendi
+    uçlarında (0 ve last_step) pencere sınırındaki geçiş olarak raporlanır.
+
+    :param rel_r, rel_v: (S, 3) katalog - sorgu bağıl durumları; bir run'ın örnekleri ardışık ve adım sıralı
+    :param run_id: (S,) örneğin ait olduğu run, steps: (S,) ızgara adımı (t_k = start + k * step_s)
+    :return: (run, tca_step, miss_km, rel_vel_km_s); tca_step kesirli adım (k + s)
+    """
+    pos = np.nonzero((run_id[1:] == run_id[:-1]) & (steps[1:] - steps[:-1] == 1))[0]
+    if len(pos) == 0:
+        empty = np.zeros(0)
+        return empty.astype(int), empty, empty, empty
+
+    s, miss, rel_vel = hermite_min(rel_r[pos], rel_v[pos], rel_r[pos + 1], rel_v[pos + 1], step_s)
+    at_start, at_end = s <= 0.0, s >= 1.0
+    linked = pos[1:] == pos[:-1] + 1  # i. ve i+1. aralıklar ortak örnekli
+    next_at_start = np.append(linked & at_start[1:], False)
+    has_prev = np.insert(linked, 0, False)
+    has_next = np.append(linked, False)
+
+    local_min = (~at_start & ~at_end) | (at_end & next_at_start)
+    local_min |= at_end & ~has_next & (steps[pos + 1] == last_step)
+    local_min |= at_start & ~has_prev & (steps[pos] == 0)
+    best = np.nonzero(local_min & (miss <= threshold_km))[0]
+    return run_id[pos[best]], steps[pos[best]] + s[best], miss[best], rel_vel[best]
@@ -0,0 +1,146 @@
+import hashlib
+from dataclasses import dataclass
+from typing import Sequence
+import numpy as np
+
+"""
+TLE satırlarının sütun bazlı (columnar) ayrıştırılması.
+TLE sabit genişlikli bir formattır; tüm satırlar tek bir (N, 69) bayt matrisine yerleştirilip
+alanlar sütun dilimleri olarak tek seferde sayıya çevrilir. Böylece binlerce nesne için
+Python döngüsü ve satır başına string işlemi yapılmaz.
+"""
+
+MU_EARTH_KM3_S2 = 398600.44
+R_EARTH_KM = 6378.137
+TLE_LINE_LENGTH = 69
+
+
+@dataclass
+class TleArrays:
+    norad_id: np.ndarray  # (N,) int
+    inclination_deg: np.ndarray
+    raan_deg: np.ndarray
+    eccentricity: np.ndarray
+    mean_motion_rev_day: np.ndarray
+    bstar: np.ndarray
+    ndot_half: np.ndarray  # ortalama hareketin birinci türevinin yarısı (rev/gün^2), Line 1
+    epoch_yyddd: np.ndarray  # Line 1 epoch alanı (YYDDD.DDDDDDDD)
+    valid: np.ndarray  # (N,) bool, ayrıştırılamayan satırlar False
+
+    def __len__(self):
+        return len(self.norad_id)
+
+    @property
+    def period_min(self) -> np.ndarray:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return 1440.0 / self.mean_motion_rev_day
+
+    @property
+    def semi_major_axis_km(self) -> np.ndarray:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            n_rad_s = self.mean_motion_rev_day * 2 * np.pi / 86400
+            return (MU_EARTH_KM3_S2 / n_rad_s ** 2) ** (1 / 3)
+
+    @property
+    def altitude_km(self) -> np.ndarray:
+        """ Ortalama hareketten yarı büyük eksen, oradan ortalama irtifa (km). """
+        return self.semi_major_axis_km - R_EARTH_KM
+
+    @property
+    def epoch_days(self) -> np.ndarray:
+        """ Epoch, 1970-01-01'den itibaren gün (float). TLE yılı 57-99 -> 19xx, 00-56 -> 20xx. """
+        yy = np.floor(self.epoch_yyddd / 1000.0)
+        year = np.where(yy < 57, 2000 + yy, 1900 + yy)
+        year = np.where(np.isfinite(year), year, 1970).astype(np.int64)
+        jan1 = (year - 1970).astype("datetime64[Y]").astype("datetime64[D]").astype(float)
+        return jan1 + (self.epoch_yyddd - yy * 1000.0) - 1.0
+
+
+def tle_version(line1: str, line2: str) -> str:
+    """ Eleman setinin kısa özeti; aynı TLE her zaman aynı sürümü verir. """
+    return hashlib.sha1(f"{(line1 or '').strip()}\n{(line2 or '').strip()}".encode()).hexdigest()[:16]
+
+
+def _char_matrix(lines: Sequence[str]) -> np.ndarray:
+    """ Satırları sabit genişliğe getirip (N, 69) tek baytlık karakter matrisine dönüştürür. """
+    padded = np.array([(line or "").encode("ascii", "replace")[:TLE_LINE_LENGTH] for line in lines],
+                      dtype=f"S{TLE_LINE_LENGTH}")
+    # 'S69' boşlukla değil NUL ile doldurur, alan ayrıştırmada boşluk gibi davransın
+    chars = padded.view("S1").reshape(len(padded), TLE_LINE_LENGTH)
+    chars[chars == b""] = b" "
+    return chars
+
+
+def _field(chars: np.ndarray, start: int, end: int) -> np.ndarray:
+    """ [start, end) sütunlarını tek bir bayt dizisi alanı olarak döndürür. """
+    return np.ascontiguousarray(chars[:, start:end]).view(f"S{end - start}").ravel()
+
+
+def _to_float(field: np.ndarray) -> np.ndarray:
+    """
+    Bayt dizilerini float'a çevirir. Toplu dönüşüm başarısız olursa (bozuk satır)
+    eleman bazında çevrilir, hatalı alanlar NaN olur.
+    """
+    try:
+        return field.astype(float)
+    except ValueError:
+        out = np.full(len(field), np.nan)
+        for i, val in enumerate(field):
+            try:
+                out[i] = float(val)
+            except ValueError:
+                pass
+        return out
+
+
+def _decimal_point_assumed(sign: np.ndarray, mantissa: np.ndarray, exponent: np.ndarray) -> np.ndarray:
+    """
+    TLE'deki 'varsayılan ondalık noktalı' üstel alanları çözer (ör. BSTAR " 12345-3" -> 0.12345e-3).
+    """
+    value = _to_float(np.char.add(np.char.add(b"0.", np.char.strip(mantissa)),
+                                  np.char.add(b"e", np.char.strip(exponent))))
+    value = np.where(np.char.strip(mantissa) == b"", 0.0, value)
+    return np.where(sign == b"-", -value, value)
+
+
+def parse_tle_arrays(line1s: Sequence[str], line2s: Sequence[str]) -> TleArrays:
+    """
+    TLE satır listelerini NumPy sütunlarına ayrıştırır.
+    :param line1s: N adet TLE 1. satırı
+    :param line2s: N adet TLE 2. satırı
+    """
+    n = len(line2s)
+    if n == 0:
+        empty = np.zeros(0)
+        return TleArrays(np.zeros(0, dtype=int), empty, empty, empty, empty, empty, empty, empty,
+                         np.zeros(0, dtype=bool))
+
+    c1 = _char_matrix(line1s)
+    c2 = _char_matrix(line2s)
+
+    lengths = np.fromiter((len(line or "") for line in line2s), dtype=int, count=n)
+    valid = (lengths >= TLE_LINE_LENGTH) & (c2[:, 0] == b"2") & (c2[:, 1] == b" ")
+
+    norad = _to_float(_field(c2, 2, 7))
+    inclination = _to_float(_field(c2, 8, 16))
+    raan = _to_float(_field(c2, 17, 25))
+    eccentricity = _to_float(np.char.add(b"0.", np.char.strip(_field(c2, 26, 33))))
+    mean_motion = _to_float(_field(c2, 52, 63))
+    epoch = _to_float(_field(c1, 18, 32))
+    ndot_half = np.nan_to_num(_to_float(_field(c1, 33, 43)))
+    bstar = np.nan_to_num(_decimal_point_assumed(_field(c1, 53, 54), _field(c1, 54, 59), _field(c1, 59, 61)))
+
+    valid &= np.isfinite(norad) & np.isfinite(inclination) & np.isfinite(eccentricity) \
+        & np.isfinite(mean_motion) & (mean_motion > 0)
+
+    return TleArrays(
+        norad_id=np.where(np.isfinite(norad), norad, -1).astype(int),
+        inclination_deg=inclination,
+        raan_deg=raan,
+        eccentricity=eccentricity,
+        mean_motion_rev_day=mean_motion,
+        bstar=bstar,
+        ndot_half=ndot_half,
+        epoch_yyddd=epoch,
+        valid=valid
+    )
@@ -0,0 +1,194 @@
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from sgp4.api import Satrec, SatrecArray, WGS72
+from processing.collision_probability import DEFAULT_SIGMA_RIC_KM
+from processing.propagator import utc_dt_to_jd
+from processing.screening import hermite_min
+
+"""
+TLE belirsizliği için Monte Carlo: iki nesnenin ortalama elemanları binlerce kez bozulur, tüm örnekler
+SatrecArray ile TCA çevresindeki kısa bir zaman ızgarasında tek çağrıda yayılır ve her örneğin en yakın
+geçişi screening modülündeki Hermite narrow phase ile bulunur.
+
+Eleman bozulmaları, epoch anındaki konum belirsizliği RIC 1σ değerlerine (collision_probability ile aynı
+varsayılan) karşılık gelecek şekilde seçilir, yakın-dairesel yörünge yaklaşımıyla:
+    - radyal: (e·cos ω, e·sin ω) bileşenleri, σ = σ_R / a (e ≈ 0 civarında kırpma yanlılığı oluşmaz;
+      enlem argümanı ω + M korunur). Bu bozulma yörünge boyunca da 2σ_R'lik bir sapma üretir.
+    - in-track: enlem argümanı ω + M, σ_u = √(σ_I² − (2σ_R)²) / a; toplam yörünge boyunca sapma σ_I olur
+      (σ_I < 2σ_R ise σ_u = 0 ve sapma 2σ_R'de kalır)
+    - cross-track: eğim σ_i = σ_C / a ve RAAN σ_Ω = σ_C / (a sin i)
+    - ortalama hareket: in-track hatanın zamanla büyümesi (km/gün), σ_n = büyüme / (a · 1 gün)
+"""
+
+DEFAULT_INTRACK_GROWTH_KM_PER_DAY = 1.0  # TLE yaşına bağlı yörünge boyunca hata büyümesi (1σ)
+
+SGP4_EPOCH0_JD = 2433281.5  # sgp4init epoch referansı: 1949-12-31 00:00 UT
+_MIN_SIN_INCL = 1e-3
+_MIN_HALF_WINDOW_S = 10.0
+_MAX_HALF_WINDOW_S = 1800.0
+_MAX_STEP_S = 30.0
+
+
+def _semi_major_axis_km(satrec: Satrec) -> float:
+    return float(satrec.a * satrec.radiusearthkm)
+
+
+def sample_satrecs(satrec: Satrec, n_samples: int, rng: np.random.Generator,
+                   sigma_ric_km: Tuple[float, float, float] = DEFAULT_SIGMA_RIC_KM,
+                   intrack_growth_km_per_day: float = DEFAULT_INTRACK_GROWTH_KM_PER_DAY) -> List[Satrec]:
+    """
+    Ortalama elemanları bozulmuş n_samples adet Satrec üretir (epoch, B* ve kimlik aynı kalır).
+    """
+    a = _semi_major_axis_km(satrec)
+    sigma_r, sigma_i, sigma_c = sigma_ric_km
+
+    h = satrec.ecco * np.cos(satrec.argpo) + rng.normal(0.0, sigma_r / a, n_samples)
+    k = satrec.ecco * np.sin(satrec.argpo) + rng.normal(0.0, sigma_r / a, n_samples)
+    ecc = np.minimum(np.hypot(h, k), 0.99)
+    argp = np.arctan2(k, h)
+    # (h, k) bozulmasının yörünge boyunca katkısı (2σ_R) enlem argümanının payından düşülür
+    sigma_u = np.sqrt(max(sigma_i ** 2 - (2.0 * sigma_r) ** 2, 0.0)) / a
+    u = satrec.argpo + satrec.mo + rng.normal(0.0, sigma_u, n_samples)  # enlem argümanı
+    mean_anom = u - argp
+    incl = satrec.inclo + rng.normal(0.0, sigma_c / a, n_samples)
+    raan = satrec.nodeo + rng.normal(0.0, sigma_c / (a * max(np.sin(satrec.inclo), _MIN_SIN_INCL)), n_samples)
+    # a·δn·(1 gün) = büyüme; no_kozai rad/dk
+    no_kozai = satrec.no_kozai + rng.normal(0.0, intrack_growth_km_per_day / (a * 1440.0), n_samples)
+
+    epoch = satrec.jdsatepoch + satrec.jdsatepochF - SGP4_EPOCH0_JD
+    samples = []
+    for i in range(n_samples):
+        sat = Satrec()
+        sat.sgp4init(WGS72, 'i', satrec.satnum, epoch, satrec.bstar, satrec.ndot, satrec.nddot,
+                     float(ecc[i]), float(argp[i] % (2 * np.pi)), float(incl[i]), float(mean_anom[i] % (2 * np.pi)),
+                     float(no_kozai[i]), float(raan[i] % (2 * np.pi)))
+        samples.append(sat)
+    return samples
+
+
+def encounter_window(rel_speed_km_s: float, sigma_ric_km: Tuple[float, float, float],
+                     intrack_growth_km_per_day: float, age_days: float) -> Tuple[float, float]:
+    """
+    Örneklerin TCA'larını kapsayacak zaman penceresi (yarı genişlik) ve adım (saniye).
+    Yörünge boyunca 6σ konum farkını bağıl hızla kat etme süresi; yavaş geçişlerde pencere genişler.
+    """
+    sigma_along = np.hypot(sigma_ric_km[1], intrack_growth_km_per_day * abs(age_days)) * np.sqrt(2.0)
+    half_window = float(np.clip(6.0 * sigma_along / max(rel_speed_km_s, 1e-3), _MIN_HALF_WINDOW_S,
+                                _MAX_HALF_WINDOW_S))
+    return half_window, min(half_window / 2.0, _MAX_STEP_S)
+
+
+def nominal_encounter_window(satrec1: Satrec, satrec2: Satrec, tca: datetime,
+                             sigma1_ric_km: Tuple[float, float, float] = DEFAULT_SIGMA_RIC_KM,
+                             sigma2_ric_km: Tuple[float, float, float] = DEFAULT_SIGMA_RIC_KM,
+                             intrack_growth_km_per_day: float = DEFAULT_INTRACK_GROWTH_KM_PER_DAY
+                             ) -> Tuple[float, float]:
+    """ Nominal bağıl hız ve iki TLE'nin TCA'ya göre yaşından encounter_window. """
+    jd, fr = utc_dt_to_jd(tca)
+    _, _, v1 = satrec1.sgp4(jd, fr)
+    _, _, v2 = satrec2.sgp4(jd, fr)
+    age_days = max(abs(jd + fr - satrec1.jdsatepoch - satrec1.jdsatepochF),
+                   abs(jd + fr - satrec2.jdsatepoch - satrec2.jdsatepochF))
+    return encounter_window(float(np.linalg.norm(np.subtract(v2, v1))),
+                            tuple(np.maximum(sigma1_ric_km, sigma2_ric_km)), intrack_growth_km_per_day, age_days)
+
+
+def propagate_encounter_samples(samples1: List[Satrec], samples2: List[Satrec], tca: datetime,
+                                half_window_s: float, step_s: float) -> Dict[str, np.ndarray]:
+    """
+    Eşleştirilmiş örnek çiftlerinin (i, i) en yakın geçişleri.
+    Tüm örnekler TCA ± half_window_s ızgarasında tek SatrecArray çağrısıyla yayılır; her örnekte en yakın
+    ızgara noktasının iki yanındaki aralıklar Hermite modeliyle incelenir.
+
+    :return: miss_km, tca_offset_s (nominal TCA'ya göre), rel_vel_km_s, in_window (TCA pencere içinde mi),
+             valid (SGP4 hatasız) dizileri, (N,)
+    """
+    n = len(samples1)
+    n_half = int(np.ceil(half_window_s / step_s))
+    offsets = np.arange(-n_half, n_half + 1) * step_s
+    jd_fr = np.array([utc_dt_to_jd(tca + timedelta(seconds=float(o))) for o in offsets])
+    err, r, v = SatrecArray(list(samples1) + list(samples2)).sgp4(np.ascontiguousarray(jd_fr[:, 0]),
+                                                                  np.ascontiguousarray(jd_fr[:, 1]))
+    r_rel = r[n:] - r[:n]  # (N, T, 3)
+    v_rel = v[n:] - v[:n]
+    valid = np.all(err[:n] == 0, axis=1) & np.all(err[n:] == 0, axis=1)
+
+    k = np.argmin(np.sum(r_rel ** 2, axis=2), axis=1)
+    rows = np.arange(n)
+    # En yakın noktanın solundaki ve sağındaki aralıklar (pencere kenarında tek taraf)
+    left = np.maximum(k - 1, 0)
+    right = np.minimum(k, len(offsets) - 2)
+    starts = np.concatenate([left, right])
+    idx = np.concatenate([rows, rows])
+    s, miss, rel_vel = hermite_min(r_rel[idx, starts], v_rel[idx, starts], r_rel[idx, starts + 1],
+                                    v_rel[idx, starts + 1], step_s)
+    best = np.where(miss[:n] <= miss[n:], 0, 1)
+    pick = best * n + rows
+    return {
+        "miss_km": miss[pick],
+        "tca_offset_s": offsets[starts[pick]] + s[pick] * step_s,
+        "rel_vel_km_s": rel_vel[pick],
+        "in_window": (k > 0) & (k < len(offsets) - 1),
+        "valid": valid,
+    }
+
+
+def monte_carlo_encounter(satrec1: Satrec, satrec2: Satrec, tca: datetime, n_samples: int,
+                          seed: Optional[np.random.SeedSequence] = None,
+                          sigma1_ric_km: Tuple[float, float, float] = DEFAULT_SIGMA_RIC_KM,
+                          sigma2_ric_km: Tuple[float, float, float] = DEFAULT_SIGMA_RIC_KM,
+                          intrack_growth_km_per_day: float = DEFAULT_INTRACK_GROWTH_KM_PER_DAY,
+                          half_window_s: Optional[float] = None, step_s: Optional[float] = None
+                          ) -> Dict[str, np.ndarray]:
+    """
+    Tek parça Monte Carlo: iki nesnenin n_samples örneği üretilip TCA çevresinde yayılır.
+    Pencere verilmezse nominal_encounter_window ile seçilir; parçalara bölünmüş çalıştırmada tüm
+    parçalar aynı ızgarayı kullansın diye pencere bir kez hesaplanıp verilir.
+    Aynı seed ile sonuç tekrarlanabilir; süreç havuzunda parçalar SeedSequence.spawn ile ayrılır.
+    """
+    rng = np.random.default_rng(seed)
+    if half_window_s is None or step_s is None:
+        half_window_s, step_s = nominal_encounter_window(satrec1, satrec2, tca, sigma1_ric_km, sigma2_ric_km,
+                                                         intrack_growth_km_per_day)
+    samples1 = sample_satrecs(satrec1, n_samples, rng, sigma1_ric_km, intrack_growth_km_per_day)
+    samples2 = sample_satrecs(satrec2, n_samples, rng, sigma2_ric_km, intrack_growth_km_per_day)
+    return propagate_encounter_samples(samples1, samples2, tca, half_window_s, step_s)
+
+
+def summarize_samples(result: Dict[str, np.ndarray], hbr_km: float, n_bins: int = 20) -> Dict[str, object]:
+    """
+    Iskalama mesafesi ve TCA dağılımlarının özeti ve ampirik Pc (HBR içinde kalan örneklerin oranı).
+    Pc'nin standart hatası √(p(1-p)/N); hiç isabet yoksa %95 üst sınır 3/N (üçler kuralı) verilir.
+    """
+    ok = result["valid"]
+    miss = result["miss_km"][ok]
+    offset = result["tca_offset_s"][ok]
+    n = int(ok.sum())
+    hits = int(np.sum(miss < hbr_km))
+    pc = hits / n if n else float("nan")
+    counts, edges = np.histogram(miss, bins=n_bins) if n else (np.array([]), np.array([]))
+    return {
+        "n_samples": int(len(ok)),
+        "valid_samples": n,
+        "outside_window": int(np.sum(ok & ~result["in_window"])),
+        "hits": hits,
+        "pc": pc,
+        "pc_std_err": float(np.sqrt(pc * (1.0 - pc) / n)) if n else float("nan"),
+        "pc_upper_95": (3.0 / n if hits == 0 else None) if n else None,
+        "miss_km": {
+            "mean": float(np.mean(miss)) if n else None,
+            "std": float(np.std(miss)) if n else None,
+            "min": float(np.min(miss)) if n else None,
+            "p05": float(np.percentile(miss, 5)) if n else None,
+            "p50": float(np.percentile(miss, 50)) if n else None,
+            "p95": float(np.percentile(miss, 95)) if n else None,
+        },
+        "tca_offset_s": {
+            "mean": float(np.mean(offset)) if n else None,
+            "std": float(np.std(offset)) if n else None,
+            "p05": float(np.percentile(offset, 5)) if n else None,
+            "p95": float(np.percentile(offset, 95)) if n else None,
+        },
+        "histogram": {"edges_km": edges.tolist(), "counts": counts.tolist()},
+    }
@@ -0,0 +1,215 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from backend.models.db import get_conn
+from backend.metrics import metrics, StageTimer
+from processing.breakup import (fragment_delta_v, fit_satrecs, flux_per_step, KM2_S_TO_M2_YR,
+                                DEFAULT_DV_MEDIAN_M_S, DEFAULT_DV_LOG10_SIGMA, DEFAULT_DV_SIGMA_RIC_M_S)
+from processing.propagator import propagate_satrec_array
+from processing.screening import screen_trajectories, radial_band_filter, CloseApproach
+from service.tle_service import tle_service
+from service.watchlist_service import BAND_MARGIN_KM
+
+"""
+Parçalanma senaryosu: bir katalog nesnesinin parçalanması ve enkaz bulutunun kataloğa ve izleme listesine
+etkisi (processing/breakup.py).
+
+Parçalar, izleme listesi taramasıyla aynı hatta işlenir: parçalar ve irtifa bandı bulutla kesişen katalog
+nesneleri zaman dilimleri halinde vektörel SGP4 ile yayılır, her adımda katalog üzerine kurulan KD-Tree
+parça konumlarıyla sorgulanır (processing.screening). Parçaların kendi aralarındaki geçişler taranmaz.
+İzlenen nesneler için her adımda parça akısı hesaplanır; sonuçlar zaman kovalarında özetlenir.
+Aynı katalog, seed ve parametreler aynı sonucu verir; tarama motoru için tekrarlanabilir bir yük senaryosudur.
+"""
+
+FRAGMENT_FIRST_NORAD = 80000  # parçalara verilen geçici katalog numaraları
+MAX_FRAGMENTS = 20000
+FRAGMENT_BSTAR_FACTOR = 5.0  # parçaların alan/kütle oranı ana nesneden büyüktür
+MAX_LISTED_CONJUNCTIONS = 200
+CHUNK_STATES = 2_000_000  # zaman dilimi başına (nesne x adım); konum+hız ~100 MB, dilimler bir adımı paylaşır
+
+BREAKUP_STAGE_SECONDS = metrics.histogram(
+    "breakup_simulation_stage_duration_seconds", "Parçalanma senaryosu aşama süreleri", ("stage",))
+
+
+class BreakupService:
+
+    def simulate(self, sat_id: Optional[int] = None, norad_id: Optional[int] = None,
+                 breakup_time: Optional[datetime] = None, n_fragments: int = 2000, seed: int = 0,
+                 distribution: str = "lognormal", dv_median_m_s: float = DEFAULT_DV_MEDIAN_M_S,
+                 dv_log10_sigma: float = DEFAULT_DV_LOG10_SIGMA,
+                 dv_sigma_ric_m_s: Tuple[float, float, float] = DEFAULT_DV_SIGMA_RIC_M_S,
+                 hours: float = 24.0, step_s: float = 30.0, threshold_km: float = 5.0,
+                 flux_radius_km: float = 50.0, bin_minutes: float = 60.0) -> Dict[str, Any]:
+        """
+        Ana nesneyi (raw_tles id'si veya NORAD numarası) breakup_time anında n_fragments parçaya ayırır ve
+        bulutu [breakup_time, breakup_time + hours] boyunca kataloğa karşı tarar.
+        Ana nesne katalogdan çıkarılır (parçalanmıştır). Sonuç kaydedilmez.
+        """
+        timer = StageTimer(BREAKUP_STAGE_SECONDS)
+        breakup_time = breakup_time or datetime.now(timezone.utc)
+        end_time = breakup_time + timedelta(hours=hours)
+
+        with timer.stage("catalog_load"):
+            catalog = tle_service.get_catalog()
+            if norad_id is None:
+                sat = tle_service.get_satellite_by_id(sat_id)
+                if not sat:
+                    raise ValueError(f"Bu id ile uydu bulunamadı. ID: {sat_id}")
+                norad_id = int(sat["line2"][2:7])
+            parent_rows = np.nonzero(catalog.norad_ids == norad_id)[0]
+            if len(parent_rows) == 0:
+                raise ValueError(f"Katalogda yok. NORAD: {norad_id}")
+            parent = int(parent_rows[0])
+            conn = get_conn()
+            watched = [r["norad_id"] for r in conn.execute("SELECT norad_id FROM watchlist").fetchall()]
+            conn.close()
+
+        with timer.stage("fragment_generation"):
+            r0, v0, err0 = propagate_satrec_array([catalog.satrecs[parent]], [breakup_time])
+            if err0[0, 0] != 0:
+                raise ValueError(f"Ana nesne parçalanma anında yayılamadı. NORAD: {norad_id}")
+            rng = np.random.default_rng(seed)
+            dv = fragment_delta_v(r0[0, 0], v0[0, 0], n_fragments, rng, distribution, dv_median_m_s,
+                                  dv_log10_sigma, dv_sigma_ric_m_s)
+            bstar = catalog.satrecs[parent].bstar * FRAGMENT_BSTAR_FACTOR * rng.lognormal(0.0, 0.5, n_fragments)
+            fragments, valid = fit_satrecs(np.repeat(r0[0], n_fragments, axis=0), v0[0, 0] + dv, breakup_time,
+                                           bstar, FRAGMENT_FIRST_NORAD)
+            frag_perigee = np.array([s.altp for s in fragments]) * fragments[0].radiusearthkm if fragments else []
+            frag_apogee = np.array([s.alta for s in fragments]) * fragments[0].radiusearthkm if fragments else []
+
+        # Bulutun irtifa bandıyla kesişen katalog nesneleri ve izlenen nesneler (ana nesne hariç)
+        with timer.stage("band_filter"):
+            is_asset = np.isin(catalog.norad_ids, watched)
+            is_asset[parent] = False
+            keep = is_asset.copy()
+            if len(fragments):
+                keep |= radial_band_filter(catalog.perigee_km, catalog.apogee_km, float(np.min(frag_perigee)),
+                                           float(np.max(frag_apogee)), threshold_km + BAND_MARGIN_KM)
+            keep[parent] = False
+            rows = np.nonzero(keep)[0]
+        satrecs = fragments + [catalog.satrecs[i] for i in rows]
+        n_frag = len(fragments)
+        asset_pos = n_frag + np.nonzero(is_asset[rows])[0]  # satrecs içindeki izlenen nesneler
+
+        n_steps = int(np.ceil(hours * 3600.0 / step_s)) + 1
+        alive = np.zeros(n_steps, dtype=int)
+        flux = np.zeros((len(asset_pos), n_steps))
+        nearby = np.zeros((len(asset_pos), n_steps), dtype=int)
+        approaches = []
+        chunk_steps = max(2, CHUNK_STATES // max(len(satrecs), 1))
+        for first in range(0, n_steps - 1 if satrecs else 0, chunk_steps - 1):
+            last = min(first + chunk_steps - 1, n_steps - 1)
+            chunk_start = breakup_time + timedelta(seconds=first * step_s)
+            times = [chunk_start + timedelta(seconds=k * step_s) for k in range(last - first + 1)]
+            with timer.stage("propagation"):
+                r, v, err = propagate_satrec_array(satrecs, times)
+            with timer.stage("screening"):
+                ok = np.all(err == 0, axis=1)  # atmosfere giren/hatalı nesneler bu dilimde dışarıda
+                f_ok = np.nonzero(ok[:n_frag])[0]
+                c_ok = n_frag + np.nonzero(ok[n_frag:])[0]
+                alive[first:last + 1] = np.sum(err[:n_frag] == 0, axis=0)
+                for a in screen_trajectories(r[f_ok], v[f_ok], r[c_ok], v[c_ok], chunk_start, step_s, threshold_km):
+                    approaches.append((int(f_ok[a.query_index]), int(c_ok[a.catalog_index]) - n_frag, a))
+            with timer.stage("flux"):
+                # Dilimler bir adımı paylaşır; ortak adımın değeri iki dilimde de aynıdır
+                count, flux_k = flux_per_step(r[asset_pos], v[asset_pos], r[f_ok], v[f_ok], flux_radius_km)
+                nearby[:, first:last + 1] = count
+                flux[:, first:last + 1] = flux_k
+
+        with timer.stage("merge"):
+            events = self._merge(approaches, step_s)
+            result = self._summarize(catalog, rows, is_asset, events, breakup_time, step_s, bin_minutes, alive,
+                                     flux, nearby, asset_pos - n_frag, np.nonzero(valid)[0])
+
+        result.update({
+            "parent": {"sat_id": int(catalog.ids[parent]), "norad_id": int(norad_id),
+                       "name": catalog.names[parent]},
+            "breakup_time": breakup_time.isoformat(),
+            "window_end": end_time.isoformat(),
+            "n_fragments": n_fragments,
+            "fragments_in_orbit": int(valid.sum()),  # hiperbolik veya hemen atmosfere girenler hariç
+            "catalog_objects": len(rows),
+            "assets": len(asset_pos),
+            "seed": seed,
+            "stage_timings_s": timer.publish(),
+        })
+        return result
+
+    @staticmethod
+    def _merge(approaches: List[Tuple[int, int, CloseApproach]], step_s: float) -> List[Tuple[int, int, CloseApproach]]:
+        """ Dilim sınırında iki kez bulunan geçişleri (aynı çift, TCA'lar bir adımdan yakın) birleştirir. """
+        events: Dict[tuple, List[CloseApproach]] = {}
+        for f, c, a in sorted(approaches, key=lambda x: x[2].tca):
+            pair_events = events.setdefault((f, c), [])
+            if pair_events and (a.tca - pair_events[-1].tca).total_seconds() <= 2.0 * step_s:
+                if a.miss_distance_km < pair_events[-1].miss_distance_km:
+                    pair_events[-1] = a
+                continue
+            pair_events.append(a)
+        return sorted(((f, c, a) for (f, c), pair_events in events.items() for a in pair_events),
+                      key=lambda e: e[2].tca)
+
+    @staticmethod
+    def _summarize(catalog, rows, is_asset, events, breakup_time: datetime, step_s: float, bin_minutes: float,
+                   alive, flux, nearby, asset_index, fragment_ids) -> Dict[str, Any]:
+        """ Zaman kovalarında geçiş sayıları, yaşayan parça sayısı ve izlenen nesnelerin akısı.
+
+        fragment_ids yörüngedeki parçaların üretilen buluttaki sırasıdır; fit_satrecs'in eledikleri atlanır.
+        """
+        n_steps = len(alive)
+        steps_per_bin = max(1, int(round(bin_minutes * 60.0 / step_s)))
+        n_bins = -(-n_steps // steps_per_bin)
+        catalog_counts = np.zeros(n_bins, dtype=int)
+        watch_counts = np.zeros(n_bins, dtype=int)
+        asset_norads = [int(catalog.norad_ids[rows[i]]) for i in asset_index]
+
+        listed = []
+        for f, c, a in events:
+            b = min(int((a.tca - breakup_time).total_seconds() / step_s) // steps_per_bin, n_bins - 1)
+            row = rows[c]
+            if is_asset[row]:
+                watch_counts[b] += 1
+                listed.append({
+                    "fragment_index": int(fragment_ids[f]),
+                    "asset_norad_id": int(catalog.norad_ids[row]),
+                    "asset_name": catalog.names[row],
+                    "tca": a.tca.isoformat(),
+                    "miss_distance_km": a.miss_distance_km,
+                    "rel_velocity_km_s": a.rel_velocity_km_s,
+                })
+            else:
+                catalog_counts[b] += 1
+        listed.sort(key=lambda e: e["miss_distance_km"])
+
+        timeline = []
+        for b in range(n_bins):
+            steps = slice(b * steps_per_bin, min((b + 1) * steps_per_bin, n_steps))
+            timeline.append({
+                "bin_start": (breakup_time + timedelta(seconds=b * steps_per_bin * step_s)).isoformat(),
+                "fragments_alive": int(alive[steps].min()),
+                "catalog_conjunctions": int(catalog_counts[b]),
+                "watchlist_conjunctions": int(watch_counts[b]),
+                "flux_per_m2_yr": {str(n): float(flux[w, steps].mean() * KM2_S_TO_M2_YR)
+                                   for w, n in enumerate(asset_norads)},
+            })
+
+        asset_flux = [{
+            "norad_id": n,
+            "name": catalog.names[rows[asset_index[w]]],
+            "mean_flux_per_m2_yr": float(flux[w].mean() * KM2_S_TO_M2_YR),
+            "peak_flux_per_m2_yr": float(flux[w].max() * KM2_S_TO_M2_YR),
+            "max_fragments_nearby": int(nearby[w].max()),
+        } for w, n in enumerate(asset_norads)]
+
+        return {
+            "step_s": step_s,
+            "catalog_conjunctions": int(catalog_counts.sum()),
+            "watchlist_conjunctions": int(watch_counts.sum()),
+            "timeline": timeline,
+            "asset_flux": asset_flux,
+            "conjunctions": listed[:MAX_LISTED_CONJUNCTIONS],
+        }
+
+
+# Singleton instance
+breakup_service = BreakupService()
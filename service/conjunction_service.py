@@ -1,12 +1,131 @@
+import hashlib
+import json
+import multiprocessing
+import os
 import sqlite3
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime, timedelta, timezone
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
+import numpy as np
 from backend.models.db import get_conn
+from backend.metrics import SCREENING_STAGE_SECONDS, StageTimer, track_pool_task, record_cache_access
+from backend.events import alert_broker
 from service.tle_service import tle_service
 from processing.propagator import tle_to_satrec
 from processing.propagate_wrapper import propagate_satrec_single
-from processing.pruner import prune_pairs
-from processing.conjunction import compute_conjunction_for_pair
+from processing.pruner import build_kdtree, prune_pairs, plan_altitude_shells
+from processing.conjunction import compute_conjunction_for_pair, Conjunction
+from processing.collision_probability import (collision_probability, default_covariance, DEFAULT_HBR_KM,
+                                               DEFAULT_SIGMA_RIC_KM)
+from processing.propagator import propagate_satrec_array
+from processing.tle_uncertainty import (monte_carlo_encounter, nominal_encounter_window, summarize_samples,
+                                        DEFAULT_INTRACK_GROWTH_KM_PER_DAY)
+
+
+PROGRESS_INTERVAL_S = 0.5  # canlı akışta ilerleme olayları arasındaki en kısa süre
+
+ANALYTIC_WINDOW = 7200.0  # 2 saatlik bir pencereye bakacağız
+RADIUS_KM = 300.0  # Sadece birbirine 300km yakın olanlar incelenecek
+COLLISION_SAVE_THRESHOLD_KM = 150.0  # 150 km den uzaksa veritabanına kaydedilmeyecek
+SCREENING_CATALOG_LIMIT = 5000  # taranan nesne sayısı (tle_service.get_all_satellites sırasıyla)
+
+# İrtifa kabuklarına bölme (sharding): bu sayının altındaki kataloglar tek süreçte taranır,
+# üstünde en fazla işçi sayısı kadar kabuk kullanılır (plan_altitude_shells gereksiz kabukları birleştirir)
+SHARDING_MIN_OBJECTS = 3000
+
+# Tarama sonuç önbelleği: başlangıç zamanı bu dilimin başına yuvarlanır, aynı dilimdeki istekler aynı
+# taramayı paylaşır. Algoritma değiştiğinde SCREENING_CACHE_VERSION artırılır (eski sonuçlar kullanılmaz).
+SCREENING_TIME_BUCKET_S = 600
+SCREENING_CACHE_VERSION = 2
+# Arşiv saklama politikası: en son bu kadar tarama ve en fazla bu kadar günlük taramalar tutulur
+SCREENING_RUN_RETENTION = 50
+SCREENING_ARCHIVE_DAYS = 30
+
+ALERT_COLUMNS = "id, sat1_id, sat2_id, tca, miss_distance_km, rel_velocity_km_s, score, event_type, created_at, " \
+                "run_id, pc"
+
+# TLE belirsizliği Monte Carlo'su: örnekler bu büyüklükte parçalar halinde süreç havuzuna dağıtılır
+MC_CHUNK_SAMPLES = 2500
+MC_MAX_SAMPLES = 200000
+
+
+def _bucket_start(t: datetime) -> datetime:
+    """ Zamanı SCREENING_TIME_BUCKET_S dilimin başına yuvarlar (saat dilimi korunur). """
+    origin = datetime(2000, 1, 1, tzinfo=t.tzinfo)
+    bucket = timedelta(seconds=SCREENING_TIME_BUCKET_S)
+    return origin + ((t - origin) // bucket) * bucket
+
+
+def _catalog_hash(satellites: List[Dict[str, Any]]) -> str:
+    """ Taramaya giren katalog anlık görüntüsünün özeti (id + TLE satırları). """
+    h = hashlib.sha1()
+    for sat in sorted(satellites, key=lambda s: s["id"]):
+        h.update(f"{sat['id']}|{sat['line1']}|{sat['line2']}\n".encode())
+    return h.hexdigest()
+
+
+def _refine_pair(id1: int, id2: int, sat1, sat2, state1, state2,
+                 analysis_start_time: datetime) -> Optional[Conjunction]:
+    """ Tek aday çiftin detaylı analizi (Narrow Phase); kaydedilmeyecek sonuçlar için None döner. """
+    r1, v1 = state1
+    r2, v2 = state2
+    try:
+        # Analitik Tahmin -> SGP4 Refinement -> Docking Kontrolü
+        conj = compute_conjunction_for_pair(
+            sat1, sat2,
+            analysis_start_time,
+            r1, v1, r2, v2,
+            propagate_satrec_single,
+            analytic_window_sec=ANALYTIC_WINDOW
+        )
+    except Exception as e:
+        print(f"Error computing pair {id1}-{id2}: {e}")
+        return None
+
+    if conj is None:
+        return None
+    # DOCKING: Kenetlenme manevralarını kaydet (arayüzde ayrı bölümü açıldığı için)
+    if conj.event_type == "DOCKING":
+        return conj
+    # Score > 0 demek belirli bir risk var demek
+    # Ayrıca mesafe eşiğinin (150 km) altında olmalı
+    if conj.event_type == "COLLISION" and conj.score > 0 and conj.miss_distance_km < COLLISION_SAVE_THRESHOLD_KM:
+        return conj
+    return None
+
+
+def _screen_shard_worker(shard: Dict[str, Any], analysis_start_time: datetime) -> Tuple[int, List[tuple]]:
+    """
+    Process pool içinde tek irtifa kabuğunun taranması.
+    Üyelerin t0 durumları ana süreçten gelir, yeniden yayılmaz. Yalnızca kabuğun sahip olduğu çiftler
+    (alçaktaki üyesi kabuk çekirdeğinde olan) incelenir, böylece her çift tam olarak bir kabukta sayılır:
+    komşular yalnızca çekirdek nesneleri için aranır (kabuk çekirdeğin altına uzanmadığından bulunan her
+    çiftin alçaktaki üyesi çekirdektedir), SGP4 nesneleri yalnızca bu çiftlerin üyeleri için kurulur.
+    Dönüş: (incelenen çift sayısı, [(id1, id2, Conjunction)])
+    """
+    states = {sid: (np.asarray(r), np.asarray(v)) for sid, r, v in zip(shard["ids"], shard["r"], shard["v"])}
+    positions_map = {k: v[0] for k, v in states.items()}
+    pairs = prune_pairs(positions_map, radius_km=RADIUS_KM, query_ids=set(shard["core_ids"]))
+
+    needed = {sid for pair in pairs for sid in pair}
+    satrecs = {sid: tle_to_satrec(l1, l2) for sid, l1, l2 in zip(shard["ids"], shard["line1"], shard["line2"])
+               if sid in needed}
+    results = []
+    for id1, id2 in pairs:
+        conj = _refine_pair(id1, id2, satrecs[id1], satrecs[id2], states[id1], states[id2], analysis_start_time)
+        if conj is not None:
+            results.append((id1, id2, conj))
+    return len(pairs), results
+
+
+def _monte_carlo_worker(tles: Tuple[str, str, str, str], tca: datetime, n_samples: int,
+                        seed: np.random.SeedSequence, params: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    """ Process pool içinde tek Monte Carlo parçası (Satrec pickle edilemez, TLE satırları gelir). """
+    satrec1 = tle_to_satrec(tles[0], tles[1])
+    satrec2 = tle_to_satrec(tles[2], tles[3])
+    return monte_carlo_encounter(satrec1, satrec2, tca, n_samples, seed=seed, **params)
 
 
 class ConjunctionService:
@@ -15,126 +134,346 @@ class ConjunctionService:
     Veriyi alır, işler, filtreler ve sonucu veritabanına yazar.
     """
 
-    def run_conjunction_screening(self, analysis_start_time: datetime = None, duration_hours: int = 2) -> Dict[
-        str, int]:
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        # Aynı anda tek tarama: güncel alarmlar tablosu ve arşiv taşıma işlemleri paylaşılır
+        self._run_lock = threading.Lock()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """ Kabuk taraması için süreç havuzu (ilk kullanımda oluşturulur, 'spawn' ile). """
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                 mp_context=multiprocessing.get_context("spawn"))
+            return self._pool
+
+    def run_conjunction_screening(self, analysis_start_time: datetime = None, duration_hours: int = 2,
+                                  shards: Optional[int] = None, use_cache: bool = True) -> Dict[str, int]:
         """
         Ana Tarama Fonksiyonu (Screening Loop).
             1. Aktif uyduları çeker.
             2. KD-Tree ile aday çiftleri bulur (Broad Phase).
             3. SGP4 ve Optimizasyon ile detaylı analiz yapar (Narrow Phase).
             4. Riskli durumları veritabanına kaydeder.
+
+        Büyük kataloglarda 2. ve 3. adımlar irtifa kabuklarına bölünüp ayrı süreçlerde çalışır
+        (shards=None: katalog dağılımından otomatik, 1: tek süreç). Sonuç bölmesiz taramayla aynıdır.
+
+        Taramalar katalog özeti, başlangıç zaman dilimi ve parametrelerle adreslenir (screening_runs):
+        aynı istek tekrar gelirse saklanan sonuç hesaplama yapılmadan güncel alarmlar olarak sunulur
+        (use_cache=False ile yeniden hesaplanır). Önceki taramaların alarmları arşive taşınır.
         """
 
         if analysis_start_time is None:
             # analiz başlangıç zamanı belirtilmemişse şu anı al utc
             analysis_start_time = datetime.now(timezone.utc)
+        analysis_start_time = _bucket_start(analysis_start_time)
+
+        # İlerleme ve alarmlar canlı akışa (/conjunctions/stream) yayınlanır
+        alert_broker.publish("screening_started", {"analysis_start_time": analysis_start_time.isoformat(),
+                                                   "duration_hours": duration_hours})
+        try:
+            with self._run_lock:
+                result = self._screen(analysis_start_time, duration_hours, shards, use_cache)
+        except Exception as e:
+            alert_broker.publish("screening_failed", {"error": str(e)})
+            raise
+        alert_broker.publish("screening_completed", result)
+        return result
+
+    def _screen(self, analysis_start_time: datetime, duration_hours: int,
+                shards: Optional[int] = None, use_cache: bool = True) -> Dict[str, Any]:
+        # Aşama süreleri /metrics'e yazılır ve sonuçla birlikte döner
+        timer = StageTimer(SCREENING_STAGE_SECONDS)
 
         # Aktif uyduları getir
-        satellites = tle_service.get_all_satellites(limit=5000)
+        with timer.stage("tle_load"):
+            satellites = tle_service.get_all_satellites(limit=SCREENING_CATALOG_LIMIT)
         if len(satellites) < 2:
-            return {"status": "Yeterli uydu yok", "processed_pairs": 0, "alerts_saved": 0}
+            return {"status": "Yeterli uydu yok", "processed_pairs": 0, "alerts_saved": 0,
+                    "stage_timings_s": timer.publish()}
+
+        # Önbellek: aynı katalog + zaman dilimi + parametrelerle tamamlanmış tarama varsa onu sun
+        params = {"radius_km": RADIUS_KM, "analytic_window_s": ANALYTIC_WINDOW,
+                  "save_threshold_km": COLLISION_SAVE_THRESHOLD_KM, "duration_hours": duration_hours,
+                  "version": SCREENING_CACHE_VERSION}
+        with timer.stage("cache_lookup"):
+            catalog_hash = _catalog_hash(satellites)
+            run_key = hashlib.sha1(json.dumps({"catalog": catalog_hash, "start": analysis_start_time.isoformat(),
+                                               "params": params}, sort_keys=True).encode()).hexdigest()
+            conn = get_conn()
+            stored = conn.execute("SELECT * FROM screening_runs WHERE run_key = ? AND status = 'completed'",
+                                  (run_key,)).fetchone()
+        if use_cache:
+            record_cache_access("screening_runs", stored is not None)
+        if use_cache and stored is not None:
+            with timer.stage("persistence"):
+                self._activate_run(conn, stored["id"])
+            conn.close()
+            return {"processed_pairs": stored["processed_pairs"], "alerts_saved": stored["alerts_saved"],
+                    "shards": stored["shards"], "run_id": stored["id"], "cached": True,
+                    "stage_timings_s": timer.publish()}
+        conn.close()
 
         satrecs = {}  # SGP4 nesnelerini tutacak
         states_map = {}  # uyduların t0 anındaki konum/hız verilerini tutacak
 
+        with timer.stage("satrec_parse"):
+            for sat in satellites:
+                try:
+                    satrecs[sat["id"]] = tle_to_satrec(sat["line1"], sat["line2"])
+                except Exception:
+                    continue
+
         # Başlangıç Durumlarının Hesaplanması
         # KD-Tree kurabilmek için tüm uyduların t0 anındaki konumlarını bilmemiz gerekir
-        for sat in satellites:
-            sid = sat["id"]
-            try:
-                st = tle_to_satrec(sat["line1"], sat["line2"])
-                satrecs[sid] = st
-                r = propagate_satrec_single(st, analysis_start_time)
-                r_f = propagate_satrec_single(st, analysis_start_time + timedelta(seconds=1))
-                v = (r_f - r) / 1.0
-                states_map[sid] = (r, v)
-            except Exception:
-                continue
+        with timer.stage("propagation"):
+            for sid, st in list(satrecs.items()):
+                try:
+                    r = propagate_satrec_single(st, analysis_start_time)
+                    r_f = propagate_satrec_single(st, analysis_start_time + timedelta(seconds=1))
+                    v = (r_f - r) / 1.0
+                    states_map[sid] = (r, v)
+                except Exception:
+                    del satrecs[sid]
 
         if len(states_map) < 2:
-            return {"status": "Yetersiz sayıda veri", "processed_pairs": 0, "alerts_saved": 0}
+            return {"status": "Yetersiz sayıda veri", "processed_pairs": 0, "alerts_saved": 0,
+                    "stage_timings_s": timer.publish()}
 
-        # Budama - Pruning Aşaması - Broad Phase Detection
-        # KD-Tree kullanılacak
-        ANALYTIC_WINDOW = 7200.0  # 2 saatlik bir pencereye bakacağız
-        RADIUS_KM = 300.0  # Sadece birbirine 300km yakın olanlar incelenecek
-        COLLISION_SAVE_THRESHOLD_KM = 150.0  # 150 km den uzaksa veritabanına kaydedilmeyecek
+        if shards is None:
+            # Tek çekirdekte süreç havuzu yalnızca ek maliyettir
+            shards = 1 if len(states_map) < SHARDING_MIN_OBJECTS else self.max_workers
+
+        names = {sat["id"]: sat["sat_name"] for sat in satellites}
+        conn = get_conn()
+        cur = conn.cursor()
+
+        # Tarama anahtarsız kaydedilir; alarmları tarama tamamlanana kadar commit edilmez, güncel alarmlar
+        # (ve aynı anahtarlı eski tarama) ancak başarılı taramayla değişir
+        with timer.stage("persistence"):
+            cur.execute("""
+                INSERT INTO screening_runs (catalog_hash, analysis_start_time, params_json, status, shards, created_at)
+                VALUES (?, ?, ?, 'running', ?, ?)
+            """, (catalog_hash, analysis_start_time.isoformat(), json.dumps(params, sort_keys=True),
+                  shards, datetime.now(timezone.utc).isoformat()))
+            run_id = cur.lastrowid
+            conn.commit()
+
+        try:
+            if shards > 1:
+                processed, saved, shards = self._screen_sharded(satellites, states_map, analysis_start_time, shards,
+                                                                names, cur, timer, run_id)
+            else:
+                processed, saved = self._screen_single(satrecs, states_map, analysis_start_time,
+                                                       names, cur, timer, run_id)
+            # Tüm alarmların çarpışma olasılığı tek vektörel geçişte hesaplanır
+            with timer.stage("collision_probability"):
+                self._store_collision_probabilities(cur, saved)
+        except Exception:
+            # Kısmi alarmlar geri alınır, önceki taramanın alarmları güncel kalır
+            conn.rollback()
+            conn.execute("UPDATE screening_runs SET status = 'failed' WHERE id = ?", (run_id,))
+            conn.commit()
+            conn.close()
+            raise
+
+        saved_count = len(saved)
+        # Aynı anahtarla (yeniden hesaplanan) eski tarama kaldırılır; diğer taramaların alarmları silinmez,
+        # arşive taşınır. Hepsi yeni alarmlarla tek işlemde commit edilir.
+        with timer.stage("persistence"):
+            old_runs = "(SELECT id FROM screening_runs WHERE run_key = ?)"
+            cur.execute(f"DELETE FROM conjunction_alerts WHERE run_id IN {old_runs}", (run_key,))
+            cur.execute(f"DELETE FROM conjunction_alerts_archive WHERE run_id IN {old_runs}", (run_key,))
+            cur.execute("DELETE FROM screening_runs WHERE run_key = ?", (run_key,))
+            cur.execute("""
+                UPDATE screening_runs SET run_key = ?, status = 'completed', processed_pairs = ?, alerts_saved = ?,
+                                          shards = ?, completed_at = ?
+                WHERE id = ?
+            """, (run_key, processed, saved_count, shards, datetime.now(timezone.utc).isoformat(), run_id))
+            self._activate_run(conn, run_id)
+            self._apply_retention(conn)
+            conn.commit()
+        conn.close()
+        alert_broker.publish("screening_progress", {"processed": processed, "total": processed,
+                                                    "alerts": saved_count})
+
+        # APIye dönülecek özet rapor
+        return {"processed_pairs": processed, "alerts_saved": saved_count, "shards": shards, "run_id": run_id,
+                "cached": False, "stage_timings_s": timer.publish()}
+
+    @staticmethod
+    def _activate_run(conn, run_id: Optional[int]):
+        """
+        conjunction_alerts yalnızca güncel taramanın alarmlarını tutar. Diğer alarmlar arşive taşınır,
+        run_id verilmişse o taramanın arşivdeki alarmları geri alınır (id'ler değişmez).
+        """
+        other, args = ("", ()) if run_id is None else ("WHERE run_id IS NOT ?", (run_id,))
+        conn.execute(f"""
+            INSERT INTO conjunction_alerts_archive ({ALERT_COLUMNS}, archived_at)
+            SELECT {ALERT_COLUMNS}, ? FROM conjunction_alerts {other}
+        """, (datetime.now(timezone.utc).isoformat(), *args))
+        conn.execute(f"DELETE FROM conjunction_alerts {other}", args)
+        if run_id is not None:
+            conn.execute(f"""
+                INSERT INTO conjunction_alerts ({ALERT_COLUMNS})
+                SELECT {ALERT_COLUMNS} FROM conjunction_alerts_archive WHERE run_id = ?
+            """, (run_id,))
+            conn.execute("DELETE FROM conjunction_alerts_archive WHERE run_id = ?", (run_id,))
+        conn.commit()
 
+    @staticmethod
+    def _apply_retention(conn):
+        """
+        Arşiv saklama politikası: son SCREENING_RUN_RETENTION tarama ve son SCREENING_ARCHIVE_DAYS gün tutulur.
+        Silinen taramaların arşivdeki alarmları ve bu alarmlar için saklanan manevra planları da silinir.
+        """
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=SCREENING_ARCHIVE_DAYS)).isoformat()
+        conn.execute("""
+            DELETE FROM screening_runs
+            WHERE id NOT IN (SELECT id FROM screening_runs ORDER BY id DESC LIMIT ?) OR created_at < ?
+        """, (SCREENING_RUN_RETENTION, cutoff))
+        # Hiçbir taramaya ait olmayan arşiv kayıtları (ör. run_id sütunundan önceki alarmlar)
+        conn.execute("DELETE FROM conjunction_alerts_archive "
+                     "WHERE run_id IS NULL OR run_id NOT IN (SELECT id FROM screening_runs)")
+        conn.execute("""
+            DELETE FROM maneuver_plans WHERE alert_id NOT IN
+                (SELECT id FROM conjunction_alerts UNION SELECT id FROM conjunction_alerts_archive)
+        """)
+
+    def _screen_single(self, satrecs, states_map, analysis_start_time: datetime, names, cur,
+                       timer: StageTimer, run_id: int) -> Tuple[int, List[Tuple[int, Conjunction]]]:
+        """ Tüm kataloğun tek süreçte taranması. Dönüş: (incelenen çift, [(alarm id, Conjunction)]) """
+        # Budama - Pruning Aşaması - Broad Phase Detection
         # sadece konum verilerini (r) alarak KD-Tree ye veriyoruz
         positions_map = {k: v[0] for k, v in states_map.items()}
 
         # prune_pairs fonksiyonu bize sadece riskli olabilecek çiftleri (id1, id2) döner
         # Örn: 5000 uydu için 12.5 milyon çift yerine sadece 500 çift döner.
-        candidate_pairs = prune_pairs(positions_map, radius_km=RADIUS_KM)
-
-        conn = get_conn()
-        cur = conn.cursor()
+        with timer.stage("kdtree_build"):
+            tree = build_kdtree(positions_map)
+        with timer.stage("pruning"):
+            candidate_pairs = prune_pairs(positions_map, radius_km=RADIUS_KM, tree=tree)
 
-        # Demo amaçlı her taramada eski alarmları temizliyoruz
-        # Gerçek bir uygulamada burası 'archive' tablosuna taşınmalıdır
-        cur.execute("DELETE FROM conjunction_alerts")
-        conn.commit()
-        saved_count = 0
+        total = len(candidate_pairs)
+        alert_broker.publish("screening_progress", {"processed": 0, "total": total, "alerts": 0})
+        last_progress = time.monotonic()
+        saved = []
 
         # Aday çiftler üzerinde detaylı analiz, Narrow Phase
         # sadece filtrelenmiş aday çiftler üzerinde SGP4 ve Optimizasyon çalıştırılacak
-        for id1, id2 in candidate_pairs:
+        for processed, (id1, id2) in enumerate(candidate_pairs, start=1):
+            if time.monotonic() - last_progress >= PROGRESS_INTERVAL_S:
+                last_progress = time.monotonic()
+                alert_broker.publish("screening_progress",
+                                     {"processed": processed - 1, "total": total, "alerts": len(saved)})
             if id1 not in satrecs or id2 not in satrecs:
                 continue
 
-            sat1 = satrecs[id1]
-            sat2 = satrecs[id2]
-            r1, v1 = states_map[id1]
-            r2, v2 = states_map[id2]
-
-            try:
-                # Analitik Tahmin -> SGP4 Refinement -> Docking Kontrolü
-                conj = compute_conjunction_for_pair(
-                    sat1, sat2,
-                    analysis_start_time,
-                    r1, v1, r2, v2,
-                    propagate_satrec_single,
-                    analytic_window_sec=ANALYTIC_WINDOW
-                )
-            except Exception as e:
-                print(f"Error computing pair {id1}-{id2}: {e}")
-                continue
+            with timer.stage("refinement"):
+                conj = _refine_pair(id1, id2, satrecs[id1], satrecs[id2], states_map[id1], states_map[id2],
+                                    analysis_start_time)
+            if conj is not None:
+                saved.append((self._save_alert(cur, id1, id2, conj, names, timer, run_id), conj))
+        return total, saved
 
-            if conj is None:
-                continue
+    def _screen_sharded(self, satellites, states_map, analysis_start_time: datetime, n_shards: int, names, cur,
+                        timer: StageTimer, run_id: int) -> Tuple[int, List[Tuple[int, Conjunction]], int]:
+        """
+        Kataloğu t0 yarıçapına göre örtüşen irtifa kabuklarına böler ve her kabuğu ayrı süreçte tarar.
+        RADIUS_KM içindeki iki nesnenin yarıçap farkı da RADIUS_KM'den küçüktür; kabuk, çekirdeğinin
+        en üst nesnesinin RADIUS_KM üstüne kadar uzanırsa çekirdeğe düşen her çiftin iki üyesi de kabuktadır.
+        Kabuk sınırları en kalabalık kabuğu küçültecek şekilde seçilir (en fazla n_shards kabuk).
+        Kabuklar bittikçe birleştirilir; alarmlar üretildikleri sırayla yayınlanır.
+        Dönüş: (incelenen çift, [(alarm id, Conjunction)], kullanılan kabuk sayısı)
+        """
+        lines = {sat["id"]: (sat["line1"], sat["line2"]) for sat in satellites}
+        ids = np.array(list(states_map.keys()))
+        r = np.array([states_map[sid][0] for sid in ids])
+        v = np.array([states_map[sid][1] for sid in ids])
+        radii = np.linalg.norm(r, axis=1)
 
-            # Sonuçların Kaydedilmesi (Persistence)
-            should_save = False
-            # DOCKING: Kenetlenme manevralarını kaydet (arayüzde ayrı bölümü açıldığı için)
-            if conj.event_type == "DOCKING":
-                should_save = True
-            elif conj.event_type == "COLLISION":
-                # Score > 0 demek belirli bir risk var demek
-                # Ayrıca mesafe eşiğinin (150 km) altında olmalı
-                if conj.score > 0 and conj.miss_distance_km < COLLISION_SAVE_THRESHOLD_KM:
-                    should_save = True
-
-            if should_save:
-                cur.execute("""
-                    INSERT INTO conjunction_alerts 
-                    (sat1_id, sat2_id, tca, miss_distance_km, rel_velocity_km_s, score, event_type, created_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    id1, id2,
-                    conj.tca.isoformat(),
-                    conj.miss_distance_km,
-                    conj.rel_velocity_km_s,
-                    conj.score,
-                    conj.event_type,
-                    datetime.now(timezone.utc).isoformat()
-                ))
-                saved_count += 1
+        with timer.stage("sharding"):
+            cores = plan_altitude_shells(radii, n_shards, halo_km=RADIUS_KM + 1.0)
+        pool = self._get_pool()
+        futures = []
+        for lo, hi in cores:
+            core = (radii >= lo) & (radii < hi)
+            members = np.nonzero((radii >= lo) & (radii <= radii[core].max() + RADIUS_KM + 1.0))[0]
+            shard = {
+                "core_ids": ids[core].tolist(),
+                "ids": ids[members].tolist(),
+                "line1": [lines[sid][0] for sid in ids[members]],
+                "line2": [lines[sid][1] for sid in ids[members]],
+                "r": r[members].tolist(),
+                "v": v[members].tolist(),
+            }
+            futures.append(track_pool_task("screening", pool.submit(_screen_shard_worker, shard,
+                                                                    analysis_start_time)))
 
-        conn.commit()
-        conn.close()
+        alert_broker.publish("screening_progress", {"processed": 0, "total": None, "alerts": 0,
+                                                    "shards": len(futures), "shards_done": 0})
+        processed, saved = 0, []
+        seen = set()
+        for done, future in enumerate(as_completed(futures), start=1):
+            with timer.stage("refinement"):
+                n_pairs, results = future.result()
+            processed += n_pairs
+            for id1, id2, conj in results:
+                if (id1, id2) in seen:
+                    continue
+                seen.add((id1, id2))
+                saved.append((self._save_alert(cur, id1, id2, conj, names, timer, run_id), conj))
+            # Çift sayısı kabuklar bitmeden bilinmez, ilerleme biten kabuk sayısıyla verilir
+            alert_broker.publish("screening_progress", {"processed": processed, "total": None, "alerts": len(saved),
+                                                        "shards": len(futures), "shards_done": done})
+        return processed, saved, len(cores)
 
-        # APIye dönülecek özet rapor
-        return {"processed_pairs": len(candidate_pairs), "alerts_saved": saved_count}
+    @staticmethod
+    def _store_collision_probabilities(cur, saved: List[Tuple[int, Conjunction]]):
+        """
+        Kaydedilen çarpışma alarmlarının Pc değerleri (varsayılan kovaryans ve HBR ile) tek NumPy geçişinde
+        hesaplanıp score'un yanına yazılır. Kenetlenme olaylarında karşılaşma düzlemi tanımsızdır, Pc boş kalır.
+        """
+        rows = [(alert_id, conj.states) for alert_id, conj in saved
+                if conj.event_type == "COLLISION" and conj.states is not None]
+        if not rows:
+            return
+        r1, v1, r2, v2 = (np.array([states[k] for _, states in rows]) for k in range(4))
+        pc = collision_probability(r1, v1, r2, v2)
+        cur.executemany("UPDATE conjunction_alerts SET pc = ? WHERE id = ?",
+                        [(None if np.isnan(p) else float(p), alert_id) for (alert_id, _), p in zip(rows, pc)])
+
+    @staticmethod
+    def _save_alert(cur, id1: int, id2: int, conj: Conjunction, names, timer: StageTimer, run_id: int) -> int:
+        # Sonuçların Kaydedilmesi (Persistence)
+        created_at = datetime.now(timezone.utc).isoformat()
+        with timer.stage("persistence"):
+            cur.execute("""
+                INSERT INTO conjunction_alerts 
+                (sat1_id, sat2_id, tca, miss_distance_km, rel_velocity_km_s, score, event_type, created_at, run_id)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                id1, id2,
+                conj.tca.isoformat(),
+                conj.miss_distance_km,
+                conj.rel_velocity_km_s,
+                conj.score,
+                conj.event_type,
+                created_at,
+                run_id
+            ))
+        # Alarm tarama bitmeden (commit beklenmeden) geçici olarak tüm panolara gönderilir: tarama
+        # screening_completed ile kesinleşir, screening_failed gelirse bu taramanın alarmları geçersizdir
+        alert_broker.publish("alert", {
+            "id": cur.lastrowid, "sat1_id": id1, "sat1_name": names.get(id1), "sat2_id": id2,
+            "sat2_name": names.get(id2), "tca": conj.tca.isoformat(), "miss_distance_km": conj.miss_distance_km,
+            "rel_velocity_km_s": conj.rel_velocity_km_s, "score": conj.score, "event_type": conj.event_type,
+            "created_at": created_at, "run_id": run_id, "provisional": True
+        })
+        return cur.lastrowid
 
     def get_alerts(self, limit: int = 20, event_type: str = "COLLISION") -> List[Dict[str, Any]]:
         """
@@ -146,6 +485,7 @@ class ConjunctionService:
         query = """
             SELECT 
                 a.id, a.sat1_id, a.sat2_id, a.tca, a.miss_distance_km, a.rel_velocity_km_s, a.score, a.event_type, a.created_at,
+                a.run_id, a.pc,
                 s1.sat_name as sat1_name, s2.sat_name as sat2_name
             FROM conjunction_alerts a
             JOIN raw_tles s1 ON a.sat1_id = s1.id
@@ -160,6 +500,120 @@ class ConjunctionService:
         # Row objelerini dictionarye çevirerek JSON uyumlu hale getir
         return [dict(row) for row in rows]
 
+    def compute_collision_probability(self, alert_ids: Optional[List[int]] = None,
+                                      cov1_ric_km2: Optional[np.ndarray] = None,
+                                      cov2_ric_km2: Optional[np.ndarray] = None,
+                                      hbr_km: float = DEFAULT_HBR_KM, method: str = "foster") -> List[Dict[str, Any]]:
+        """
+        Güncel çarpışma alarmlarının Pc değerini verilen kovaryans ve sert cisim yarıçapıyla yeniden hesaplar.
+        Sonuç kaydedilmez (what-if); kaydedilen Pc varsayılan kovaryansla hesaplanandır (stored_pc).
+        Args:
+            alert_ids: Hesaplanacak alarmlar (verilmezse tüm güncel çarpışma alarmları).
+            cov1_ric_km2, cov2_ric_km2: (3, 3) RIC kovaryansları (km²); verilmezse DEFAULT_SIGMA_RIC_KM.
+            hbr_km: Birleşik sert cisim yarıçapı (km).
+            method: 'foster' veya 'chan'.
+        """
+        conn = get_conn()
+        query = "SELECT id, sat1_id, sat2_id, tca, pc FROM conjunction_alerts WHERE event_type = 'COLLISION'"
+        params: list = []
+        if alert_ids is not None:
+            query += f" AND id IN ({','.join('?' * len(alert_ids))})"
+            params.extend(alert_ids)
+        alerts = [dict(r) for r in conn.execute(query + " ORDER BY id", params).fetchall()]
+        conn.close()
+        if alert_ids is not None and not alerts:
+            raise ValueError(f"Alarm bulunamadı. ID: {alert_ids}")
+
+        # TCA anındaki durumlar (alarm başına iki nesne, tek zaman noktası)
+        states = np.full((len(alerts), 4, 3), np.nan)
+        satrecs: Dict[int, Any] = {}
+        for i, alert in enumerate(alerts):
+            for sid in (alert["sat1_id"], alert["sat2_id"]):
+                if sid not in satrecs:
+                    satrecs[sid] = tle_service.get_satrec_by_id(sid)
+            pair = [satrecs[alert["sat1_id"]], satrecs[alert["sat2_id"]]]
+            if None in pair:
+                continue
+            r, v, err = propagate_satrec_array(pair, [datetime.fromisoformat(alert["tca"])])
+            if np.all(err == 0):
+                states[i] = [r[0, 0], v[0, 0], r[1, 0], v[1, 0]]
+
+        pc = np.full(len(alerts), np.nan)
+        ok = np.all(np.isfinite(states), axis=(1, 2))
+        if np.any(ok):
+            cov1 = default_covariance(1)[0] if cov1_ric_km2 is None else np.asarray(cov1_ric_km2, dtype=float)
+            cov2 = default_covariance(1)[0] if cov2_ric_km2 is None else np.asarray(cov2_ric_km2, dtype=float)
+            pc[ok] = collision_probability(states[ok, 0], states[ok, 1], states[ok, 2], states[ok, 3],
+                                           cov1, cov2, hbr_km=hbr_km, method=method)
+        return [{"alert_id": a["id"], "sat1_id": a["sat1_id"], "sat2_id": a["sat2_id"], "tca": a["tca"],
+                 "pc": None if np.isnan(p) else float(p), "stored_pc": a["pc"]} for a, p in zip(alerts, pc)]
+
+    def run_monte_carlo(self, alert_id: int, n_samples: int = 10000, seed: Optional[int] = None,
+                        hbr_km: float = DEFAULT_HBR_KM,
+                        sigma1_ric_km: Tuple[float, float, float] = DEFAULT_SIGMA_RIC_KM,
+                        sigma2_ric_km: Tuple[float, float, float] = DEFAULT_SIGMA_RIC_KM,
+                        intrack_growth_km_per_day: float = DEFAULT_INTRACK_GROWTH_KM_PER_DAY) -> Dict[str, Any]:
+        """
+        Bir alarmın iki nesnesinin TLE elemanları n_samples kez bozulur ve TCA çevresinde yayılır
+        (processing/tle_uncertainty.py). Örnekler MC_CHUNK_SAMPLES'lık parçalarla süreç havuzunda çalışır;
+        parça tohumları SeedSequence(seed).spawn ile üretildiğinden sonuç işçi sayısından bağımsızdır.
+        Karşılaştırma için aynı σ değerleriyle analitik (Foster) Pc de döner.
+        """
+        start = time.perf_counter()
+        conn = get_conn()
+        alert = None
+        for table in ("conjunction_alerts", "conjunction_alerts_archive"):
+            row = conn.execute(f"SELECT id, sat1_id, sat2_id, tca, miss_distance_km, pc FROM {table} WHERE id = ?",
+                               (alert_id,)).fetchone()
+            if row:
+                alert = dict(row)
+                break
+        conn.close()
+        if alert is None:
+            raise ValueError(f"Alarm bulunamadı. ID: {alert_id}")
+        sat1 = tle_service.get_satellite_by_id(alert["sat1_id"])
+        sat2 = tle_service.get_satellite_by_id(alert["sat2_id"])
+        if sat1 is None or sat2 is None:
+            raise ValueError(f"Alarmın TLE kaydı bulunamadı. ID: {alert_id}")
+
+        tca = datetime.fromisoformat(alert["tca"])
+        tles = (sat1["line1"], sat1["line2"], sat2["line1"], sat2["line2"])
+        satrec1, satrec2 = tle_to_satrec(tles[0], tles[1]), tle_to_satrec(tles[2], tles[3])
+        half_window_s, step_s = nominal_encounter_window(satrec1, satrec2, tca, sigma1_ric_km, sigma2_ric_km,
+                                                         intrack_growth_km_per_day)
+        params = {"sigma1_ric_km": tuple(sigma1_ric_km), "sigma2_ric_km": tuple(sigma2_ric_km),
+                  "intrack_growth_km_per_day": intrack_growth_km_per_day,
+                  "half_window_s": half_window_s, "step_s": step_s}
+
+        n_chunks = -(-n_samples // MC_CHUNK_SAMPLES)
+        sizes = [MC_CHUNK_SAMPLES] * (n_chunks - 1) + [n_samples - MC_CHUNK_SAMPLES * (n_chunks - 1)]
+        seeds = np.random.SeedSequence(seed).spawn(n_chunks)
+        if n_chunks == 1 or self.max_workers == 1:
+            chunks = [_monte_carlo_worker(tles, tca, size, ss, params) for size, ss in zip(sizes, seeds)]
+        else:
+            pool = self._get_pool()
+            futures = [track_pool_task("monte_carlo", pool.submit(_monte_carlo_worker, tles, tca, size, ss, params))
+                       for size, ss in zip(sizes, seeds)]
+            chunks = [f.result() for f in futures]
+        result = {key: np.concatenate([c[key] for c in chunks]) for key in chunks[0]}
+
+        r, v, err = propagate_satrec_array([satrec1, satrec2], [tca])
+        analytic_pc = None
+        if np.all(err == 0):
+            pc = collision_probability(r[0], v[0], r[1], v[1], default_covariance(1, sigma1_ric_km),
+                                       default_covariance(1, sigma2_ric_km), hbr_km=hbr_km)[0]
+            analytic_pc = None if np.isnan(pc) else float(pc)
+
+        summary = summarize_samples(result, hbr_km)
+        summary.update({
+            "alert_id": alert["id"], "sat1_id": alert["sat1_id"], "sat2_id": alert["sat2_id"], "tca": alert["tca"],
+            "nominal_miss_km": alert["miss_distance_km"], "stored_pc": alert["pc"], "analytic_pc": analytic_pc,
+            "hbr_km": hbr_km, "seed": seed, "chunks": n_chunks,
+            "window_half_width_s": half_window_s, "step_s": step_s,
+            "elapsed_s": round(time.perf_counter() - start, 3),
+        })
+        return summary
+
 
 # Singleton instance (Servis tek bir örnek olarak başlatılır)
 conjunction_service = ConjunctionService()
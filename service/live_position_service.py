@@ -0,0 +1,237 @@
+import asyncio
+import os
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Set, Tuple
+import numpy as np
+from sgp4.api import SatrecArray
+from backend.events import STREAM_SUBSCRIBERS
+from backend.metrics import metrics
+from processing.coord_utils import teme_to_latlon_array
+from processing.position_codec import quantize, encode_keyframe, encode_delta
+from processing.propagator import utc_dt_to_jd
+from service.tle_service import tle_service, CatalogSnapshot
+
+"""
+Harita için canlı konum akışı (WebSocket /orbit/live).
+
+İstemciler uydu id listesine veya tüm kataloga abone olur. Aynı listeye ve aynı hıza abone olan
+istemciler bir grup oluşturur. Her tikte tüm grupların istediği nesnelerin birleşimi tek bir vektörel
+SGP4 çağrısıyla ilerletilir, grup başına bir çerçeve kodlanır ve gruptaki tüm istemcilere aynı bayt
+dizisi gönderilir. Abone sayısı hesaplama maliyetini artırmaz.
+
+Çerçeveler processing.position_codec formatındadır: ilk çerçeve (ve katalog değiştiğinde) anahtar
+çerçeve, sonrakiler bir önceki tike göre farklardır. Gruba sonradan katılan veya geride kalıp çerçeve
+kaçıran istemciye grubun güncel durumundan bir anahtar çerçeve gönderilir, ardından ortak farklarla
+devam eder.
+"""
+
+LIVE_RATE_HZ = float(os.environ.get("ASTM_LIVE_RATE_HZ", "1.0"))
+MAX_SUBSCRIBED_IDS = 20000
+QUEUE_SIZE = 8  # istemci başına bekleyen çerçeve (yavaş istemci bu sınırı aşarsa anahtar çerçeveye döner)
+
+LIVE_TICK_SECONDS = metrics.histogram("live_position_tick_seconds", "Canlı konum tiki (yayılım + kodlama)")
+LIVE_FRAME_BYTES = metrics.counter("live_position_frame_bytes_total", "Kodlanan canlı konum çerçeveleri (bayt)",
+                                   ("frame",))
+
+GroupKey = Tuple[Optional[Tuple[int, ...]], int]  # (uydu id'leri, None = tüm katalog), kaç tikte bir
+
+
+class LiveSubscriber:
+
+    def __init__(self):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self.group: Optional["_Group"] = None
+
+    def push(self, frame: bytes, keyframe) -> None:
+        """ Kuyruk doluysa bekleyen çerçeveler atılır, yerine güncel anahtar çerçeve konur. """
+        try:
+            self.queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(keyframe())
+
+
+class _Group:
+
+    def __init__(self, key: GroupKey):
+        self.sat_ids, self.every = key
+        self.subscribers: Set[LiveSubscriber] = set()
+        self.version = None  # çözümlemenin yapıldığı katalog sürümü
+        self.ids = np.zeros(0, dtype=np.int64)  # çerçevedeki id'ler
+        self.index = np.zeros(0, dtype=np.int64)  # katalog anlık görüntüsündeki sıra, -1 = bulunamadı
+        self.q: Optional[np.ndarray] = None  # son gönderilen nicemlenmiş konumlar
+        self.seq = 0
+        self.t_unix = 0.0
+
+    def keyframe(self) -> bytes:
+        frame = encode_keyframe(self.seq, self.t_unix, self.ids, self.q)
+        LIVE_FRAME_BYTES.inc(len(frame), frame="key")
+        return frame
+
+
+class LivePositionService:
+
+    def __init__(self, rate_hz: float = LIVE_RATE_HZ):
+        self.rate_hz = rate_hz
+        self._groups: Dict[GroupKey, _Group] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._tick = 0
+        self._propagator = None  # (katalog sürümü, birleşim indeksleri, SatrecArray)
+
+    def interval_to_every(self, interval_s: Optional[float]) -> int:
+        if not interval_s:
+            return 1
+        return max(1, int(round(interval_s * self.rate_hz)))
+
+    def subscribe(self, sub: LiveSubscriber, sat_ids: Optional[List[int]], interval_s: Optional[float] = None):
+        """
+        İstemcinin aboneliğini değiştirir (olay döngüsünden çağrılır). sat_ids None ise tüm katalog,
+        boş liste ise abonelik kaldırılır.
+        """
+        if sat_ids is not None and len(sat_ids) > MAX_SUBSCRIBED_IDS:
+            raise ValueError(f"En fazla {MAX_SUBSCRIBED_IDS} uyduya abone olunabilir, tüm katalog için 'all' kullanın")
+        self.unsubscribe(sub)
+        while not sub.queue.empty():
+            sub.queue.get_nowait()  # önceki aboneliğin gönderilmemiş çerçeveleri
+        if sat_ids is not None and len(sat_ids) == 0:
+            return
+
+        key = (None if sat_ids is None else tuple(dict.fromkeys(int(i) for i in sat_ids)),
+               self.interval_to_every(interval_s))
+        group = self._groups.get(key)
+        if group is None:
+            group = self._groups[key] = _Group(key)
+        group.subscribers.add(sub)
+        sub.group = group
+        STREAM_SUBSCRIBERS.inc(stream="positions")
+        if group.q is not None:
+            sub.push(group.keyframe(), group.keyframe)
+
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._task = loop.create_task(self._run())
+
+    def unsubscribe(self, sub: LiveSubscriber):
+        group = sub.group
+        if group is None:
+            return
+        group.subscribers.discard(sub)
+        sub.group = None
+        STREAM_SUBSCRIBERS.dec(stream="positions")
+        if not group.subscribers:
+            self._groups.pop((group.sat_ids, group.every), None)
+
+    async def _run(self):
+        period = 1.0 / self.rate_hz
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        while self._groups:
+            try:
+                with LIVE_TICK_SECONDS.time():
+                    await self._run_tick()
+            except Exception as e:
+                # Tek bir hatalı tik (ör. ingest sırasında kilitli veritabanı) akışı durdurmaz
+                print(f">>> Canlı konum tiki hatası: {e}")
+            next_tick = max(next_tick + period, loop.time())  # gecikirse tik atlanır, birikmez
+            await asyncio.sleep(next_tick - loop.time())
+
+    async def _run_tick(self):
+        self._tick += 1
+        due = [g for g in self._groups.values() if g.q is None or self._tick % g.every == 0]
+        if not due:
+            return
+        now = datetime.now(timezone.utc)
+        # Yayılım ve katalog okuma iş parçacığında; olay döngüsü diğer istemcilere hizmet etmeye devam eder
+        results = await asyncio.to_thread(self._compute, [g.sat_ids for g in due], now)
+
+        for group, (version, ids, index, q) in zip(due, results):
+            if not group.subscribers:
+                continue  # hesaplama sürerken tüm aboneler ayrıldı
+            prev_q = group.q
+            if version != group.version:
+                if not np.array_equal(ids, group.ids):
+                    prev_q = None  # nesne listesi değişti (yeni ingest), fark çerçevesi anlamsız
+                group.version, group.ids, group.index = version, ids, index
+            group.q, group.seq, group.t_unix = q, group.seq + 1, now.timestamp()
+
+            frame = encode_delta(group.seq, group.t_unix, prev_q, q) if prev_q is not None else None
+            if frame is None:
+                frame = group.keyframe()
+            else:
+                LIVE_FRAME_BYTES.inc(len(frame), frame="delta")
+            for sub in list(group.subscribers):
+                sub.push(frame, group.keyframe)
+
+    def _compute(self, requests, now: datetime):
+        """ requests: grup başına sat_ids -> grup başına (katalog sürümü, ids, index, nicemlenmiş konumlar). """
+        snapshot = tle_service.get_catalog()
+        resolved = []
+        for sat_ids in requests:
+            if sat_ids is None:
+                resolved.append((snapshot.ids, np.arange(len(snapshot), dtype=np.int64)))
+            else:
+                ids = np.array(sat_ids, dtype=np.int64)
+                resolved.append((ids, self._resolve(snapshot, ids)))
+
+        if any(sat_ids is None for sat_ids in requests):
+            union = np.arange(len(snapshot), dtype=np.int64)
+        else:
+            union = np.unique(np.concatenate([index[index >= 0] for _, index in resolved] + [np.zeros(0, np.int64)]))
+
+        lat = lon = alt = np.zeros(0)
+        valid = np.zeros(0, dtype=bool)
+        if len(union):
+            sat_array = self._satrec_array(snapshot, union)
+            jd, fr = utc_dt_to_jd(now)
+            err, r, _ = sat_array.sgp4(np.array([jd]), np.array([fr]))
+            lat, lon, alt = teme_to_latlon_array(r[:, 0, :], now)
+            valid = err[:, 0] == 0
+
+        results = []
+        for ids, index in resolved:
+            pos = np.clip(np.searchsorted(union, index), 0, max(len(union) - 1, 0))
+            found = index >= 0
+            if len(union):
+                q = quantize(lat[pos], lon[pos], alt[pos], valid[pos] & found)
+            else:
+                q = quantize(np.full(len(ids), np.nan), np.zeros(len(ids)), np.zeros(len(ids)))
+            results.append((snapshot.version, ids, index, q))
+        return results
+
+    @staticmethod
+    def _resolve(snapshot: CatalogSnapshot, sat_ids: np.ndarray) -> np.ndarray:
+        """
+        raw_tles id'lerini anlık görüntü sırasına çevirir. Eski bir TLE kaydının id'si verilmişse
+        aynı NORAD numarasının güncel kaydı kullanılır.
+        """
+        index = np.full(len(sat_ids), -1, dtype=np.int64)
+        if len(snapshot) == 0:
+            return index
+        pos = np.clip(np.searchsorted(snapshot.ids, sat_ids), 0, len(snapshot) - 1)
+        hit = snapshot.ids[pos] == sat_ids
+        index[hit] = pos[hit]
+
+        if not hit.all():
+            catalog = tle_service.get_catalog_elements()
+            epos = np.clip(np.searchsorted(catalog.ids, sat_ids), 0, max(len(catalog) - 1, 0))
+            known = ~hit & (catalog.ids[epos] == sat_ids)
+            norad = catalog.elements.norad_id[epos]
+            order = np.argsort(snapshot.norad_ids)
+            npos = np.clip(np.searchsorted(snapshot.norad_ids, norad, sorter=order), 0, len(snapshot) - 1)
+            match = known & (snapshot.norad_ids[order[npos]] == norad)
+            index[match] = order[npos[match]]
+        return index
+
+    def _satrec_array(self, snapshot: CatalogSnapshot, union: np.ndarray):
+        """ SatrecArray kurulumu yayılım kadar sürer; katalog ve abone kümesi değişmedikçe yeniden kullanılır. """
+        cached = self._propagator
+        if cached is not None and cached[0] == snapshot.version and np.array_equal(cached[1], union):
+            return cached[2]
+        sat_array = SatrecArray([snapshot.satrecs[i] for i in union])
+        self._propagator = (snapshot.version, union, sat_array)
+        return sat_array
+
+
+# Singleton instance
+live_position_service = LivePositionService()
@@ -1,8 +1,38 @@
-from datetime import datetime, timedelta
-from typing import Dict, Any
+import hashlib
+import json
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, List, Optional, Iterator
+import numpy as np
+from backend.models.db import get_conn
+from backend.metrics import record_cache_access, track_pool_task
 from service.tle_service import tle_service
-from planner.optimizer import find_minimal_dv
+from planner.optimizer import find_minimal_dv, state_at_burn, post_burn_ephemeris, ManeuverProposal, \
+    linearize_burn, simulate_burns_batch, apply_burn_errors, sample_burn_errors
+from planner.trade_study import run_burn_trade_study
 from processing.propagate_wrapper import propagate_satrec_single
+from processing.propagator import propagate_satrec_array
+from processing.screening import screen_trajectories, radial_band_filter
+from processing.tle_arrays import tle_version
+
+BURN_LEAD_TIME_S = 3600.0  # varsayılan ateşleme zamanı: TCA'dan bu kadar önce
+MAX_TRADE_STUDY_CASES = 2000  # takas çalışmasında (ateşleme zamanı x hedef mesafe) en fazla senaryo
+
+
+def _plan_alert_worker(sat1_id: int, sat2_id: int, tca_iso: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Process pool içinde çalışan tek manevra planı.
+    Worker süreçleri servis modülünü kendisi import eder, katalog önbelleği süreç başına tutulur.
+    """
+    return maneuver_service.calculate_avoidance_maneuver(
+        sat_id_primary=sat1_id,
+        sat_id_secondary=sat2_id,
+        tca=datetime.fromisoformat(tca_iso),
+        **params
+    )
 
 
 class ManeuverService:
@@ -11,11 +41,31 @@ class ManeuverService:
     Matematiksel optimizasyon motorunu (find_minimal_dv) kullanır ve sonuçları
     API'nin anlayacağı formatta sunar.
     """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """
+        Toplu planlama için süreç havuzu (ilk kullanımda oluşturulur ve açık tutulur).
+        'spawn' kullanılır: API sunucusu çok iş parçacıklıdır, fork kilitlenmelere yol açabilir.
+        """
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                 mp_context=multiprocessing.get_context("spawn"))
+            return self._pool
+
     def calculate_avoidance_maneuver(self,
                                      sat_id_primary: int,
                                      sat_id_secondary: int,
                                      tca: datetime,
-                                     target_miss_km: float = 2.0) -> Dict[str, Any]:
+                                     target_miss_km: float = 2.0,
+                                     rescreen: bool = True,
+                                     rescreen_window_hours: float = 6.0,
+                                     rescreen_threshold_km: float = 10.0) -> Dict[str, Any]:
         """
         İki uydu arasındaki çarpışmayı önlemek için gerekli ateşleme planını oluşturur.
         Args:
@@ -23,6 +73,9 @@ class ManeuverService:
             sat_id_secondary: Çarpışma riski taşıyan diğer obje (enkaz veya uydu).
             tca: Time of Closest Approach (En Yakın Geçiş Zamanı).
             target_miss_km: Hedeflenen güvenli mesafe (Varsayılan: 2 km).
+            rescreen: Manevra sonrası yörünge tüm kataloğa karşı taransın mı?
+            rescreen_window_hours: Ateşleme anından itibaren taranacak pencere (saat).
+            rescreen_threshold_km: Bu mesafenin altındaki yakınlaşmalar raporlanır.
         """
         # Uyduların matematiksel modellerini yani SGP4 nesnelerini getir
         sat1 = tle_service.get_satrec_by_id(sat_id_primary)
@@ -36,7 +89,7 @@ class ManeuverService:
         # Burada ateşleme zamanını TCA'dan 1 saat (3600 sn) öncesine çekiyoruz.
         # Çünkü çarpışmadan ne kadar önce manevra yaparsak, o kadar az yakıt (DeltaV) harcarız.
         # Çok küçük bir açı değişikliği, 1 saatlik uçuş süresinde km'lerce fark yaratır.
-        burn_time = tca - timedelta(seconds=3600)
+        burn_time = tca - timedelta(seconds=BURN_LEAD_TIME_S)
 
         # Optimizasyon Motorunu Çalıştır - Minimize J(dv) fonksiyonu
         proposal = find_minimal_dv(
@@ -57,6 +110,22 @@ class ManeuverService:
             verbose=False
         )
 
+        # Yeniden tarama yalnızca uygulanabilir bir ateşleme için yapılır. Hatası planı geçersiz kılmaz,
+        # yanıtta rescreen_status='failed' ve hata mesajı ile bildirilir
+        new_conjunctions = []
+        rescreen_status, rescreen_error = "skipped", None
+        if rescreen and proposal.success and proposal.dv_mag_km_s > 0.0:
+            try:
+                new_conjunctions = self.rescreen_post_burn(
+                    sat1, sat2, proposal,
+                    window_hours=rescreen_window_hours,
+                    threshold_km=rescreen_threshold_km
+                )
+                rescreen_status = "completed"
+            except Exception as e:
+                print(f">>> Manevra sonrası tarama başarısız: {e}")
+                rescreen_status, rescreen_error = "failed", str(e)
+
         return {
             "success": proposal.success,
             "burn_time": proposal.burn_time.isoformat(),
@@ -64,9 +133,301 @@ class ManeuverService:
             "predicted_miss_km": proposal.predicted_miss_km,
             "dv_vector_m_s": (proposal.dv_km_s * 1000).tolist(),
             "dv_magnitude_m_s": proposal.dv_mag_m_s,
-            "message": proposal.message
+            "message": proposal.message,
+            "new_conjunctions": new_conjunctions,
+            "rescreen_status": rescreen_status,
+            "rescreen_error": rescreen_error
         }
 
+    def rescreen_post_burn(self, satrec_our, satrec_secondary, proposal: ManeuverProposal,
+                           window_hours: float = 6.0, threshold_km: float = 10.0,
+                           step_s: float = 60.0) -> List[Dict[str, Any]]:
+        """
+        Manevra sonrası yörüngeyi kataloğa karşı tek-herkese (one-vs-all) tarar.
+        Kaçınma manevrası başka bir nesneyle yeni bir yakınlaşma oluşturabilir.
+
+            1. Manevra sonrası efemeris: SGP4 nominal + iki cisim manevra farkı.
+            2. Perigee/Apogee filtresi ile irtifa bandı kesişmeyen nesneler elenir.
+            3. Kalan nesneler vektörel SGP4 ile aynı zaman ızgarasında ilerletilir.
+            4. KD-Tree broad phase + Hermite narrow phase (processing.screening).
+
+        Nominal (manevrasız) yörüngede zaten aynı yakınlıkta olan geçişler yeni sayılmaz,
+        sadece yeni oluşan veya manevra ile daha da yakınlaşan geçişler döner.
+        """
+        n_steps = int(window_hours * 3600.0 / step_s) + 1
+        start = proposal.burn_time
+        offsets = np.arange(n_steps) * step_s
+        times = [start + timedelta(seconds=float(o)) for o in offsets]
+
+        r_nom, v_nom, err = propagate_satrec_array([satrec_our], times)
+        if np.any(err[0] != 0):
+            return []
+        r_b, v_b = state_at_burn(satrec_our, start, propagate_satrec_single)
+        r_post, v_post = post_burn_ephemeris(r_nom[0], v_nom[0], offsets, r_b, v_b, proposal.dv_km_s)
+
+        catalog = tle_service.get_catalog()
+        radius = np.linalg.norm(r_post, axis=1) - satrec_our.radiusearthkm
+        # 50 km pay: ortalama elemanlardan gelen perigee/apogee ile anlık irtifa arasındaki fark
+        mask = radial_band_filter(catalog.perigee_km, catalog.apogee_km,
+                                  float(radius.min()), float(radius.max()), threshold_km + 50.0)
+        mask &= ~np.isin(catalog.norad_ids, [satrec_our.satnum, satrec_secondary.satnum])
+        cat_idx = np.nonzero(mask)[0]
+        if len(cat_idx) == 0:
+            return []
+
+        cat_r, cat_v, cat_err = propagate_satrec_array([catalog.satrecs[i] for i in cat_idx], times)
+        ok = np.all(cat_err == 0, axis=1)
+        cat_idx, cat_r, cat_v = cat_idx[ok], cat_r[ok], cat_v[ok]
+
+        post = screen_trajectories(r_post[None], v_post[None], cat_r, cat_v, start, step_s, threshold_km)
+        if not post:
+            return []
+        nominal = screen_trajectories(r_nom, v_nom, cat_r, cat_v, start, step_s, threshold_km)
+        nominal_miss = {}
+        for a in nominal:
+            nominal_miss[a.catalog_index] = min(a.miss_distance_km, nominal_miss.get(a.catalog_index, np.inf))
+
+        results = []
+        for a in post:
+            before = nominal_miss.get(a.catalog_index)
+            if before is not None and a.miss_distance_km >= before:
+                continue
+            i = cat_idx[a.catalog_index]
+            results.append({
+                "sat_id": int(catalog.ids[i]),
+                "sat_name": catalog.names[i],
+                "tca": a.tca.isoformat(),
+                "miss_distance_km": a.miss_distance_km,
+                "rel_velocity_km_s": a.rel_velocity_km_s,
+                "nominal_miss_km": before
+            })
+        return results
+
+    def assess_burn_robustness(self,
+                               sat_id_primary: int,
+                               sat_id_secondary: int,
+                               tca: datetime,
+                               dv_vector_m_s: List[float],
+                               burn_time: Optional[datetime] = None,
+                               target_miss_km: float = 1.0,
+                               magnitude_sigma_pct: float = 2.0,
+                               pointing_sigma_deg: float = 1.0,
+                               n_samples: int = 5000,
+                               confidence: float = 0.99,
+                               seed: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Önerilen bir manevranın icra hatalarına karşı dayanıklılığını Monte Carlo ile değerlendirir.
+        Örn: "%99 güvenle miss distance en az kaç km?" sorusunun cevabı.
+        """
+        sat1 = tle_service.get_satrec_by_id(sat_id_primary)
+        sat2 = tle_service.get_satrec_by_id(sat_id_secondary)
+
+        if not sat1 or not sat2:
+            raise ValueError("Uydular bulunamadı")
+
+        if burn_time is None:
+            burn_time = tca - timedelta(seconds=BURN_LEAD_TIME_S)  # calculate_avoidance_maneuver ile aynı
+
+        dv = np.array(dv_vector_m_s, dtype=float) / 1000.0
+        magnitude_errors, pointing_errors = sample_burn_errors(
+            n_samples, magnitude_sigma_pct / 100.0, np.radians(pointing_sigma_deg), seed=seed)
+
+        # Tek doğrusallaştırma; nominal (hatasız) deltaV ilk satır, ardından hata örnekleri tek çağrıda
+        lin = linearize_burn(sat2, sat1, burn_time, tca, propagate_satrec_single)
+        dv_batch = np.concatenate([dv[None], apply_burn_errors(dv, magnitude_errors, pointing_errors)[0]])
+        all_miss, all_rel_vel = simulate_burns_batch(lin, dv_batch)
+        nominal_miss, miss, rel_vel = all_miss[0], all_miss[1:], all_rel_vel[1:]
+
+        return {
+            "burn_time": burn_time.isoformat(),
+            "tca_original": tca.isoformat(),
+            "n_samples": int(n_samples),
+            "nominal_miss_km": float(nominal_miss),
+            "confidence": confidence,
+            "miss_at_confidence_km": float(np.quantile(miss, 1.0 - confidence)),
+            "probability_below_target": float(np.mean(miss < target_miss_km)),
+            "miss_percentiles_km": {str(q): float(np.percentile(miss, q)) for q in (1, 5, 50, 95, 99)},
+            "rel_velocity_mean_km_s": float(np.mean(rel_vel))
+        }
+
+    def count_trade_study_cases(self, sat_id_primary: int, n_targets: int, min_lead_minutes: float = 10.0,
+                                max_lead_orbits: float = 2.0, step_minutes: float = 5.0) -> int:
+        """ run_trade_study'nin hesaplayacağı senaryo sayısı (ateşleme zamanları dizisi oluşturulmadan). """
+        sat1 = tle_service.get_satrec_by_id(sat_id_primary)
+        if not sat1:
+            raise ValueError("Uydular bulunamadı")
+        max_lead_minutes = max_lead_orbits * 2.0 * np.pi / sat1.no_kozai
+        n_leads = max(0, int(np.ceil((max_lead_minutes + 1e-9 - min_lead_minutes) / step_minutes)))
+        return n_leads * n_targets
+
+    def run_trade_study(self,
+                        sat_id_primary: int,
+                        sat_id_secondary: int,
+                        tca: datetime,
+                        target_misses_km: Optional[List[float]] = None,
+                        min_lead_minutes: float = 10.0,
+                        max_lead_orbits: float = 2.0,
+                        step_minutes: float = 5.0,
+                        dv_bound_m_s: float = 2.0) -> Dict[str, Any]:
+        """
+        Sabit 1 saatlik ateşleme yerine, ateşleme zamanı ve hedef mesafe taraması yapar.
+        Lead time: min_lead_minutes'ten max_lead_orbits yörünge periyoduna kadar step_minutes adımlarla.
+        Tüm senaryoların sonuçları ve DeltaV / lead time / miss distance Pareto cephesi döner.
+        """
+        sat1 = tle_service.get_satrec_by_id(sat_id_primary)
+        sat2 = tle_service.get_satrec_by_id(sat_id_secondary)
+
+        if not sat1 or not sat2:
+            raise ValueError("Uydular bulunamadı")
+
+        if target_misses_km is None:
+            target_misses_km = [1.0, 2.0, 5.0]
+
+        # Yörünge periyodu (dakika): no_kozai rad/dakika cinsinden ortalama hareket
+        period_min = 2.0 * np.pi / sat1.no_kozai
+        max_lead_minutes = max_lead_orbits * period_min
+        if max_lead_minutes < min_lead_minutes:
+            raise ValueError("Lead time aralığı geçersiz")
+        lead_times_s = np.arange(min_lead_minutes, max_lead_minutes + 1e-9, step_minutes) * 60.0
+
+        cases = run_burn_trade_study(
+            satrec_target=sat2,
+            satrec_our=sat1,
+            tca_time=tca,
+            propagate_func=propagate_satrec_single,
+            lead_times_s=lead_times_s,
+            target_misses_km=target_misses_km,
+            dv_bound_km_s=dv_bound_m_s / 1000.0
+        )
+
+        results = [{
+            "lead_time_minutes": case.lead_time_s / 60.0,
+            "burn_time": case.burn_time.isoformat(),
+            "target_miss_km": case.target_miss_km,
+            "predicted_miss_km": case.predicted_miss_km,
+            "dv_vector_m_s": (case.dv_km_s * 1000).tolist(),
+            "dv_magnitude_m_s": case.dv_mag_m_s,
+            "success": case.success,
+            "pareto_optimal": case.pareto_optimal
+        } for case in cases]
+
+        return {
+            "tca_original": tca.isoformat(),
+            "orbit_period_minutes": period_min,
+            "cases": results,
+            "pareto_front": sorted([r for r in results if r["pareto_optimal"]],
+                                   key=lambda r: (r["target_miss_km"], r["lead_time_minutes"]))
+        }
+
+    def plan_batch(self,
+                   alert_ids: Optional[List[int]] = None,
+                   min_score: Optional[float] = None,
+                   target_miss_km: float = 1.0,
+                   rescreen: bool = True,
+                   rescreen_window_hours: float = 6.0,
+                   rescreen_threshold_km: float = 10.0,
+                   limit: int = 100) -> Iterator[Dict[str, Any]]:
+        """
+        Birden fazla COLLISION alarmı için manevra planlarını paralel hesaplar.
+        Alarmlar ya id listesiyle ya da 'skoru min_score ve üzeri olanlar' şeklinde seçilir.
+
+        Sonuçlar tamamlandıkça (generator olarak) döner. Her plan maneuver_plans tablosuna yazılır,
+        aynı alarm ve aynı parametrelerle gelen istekler veritabanından cevaplanır.
+        Önbellek anahtarı iki uydunun TLE özetlerini (ve yeniden taramada katalog sürümünü) içerir;
+        TLE'ler değiştiğinde plan yeniden hesaplanır.
+        """
+        params = {
+            "target_miss_km": target_miss_km,
+            "rescreen": rescreen,
+            "rescreen_window_hours": rescreen_window_hours,
+            "rescreen_threshold_km": rescreen_threshold_km
+        }
+        # Yeniden tarama sonucu tüm kataloğa bağlıdır
+        catalog_version = list(tle_service.get_catalog_version()) if rescreen else None
+
+        conn = get_conn()
+        cur = conn.cursor()
+        if alert_ids:
+            placeholders = ",".join("?" * len(alert_ids))
+            cur.execute(f"""
+                SELECT id, sat1_id, sat2_id, tca, score FROM conjunction_alerts
+                WHERE event_type = 'COLLISION' AND id IN ({placeholders})
+                ORDER BY score DESC LIMIT ?
+            """, (*alert_ids, limit))
+        else:
+            cur.execute("""
+                SELECT id, sat1_id, sat2_id, tca, score FROM conjunction_alerts
+                WHERE event_type = 'COLLISION' AND score >= ?
+                ORDER BY score DESC LIMIT ?
+            """, (min_score if min_score is not None else 0.0, limit))
+        alerts = [dict(row) for row in cur.fetchall()]
+
+        # Daha önce hesaplanmış planlar
+        stored, plan_keys = {}, {}
+        if alerts:
+            sat_ids = sorted({a["sat1_id"] for a in alerts} | {a["sat2_id"] for a in alerts})
+            cur.execute(f"SELECT id, line1, line2 FROM raw_tles WHERE id IN ({','.join('?' * len(sat_ids))})",
+                        sat_ids)
+            versions = {row["id"]: tle_version(row["line1"], row["line2"]) for row in cur.fetchall()}
+            for a in alerts:
+                key = dict(params, tles=[versions.get(a["sat1_id"]), versions.get(a["sat2_id"])],
+                           catalog=catalog_version)
+                plan_keys[a["id"]] = hashlib.sha1(json.dumps(key, sort_keys=True).encode()).hexdigest()
+
+            placeholders = ",".join("?" * len(alerts))
+            cur.execute(f"""
+                SELECT alert_id, params_key, result_json FROM maneuver_plans
+                WHERE alert_id IN ({placeholders})
+            """, [a["id"] for a in alerts])
+            # Alarm başına tek satır; TLE'si veya parametreleri değişmiş plan yeniden hesaplanır
+            stored = {row["alert_id"]: json.loads(row["result_json"]) for row in cur.fetchall()
+                      if row["params_key"] == plan_keys[row["alert_id"]]}
+        conn.close()
+
+        pending = []
+        for alert in alerts:
+            record_cache_access("maneuver_plans", alert["id"] in stored)
+            if alert["id"] in stored:
+                yield {"alert_id": alert["id"], "status": "ok", "cached": True, "result": stored[alert["id"]]}
+            else:
+                pending.append(alert)
+
+        if not pending:
+            return
+
+        pool = self._get_pool()
+        futures = {
+            track_pool_task("maneuver", pool.submit(_plan_alert_worker, a["sat1_id"], a["sat2_id"], a["tca"], params)): a
+            for a in pending
+        }
+        try:
+            for future in as_completed(futures):
+                alert = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    yield {"alert_id": alert["id"], "status": "error", "cached": False, "detail": str(e)}
+                    continue
+
+                # Kalıcılık: sadece ana süreç yazar (SQLite tek yazıcı). Alarm başına yalnızca son plan
+                # tutulur, eski TLE/parametre anahtarlı planlar aynı işlemde silinir
+                conn = get_conn()
+                with conn:
+                    conn.execute("DELETE FROM maneuver_plans WHERE alert_id = ? AND params_key != ?",
+                                 (alert["id"], plan_keys[alert["id"]]))
+                    conn.execute("""
+                        INSERT OR REPLACE INTO maneuver_plans
+                        (alert_id, sat1_id, sat2_id, tca, params_key, result_json, created_at)
+                        VALUES (?, ?, ?, ?, ?, ?, ?)
+                    """, (alert["id"], alert["sat1_id"], alert["sat2_id"], alert["tca"], plan_keys[alert["id"]],
+                          json.dumps(result), datetime.now(timezone.utc).isoformat()))
+                conn.close()
+                yield {"alert_id": alert["id"], "status": "ok", "cached": False, "result": result}
+        finally:
+            # İstemci bağlantıyı keserse henüz başlamamış işleri iptal et
+            for future in futures:
+                future.cancel()
+
 
 # Singleton instance
 maneuver_service = ManeuverService()
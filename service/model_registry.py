@@ -0,0 +1,189 @@
+import json
+import os
+import re
+import shutil
+import threading
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+"""
+SSA modelleri için sürümlü model kayıt defteri (registry).
+
+Dizin yapısı:
+    data/models/<sürüm>/model.joblib    (model, label_encoder, scaler, kmeans, iso_forest)
+    data/models/<sürüm>/metadata.json   (eğitim zamanı, metrikler, sınıflar, özellikler)
+    data/models/ACTIVE                  (etkin sürümün adı)
+
+Modeller sıkıştırılmadan kaydedilir ve mmap_mode='r' ile açılır; orman ağaçlarının büyük
+NumPy dizileri belleğe kopyalanmadan işletim sisteminin sayfa önbelleğinden okunur.
+Etkin sürüm değişimi yeni paket tamamen yüklendikten sonra tek bir referans atamasıyla yapılır;
+devam eden istekler ellerindeki eski paketi kullanmaya devam eder.
+"""
+
+MODEL_FILE = "model.joblib"
+METADATA_FILE = "metadata.json"
+ACTIVE_FILE = "ACTIVE"
+VERSION_PATTERN = re.compile(r"v\d{8}T\d{6}-[0-9a-f]{6}")  # _new_version_name biçimi
+
+
+@dataclass(frozen=True)
+class ModelBundle:
+    """ Bir sürüme ait, birlikte kullanılan modeller. Yüklendikten sonra değiştirilmez. """
+    version: str
+    model: Any  # RandomForestClassifier
+    label_encoder: Any
+    scaler: Any
+    kmeans: Any
+    iso_forest: Any
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+class ModelRegistry:
+
+    def __init__(self, root: Path = Path("data/models"), legacy_path: Path = Path("data/ssa_model.joblib")):
+        self.root = root
+        self.legacy_path = legacy_path  # registry öncesi tek dosyalık model
+        self._active: Optional[ModelBundle] = None
+        self._lock = threading.Lock()  # yükleme/değiştirme işlemlerini sıraya koyar, okuma kilitsizdir
+        self._warmup_thread: Optional[threading.Thread] = None
+
+    def _write_atomic(self, path: Path, text: str):
+        tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+        tmp.write_text(text, encoding="utf-8")
+        os.replace(tmp, path)
+
+    def _new_version_name(self) -> str:
+        return f"v{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+    def _version_dir(self, version: str) -> Optional[Path]:
+        """ Sürüm dizini; ad registry'nin ürettiği biçimde değilse (ör. '..') None. """
+        if not VERSION_PATTERN.fullmatch(version):
+            return None
+        return self.root / version
+
+    def list_versions(self) -> List[Dict[str, Any]]:
+        """ Kayıtlı sürümler (yeniden eskiye) ve metadataları. """
+        if not self.root.exists():
+            return []
+        active = self.get_active_version_name()
+        versions = []
+        for d in self.root.iterdir():
+            meta_path = d / METADATA_FILE
+            if d.is_dir() and meta_path.exists() and (d / MODEL_FILE).exists():
+                meta = json.loads(meta_path.read_text(encoding="utf-8"))
+                meta["active"] = d.name == active
+                versions.append(meta)
+        versions.sort(key=lambda m: m.get("created_at", ""), reverse=True)
+        return versions
+
+    def get_active_version_name(self) -> Optional[str]:
+        active_path = self.root / ACTIVE_FILE
+        if active_path.exists():
+            name = active_path.read_text(encoding="utf-8").strip()
+            path = self._version_dir(name)
+            if path is not None and (path / MODEL_FILE).exists():
+                return name
+        return None
+
+    def get_metadata(self, version: str) -> Optional[Dict[str, Any]]:
+        path = self._version_dir(version)
+        if path is None or not (path / METADATA_FILE).exists():
+            return None
+        return json.loads((path / METADATA_FILE).read_text(encoding="utf-8"))
+
+    def publish(self, models: tuple, metadata: Dict[str, Any], activate: bool = True) -> str:
+        """
+        Yeni bir sürüm kaydeder. Dosyalar önce geçici dizine yazılır ve tek adımda
+        yerine taşınır, yarım kalmış bir sürüm hiçbir zaman görünmez.
+        :param models: (model, label_encoder, scaler, kmeans, iso_forest)
+        """
+        import joblib
+
+        version = self._new_version_name()
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_dir = self.root / f".{version}.tmp"
+        tmp_dir.mkdir()
+        try:
+            joblib.dump(models, tmp_dir / MODEL_FILE)  # mmap için sıkıştırma yok
+            meta = dict(metadata, version=version, created_at=datetime.now(timezone.utc).isoformat())
+            (tmp_dir / METADATA_FILE).write_text(json.dumps(meta), encoding="utf-8")
+            os.replace(tmp_dir, self.root / version)
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+        if activate:
+            self.activate(version)
+        return version
+
+    def _load(self, version: str) -> ModelBundle:
+        import joblib  # sklearn modellerinin çözülmesi sklearn'i de yükler; ilk model kullanımında
+        models = joblib.load(self.root / version / MODEL_FILE, mmap_mode="r")
+        model, label_encoder, scaler, kmeans, iso_forest = models
+        return ModelBundle(version, model, label_encoder, scaler, kmeans, iso_forest,
+                           self.get_metadata(version) or {})
+
+    def _import_legacy(self) -> Optional[str]:
+        """ Registry öncesinde eğitilmiş data/ssa_model.joblib dosyasını ilk sürüm olarak alır. """
+        if not self.legacy_path.exists():
+            return None
+        import joblib
+        models = joblib.load(self.legacy_path)
+        print(">>> Eski model dosyası registry'ye aktarılıyor.")
+        return self.publish(models, {"source": str(self.legacy_path)}, activate=False)
+
+    def activate(self, version: str) -> ModelBundle:
+        """
+        Sürümü yükler ve etkin yapar. Yükleme sırasında mevcut etkin paket kullanılmaya devam eder.
+        Yalnızca registry'nin ürettiği biçimdeki sürüm adları kabul edilir (dizin dışına çıkan yol yüklenmez).
+        """
+        path = self._version_dir(version)
+        if path is None or not (path / MODEL_FILE).exists():
+            raise ValueError(f"Model sürümü bulunamadı: {version}")
+        with self._lock:
+            bundle = self._load(version)
+            self._write_atomic(self.root / ACTIVE_FILE, version)
+            self._active = bundle  # tek referans ataması, okuyucular kilit beklemez
+        print(f">>> Etkin SSA model sürümü: {version}")
+        return bundle
+
+    def get_active(self) -> Optional[ModelBundle]:
+        """ Etkin model paketi; henüz yüklenmediyse yüklenir. Model yoksa None. """
+        bundle = self._active
+        if bundle is not None:
+            return bundle
+        with self._lock:
+            if self._active is None:
+                version = self.get_active_version_name()
+                if version is None:
+                    version = self._import_legacy()
+                    if version is None:
+                        return None
+                    self._write_atomic(self.root / ACTIVE_FILE, version)
+                self._active = self._load(version)
+            return self._active
+
+    def warm_up(self, background: bool = True):
+        """
+        Etkin modeli önceden yükler, ilk analiz isteği yükleme süresini beklemez.
+        """
+        if not background:
+            self.get_active()
+            return
+        if self._warmup_thread is None or not self._warmup_thread.is_alive():
+            self._warmup_thread = threading.Thread(target=self._warm_up_safe, name="ssa-model-warmup", daemon=True)
+            self._warmup_thread.start()
+
+    def _warm_up_safe(self):
+        try:
+            bundle = self.get_active()
+            if bundle is not None:
+                print(f">>> SSA modeli önceden yüklendi: {bundle.version}")
+        except Exception as e:
+            print(f">>> Model ön yükleme hatası: {e}")
+
+
+model_registry = ModelRegistry()
@@ -0,0 +1,182 @@
+import hashlib
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Any, Iterable, Optional, Tuple, TYPE_CHECKING
+from backend.models.db import get_conn
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+"""
+UCS (Union of Concerned Scientists) uydu veri setinin referans katmanı.
+CSV dosyası yalnızca değiştiğinde ayrıştırılır ve NORAD numarasına göre indeksli
+'ucs_satellites' tablosuna yazılır. Değişiklik kontrolü önce dosya mtime/boyut ile (ucuz),
+bunlar farklıysa SHA-1 özeti ile yapılır; sadece dokunulmuş ama içeriği aynı dosya yeniden yüklenmez.
+"""
+
+SOURCE_NAME = "ucs"
+
+# CSV sütunları -> tablo sütunları
+TEXT_COLUMNS = {
+    'Name of Satellite, Alternate Names': 'name',
+    'Country of Operator/Owner': 'country',
+    'Operator/Owner': 'operator',
+    'Purpose': 'purpose',
+}
+NUMERIC_COLUMNS = {
+    'NORAD Number': 'norad_id',
+    'Launch Mass (kg.)': 'launch_mass_kg',
+    'Inclination (degrees)': 'inclination_deg',
+    'Eccentricity': 'eccentricity',
+    'Period (minutes)': 'period_min',
+    'Perigee (km)': 'perigee_km',
+    'Apogee (km)': 'apogee_km',
+}
+TABLE_COLUMNS = ['norad_id', 'name', 'country', 'operator', 'purpose', 'launch_mass_kg',
+                 'inclination_deg', 'eccentricity', 'period_min', 'perigee_km', 'apogee_km']
+
+
+class ReferenceService:
+    """ UCS referans verisine NORAD numarası ile hızlı erişim. """
+
+    def __init__(self, csv_path: Path = Path("data/ucs_database.csv")):
+        self.csv_path = csv_path
+        self._lock = threading.Lock()
+        self._verified_signature: Optional[Tuple[str, int, int]] = None  # (yol, mtime_ns, boyut)
+        self._lookup: Optional[Dict[int, Dict[str, Any]]] = None
+
+    def _file_sha1(self) -> str:
+        h = hashlib.sha1()
+        with open(self.csv_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        return h.hexdigest()
+
+    def _read_csv(self) -> "pd.DataFrame":
+        """ Ham CSV'yi tablo sütunlarına dönüştürür (sayısal alanlardaki virgül ve tırnaklar temizlenir). """
+        import pandas as pd  # yalnızca CSV değiştiğinde gerekir
+
+        df = pd.read_csv(self.csv_path, sep=';', on_bad_lines='skip', low_memory=False, encoding='latin-1')
+        df.columns = [c.strip() for c in df.columns]
+
+        out = pd.DataFrame(index=df.index)
+        for src, dst in TEXT_COLUMNS.items():
+            out[dst] = df[src].astype(str).str.strip() if src in df else None
+            if src in df:
+                out.loc[df[src].isna(), dst] = None
+        for src, dst in NUMERIC_COLUMNS.items():
+            if src in df:
+                cleaned = df[src].astype(str).str.replace(',', '').str.replace('"', '')
+                out[dst] = pd.to_numeric(cleaned, errors='coerce')
+            else:
+                out[dst] = float('nan')
+        return out[TABLE_COLUMNS]
+
+    def _ingest(self, conn, stat, sha1: str) -> int:
+        df = self._read_csv()
+        # NaN -> NULL, NORAD numarası tamsayı
+        records = df.astype(object).where(df.notna(), None).to_dict('records')
+        rows = [tuple(int(r[c]) if c == 'norad_id' and r[c] is not None else r[c] for c in TABLE_COLUMNS)
+                for r in records]
+
+        placeholders = ",".join("?" * len(TABLE_COLUMNS))
+        with conn:
+            conn.execute("DELETE FROM ucs_satellites")
+            conn.executemany(f"INSERT INTO ucs_satellites ({','.join(TABLE_COLUMNS)}) VALUES ({placeholders})", rows)
+            conn.execute("""
+                INSERT OR REPLACE INTO reference_sources (name, path, mtime_ns, size, sha1, row_count, loaded_at)
+                VALUES (?,?,?,?,?,?,?)
+            """, (SOURCE_NAME, str(self.csv_path), stat.st_mtime_ns, stat.st_size, sha1, len(rows),
+                  datetime.now(timezone.utc).isoformat()))
+        print(f">>> UCS referans verisi yüklendi: {len(rows)} kayıt")
+        return len(rows)
+
+    def ensure_loaded(self) -> bool:
+        """
+        Referans tablosunu CSV ile senkron tutar.
+        :return: Referans verisi kullanılabilir ise True
+        """
+        with self._lock:
+            conn = get_conn()
+            try:
+                if not self.csv_path.exists():
+                    # Dosya yoksa daha önce yüklenmiş veri kullanılmaya devam edilir
+                    row = conn.execute("SELECT row_count FROM reference_sources WHERE name=?", (SOURCE_NAME,)).fetchone()
+                    return row is not None
+
+                stat = self.csv_path.stat()
+                signature = (str(self.csv_path), stat.st_mtime_ns, stat.st_size)
+                if signature == self._verified_signature:
+                    return True
+                # Dosya değişti: tabloyu başka bir süreç yeniden yüklemiş olabilir, bellekteki sözlük de yenilenir
+                self._lookup = None
+
+                meta = conn.execute("SELECT path, mtime_ns, size, sha1 FROM reference_sources WHERE name=?",
+                                    (SOURCE_NAME,)).fetchone()
+                if meta is not None and (meta['path'], meta['mtime_ns'], meta['size']) == signature:
+                    self._verified_signature = signature
+                    return True
+
+                sha1 = self._file_sha1()
+                if meta is not None and meta['sha1'] == sha1:
+                    # İçerik aynı, sadece dosya bilgilerini güncelle
+                    with conn:
+                        conn.execute("UPDATE reference_sources SET path=?, mtime_ns=?, size=? WHERE name=?",
+                                     (str(self.csv_path), stat.st_mtime_ns, stat.st_size, SOURCE_NAME))
+                else:
+                    self._ingest(conn, stat, sha1)
+
+                self._verified_signature = signature
+                return True
+            finally:
+                conn.close()
+
+    def _get_lookup(self) -> Dict[int, Dict[str, Any]]:
+        """ NORAD -> kayıt sözlüğü, bellekte tutulur. Aynı NORAD birden fazla ise son satır geçerlidir. """
+        if not self.ensure_loaded():
+            return {}
+        with self._lock:
+            if self._lookup is None:
+                conn = get_conn()
+                try:
+                    cur = conn.execute("""
+                        SELECT norad_id, name, country, operator, purpose, launch_mass_kg
+                        FROM ucs_satellites WHERE norad_id IS NOT NULL ORDER BY id
+                    """)
+                    self._lookup = {row['norad_id']: dict(row) for row in cur.fetchall()}
+                finally:
+                    conn.close()
+            return self._lookup
+
+    def lookup(self, norad_id: int) -> Optional[Dict[str, Any]]:
+        """ Tek bir uydu için ülke, operatör, amaç ve kütle bilgisi. """
+        return self._get_lookup().get(int(norad_id))
+
+    def lookup_many(self, norad_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+        lookup = self._get_lookup()
+        return {int(n): lookup[int(n)] for n in norad_ids if int(n) in lookup}
+
+    def get_country_map(self) -> Dict[int, str]:
+        return {n: r['country'] for n, r in self._get_lookup().items() if r['country'] is not None}
+
+    def get_training_frame(self) -> Optional["pd.DataFrame"]:
+        """
+        Model eğitimi için UCS kayıtları (train_model'in beklediği sütun adları ile).
+        """
+        if not self.ensure_loaded():
+            return None
+        import pandas as pd
+
+        conn = get_conn()
+        try:
+            return pd.read_sql_query("""
+                SELECT purpose AS Purpose, inclination_deg AS Inclination, eccentricity AS Eccentricity,
+                       period_min AS Period_minutes, perigee_km AS Perigee, apogee_km AS Apogee
+                FROM ucs_satellites ORDER BY id
+            """, conn)
+        finally:
+            conn.close()
+
+
+reference_service = ReferenceService()
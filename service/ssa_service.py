@@ -1,15 +1,21 @@
-import pandas as pd
 import numpy as np
 import json
-import joblib
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from datetime import datetime, timezone
-from sklearn.ensemble import RandomForestClassifier, IsolationForest
-from sklearn.cluster import KMeans
-from sklearn.preprocessing import LabelEncoder, StandardScaler
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import accuracy_score, f1_score, roc_auc_score, confusion_matrix, classification_report
+from datetime import datetime, timezone, timedelta
+from typing import Optional
 from backend.models.db import get_conn
+from backend.metrics import record_cache_access
+from processing.tle_arrays import parse_tle_arrays, tle_version
+from processing.lifetime import estimate_lifetime
+from processing.maneuver_detection import consecutive_pairs, evaluate_pairs, component_labels
+from service.reference_service import reference_service
+from service.tle_service import tle_service
+from service.model_registry import model_registry
+from service.ssa_training import training_manager, TrainingJob
+
+HEATMAP_CACHE_SIZE = 8  # farklı bin/irtifa ayarıyla saklanan en fazla histogram (LRU)
 
 
 class SSAService:
@@ -19,14 +25,15 @@ class SSAService:
     """
 
     def __init__(self):
-        self.model_path = Path("data/ssa_model.joblib")
-        self.data_path = Path("data/ucs_database.csv")
-        self.metrics_path = Path("data/ssa_metrics.json")
-        self.model = None
-        self.kmeans = None
-        self.iso_forest = None
-        self.label_encoder = LabelEncoder()  # Kategorik verileri sayısal verilere dönüştürür
-        self.scaler = StandardScaler()  # Verileri standart normal dağılıma (0 ortalama, 1 sapma) çeker
+        self.metrics_path = Path("data/ssa_metrics.json")  # registry öncesi eğitimlerin metrikleri
+        # Sürümlü modeller; etkin sürüm her tahminle birlikte saklanır (model_version)
+        self.registry = model_registry
+        self.auto_analyze_on_ingest = False  # True ise yeni TLE'ler kaydedilince artımlı analiz çalışır
+        self.last_analysis = None  # son analizin özeti (atlanan / kopyalanan / skorlanan)
+        self._heatmap_cache = OrderedDict()  # (katalog sürümü, bin ayarları) -> histogram, LRU sırasında
+        self._heatmap_lock = threading.Lock()
+        # Modelin girdi özellikleri (eğitim ve tahminde aynı sıra)
+        self.features = ['Inclination', 'Eccentricity', 'Period_minutes', 'Perigee', 'Apogee']
 
         """
         Problem: Uzayda binlerce aktif/pasif nesne bulunmaktadır. Bu nesnelerin ham yörünge 
@@ -43,239 +50,447 @@ class SSAService:
             4: "VLEO - Çok Alçak Yörünge"
         }
 
-    def parse_bstar(self, line1):
-        """
-        TLE Line 1 içindeki B* (BSTAR) sürüklenme katsayısını ayrıştırır.
-        Bu değer uydunun atmosferik dirençten ne kadar etkilendiğini gösterir.
-        """
-        try:
-            # Boşlukları temizle ve formatı düzelt (Örn: " 12345-3" -> "0.12345e-3")
-            bstar_str = line1[53:61].strip()
-            if not bstar_str: return 0.0
-
-            # Eğer sonda işaret varsa (-3, +2 gibi) onu ayır
-            sign_pos = -2
-            mantissa = bstar_str[:sign_pos].strip()
-            exponent = bstar_str[sign_pos:].strip()
-
-            val = f"0.{mantissa}e{exponent}"
-            return float(val)
-        except:
-            return 0.0
-
-    def train_model(self):
+    def _prepare_training_data(self):
         """
         Kaynak: Union of Concerned Scientists (UCS) Uydu Veri Seti.
         Bu veri seti Dünya yörüngesindeki yaklaşık 7.500 aktif uyduya ait teknik (kütle, güç, fırlatma tarihi),
         yörünge (apoj, perij, eğim, yörünge türü) ve operasyonel (ülke, operatör, kullanım amacı) bilgileri içeren,
         uzay varlıklarının dağılımı ve kullanım alanlarının analizine uygun kapsamlı bir veri setidir.
         https://www.kaggle.com/datasets/mexwell/ucs-satellite-database/data
+
+        :return: (X, y, label_encoder)
+        """
+        # Ön İşleme
+        # Ham verideki sayısal hataları, noktalama yanlışlarını ve eksik değerleri referans katmanı
+        # CSV'yi yüklerken temizler; burada hazır tablo okunur.
+        df = reference_service.get_training_frame()
+        if df is None or df.empty:
+            raise ValueError("Veri seti bulunamadı.")
+
+        # Özellik Seçimi, en açıklayıcı 5 fiziksel parametre
+        # Uydu amacını belirlemede en etkili fiziksel parametreler seçilmiştir:
+        # Eğim (Inclination), Basıklık (Eccentricity), Periyot ve İrtifa değerleri.
+        features = self.features
+
+        # Eksik verileri (NaN) temizle ve hedef değişkeni etiketle
+        df = df[['Purpose'] + features].dropna()
+
+        # Eğitim kararlılığı için sadece 1 örneği olan nadir sınıfları çıkarıyoruz
+        df = df[df.groupby('Purpose')['Purpose'].transform('count') > 1]
+        if df.empty:
+            raise ValueError("Eğitim için yeterli veri yok.")
+
+        from sklearn.preprocessing import LabelEncoder
+
+        # Eğitim yeni nesnelerle yapılır, etkin modeli kullanan istekler etkilenmez
+        label_encoder = LabelEncoder()  # Kategorik verileri sayısal verilere dönüştürür
+        X = df[features].to_numpy(dtype=float)  # Girdi özellikleri
+        y = label_encoder.fit_transform(df['Purpose'].astype(str))  # Hedef değişken
+        return X, y, label_encoder
+
+    def start_training_job(self, n_folds: int = 5, search_space=None) -> TrainingJob:
         """
-        if not self.data_path.exists():
-            return "Hata: Veri seti bulunamadı."
+        Eğitimi arka planda başlatır, API isteğini bekletmez.
+
+        Random Forest algoritması kullanılmıştır.
+        Bu problemde uyduların kullanım amaçları (Kategorik hedef) ile yörünge parametreleri (Sayısal girdiler) arasındaki
+        ilişki doğrusal olmayabilir. Örneğin casus uydular ile meteoroloji uyduları benzer irtifalarda (LEO) olabilir
+        ancak eğimleri (Inclination) farklıdır. Random Forest, bu karmaşık karar ağaçlarını başarıyla modeller.
+        Ormanın, K-Means kümelemenin ve Isolation Forest anomali tespitinin ayarları çapraz doğrulama ile
+        süreç havuzunda aranır (bkz. service/ssa_training.py); en iyi modeller yeni sürüm olarak yayınlanıp etkinleştirilir.
+        """
+        # UCS verisinin okunması ve ön işleme de arka plan iş parçacığında yapılır
+        return training_manager.start(self._prepare_training_data, list(self.features), self.registry.root,
+                                      search_space=search_space, n_folds=n_folds,
+                                      on_complete=self.registry.activate)
 
+    def train_model(self):
+        """
+        Eğitimi başlatır ve bitmesini bekler (betikler ve notebooklar için).
+        API arka plan işini kullanır: start_training_job.
+        """
         try:
-            # Ön İşleme
-            # Ham verideki sayısal hataları, noktalama yanlışlarını ve eksik değerleri temizliyoruz.
-            df = pd.read_csv(self.data_path, sep=';', on_bad_lines='skip', low_memory=False, encoding='latin-1')
-            df.columns = [c.strip() for c in df.columns]
-
-            # Sütun isimlerini daha yönetilebilir hale getirme (Mapping)
-            mapping = {
-                'Purpose': 'Purpose',
-                'Inclination (degrees)': 'Inclination',
-                'Eccentricity': 'Eccentricity',
-                'Period (minutes)': 'Period_minutes',
-                'Perigee (km)': 'Perigee',
-                'Apogee (km)': 'Apogee'
-            }
-            df = df.rename(columns=mapping)
-
-            # Özellik Seçimi, en açıklayıcı 5 fiziksel parametre
-            # Uydu amacını belirlemede en etkili fiziksel parametreler seçilmiştir:
-            # Eğim (Inclination), Basıklık (Eccentricity), Periyot ve İrtifa değerleri.
-            features = ['Inclination', 'Eccentricity', 'Period_minutes', 'Perigee', 'Apogee']
-
-
-            for col in features:
-                # Veri setindeki virgülleri noktaya çevirip sayısal tipe dönüştürme
-                df[col] = df[col].astype(str).str.replace(',', '').str.replace('"', '')
-                df[col] = pd.to_numeric(df[col], errors='coerce')
-
-            # Eksik verileri (NaN) temizle ve hedef değişkeni etiketle
-            df = df[['Purpose'] + features].dropna()
-
-            # Eğitim kararlılığı için sadece 1 örneği olan nadir sınıfları çıkarıyoruz
-            df = df[df.groupby('Purpose')['Purpose'].transform('count') > 1]
-
-            X = df[features]  # Girdi özellikleri
-            y = self.label_encoder.fit_transform(df['Purpose'].astype(str))  # Hedef değişken
-
-            # Random Forest algoritması kullanılmıştır - %80 Eğitim, %20 Test
-            # Bu problemde uyduların kullanım amaçları (Kategorik hedef) ile yörünge parametreleri (Sayısal girdiler) arasındaki
-            # ilişki doğrusal olmayabilir. Örneğin casus uydular ile meteoroloji uyduları benzer irtifalarda (LEO) olabilir
-            # ancak eğimleri (Inclination) farklıdır. Random Forest, bu karmaşık karar ağaçlarını başarıyla modeller.
-            X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
-            self.model = RandomForestClassifier(n_estimators=200, class_weight='balanced', random_state=42)
-            self.model.fit(X_train, y_train)
-
-            # Performans Metrikleri
-            y_pred = self.model.predict(X_test)
-            y_prob = self.model.predict_proba(X_test)
-
-            try:
-                # Çok sınıflı ROC-AUC skoru
-                roc_auc = roc_auc_score(y_test, y_prob, multi_class='ovr', average='weighted')
-            except:
-                roc_auc = 0.0
-
-            metrics = {
-                "accuracy": accuracy_score(y_test, y_pred),  # Genel doğruluk oranı
-                "f1_score": f1_score(y_test, y_pred, average='weighted'),  # Dengesiz sınıflar için hassasiyet metriği
-                "roc_auc": roc_auc,
-                "confusion_matrix": confusion_matrix(y_test, y_pred).tolist(),
-                "classes": self.label_encoder.classes_.tolist(),
-                "feature_importance": dict(zip(features, self.model.feature_importances_.tolist())),  # Hangi özellik daha önemli?
-                "classification_report": classification_report(y_test, y_pred, output_dict=True),  # Detaylı rapor
-                "sample_size": len(df),
-                "timestamp": datetime.now().isoformat()
-            }
-
-            # Metrikleri JSON dosyasına kaydet
-            with open(self.metrics_path, "w") as f:
-                json.dump(metrics, f)
-
-            # Kümeleme (K-Means) ve Anomali Tespiti (Isolation Forest)
-            # Veriyi ölçeklendirip uyduları gruplandırıyoruz ve normal dışı olanları yakalıyoruz.
-            kmeans = KMeans(n_clusters=5, random_state=42).fit(self.scaler.fit_transform(X))
-            iso_forest = IsolationForest(contamination=0.03, random_state=42).fit(self.scaler.transform(X))
-
-            # Modelleri disk üzerine kaydediyoruz
-            joblib.dump((self.model, self.label_encoder, self.scaler, kmeans, iso_forest), self.model_path)
-            return f"Model Başarıyla Eğitildi. Doğruluk: %{metrics['accuracy'] * 100:.1f}"
-
+            job = self.start_training_job()
+            for _ in training_manager.iter_events(job.job_id):
+                pass
+            if job.status != "completed":
+                return f"Eğitim Hatası: {job.error}"
+            metrics = self.registry.get_metadata(job.version)["metrics"]
+            return f"Model Başarıyla Eğitildi ({job.version}). Doğruluk: %{metrics['accuracy'] * 100:.1f}"
         except Exception as e:
             return f"Eğitim Hatası: {str(e)}"
 
-    def analyze_all_satellites(self):
+    def analyze_all_satellites(self, force: bool = False):
         """
         Eğitilmiş modelleri kullanarak canlı TLE verilerini analiz etme.
+        Artımlı çalışır: her tahmin, üretildiği TLE sürümü (tle_version) ve model sürümü
+        (model_version) ile saklanır. Yalnızca yeni, elemanları değişmiş veya eski modelle
+        skorlanmış satırlar yeniden hesaplanır. force=True tüm kataloğu yeniden skorlar.
+        :return: Güncellenen satır sayısı
         """
-        if self.model is None or self.kmeans is None or self.iso_forest is None:
-            if self.model_path.exists():
-                try:
-                    loaded_data = joblib.load(self.model_path)
-                    self.model, self.label_encoder, self.scaler, self.kmeans, self.iso_forest = loaded_data
-                    print(">>> Modeller diskten başarıyla yüklendi.")
-                except Exception as e:
-                    print(f">>> Modeller yüklenirken hata: {e}")
-                    return 0
-            else:
-                print(">>> HATA: Model dosyası bulunamadı! Lütfen önce /ssa/train yapın.")
-                return 0
-
-        if self.model is None:
+        # Etkin model paketi bir kez alınır; analiz sırasında sürüm değişse bile tutarlı kalır
+        try:
+            bundle = self.registry.get_active()
+        except Exception as e:
+            print(f">>> Modeller yüklenirken hata: {e}")
+            return 0
+        if bundle is None:
+            print(">>> HATA: Model dosyası bulunamadı! Lütfen önce /ssa/train yapın.")
             return 0
-
-        # Ülke lookup tablosu oluştur
-        ucs_df = pd.read_csv(self.data_path, sep=';', on_bad_lines='skip', low_memory=False, encoding='latin-1')
-        ucs_df.columns = [c.strip() for c in ucs_df.columns]
-
-        # NORAD sütununu sayısal yap ve boşlukları sil
-        ucs_df['NORAD Number'] = pd.to_numeric(ucs_df['NORAD Number'], errors='coerce')
-        country_lookup = ucs_df.dropna(subset=['NORAD Number']).set_index('NORAD Number')[
-            'Country of Operator/Owner'].to_dict()
 
         conn = get_conn()
         cur = conn.cursor()
-        cur.execute("SELECT id, sat_name, line1, line2 FROM raw_tles")
-        rows = cur.fetchall()
-
-        count = 0
-        for sid, name, line1, line2 in rows:
-            try:
-                if not line2 or len(line2) < 69:
-                    continue
-                if not line2.startswith("2 "):
-                    continue
-
-                # Fiziksel Parametreler
-                incl = float(line2[8:16])
-                ecc = float("0." + line2[26:33].strip())
-                mm = float(line2[52:63])  # Mean Motion uydunun bir günde dünya etrafında kaç tur attığıdır
-                alt = ((398600.44 / ((mm * 2 * np.pi / 86400) ** 2)) ** (1 / 3)) - 6378.137
-                bstar = self.parse_bstar(line1)
-
-                # AI Tahminleri
-                input_raw = np.array([[incl, ecc, 1440 / mm, alt, alt]])
-                scaled = self.scaler.transform(input_raw)
-
-                cat = self.label_encoder.inverse_transform(self.model.predict(input_raw))[0]
-                conf = np.max(self.model.predict_proba(input_raw))
-                cluster_id = int(self.kmeans.predict(scaled)[0])
-                is_anomaly = 1 if self.iso_forest.predict(scaled)[0] == -1 else 0
-
-                # YÖRÜNGE SÖNÜMLENME RİSKİ (Decay Risk)
-                # Alçak irtifa + Yüksek BSTAR = Kritik Risk
-                decay_risk = "DÜŞÜK"
-                if alt < 350 and bstar > 0.0005:  # Kritik irtifa sınırı
-                    decay_risk = "YÜKSEK"
-                elif alt < 400:
-                    decay_risk = "ORTA"
-
-                # ÜLKE BİLGİSİ (Lookup)
-                # TLE'deki NORAD ID'yi yakala (Line 2: 3-7 karakterler)
-                # TLE'den gelen ID'yi int'e çevir
-                norad_id = int(line2[2:7].strip())
-                country = country_lookup.get(norad_id, "Bilinmiyor")
-
-                cur.execute("""
-                    UPDATE satellite_intelligence 
-                    SET predicted_category=?, confidence=?, cluster_id=?, is_anomaly=?, 
-                        predicted_country=?, decay_risk=?, predicted_at=?
-                    WHERE sat_id=?
-                """, (cat, float(conf), cluster_id, is_anomaly, country, decay_risk,
-                      datetime.now(timezone.utc).isoformat(), sid))
-
-                if cur.rowcount == 0:
-                    cur.execute("""
-                        INSERT INTO satellite_intelligence 
-                        (sat_id, predicted_category, confidence, cluster_id, is_anomaly, predicted_country, decay_risk, predicted_at)
-                        VALUES (?,?,?,?,?,?,?,?)
-                    """, (sid, cat, float(conf), cluster_id, is_anomaly, country, decay_risk,
-                          datetime.now(timezone.utc).isoformat()))
-
-                count += 1
-            except Exception as e:
-                print(f"[SSA ERROR] {e}")
-                continue
+        # raw_tles satırları değişmez (ingest yalnızca yeni satır ekler). Bu nedenle skorlanmamış,
+        # sürüm bilgisi olmayan veya başka modelle skorlanmış satırlar SQL tarafında seçilir;
+        # güncel satırlar hiç okunmaz.
+        if force:
+            cur.execute("SELECT id, line1, line2 FROM raw_tles")
+        else:
+            cur.execute("""
+                SELECT r.id, r.line1, r.line2
+                FROM raw_tles r
+                LEFT JOIN satellite_intelligence si ON si.sat_id = r.id
+                WHERE si.sat_id IS NULL OR si.tle_version IS NULL OR si.model_version IS NOT ?
+            """, (bundle.version,))
+        pending = [(r, tle_version(r['line1'], r['line2'])) for r in cur.fetchall()]
+        self.last_analysis = {"pending": len(pending), "reused": 0, "scored": 0, "invalid": 0}
+        if not pending:
+            conn.close()
+            return 0
+
+        # Aynı eleman setinin güncel modelle yapılmış tahminleri (tle_version indeksi üzerinden)
+        fresh_by_version = {}
+        if not force:
+            unique_versions = list({v for _, v in pending})
+            for i in range(0, len(unique_versions), 500):
+                chunk = unique_versions[i:i + 500]
+                cur.execute(f"""
+                    SELECT tle_version, predicted_category, confidence, cluster_id, is_anomaly,
+                           predicted_country, decay_risk, lifetime_days, reentry_epoch,
+                           reentry_window_start, reentry_window_end
+                    FROM satellite_intelligence
+                    WHERE model_version = ? AND tle_version IN ({",".join("?" * len(chunk))})
+                """, [bundle.version] + chunk)
+                fresh_by_version.update({row['tle_version']: row for row in cur.fetchall()})
+
+        now = datetime.now(timezone.utc).isoformat()
+        results = []
+
+        # Aynı eleman seti başka bir satırda güncel model ile zaten skorlanmışsa sonuç kopyalanır
+        # (ör. değişmemiş bir TLE'nin yeniden çekilmesi)
+        to_score = []
+        for r, v in pending:
+            src = fresh_by_version.get(v)
+            if src is not None:
+                results.append((r['id'], src['predicted_category'], src['confidence'], src['cluster_id'],
+                                src['is_anomaly'], src['predicted_country'], src['decay_risk'], now, v,
+                                src['lifetime_days'], src['reentry_epoch'], src['reentry_window_start'],
+                                src['reentry_window_end']))
+            else:
+                to_score.append((r, v))
+        self.last_analysis["reused"] = len(results)
+
+        if to_score:
+            # Ülke lookup tablosu (NORAD -> ülke), referans katmanında önbelleklenir
+            country_lookup = reference_service.get_country_map()
+
+            # Fiziksel Parametreler: tüm satırlar tek geçişte NumPy sütunlarına ayrıştırılır
+            sat_ids = np.array([r['id'] for r, _ in to_score])
+            score_versions = np.array([v for _, v in to_score])
+            tle = parse_tle_arrays([r['line1'] for r, _ in to_score], [r['line2'] for r, _ in to_score])
+            alt = tle.altitude_km
+            X = np.column_stack([tle.inclination_deg, tle.eccentricity, tle.period_min, alt, alt])
+            valid = tle.valid & np.all(np.isfinite(X), axis=1)
+
+            # Ayrıştırılamayan satırlar tahminsiz kaydedilir; sürüm bilgisi yazıldığından aynı model
+            # ile sonraki çalıştırmalarda yeniden seçilmezler (/ssa/results bu satırları göstermez)
+            results.extend((int(i), None, None, None, None, None, None, now, v, None, None, None, None)
+                           for i, v in zip(sat_ids[~valid], score_versions[~valid]))
+            self.last_analysis["invalid"] = int(np.sum(~valid))
+
+            if np.any(valid):
+                sat_ids, score_versions, X = sat_ids[valid], score_versions[valid], X[valid]
+                bstar, norad_ids = tle.bstar[valid], tle.norad_id[valid]
+
+                # AI Tahminleri: her model tam matris üzerinde tek çağrı
+                import pandas as pd  # model yüklüyse (joblib -> sklearn) pandas da zaten yüklüdür
+                X_df = pd.DataFrame(X, columns=self.features)
+                proba = bundle.model.predict_proba(X_df)
+                best = np.argmax(proba, axis=1)
+                cats = bundle.label_encoder.inverse_transform(bundle.model.classes_[best])
+                confs = proba[np.arange(len(best)), best]
+                scaled = bundle.scaler.transform(X_df)
+                cluster_ids = bundle.kmeans.predict(scaled)
+                anomalies = bundle.iso_forest.predict(scaled) == -1
+
+                # YÖRÜNGE SÖNÜMLENME RİSKİ (Decay Risk): tahmini kalan yörünge ömründen
+                valid_idx = np.nonzero(valid)[0]
+                lifetimes, decay_risks = self._lifetime_columns(
+                    tle.mean_motion_rev_day[valid_idx], tle.eccentricity[valid_idx], bstar,
+                    tle.ndot_half[valid_idx], tle.epoch_days[valid_idx])
+
+                # ÜLKE BİLGİSİ (Lookup), TLE'deki NORAD ID ile
+                countries = [country_lookup.get(int(n), "Bilinmiyor") for n in norad_ids]
+
+                scored = zip(sat_ids.tolist(), cats.tolist(), confs.tolist(), cluster_ids.tolist(),
+                             anomalies.astype(int).tolist(), countries, decay_risks, [now] * len(sat_ids),
+                             score_versions.tolist())
+                results.extend(base + life for base, life in zip(scored, lifetimes))
+                self.last_analysis["scored"] = int(len(sat_ids))
+
+        cur.executemany("""
+            INSERT INTO satellite_intelligence 
+            (sat_id, predicted_category, confidence, cluster_id, is_anomaly, predicted_country, decay_risk,
+             predicted_at, tle_version, lifetime_days, reentry_epoch, reentry_window_start, reentry_window_end,
+             lifetime_at, model_version)
+            VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)
+            ON CONFLICT(sat_id) DO UPDATE SET
+                predicted_category=excluded.predicted_category, confidence=excluded.confidence,
+                cluster_id=excluded.cluster_id, is_anomaly=excluded.is_anomaly,
+                predicted_country=excluded.predicted_country, decay_risk=excluded.decay_risk,
+                predicted_at=excluded.predicted_at, tle_version=excluded.tle_version,
+                lifetime_days=excluded.lifetime_days, reentry_epoch=excluded.reentry_epoch,
+                reentry_window_start=excluded.reentry_window_start,
+                reentry_window_end=excluded.reentry_window_end, lifetime_at=excluded.lifetime_at,
+                model_version=excluded.model_version
+        """, [res + (now, bundle.version) for res in results])
 
         conn.commit()
         conn.close()
-        return count
+        return len(results)
+
+    @staticmethod
+    def _decay_risk_labels(lifetime_days: np.ndarray) -> np.ndarray:
+        """ Kalan ömür (gün) -> risk etiketi. Tahmin yoksa (NaN) sönümlenme beklenmez. """
+        return np.select([lifetime_days < 90, lifetime_days < 730], ["YÜKSEK", "ORTA"], default="DÜŞÜK")
+
+    @classmethod
+    def _lifetime_columns(cls, mean_motion_rev_day, ecc, bstar, ndot_half, epoch_days):
+        """
+        Yörünge ömrü tahmininin (bkz. processing/lifetime.py) satellite_intelligence sütunları.
+        :return: satır başına (lifetime_days, reentry_epoch, reentry_window_start, reentry_window_end)
+                 ve decay_risk etiketleri
+        """
+        lifetime = estimate_lifetime(mean_motion_rev_day, ecc, bstar, ndot_half)
+
+        def to_iso(days):
+            # NaN (sönümlenmiyor / bilinmiyor) -> NULL
+            return [None if not np.isfinite(d) else
+                    (datetime(1970, 1, 1, tzinfo=timezone.utc) + timedelta(days=float(d))).isoformat()
+                    for d in days]
+
+        lifetimes = [None if not np.isfinite(d) else float(d) for d in lifetime.lifetime_days]
+        columns = list(zip(lifetimes, to_iso(epoch_days + lifetime.lifetime_days),
+                           to_iso(epoch_days + lifetime.early_days), to_iso(epoch_days + lifetime.late_days)))
+        return columns, cls._decay_risk_labels(lifetime.lifetime_days).tolist()
+
+    def update_lifetimes(self) -> int:
+        """
+        Her nesnenin en güncel eleman seti için yörünge ömrü ve atmosfere giriş penceresi.
+        Tüm katalog tek vektörel çağrıda hesaplanır; model gerektirmez, her TLE güncellemesinde çalışır.
+        Yalnızca satellite_intelligence'ta satırı olan (analiz edilmiş) eleman setleri güncellenir;
+        yeni setlerin ömrü analiz sırasında yazılır.
+        :return: Güncellenen satır sayısı
+        """
+        catalog = tle_service.get_catalog_elements()
+        el = catalog.elements
+        idx = np.nonzero(catalog.latest)[0]
+        if len(idx) == 0:
+            return 0
+
+        columns, risks = self._lifetime_columns(el.mean_motion_rev_day[idx], el.eccentricity[idx], el.bstar[idx],
+                                                el.ndot_half[idx], el.epoch_days[idx])
+        now = datetime.now(timezone.utc).isoformat()
+        rows = [life + (risk, now, sat_id) for life, risk, sat_id in zip(columns, risks, catalog.ids[idx].tolist())]
+
+        conn = get_conn()
+        try:
+            with conn:
+                before = conn.total_changes
+                conn.executemany("""
+                    UPDATE satellite_intelligence SET
+                        lifetime_days=?, reentry_epoch=?, reentry_window_start=?, reentry_window_end=?,
+                        decay_risk=?, lifetime_at=?
+                    WHERE sat_id=?
+                """, rows)
+                updated = conn.total_changes - before
+        finally:
+            conn.close()
+        return updated
+
+    def get_reentry_forecast(self, max_days: float = 365.0, limit: int = 100):
+        """ Ömrü max_days'ten kısa nesneler, en yakın giriş tarihinden başlayarak. """
+        conn = get_conn()
+        try:
+            cur = conn.execute("""
+                SELECT s.sat_name, s.line2, si.sat_id, si.lifetime_days, si.reentry_epoch,
+                       si.reentry_window_start, si.reentry_window_end, si.decay_risk
+                FROM satellite_intelligence si
+                JOIN raw_tles s ON si.sat_id = s.id
+                WHERE si.lifetime_days IS NOT NULL AND si.lifetime_days <= ?
+                ORDER BY si.reentry_epoch ASC LIMIT ?
+            """, (max_days, limit))
+            results = []
+            for row in cur.fetchall():
+                d = dict(row)
+                try:
+                    d["norad_id"] = int(d.pop("line2")[2:7])
+                except (TypeError, ValueError):
+                    continue  # NORAD numarası okunamayan bozuk satır
+                results.append(d)
+            return results
+        finally:
+            conn.close()
+
+    def detect_maneuvers(self, full: bool = False) -> int:
+        """
+        TLE geçmişinde manevra tespiti (bkz. processing/maneuver_detection.py).
+        Artımlı çalışır: yalnızca en son çalıştırmadan sonra eklenen eleman setleri (processing_state'teki
+        son id'den büyük satırlar) ve bu nesnelerin daha önce işlenmiş en son seti okunup ayrıştırılır.
+        Geç gelen, daha eski epoch'lu setler yalnızca bu son setle karşılaştırılır.
+        full=True tüm geçmişi baştan hesaplar.
+        :return: Yeni kaydedilen manevra olayı sayısı
+        """
+        conn = get_conn()
+        try:
+            row = conn.execute("SELECT last_id FROM processing_state WHERE name='maneuver_detection'").fetchone()
+            if full or row is None:
+                catalog = tle_service.get_catalog_elements()
+                watermark, ids, el = 0, catalog.ids, catalog.elements
+            else:
+                watermark = row["last_id"]
+                rows = conn.execute("""
+                    SELECT id, line1, line2 FROM raw_tles WHERE id > ?
+                    UNION ALL
+                    SELECT MAX(id), line1, line2 FROM raw_tles
+                    WHERE id <= ? AND substr(line2, 3, 5) IN (SELECT substr(line2, 3, 5) FROM raw_tles WHERE id > ?)
+                    GROUP BY substr(line2, 3, 5)
+                    ORDER BY id
+                """, (watermark, watermark, watermark)).fetchall()
+                ids = np.array([r["id"] for r in rows], dtype=int)
+                el = parse_tle_arrays([r["line1"] for r in rows], [r["line2"] for r in rows])
+            last_id = int(ids.max()) if len(ids) else watermark
+
+            valid_idx = np.nonzero(el.valid)[0]
+            epoch_days = el.epoch_days
+            prev, nxt = consecutive_pairs(el.norad_id[valid_idx], epoch_days[valid_idx])
+            prev, nxt = valid_idx[prev], valid_idx[nxt]
+
+            # Sadece yeni eleman seti içeren çiftler
+            involves_new = (ids[prev] > watermark) | (ids[nxt] > watermark)
+            pairs = evaluate_pairs(prev[involves_new], nxt[involves_new], epoch_days, el.mean_motion_rev_day,
+                                   el.ndot_half, el.inclination_deg, el.raan_deg, el.eccentricity)
+            hits = np.nonzero(pairs.flagged)[0]
+
+            to_iso = lambda d: (datetime(1970, 1, 1, tzinfo=timezone.utc) + timedelta(days=float(d))).isoformat()
+            now = datetime.now(timezone.utc).isoformat()
+            rows = [(int(el.norad_id[pairs.next_index[k]]), int(ids[pairs.next_index[k]]),
+                     int(ids[pairs.prev_index[k]]), to_iso(epoch_days[pairs.next_index[k]]),
+                     to_iso(epoch_days[pairs.prev_index[k]]), float(pairs.dt_days[k]), float(pairs.delta_a_km[k]),
+                     float(pairs.delta_incl_deg[k]), float(pairs.delta_raan_deg[k]), float(pairs.delta_ecc[k]),
+                     float(pairs.score[k]), component_labels(int(pairs.components[k])), now) for k in hits]
+
+            with conn:
+                if full:
+                    conn.execute("DELETE FROM maneuver_events")
+                before = conn.total_changes
+                conn.executemany("""
+                    INSERT OR IGNORE INTO maneuver_events
+                    (norad_id, sat_id, prev_sat_id, epoch, prev_epoch, dt_days, delta_a_km, delta_incl_deg,
+                     delta_raan_deg, delta_ecc, score, components, detected_at)
+                    VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?)
+                """, rows)
+                inserted = conn.total_changes - before
+                conn.execute("INSERT OR REPLACE INTO processing_state (name, last_id, updated_at) VALUES (?,?,?)",
+                             ("maneuver_detection", last_id, now))
+            return inserted
+        finally:
+            conn.close()
+
+    def get_maneuver_events(self, norad_id: Optional[int] = None, limit: int = 100):
+        conn = get_conn()
+        try:
+            if norad_id is not None:
+                cur = conn.execute("SELECT * FROM maneuver_events WHERE norad_id=? ORDER BY epoch DESC LIMIT ?",
+                                   (norad_id, limit))
+            else:
+                cur = conn.execute("SELECT * FROM maneuver_events ORDER BY epoch DESC LIMIT ?", (limit,))
+            return [dict(r) for r in cur.fetchall()]
+        finally:
+            conn.close()
+
+    def set_auto_analysis(self, enabled: bool):
+        """Yeni TLE'ler kaydedildikten sonra artımlı analizin otomatik çalışmasını açar/kapatır."""
+        self.auto_analyze_on_ingest = enabled
+
+    def _on_tles_ingested(self, count: int):
+        """TleService post-ingest kancası."""
+        if count > 0:
+            # Manevra tespiti ucuzdur ve artımlıdır, her güncellemede çalışır
+            detected = self.detect_maneuvers()
+            print(f">>> Manevra tespiti: {detected} yeni olay.")
+            updated = self.update_lifetimes()
+            print(f">>> Yörünge ömrü tahmini: {updated} nesne.")
+        if self.auto_analyze_on_ingest and count > 0:
+            updated = self.analyze_all_satellites()
+            print(f">>> Otomatik SSA analizi: {updated} satır güncellendi.")
 
     def get_metrics(self):
+        # Etkin sürümün metrikleri (model yüklenmeden metadata dosyasından okunur)
+        version = self.registry.get_active_version_name()
+        meta = self.registry.get_metadata(version) if version else None
+        if meta and meta.get("metrics"):
+            return dict(meta["metrics"], model_version=version)
         if self.metrics_path.exists():
             with open(self.metrics_path, "r") as f: return json.load(f)
         return None
 
-    def get_regime_heatmap_data(self):
-        conn = get_conn()
-        cur = conn.cursor()
-        cur.execute("SELECT line2 FROM raw_tles")
-        data = []
-        for row in cur.fetchall():
-            try:
-                line2 = row[0]
-                incl = float(line2[8:16])
-                mm = float(line2[52:63])
-                alt = ((398600.44 / ((mm * 2 * np.pi / 86400) ** 2)) ** (1 / 3)) - 6378.137
-                if 200 < alt < 40000:
-                    data.append({"x": round(incl, 1), "y": round(alt, -1)})
-            except:
-                continue
-        conn.close()
-        return data
+    def get_regime_heatmap_data(self, incl_bin_deg: float = 1.0, alt_bin_km: float = 50.0,
+                                min_alt_km: float = 200.0, max_alt_km: float = 40000.0):
+        """
+        Eğim x irtifa yoğunluk haritası (2D histogram), sunucu tarafında hesaplanır.
+        Her uydunun en son TLE kaydı kullanılır. Sadece boş olmayan hücreler döner, böylece
+        yanıt boyutu katalog büyüklüğünden değil dolu hücre sayısından etkilenir.
+        Sonuç bir sonraki TLE güncellemesine (katalog sürümü değişene) kadar önbellekte tutulur;
+        en son kullanılan HEATMAP_CACHE_SIZE ayar saklanır.
+        """
+        catalog = tle_service.get_catalog_elements()
+        key = (catalog.version, incl_bin_deg, alt_bin_km, min_alt_km, max_alt_km)
+        with self._heatmap_lock:
+            cached = self._heatmap_cache.get(key)
+            record_cache_access("regime_heatmap", cached is not None)
+            if cached is not None:
+                self._heatmap_cache.move_to_end(key)
+                return cached
+
+        el = catalog.elements
+        incl = el.inclination_deg[catalog.latest]
+        alt = el.altitude_km[catalog.latest]
+        mask = np.isfinite(incl) & np.isfinite(alt) & (alt > min_alt_km) & (alt < max_alt_km)
+        incl, alt = incl[mask], alt[mask]
+
+        # Hücre indeksleri ve dolu hücrelerin sayımı
+        cells = np.stack([np.floor(incl / incl_bin_deg), np.floor(alt / alt_bin_km)], axis=1).astype(np.int64)
+        uniq, counts = np.unique(cells, axis=0, return_counts=True) if len(cells) else (np.zeros((0, 2)), [])
+
+        result = {
+            "incl_bin_deg": incl_bin_deg,
+            "alt_bin_km": alt_bin_km,
+            "total": int(len(incl)),
+            # x, y: hücre merkezleri (derece, km)
+            "bins": [{"x": round((i + 0.5) * incl_bin_deg, 6), "y": round((a + 0.5) * alt_bin_km, 6), "count": int(c)}
+                     for (i, a), c in zip(uniq.tolist(), np.asarray(counts).tolist())]
+        }
+
+        with self._heatmap_lock:
+            # Eski katalog sürümüne ait sonuçlar ve en uzun süredir kullanılmayan ayarlar atılır
+            self._heatmap_cache = OrderedDict((k, v) for k, v in self._heatmap_cache.items()
+                                              if k[0] == catalog.version)
+            self._heatmap_cache[key] = result
+            while len(self._heatmap_cache) > HEATMAP_CACHE_SIZE:
+                self._heatmap_cache.popitem(last=False)
+        return result
 
 
 ssa_service = SSAService()
+tle_service.register_post_ingest_hook(ssa_service._on_tles_ingested)
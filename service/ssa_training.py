@@ -0,0 +1,350 @@
+import multiprocessing
+import os
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from itertools import combinations
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+import numpy as np
+from service.model_registry import ModelRegistry
+from backend.metrics import track_pool_task
+
+"""
+SSA modelleri için arka planda, paralel eğitim ve hiperparametre araması.
+
+Her (aday parametre seti, katman/fold) çifti süreç havuzunda ayrı bir görev olarak çalışır:
+    * Random Forest: katmanlı (stratified) çapraz doğrulama, ağırlıklı F1 ile seçilir.
+    * K-Means: dışarıda bırakılan katmandaki siluet (silhouette) skoru ile seçilir.
+      Küme sayısı REGIME_MAP etiket sayısını aşmaz.
+    * Isolation Forest: farklı katmanlarla eğitilen modellerin işaretlediği anomali kümelerinin
+      benzerliği (Jaccard) ile, yani kararlılığına göre seçilir.
+Seçilen ayarlarla son modeller tüm veri üzerinde eğitilir ve model registry'ye yeni sürüm olarak yayınlanır.
+Tüm ilerleme olay (event) listesi olarak tutulur; API bunları sorgulayabilir veya akış olarak dinleyebilir.
+"""
+
+DEFAULT_SEARCH_SPACE = {
+    "forest": {"n_estimators": [100, 200, 400], "max_depth": [None, 16], "min_samples_leaf": [1, 3]},
+    "kmeans": {"n_clusters": [3, 4, 5]},
+    "iso_forest": {"n_estimators": [100, 200], "max_samples": ["auto", 512]},
+}
+ISO_CONTAMINATION = 0.03  # alan bilgisine dayalı oran, aranmaz
+SILHOUETTE_SAMPLE = 2000
+
+
+# --- Süreç havuzunda çalışan görevler (spawn ile import edilebilmeleri için modül seviyesinde)
+
+# scikit-learn ve pandas yalnızca eğitim sırasında (işçi süreçlerde ve arama döngüsünde) yüklenir,
+# uygulamanın açılışında içe aktarılmaz.
+
+def _forest_fold_worker(X, y, n_classes, params, train_idx, test_idx) -> Dict[str, Any]:
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.metrics import accuracy_score, f1_score
+
+    model = RandomForestClassifier(class_weight='balanced', random_state=42, n_jobs=1, **params)
+    model.fit(X[train_idx], y[train_idx])
+
+    # Olasılıklar tüm sınıflar için hizalanır (katmanda olmayan sınıf sütunu 0 kalır)
+    prob = np.zeros((len(test_idx), n_classes))
+    prob[:, model.classes_] = model.predict_proba(X[test_idx])
+    pred = np.argmax(prob, axis=1)
+    return {
+        "accuracy": float(accuracy_score(y[test_idx], pred)),
+        "f1_score": float(f1_score(y[test_idx], pred, average='weighted')),
+        "pred": pred,
+        "prob": prob,
+    }
+
+
+def _kmeans_fold_worker(Xs, params, train_idx, test_idx) -> Dict[str, Any]:
+    from sklearn.cluster import KMeans
+    from sklearn.metrics import silhouette_score
+
+    kmeans = KMeans(random_state=42, n_init=10, **params).fit(Xs[train_idx])
+    labels = kmeans.predict(Xs[test_idx])
+    if len(np.unique(labels)) < 2:
+        return {"silhouette": -1.0}
+    sample = min(SILHOUETTE_SAMPLE, len(test_idx))
+    return {"silhouette": float(silhouette_score(Xs[test_idx], labels, sample_size=sample, random_state=42))}
+
+
+def _iso_forest_fold_worker(Xs, params, train_idx) -> Dict[str, Any]:
+    from sklearn.ensemble import IsolationForest
+
+    iso = IsolationForest(contamination=ISO_CONTAMINATION, random_state=42, **params).fit(Xs[train_idx])
+    return {"flags": iso.predict(Xs) == -1}
+
+
+def _fit_final_worker(X, y, label_encoder, features, forest_params, kmeans_params, iso_params,
+                      metrics: Dict[str, Any], search: Dict[str, Any], registry_root: str) -> str:
+    """ Seçilen ayarlarla tüm veri üzerinde son eğitim, registry'ye yayın. Sürüm adını döner. """
+    import pandas as pd
+    from sklearn.cluster import KMeans
+    from sklearn.ensemble import RandomForestClassifier, IsolationForest
+    from sklearn.preprocessing import StandardScaler
+
+    # Tahmin tarafı özellik adlarıyla (DataFrame) çağırdığı için son modeller de adlarla eğitilir
+    X = pd.DataFrame(X, columns=features)
+    model = RandomForestClassifier(class_weight='balanced', random_state=42, n_jobs=-1, **forest_params).fit(X, y)
+    scaler = StandardScaler()
+    Xs = scaler.fit_transform(X)
+    kmeans = KMeans(random_state=42, n_init=10, **kmeans_params).fit(Xs)
+    iso_forest = IsolationForest(contamination=ISO_CONTAMINATION, random_state=42, **iso_params).fit(Xs)
+
+    metrics = dict(metrics, feature_importance=dict(zip(features, model.feature_importances_.tolist())))
+    model.n_jobs = 1  # tahmin sırasında API sürecinde ek iş parçacığı açılmasın
+    return ModelRegistry(Path(registry_root)).publish(
+        (model, label_encoder, scaler, kmeans, iso_forest),
+        {"features": features, "metrics": metrics, "search": search}, activate=False)
+
+
+# --- İş (job) yönetimi
+
+@dataclass
+class TrainingJob:
+    job_id: str
+    status: str = "queued"  # queued, running, completed, failed
+    created_at: str = field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+    finished_at: Optional[str] = None
+    total_tasks: int = 0
+    done_tasks: int = 0
+    version: Optional[str] = None
+    error: Optional[str] = None
+    events: List[Dict[str, Any]] = field(default_factory=list)
+    _cond: threading.Condition = field(default_factory=threading.Condition, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("completed", "failed")
+
+    def emit(self, event: Dict[str, Any]):
+        with self._cond:
+            self.events.append(event)
+            self._cond.notify_all()
+
+    def finish(self, status: str, event: Dict[str, Any]):
+        """
+        Son olay ve bitiş durumu aynı kilit altında yazılır: iter_events işi bitmiş gördüğünde
+        completed/failed olayı da listededir.
+        """
+        with self._cond:
+            self.events.append(event)
+            self.status = status
+            self.finished_at = datetime.now(timezone.utc).isoformat()
+            self._cond.notify_all()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id, "status": self.status, "created_at": self.created_at,
+            "finished_at": self.finished_at, "total_tasks": self.total_tasks, "done_tasks": self.done_tasks,
+            "version": self.version, "error": self.error, "events": list(self.events),
+        }
+
+
+def _resolve_search_space(search_space: Optional[Dict[str, Dict[str, list]]]) -> Dict[str, Dict[str, list]]:
+    """ Eksik model ızgaraları DEFAULT_SEARCH_SPACE'ten alınır; bilinmeyen model veya boş ızgarada ValueError. """
+    space = dict(DEFAULT_SEARCH_SPACE, **(search_space or {}))
+    unknown = sorted(set(space) - set(DEFAULT_SEARCH_SPACE))
+    if unknown:
+        raise ValueError(f"Bilinmeyen model: {', '.join(unknown)}")
+    for name, grid in space.items():
+        empty = [param for param, values in grid.items() if len(values) == 0]
+        if empty:
+            raise ValueError(f"{name} ızgarasında aday yok: {', '.join(empty)}")
+    return space
+
+
+def _mean_fold_metrics(folds: Dict[int, Dict[str, Any]], keys) -> Dict[str, float]:
+    return {k: float(np.mean([f[k] for f in folds.values()])) for k in keys}
+
+
+class TrainingManager:
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._jobs: Dict[str, TrainingJob] = {}
+        self._lock = threading.Lock()
+
+    def get(self, job_id: str) -> Optional[TrainingJob]:
+        return self._jobs.get(job_id)
+
+    def active_job(self) -> Optional[TrainingJob]:
+        with self._lock:
+            return next((j for j in self._jobs.values() if not j.finished), None)
+
+    def start(self, prepare: Callable[[], Tuple[np.ndarray, np.ndarray, Any]], features: List[str],
+              registry_root: Path, search_space: Optional[Dict[str, Dict[str, list]]] = None, n_folds: int = 5,
+              on_complete=None) -> TrainingJob:
+        """
+        Eğitim işini arka plan iş parçacığında başlatır ve hemen döner.
+        Aynı anda tek bir eğitim çalışır; devam eden iş varsa RuntimeError.
+        search_space'te verilmeyen modeller varsayılan ızgarayla aranır; boş ızgara iş başlamadan ValueError.
+        :param prepare: (X, y, label_encoder) döner; veri hazırlığı da arka planda çalışır,
+                        hatası işi 'failed' olarak bitirir
+        :param on_complete: iş başarıyla bitince yeni sürüm adıyla çağrılır
+        """
+        search_space = _resolve_search_space(search_space)
+        with self._lock:
+            if any(not j.finished for j in self._jobs.values()):
+                raise RuntimeError("Devam eden bir eğitim işi var")
+            job = TrainingJob(job_id=uuid.uuid4().hex[:12])
+            self._jobs[job.job_id] = job
+
+        thread = threading.Thread(
+            target=self._run, name=f"ssa-train-{job.job_id}", daemon=True,
+            args=(job, prepare, features, str(registry_root), search_space,
+                  n_folds, on_complete))
+        thread.start()
+        return job
+
+    def iter_events(self, job_id: str, start: int = 0, timeout_s: float = 15.0) -> Iterator[Dict[str, Any]]:
+        """
+        İşin olaylarını sırayla döner, iş bitene kadar yeni olayları bekler.
+        Uzun süre olay gelmezse bağlantının açık kaldığını göstermek için 'heartbeat' üretir.
+        """
+        job = self._jobs[job_id]
+        i = start
+        while True:
+            with job._cond:
+                if i >= len(job.events) and not job.finished:
+                    job._cond.wait(timeout=timeout_s)
+                new_events = job.events[i:]
+                finished = job.finished
+            if new_events:
+                for event in new_events:
+                    yield event
+                i += len(new_events)
+            elif not finished:
+                yield {"type": "heartbeat", "done": job.done_tasks, "total": job.total_tasks}
+            if finished and i >= len(job.events):
+                return
+
+    def _run(self, job: TrainingJob, prepare, features, registry_root, search_space, n_folds, on_complete):
+        job.status = "running"
+        try:
+            X, y, label_encoder = prepare()
+            summary = self._search_and_publish(job, X, y, label_encoder, features, registry_root, search_space,
+                                               n_folds)
+            # Yeni sürüm etkinleştirildikten sonra iş tamamlanmış sayılır
+            if on_complete is not None:
+                on_complete(job.version)
+            job.finish("completed", {"type": "completed", "version": job.version, "done": job.done_tasks,
+                                     "total": job.total_tasks, "metrics": summary})
+        except Exception as e:
+            job.error = str(e)
+            job.finish("failed", {"type": "failed", "error": str(e)})
+
+    def _search_and_publish(self, job: TrainingJob, X, y, label_encoder, features, registry_root, search_space,
+                            n_folds) -> Dict[str, Any]:
+        """ Arama ve son eğitim; yayınlanan sürümü job.version'a yazar, özet metrikleri döner. """
+        from sklearn.metrics import accuracy_score, f1_score, roc_auc_score, confusion_matrix, classification_report
+        from sklearn.model_selection import StratifiedKFold, ParameterGrid
+        from sklearn.preprocessing import StandardScaler
+
+        n_classes = len(label_encoder.classes_)
+        # Katman sayısı en küçük sınıfın örnek sayısını aşamaz
+        n_folds = int(max(2, min(n_folds, np.bincount(y).min())))
+        folds = list(StratifiedKFold(n_splits=n_folds, shuffle=True, random_state=42).split(X, y))
+        Xs = StandardScaler().fit_transform(X)
+
+        candidates = {name: list(ParameterGrid(grid)) for name, grid in search_space.items()}
+        job.total_tasks = n_folds * sum(len(c) for c in candidates.values()) + 1  # +1 son eğitim
+        job.emit({"type": "started", "n_folds": n_folds, "total_tasks": job.total_tasks,
+                  "candidates": {name: len(c) for name, c in candidates.items()}})
+
+        results = {name: {i: {} for i in range(len(c))} for name, c in candidates.items()}
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=self.max_workers, mp_context=ctx) as pool:
+            futures = {}
+            for k, (train_idx, test_idx) in enumerate(folds):
+                for i, params in enumerate(candidates["forest"]):
+                    f = pool.submit(_forest_fold_worker, X, y, n_classes, params, train_idx, test_idx)
+                    futures[f] = ("forest", i, k)
+                for i, params in enumerate(candidates["kmeans"]):
+                    futures[pool.submit(_kmeans_fold_worker, Xs, params, train_idx, test_idx)] = ("kmeans", i, k)
+                for i, params in enumerate(candidates["iso_forest"]):
+                    futures[pool.submit(_iso_forest_fold_worker, Xs, params, train_idx)] = ("iso_forest", i, k)
+            for f in futures:
+                track_pool_task("ssa_training", f)
+
+            try:
+                for future in as_completed(futures):
+                    name, i, k = futures[future]
+                    res = future.result()
+                    results[name][i][k] = res
+                    job.done_tasks += 1
+                    event = {"type": "fold", "model": name, "candidate": i, "params": candidates[name][i],
+                             "fold": k, "done": job.done_tasks, "total": job.total_tasks}
+                    event["metrics"] = {m: v for m, v in res.items() if m not in ("pred", "prob", "flags")}
+                    job.emit(event)
+            except Exception:
+                for f in futures:
+                    f.cancel()
+                raise
+
+            # Aday özetleri ve seçim
+            search = {}
+            forest_scores = [_mean_fold_metrics(results["forest"][i], ("f1_score", "accuracy"))
+                             for i in range(len(candidates["forest"]))]
+            kmeans_scores = [_mean_fold_metrics(results["kmeans"][i], ("silhouette",))
+                             for i in range(len(candidates["kmeans"]))]
+            iso_scores = []
+            for i in range(len(candidates["iso_forest"])):
+                flags = [results["iso_forest"][i][k]["flags"] for k in range(n_folds)]
+                jaccard = [np.sum(a & b) / max(1, np.sum(a | b)) for a, b in combinations(flags, 2)]
+                iso_scores.append({"stability": float(np.mean(jaccard))})
+
+            best = {
+                # Eşitlikte doğruluk belirler
+                "forest": max(range(len(forest_scores)),
+                              key=lambda i: (forest_scores[i]["f1_score"], forest_scores[i]["accuracy"])),
+                "kmeans": int(np.argmax([s["silhouette"] for s in kmeans_scores])),
+                "iso_forest": int(np.argmax([s["stability"] for s in iso_scores])),
+            }
+            for name, scores in (("forest", forest_scores), ("kmeans", kmeans_scores), ("iso_forest", iso_scores)):
+                search[name] = [{"params": candidates[name][i], "mean": scores[i], "best": i == best[name]}
+                                for i in range(len(scores))]
+                job.emit({"type": "candidates", "model": name, "results": search[name]})
+            best_params = {name: candidates[name][best[name]] for name in best}
+            job.emit({"type": "selected", "params": best_params})
+
+            # Raporlanan metrikler: seçilen ormanın katman dışı (out-of-fold) tahminleri
+            oof_pred = np.zeros(len(y), dtype=int)
+            oof_prob = np.zeros((len(y), n_classes))
+            for k, (_, test_idx) in enumerate(folds):
+                oof_pred[test_idx] = results["forest"][best["forest"]][k]["pred"]
+                oof_prob[test_idx] = results["forest"][best["forest"]][k]["prob"]
+            try:
+                roc_auc = float(roc_auc_score(y, oof_prob, multi_class='ovr', average='weighted'))
+            except ValueError:
+                roc_auc = 0.0
+            metrics = {
+                "accuracy": float(accuracy_score(y, oof_pred)),
+                "f1_score": float(f1_score(y, oof_pred, average='weighted')),
+                "roc_auc": roc_auc,
+                "confusion_matrix": confusion_matrix(y, oof_pred, labels=np.arange(n_classes)).tolist(),
+                "classes": label_encoder.classes_.tolist(),
+                "classification_report": classification_report(
+                    y, oof_pred, labels=np.arange(n_classes), target_names=label_encoder.classes_.tolist(),
+                    output_dict=True, zero_division=0),
+                "sample_size": int(len(y)),
+                "cv_folds": n_folds,
+                "cv_fold_metrics": [{m: results["forest"][best["forest"]][k][m] for m in ("accuracy", "f1_score")}
+                                    for k in range(n_folds)],
+                "best_params": best_params,
+                "timestamp": datetime.now().isoformat()
+            }
+
+            job.emit({"type": "final_fit", "params": best_params})
+            version = track_pool_task("ssa_training", pool.submit(
+                _fit_final_worker, X, y, label_encoder, features, best_params["forest"], best_params["kmeans"],
+                best_params["iso_forest"], metrics, search, registry_root)).result()
+
+        job.done_tasks += 1
+        job.version = version
+        return {m: metrics[m] for m in ("accuracy", "f1_score", "roc_auc", "sample_size")}
+
+
+training_manager = TrainingManager()
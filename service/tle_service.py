@@ -1,15 +1,75 @@
 import sqlite3
-from typing import List, Optional, Dict, Any
+import threading
+from dataclasses import dataclass
+from typing import List, Optional, Dict, Any, Tuple, Callable
+import numpy as np
+import backend.models.db as db
 from backend.models.db import get_conn
+from backend.metrics import record_cache_access
 from ingest.tle_fetcher import fetch_and_store
 from processing.propagator import tle_to_satrec
+from processing.tle_arrays import TleArrays, parse_tle_arrays, tle_version
+
+# Veritabanı yolu, satır sayısı, en büyük id, en son satırın eleman seti özeti
+CatalogVersion = Tuple[str, int, int, str]
+
+
+@dataclass
+class CatalogSnapshot:
+    """
+    Katalogun hesaplamaya hazır hali (her NORAD numarası için en güncel TLE).
+    Tüm diziler aynı sırada indekslenir.
+    """
+    version: CatalogVersion  # raw_tles veya veritabanı dosyası değiştiğinde değişir
+    ids: np.ndarray  # raw_tles.id
+    norad_ids: np.ndarray
+    names: List[str]
+    satrecs: list  # sgp4 Satrec nesneleri
+    perigee_km: np.ndarray  # perigee irtifası
+    apogee_km: np.ndarray  # apogee irtifası
+
+    def __len__(self):
+        return len(self.ids)
+
+
+@dataclass
+class CatalogElements:
+    """
+    raw_tles tablosunun tamamının (geçmiş kayıtlar dahil) NumPy eleman dizileri.
+    SGP4 nesnesi oluşturmadan istatistik ve toplu analizlerde kullanılır.
+    """
+    version: CatalogVersion
+    ids: np.ndarray  # raw_tles.id (artan sırada)
+    elements: TleArrays
+    latest: np.ndarray  # (N,) bool, her NORAD numarasının en son kaydı ve geçerli satırlar
+
+    def __len__(self):
+        return len(self.ids)
 
 
 class TleService:
 
+    def __init__(self):
+        self._catalog: Optional[CatalogSnapshot] = None
+        self._catalog_lock = threading.Lock()
+        self._elements: Optional[CatalogElements] = None
+        self._elements_lock = threading.Lock()
+        self._post_ingest_hooks: List[Callable[[int], Any]] = []
+
+    def register_post_ingest_hook(self, hook: Callable[[int], Any]):
+        """Yeni TLE'ler kaydedildikten sonra çağrılacak fonksiyon (parametre: kaydedilen TLE sayısı)."""
+        if hook not in self._post_ingest_hooks:
+            self._post_ingest_hooks.append(hook)
+
     def update_tles_from_source(self) -> int:
         """Celestrak veya tanımlı kaynaktan TLE verilerini çeker ve DB'yi günceller."""
         count = fetch_and_store()
+        for hook in self._post_ingest_hooks:
+            # Bir kancanın hatası veri çekme işlemini başarısız saymaz
+            try:
+                hook(count)
+            except Exception as e:
+                print(f"[INGEST HOOK ERROR] {e}")
         return count
 
     def get_all_satellites(self, limit: int = 100) -> List[Dict[str, Any]]:
@@ -72,6 +132,97 @@ class TleService:
             return None
         return tle_to_satrec(sat_data["line1"], sat_data["line2"])
 
+    def get_catalog_version(self) -> CatalogVersion:
+        """
+        raw_tles tablosunun sürümü. Ucuz bir sorgudur (indeksli iki okuma).
+        raw_tles'a yalnızca satır eklendiğinden aynı veritabanında (satır sayısı, en büyük id) içeriği belirler;
+        veritabanı yolu ve en son satırın özeti, aynı sayıda satır içeren başka bir veritabanının
+        (ör. yeniden oluşturulan dosya) eski önbelleği kullanmasını önler.
+        """
+        conn = get_conn()
+        try:
+            count, max_id = conn.execute("SELECT COUNT(*), COALESCE(MAX(id), 0) FROM raw_tles").fetchone()
+            last = conn.execute("SELECT line1, line2 FROM raw_tles WHERE id = ?", (max_id,)).fetchone()
+            digest = tle_version(last["line1"], last["line2"]) if last else ""
+            return str(db.DB_PATH), int(count), int(max_id), digest
+        finally:
+            conn.close()
+
+    def reset_caches(self):
+        """ Bellekteki katalog önbelleklerini boşaltır (veritabanı değiştirildiğinde, testlerde). """
+        with self._catalog_lock:
+            self._catalog = None
+        with self._elements_lock:
+            self._elements = None
+
+    def get_catalog(self) -> CatalogSnapshot:
+        """
+        Katalogun SGP4 nesnelerini bellekte tutar.
+        Her çağrıda TLE'leri yeniden ayrıştırmamak için sürüm değişmedikçe aynı nesne döner.
+        """
+        version = self.get_catalog_version()
+        with self._catalog_lock:
+            hit = self._catalog is not None and self._catalog.version == version
+            record_cache_access("catalog_snapshot", hit)
+            if hit:
+                return self._catalog
+
+            conn = get_conn()
+            rows = conn.execute("SELECT id, sat_name, line1, line2 FROM raw_tles ORDER BY id").fetchall()
+            conn.close()
+
+            # Aynı uydu birden fazla kez çekilmiş olabilir, en son kaydı kullan
+            latest = {}
+            for row in rows:
+                try:
+                    satrec = tle_to_satrec(row["line1"], row["line2"])
+                except Exception:
+                    continue
+                latest[satrec.satnum] = (row["id"], row["sat_name"], satrec)
+
+            entries = sorted(latest.values(), key=lambda e: e[0])
+            satrecs = [e[2] for e in entries]
+            self._catalog = CatalogSnapshot(
+                version=version,
+                ids=np.array([e[0] for e in entries], dtype=int),
+                norad_ids=np.array([s.satnum for s in satrecs], dtype=int),
+                names=[e[1] for e in entries],
+                satrecs=satrecs,
+                perigee_km=np.array([s.altp * s.radiusearthkm for s in satrecs], dtype=float),
+                apogee_km=np.array([s.alta * s.radiusearthkm for s in satrecs], dtype=float)
+            )
+            return self._catalog
+
+    def get_catalog_elements(self) -> CatalogElements:
+        """
+        Tüm TLE kayıtlarının sütun bazlı eleman dizileri.
+        get_catalog gibi katalog sürümü değişene (yeni ingest) kadar önbellekte tutulur.
+        """
+        version = self.get_catalog_version()
+        with self._elements_lock:
+            hit = self._elements is not None and self._elements.version == version
+            record_cache_access("catalog_elements", hit)
+            if hit:
+                return self._elements
+
+            conn = get_conn()
+            rows = conn.execute("SELECT id, line1, line2 FROM raw_tles ORDER BY id").fetchall()
+            conn.close()
+
+            ids = np.array([r["id"] for r in rows], dtype=int)
+            elements = parse_tle_arrays([r["line1"] for r in rows], [r["line2"] for r in rows])
+
+            # Her NORAD numarası için en büyük id (en son çekilen kayıt)
+            latest = np.zeros(len(ids), dtype=bool)
+            valid_idx = np.nonzero(elements.valid)[0]
+            if len(valid_idx):
+                rev = valid_idx[::-1]
+                _, first = np.unique(elements.norad_id[rev], return_index=True)
+                latest[rev[first]] = True
+
+            self._elements = CatalogElements(version=version, ids=ids, elements=elements, latest=latest)
+            return self._elements
+
 
 # Singleton instance
 tle_service = TleService()
@@ -0,0 +1,277 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+import numpy as np
+from backend.models.db import get_conn
+from backend.metrics import metrics, StageTimer
+from processing.kepler import osculating_elements
+from processing.propagator import propagate_satrec_array, utc_dt_to_jd
+from processing.screening import crossing_windows, screen_runs, radial_band_filter, CloseApproach
+from service.tle_service import tle_service
+
+"""
+İzleme listesi (watchlist): kendi uydularımız ve bunların tüm kataloğa karşı taranması.
+
+Tüm-tümüne (all-vs-all) tarama yerine yalnızca listedeki W nesne kataloğa karşı çok günlük bir
+pencerede taranır. Tüm kataloğu ince ızgarada (ör. 7 gün x 60 s) yaymak maliyetin neredeyse tamamını
+oluşturduğundan tarama iki aşamalıdır (processing.screening):
+    1. Düğüm filtresi: katalog yalnızca seyrek çapa anlarında (ANCHOR_STEP_S) yayılır; her (izlenen, katalog)
+       çifti için bağıl düğümden geçiş zamanları karşılaştırılarak aday aralıklar bulunur.
+    2. İnceleme: yalnızca aday aralıklarda katalog nesnesi ince ızgarada yayılır ve Hermite modeliyle yerel
+       en yakın geçişler bulunur. Izgara ve Hermite modeli tam taramayla aynı olduğundan sonuçlar da aynıdır.
+İrtifa bandı izlenen nesneninkiyle kesişmeyen katalog nesneleri o nesne için hiç değerlendirilmez.
+"""
+
+ANCHOR_CHUNK_STATES = 2_000_000  # çapa anlarında yayılımda grup başına (nesne x çapa anı); konum+hız ~100 MB
+ANCHOR_STEP_S = 3 * 3600.0  # düğüm filtresi için katalog elemanlarının örneklendiği aralık (J2 sürüklenmesi)
+BAND_MARGIN_KM = 50.0  # ortalama elemanlardan gelen perigee/apogee ile anlık irtifa farkı payı
+
+WATCHLIST_STAGE_SECONDS = metrics.histogram(
+    "watchlist_screening_stage_duration_seconds", "İzleme listesi taraması aşama süreleri", ("stage",))
+
+
+class WatchlistService:
+
+    def get_watchlist(self) -> List[Dict[str, Any]]:
+        """ Liste ve her nesnenin katalogdaki güncel kaydı (yoksa sat_id None). """
+        conn = get_conn()
+        rows = conn.execute("SELECT norad_id, label, added_at FROM watchlist ORDER BY norad_id").fetchall()
+        conn.close()
+
+        catalog = tle_service.get_catalog()
+        position = {int(n): i for i, n in enumerate(catalog.norad_ids)}
+        result = []
+        for row in rows:
+            i = position.get(row["norad_id"])
+            result.append({
+                "norad_id": row["norad_id"],
+                "label": row["label"],
+                "added_at": row["added_at"],
+                "sat_id": int(catalog.ids[i]) if i is not None else None,
+                "sat_name": catalog.names[i] if i is not None else None,
+            })
+        return result
+
+    def add(self, norad_id: Optional[int] = None, sat_id: Optional[int] = None,
+            label: Optional[str] = None) -> Dict[str, Any]:
+        """ NORAD numarası veya raw_tles id'si ile ekler; zaten listedeyse etiketi günceller. """
+        if norad_id is None:
+            sat = tle_service.get_satellite_by_id(sat_id)
+            if not sat:
+                raise ValueError(f"Bu id ile uydu bulunamadı. ID: {sat_id}")
+            norad_id = int(sat["line2"][2:7])
+            label = label or sat["sat_name"]
+
+        conn = get_conn()
+        conn.execute("""
+            INSERT INTO watchlist (norad_id, label, added_at) VALUES (?, ?, ?)
+            ON CONFLICT(norad_id) DO UPDATE SET label = COALESCE(excluded.label, watchlist.label)
+        """, (norad_id, label, datetime.now(timezone.utc).isoformat()))
+        conn.commit()
+        conn.close()
+        return next(w for w in self.get_watchlist() if w["norad_id"] == norad_id)
+
+    def remove(self, norad_id: int):
+        """ Listeden çıkarır; nesnenin son taramadaki yakınlaşmaları da aynı işlemde silinir. """
+        conn = get_conn()
+        cur = conn.execute("DELETE FROM watchlist WHERE norad_id = ?", (norad_id,))
+        conn.execute("DELETE FROM watchlist_conjunctions WHERE asset_norad_id = ?", (norad_id,))
+        conn.commit()
+        conn.close()
+        if cur.rowcount == 0:
+            raise ValueError(f"İzleme listesinde yok. NORAD: {norad_id}")
+
+    def screen(self, start_time: Optional[datetime] = None, days: float = 7.0, step_s: float = 60.0,
+               threshold_km: float = 10.0) -> Dict[str, Any]:
+        """
+        İzleme listesindeki nesneleri tüm kataloğa karşı [start_time, start_time + days] boyunca tarar.
+        Sonuçlar watchlist_conjunctions tablosuna yazılır (taranan nesnelerin önceki sonuçlarının yerine).
+        """
+        timer = StageTimer(WATCHLIST_STAGE_SECONDS)
+        start_time = start_time or datetime.now(timezone.utc)
+        end_time = start_time + timedelta(days=days)
+
+        with timer.stage("catalog_load"):
+            catalog = tle_service.get_catalog()
+            conn = get_conn()
+            watched = [r["norad_id"] for r in conn.execute("SELECT norad_id FROM watchlist").fetchall()]
+            conn.close()
+
+        # İzlenen nesnelerin katalogdaki satırları ve irtifa bandı filtresi
+        is_asset = np.isin(catalog.norad_ids, watched)
+        asset_rows = np.nonzero(is_asset)[0]
+        if len(asset_rows) == 0:
+            return {"assets": 0, "catalog_objects": 0, "window_start": start_time.isoformat(),
+                    "window_end": end_time.isoformat(), "conjunctions": [], "stage_timings_s": timer.publish()}
+
+        with timer.stage("band_filter"):
+            keep = is_asset.copy()
+            for i in asset_rows:
+                keep |= radial_band_filter(catalog.perigee_km, catalog.apogee_km, catalog.perigee_km[i],
+                                           catalog.apogee_km[i], threshold_km + BAND_MARGIN_KM)
+            rows = np.nonzero(keep)[0]
+            query_pos = np.nonzero(is_asset[rows])[0]  # rows içindeki izlenen nesneler
+            pair_mask = np.stack([radial_band_filter(catalog.perigee_km[rows], catalog.apogee_km[rows],
+                                                     catalog.perigee_km[rows[q]], catalog.apogee_km[rows[q]],
+                                                     threshold_km + BAND_MARGIN_KM) for q in query_pos])
+            # Kendisiyle ve iki izlenen nesne arasındaki ikinci yönde eşleşme taranmaz
+            pair_mask &= ~(is_asset[rows][None, :] & (rows[None, :] <= rows[query_pos][:, None]))
+        satrecs = [catalog.satrecs[i] for i in rows]
+
+        n_steps = int(np.ceil(days * 86400.0 / step_s)) + 1
+        times = [start_time + timedelta(seconds=k * step_s) for k in range(n_steps)]
+        n_anchors = int(np.ceil((n_steps - 1) * step_s / ANCHOR_STEP_S)) + 1
+        anchor_s = np.arange(n_anchors) * ANCHOR_STEP_S
+        with timer.stage("propagation"):
+            anchor_times = [start_time + timedelta(seconds=float(t)) for t in anchor_s]
+            elements = np.empty((len(rows), n_anchors, 6))
+            # Katalog nesne grupları halinde yayılır (zaman ekseni bölünmez)
+            chunk_objects = max(1, ANCHOR_CHUNK_STATES // n_anchors)
+            for first in range(0, len(rows), chunk_objects):
+                r, v, err = propagate_satrec_array(satrecs[first:first + chunk_objects], anchor_times)
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    elements[first:first + chunk_objects] = osculating_elements(r, v)
+                elements[first:first + chunk_objects][err != 0] = np.nan
+
+        with timer.stage("sieve"):
+            w_idx, n_idx, tca_s, half_s = crossing_windows(elements[query_pos], elements, anchor_s, threshold_km,
+                                                           pair_mask=pair_mask)
+
+        with timer.stage("refinement"):
+            approaches = self._refine(satrecs, query_pos, times, w_idx, n_idx, tca_s, half_s, step_s,
+                                      threshold_km)
+            approaches = [(rows[q], rows[c], a) for q, c, a in approaches]
+
+        with timer.stage("merge"):
+            events = self._merge(catalog, approaches, is_asset, step_s)
+
+        with timer.stage("persistence"):
+            screened_at = datetime.now(timezone.utc).isoformat()
+            conn = get_conn()
+            conn.execute(f"DELETE FROM watchlist_conjunctions WHERE asset_norad_id IN "
+                         f"({','.join('?' * len(asset_rows))})", [int(catalog.norad_ids[i]) for i in asset_rows])
+            conn.executemany("""
+                INSERT INTO watchlist_conjunctions
+                (asset_norad_id, asset_sat_id, other_sat_id, other_norad_id, tca, miss_distance_km,
+                 rel_velocity_km_s, window_start, window_end, screened_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, [(e["asset_norad_id"], e["asset_sat_id"], e["other_sat_id"], e["other_norad_id"], e["tca"],
+                   e["miss_distance_km"], e["rel_velocity_km_s"], start_time.isoformat(), end_time.isoformat(),
+                   screened_at) for e in events])
+            conn.commit()
+            conn.close()
+
+        return {
+            "assets": len(asset_rows),
+            "catalog_objects": len(rows),
+            "window_start": start_time.isoformat(),
+            "window_end": end_time.isoformat(),
+            "conjunctions": events,
+            "stage_timings_s": timer.publish(),
+        }
+
+    @staticmethod
+    def _refine(satrecs, query_pos, times, w_idx, n_idx, tca_s, half_s, step_s: float,
+                threshold_km: float) -> List[tuple]:
+        """
+        Düğüm filtresinin aday aralıklarını ince ızgarada tarar. İzlenen nesne tüm ızgarada, adayın katalog
+        nesnesi yalnızca kendi aralığında SGP4 ile yayılır; aynı çiftin örtüşen aralıkları birleştirilir.
+        :return: (sorgu satırı, katalog satırı, CloseApproach) listesi; satırlar satrecs indeksleridir
+        """
+        n_steps = len(times)
+        if len(w_idx) == 0:
+            return []
+        k_lo = np.clip(np.floor((tca_s - half_s) / step_s).astype(int) - 1, 0, n_steps - 2)
+        k_hi = np.clip(np.ceil((tca_s + half_s) / step_s).astype(int) + 1, k_lo + 1, n_steps - 1)
+        order = np.lexsort((k_lo, n_idx, w_idx))
+        w_idx, n_idx, k_lo, k_hi = w_idx[order], n_idx[order], k_lo[order], k_hi[order]
+        pair_start = np.ones(len(order), dtype=bool)
+        pair_start[1:] = (w_idx[1:] != w_idx[:-1]) | (n_idx[1:] != n_idx[:-1])
+        # Çift içinde o ana kadarki en geç bitiş: çift sırası kadar kaydırılmış dizide kümülatif maksimum
+        offset = (np.cumsum(pair_start) - 1) * (n_steps + 2)
+        reach = np.maximum.accumulate(k_hi + offset) - offset
+        new_run = pair_start.copy()
+        new_run[1:] |= k_lo[1:] > reach[:-1] + 1
+        starts = np.nonzero(new_run)[0]
+        ends = np.append(starts[1:], len(order)) - 1
+
+        jd, fr = (np.ascontiguousarray(x) for x in np.array([utc_dt_to_jd(t) for t in times]).T)
+        rel_r, rel_v, run_id, steps = [], [], [], []
+        for w in np.unique(w_idx[starts]):
+            err_q, r_q, v_q = satrecs[query_pos[w]].sgp4_array(jd, fr)
+            for run in np.nonzero(w_idx[starts] == w)[0]:
+                lo, hi = k_lo[starts[run]], reach[ends[run]]
+                err, r, v = satrecs[n_idx[starts[run]]].sgp4_array(jd[lo:hi + 1], fr[lo:hi + 1])
+                ok = (err == 0) & (err_q[lo:hi + 1] == 0)
+                rel_r.append((r - r_q[lo:hi + 1])[ok])
+                rel_v.append((v - v_q[lo:hi + 1])[ok])
+                run_id.append(np.full(int(ok.sum()), run))
+                steps.append(np.arange(lo, hi + 1)[ok])
+
+        run, tca_step, miss, rel_vel = screen_runs(np.concatenate(rel_r), np.concatenate(rel_v),
+                                                   np.concatenate(run_id), np.concatenate(steps), step_s,
+                                                   threshold_km, n_steps - 1)
+        result = []
+        for k, t, m, rv in zip(run, tca_step, miss, rel_vel):
+            w, n = w_idx[starts[k]], n_idx[starts[k]]
+            result.append((query_pos[w], n, CloseApproach(
+                query_index=int(w), catalog_index=int(n), tca=times[0] + timedelta(seconds=float(t * step_s)),
+                miss_distance_km=float(m), rel_velocity_km_s=float(rv))))
+        return result
+
+    @staticmethod
+    def _merge(catalog, approaches, is_asset, step_s: float) -> List[Dict[str, Any]]:
+        """
+        Aynı nesnenin kendisiyle eşleşmesini atar, iki izlenen nesne arasındaki geçişi bir kez sayar ve
+        aynı çiftin TCA'ları iki adımdan yakın geçişlerini en yakın olanla tek olay sayar. Çiftin örtüşen
+        aday aralıkları _refine'da birleştirildiğinden aynı geçiş normalde zaten bir kez bulunur.
+        """
+        best: Dict[tuple, List[CloseApproach]] = {}
+        for q_row, c_row, a in sorted(approaches, key=lambda x: x[2].tca):
+            if q_row == c_row or (is_asset[c_row] and c_row < q_row):
+                continue
+            events = best.setdefault((q_row, c_row), [])
+            if events and (a.tca - events[-1].tca).total_seconds() <= 2.0 * step_s:
+                if a.miss_distance_km < events[-1].miss_distance_km:
+                    events[-1] = a
+                continue
+            events.append(a)
+
+        result = []
+        for (q_row, c_row), events in best.items():
+            for a in events:
+                result.append({
+                    "asset_norad_id": int(catalog.norad_ids[q_row]),
+                    "asset_sat_id": int(catalog.ids[q_row]),
+                    "asset_name": catalog.names[q_row],
+                    "other_sat_id": int(catalog.ids[c_row]),
+                    "other_norad_id": int(catalog.norad_ids[c_row]),
+                    "other_name": catalog.names[c_row],
+                    "tca": a.tca.isoformat(),
+                    "miss_distance_km": a.miss_distance_km,
+                    "rel_velocity_km_s": a.rel_velocity_km_s,
+                })
+        result.sort(key=lambda e: e["tca"])
+        return result
+
+    def get_conjunctions(self, norad_id: Optional[int] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """ Son taramanın sonuçları (izlenen nesne verilirse yalnızca onunki), TCA sırasıyla. """
+        conn = get_conn()
+        query = """
+            SELECT w.*, s1.sat_name AS asset_name, s2.sat_name AS other_name
+            FROM watchlist_conjunctions w
+            LEFT JOIN raw_tles s1 ON w.asset_sat_id = s1.id
+            LEFT JOIN raw_tles s2 ON w.other_sat_id = s2.id
+        """
+        params: list = []
+        if norad_id is not None:
+            query += " WHERE w.asset_norad_id = ?"
+            params.append(norad_id)
+        query += " ORDER BY w.tca LIMIT ?"
+        params.append(limit)
+        rows = conn.execute(query, params).fetchall()
+        conn.close()
+        return [dict(r) for r in rows]
+
+
+# Singleton instance
+watchlist_service = WatchlistService()
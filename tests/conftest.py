@@ -0,0 +1,31 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+import backend.models.db as db
+from benchmarks.synthetic_catalog import generate_catalog
+
+
+@pytest.fixture
+def catalog_db(tmp_path, monkeypatch):
+    """
+    Geçici veritabanı ve boş katalog önbellekleri.
+    Dönen fonksiyon sentetik bir katalog üretip raw_tles'a kaydeder ve kataloğu döner
+    (parametreler benchmarks.synthetic_catalog.generate_catalog ile aynı).
+    """
+    from ingest.tle_fetcher import save_tles
+    from service.tle_service import tle_service
+
+    monkeypatch.setattr(db, "DB_PATH", tmp_path / "test.db")
+    db.init_db()
+    tle_service.reset_caches()
+
+    def load(n: int, **kwargs):
+        catalog = generate_catalog(n, **kwargs)
+        save_tles(catalog.tles, source="test")
+        return catalog
+
+    yield load
+    tle_service.reset_caches()
@@ -0,0 +1,17 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from benchmarks.accuracy import CHECKS
+
+# Tam koşum (binlerce vaka): python benchmarks/accuracy.py
+CASES = {"propagation": 500, "geodetic": 200, "tca_refinement": 200, "maneuver": 8}
+
+
+@pytest.mark.parametrize("name", list(CHECKS))
+def test_fast_path_within_tolerance(name):
+    result = CHECKS[name](CASES[name], 1)
+    assert result.cases > 0
+    assert result.passed, f"{name}: {result.failures} {result.max_errors}"
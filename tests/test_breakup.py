@@ -0,0 +1,98 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from benchmarks.synthetic_catalog import generate_catalog
+from processing.breakup import fragment_delta_v, fit_satrecs
+from processing.propagator import tle_to_satrec, propagate_satrec_array
+
+
+def test_fragments_reproduce_breakup_states():
+    catalog = generate_catalog(5, seed=4, n_planted=0)
+    parent = tle_to_satrec(catalog.tles[0][1], catalog.tles[0][2])
+    r0, v0, _ = propagate_satrec_array([parent], [catalog.epoch])
+    rng = np.random.default_rng(0)
+    dv = fragment_delta_v(r0[0, 0], v0[0, 0], 3000, rng, dv_median_m_s=50.0)
+    assert abs(np.median(np.linalg.norm(dv, axis=1)) * 1000.0 - 50.0) < 5.0
+
+    r = np.repeat(r0[0], len(dv), axis=0)
+    sats, valid = fit_satrecs(r, v0[0, 0] + dv, catalog.epoch, np.full(len(dv), 1e-4), 80000)
+    assert len(sats) == valid.sum() > 0
+    r_fit, v_fit, err = propagate_satrec_array(sats, [catalog.epoch])
+    assert np.all(err == 0)
+    # SGP4 ortalama elemanları epoch anında hedef durumu vermeli
+    assert np.max(np.linalg.norm(r_fit[:, 0] - r[valid], axis=1)) < 1e-6
+    assert np.max(np.linalg.norm(v_fit[:, 0] - (v0[0, 0] + dv)[valid], axis=1)) < 1e-9
+
+    dv_ric = fragment_delta_v(r0[0, 0], v0[0, 0], 3000, rng, distribution="gaussian_ric",
+                              dv_sigma_ric_m_s=(0.0, 30.0, 0.0))
+    along = v0[0, 0] / np.linalg.norm(v0[0, 0])
+    assert abs(np.std(dv_ric @ along) * 1000.0 - 30.0) < 3.0
+
+
+def test_breakup_simulation_is_reproducible(catalog_db, monkeypatch):
+    from service import breakup_service as bs
+    from service.watchlist_service import watchlist_service
+    from service.tle_service import tle_service
+
+    catalog = catalog_db(400, seed=3)
+    snapshot = tle_service.get_catalog()
+    parent = int(np.argmin(np.abs(snapshot.perigee_km - 550.0)))
+    assets = np.argsort(np.abs(snapshot.perigee_km - snapshot.perigee_km[parent]))[1:4]
+    for i in assets:
+        watchlist_service.add(norad_id=int(snapshot.norad_ids[i]))
+
+    params = dict(norad_id=int(snapshot.norad_ids[parent]), breakup_time=catalog.epoch, n_fragments=300,
+                  seed=5, hours=2.0, bin_minutes=30.0, threshold_km=25.0)
+    result = bs.breakup_service.simulate(**params)
+    assert result["assets"] == 3 and result["catalog_objects"] < len(snapshot)
+    assert 0 < result["fragments_in_orbit"] <= 300
+    assert len(result["timeline"]) == 5  # 2 saat / 30 dk kovalar (+ son adım)
+    assert sum(b["catalog_conjunctions"] for b in result["timeline"]) == result["catalog_conjunctions"] > 0
+    assert sum(b["watchlist_conjunctions"] for b in result["timeline"]) == result["watchlist_conjunctions"]
+    assert all(f["mean_flux_per_m2_yr"] >= 0.0 for f in result["asset_flux"])
+
+    # Küçük dilimlerle (çok sayıda dilim sınırı) ve aynı seed ile aynı sonuç
+    monkeypatch.setattr(bs, "CHUNK_STATES", 20000)
+    chunked = bs.breakup_service.simulate(**params)
+    for key in ("fragments_in_orbit", "catalog_conjunctions", "watchlist_conjunctions", "timeline",
+                "asset_flux", "conjunctions"):
+        assert chunked[key] == result[key]
+
+
+def test_breakup_endpoint_rejects_unbounded_step_count(catalog_db, monkeypatch):
+    monkeypatch.setenv("ASTM_PREWARM", "0")
+    import main
+    from fastapi.testclient import TestClient
+    from backend.api.router_breakup import MAX_SIMULATION_HOURS
+
+    catalog = catalog_db(50, seed=3, n_planted=0)
+    norad_id = int(catalog.tles[0][2][2:7])
+    with TestClient(main.app) as client:
+        def simulate(**kw):
+            body = {"norad_id": norad_id, "n_fragments": 20, "breakup_time": catalog.epoch.isoformat(), **kw}
+            return client.post("/breakup/simulate", json=body).status_code
+
+        assert simulate(hours=1.0, step_s=1e-3) == 422
+        assert simulate(hours=MAX_SIMULATION_HOURS, step_s=10.0) == 422
+        assert simulate(hours=MAX_SIMULATION_HOURS + 1.0) == 422
+        assert simulate(hours=0.5, step_s=60.0) == 200
+        assert simulate(norad_id=99999, hours=0.5) == 404
+
+
+def test_conjunction_fragment_index_refers_to_generated_cloud():
+    from datetime import datetime, timedelta
+    from types import SimpleNamespace
+    from processing.screening import CloseApproach
+    from service.breakup_service import BreakupService
+
+    t0 = datetime(2024, 1, 1)
+    catalog = SimpleNamespace(norad_ids=np.array([101, 102]), names=["A", "B"])
+    events = [(1, 0, CloseApproach(1, 0, t0 + timedelta(seconds=60), 2.0, 10.0))]
+    # 5 parçadan 0 ve 2 yörüngeye oturmadı; yörüngedeki 1. parça bulutun 3. parçası
+    result = BreakupService._summarize(catalog, np.array([0, 1]), np.array([True, False]), events, t0, 60.0, 10.0,
+                                       np.full(3, 3), np.zeros((1, 3)), np.zeros((1, 3), dtype=int), np.array([0]),
+                                       np.nonzero(np.array([False, True, False, True, True]))[0])
+    assert [c["fragment_index"] for c in result["conjunctions"]] == [3]
@@ -0,0 +1,65 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from processing.collision_probability import collision_probability, pc_foster, pc_chan
+
+
+def test_isotropic_pc_matches_noncentral_chi2():
+    # İzotropik dağılımda |x|²/σ² merkezsiz ki-kare (2 serbestlik derecesi) dağılır
+    from scipy.stats import ncx2
+    sigma, hbr = 0.3, 0.05
+    miss = np.array([0.0, 0.1, 0.5, 1.5])
+    miss_2d = np.stack([miss, np.zeros_like(miss)], axis=-1)
+    cov_2d = np.broadcast_to(np.eye(2) * sigma ** 2, (len(miss), 2, 2))
+    expected = ncx2.cdf(hbr ** 2 / sigma ** 2, 2, miss ** 2 / sigma ** 2)
+    assert np.allclose(pc_foster(miss_2d, cov_2d, hbr), expected, rtol=1e-6)
+    assert np.allclose(pc_chan(miss_2d, cov_2d, hbr), expected, rtol=1e-6)
+
+
+def test_pc_is_frame_invariant_and_vectorized():
+    rng = np.random.default_rng(1)
+    n = 200
+    r1 = rng.normal(size=(n, 3))
+    r1 *= 7000.0 / np.linalg.norm(r1, axis=1, keepdims=True)
+    v1 = np.cross(r1, rng.normal(size=(n, 3)))
+    v1 *= 7.5 / np.linalg.norm(v1, axis=1, keepdims=True)
+    r2 = r1 + rng.normal(scale=0.5, size=(n, 3))
+    v2 = v1 + rng.normal(scale=5.0, size=(n, 3))
+    pc = collision_probability(r1, v1, r2, v2)
+    one_by_one = [collision_probability(r1[i], v1[i], r2[i], v2[i])[0] for i in range(5)]
+    assert np.allclose(pc[:5], one_by_one)
+
+    q, _ = np.linalg.qr(rng.normal(size=(3, 3)))  # rastgele dönüşüm: Pc çerçeveden bağımsız
+    rotated = collision_probability(r1 @ q.T, v1 @ q.T, r2 @ q.T, v2 @ q.T)
+    assert np.allclose(pc, rotated, rtol=1e-9, atol=1e-300)
+    # Bağıl hız sıfırsa karşılaşma düzlemi tanımsız
+    assert np.isnan(collision_probability(r1[0], v1[0], r2[0], v1[0])[0])
+
+
+def test_screening_stores_pc_and_what_if_endpoint(catalog_db, monkeypatch):
+    monkeypatch.setenv("ASTM_PREWARM", "0")
+    import main
+    from fastapi.testclient import TestClient
+    from service.conjunction_service import ConjunctionService
+
+    with TestClient(main.app) as client:
+        catalog = catalog_db(400, seed=2)
+        ConjunctionService(max_workers=1).run_conjunction_screening(analysis_start_time=catalog.epoch)
+
+        alerts = client.get("/conjunctions/alerts", params={"limit": 500}).json()
+        assert alerts and all(a["pc"] is not None and 0.0 <= a["pc"] <= 1.0 for a in alerts)
+
+        ids = [a["id"] for a in alerts[:5]]
+        default = client.post("/conjunctions/pc", json={"alert_ids": ids}).json()
+        # Taramadaki hızlar sonlu farkla, burada SGP4'ten gelir; fark küçüktür
+        assert np.allclose([r["pc"] for r in default], [r["stored_pc"] for r in default], rtol=1e-3)
+        larger = client.post("/conjunctions/pc", json={"alert_ids": ids, "hbr_m": 50.0,
+                                                      "sigma1_ric_km": [0.05, 0.2, 0.05]}).json()
+        assert [r["alert_id"] for r in larger] == sorted(ids)
+        assert any(b["pc"] != a["pc"] for a, b in zip(default, larger))
+
+        assert client.post("/conjunctions/pc", json={"sigma1_ric_km": [1.0, -1.0, 1.0]}).status_code == 422
+        assert client.post("/conjunctions/pc", json={"alert_ids": [10 ** 9]}).status_code == 404
@@ -0,0 +1,63 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import backend.models.db as db
+from processing.pruner import plan_altitude_shells
+
+
+def _alerts():
+    conn = db.get_conn()
+    rows = conn.execute("SELECT sat1_id, sat2_id, tca, miss_distance_km, rel_velocity_km_s, score, event_type "
+                        "FROM conjunction_alerts").fetchall()
+    conn.close()
+    return sorted(tuple(r) for r in rows)
+
+
+def test_plan_altitude_shells_covers_each_object_once():
+    radii = np.concatenate([np.full(500, 6928.0), np.random.default_rng(0).uniform(6700, 8000, 500)])
+    cores = plan_altitude_shells(radii, 6)
+    owners = [sum(lo <= r < hi for lo, hi in cores) for r in radii]
+    assert owners == [1] * len(radii)
+    assert cores[0][0] == -np.inf and cores[-1][1] == np.inf
+    assert plan_altitude_shells(radii, 1) == [(-np.inf, np.inf)]
+
+
+def test_plan_altitude_shells_bounds_shell_members():
+    # Yoğun bir bant ve seyrek bir dağılım: halo yüzünden kabuklar çekirdeklerinden kalabalıktır
+    rng = np.random.default_rng(0)
+    radii = np.concatenate([rng.normal(6930.0, 20.0, 3000), rng.uniform(6700, 8000, 1000)])
+
+    def members(cores):
+        return [np.sum((radii >= lo) & (radii <= radii[(radii >= lo) & (radii < hi)].max() + 300.0))
+                for lo, hi in cores]
+
+    quantile = members(plan_altitude_shells(radii, 4))
+    bounded_cores = plan_altitude_shells(radii, 4, halo_km=300.0)
+    bounded = members(bounded_cores)
+    assert [sum(lo <= r < hi for lo, hi in bounded_cores) for r in radii] == [1] * len(radii)
+    # Bandın halosu bölünemez: en kalabalık kabuk küçülmüyor, kabuk sayısı ve toplam tekrar azalır
+    assert max(bounded) <= 1.05 * max(quantile) and sum(bounded) < sum(quantile)
+    many = members(plan_altitude_shells(radii, 32, halo_km=300.0))
+    assert len(many) < 32 and max(many) <= max(bounded)
+
+
+def test_sharded_screening_matches_single_process(catalog_db):
+    from service.conjunction_service import ConjunctionService
+    catalog = catalog_db(800, seed=5)
+
+    service = ConjunctionService(max_workers=2)
+    try:
+        single = service.run_conjunction_screening(analysis_start_time=catalog.epoch, shards=1)
+        single_alerts = _alerts()
+        sharded = service.run_conjunction_screening(analysis_start_time=catalog.epoch, shards=4,
+                                                   use_cache=False)
+        assert 1 < sharded["shards"] <= 4
+        assert sharded["processed_pairs"] == single["processed_pairs"]
+        assert sharded["alerts_saved"] == single["alerts_saved"] > 0
+        assert _alerts() == single_alerts
+    finally:
+        if service._pool is not None:
+            service._pool.shutdown()
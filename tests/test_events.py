@@ -0,0 +1,85 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import asyncio
+import threading
+from backend.events import EventBroker, STREAM_SUBSCRIBERS
+
+
+async def _collect(agen, n, timeout=2.0):
+    items = []
+    async def run():
+        async for item in agen:
+            items.append(item)
+            if len(items) == n:
+                break
+    await asyncio.wait_for(run(), timeout)
+    await agen.aclose()
+    return items
+
+
+def test_event_published_from_thread_reaches_subscriber():
+    broker = EventBroker("test_thread")
+
+    async def main():
+        agen = broker.subscribe(heartbeat_s=5.0)
+        first = asyncio.ensure_future(agen.__anext__())
+        await asyncio.sleep(0.05)  # abone bekleme durumunda
+        assert STREAM_SUBSCRIBERS.value(stream="test_thread") == 1
+        threading.Thread(target=broker.publish, args=("alert", {"miss": 1.0})).start()
+        event = await asyncio.wait_for(first, 2.0)
+        await agen.aclose()
+        return event
+
+    event = asyncio.run(main())
+    assert event["event"] == "alert" and event["data"] == {"miss": 1.0}
+    assert STREAM_SUBSCRIBERS.value(stream="test_thread") == 0
+
+
+def test_reconnect_replays_missed_events():
+    broker = EventBroker("test_replay")
+    ids = [broker.publish("alert", {"n": i}) for i in range(5)]
+    events = asyncio.run(_collect(broker.subscribe(after_id=ids[1]), 3))
+    assert [e["id"] for e in events] == ids[2:]
+
+
+def test_buffer_overrun_yields_resync():
+    broker = EventBroker("test_overrun", buffer_size=3)
+    for i in range(10):
+        broker.publish("alert", {"n": i})
+    events = asyncio.run(_collect(broker.subscribe(after_id=2), 4))
+    assert events[0]["event"] == "resync"
+    assert [e["data"]["n"] for e in events[1:]] == [7, 8, 9]
+
+
+def test_idle_stream_sends_heartbeat():
+    broker = EventBroker("test_heartbeat")
+    events = asyncio.run(_collect(broker.subscribe(heartbeat_s=0.05), 1))
+    assert events == [None]
+
+
+def test_stale_event_id_after_restart_yields_resync():
+    old = EventBroker("test_restart_old")
+    old_ids = [old.format_id(old.publish("alert", {"n": i})) for i in range(500)]
+    broker = EventBroker("test_restart")
+    assert broker.epoch != old.epoch
+
+    # Önceki sürecin kimliği veya sayacın ilerisindeki sıra: resync, ardından yeni olaylar
+    for after in (old_ids[-1], 500, "bozuk"):
+        async def main():
+            agen = broker.subscribe(after_id=after, heartbeat_s=5.0)
+            first = await asyncio.wait_for(agen.__anext__(), 2.0)
+            start = broker.last_id
+            threading.Thread(target=lambda: [broker.publish("alert", {"n": i}) for i in range(3)]).start()
+            rest = await _collect(agen, 3)
+            return first, start, rest
+
+        first, start, rest = asyncio.run(main())
+        assert first["event"] == "resync" and first["data"] == {"reason": "restart"}
+        assert [e["id"] for e in rest] == [start + 1, start + 2, start + 3]
+
+    # Aynı sürecin kimliği kaçırılan olayları tekrar getirir
+    events = asyncio.run(_collect(broker.subscribe(after_id=broker.format_id(broker.last_id - 2)), 2))
+    assert [e["data"]["n"] for e in events] == [1, 2]
@@ -0,0 +1,48 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from processing.kepler import propagate_kepler, kepler_stm
+from planner.optimizer import solve_linear_min_dv
+
+R0 = np.array([6778.0, 100.0, 50.0])
+V0 = np.array([0.1, 7.6, 1.2])
+
+
+def test_kepler_conserves_energy_and_momentum():
+    r, v = propagate_kepler(R0, V0, np.array([600.0, 3600.0, 86400.0]))
+    mu = 398600.4418
+    e0 = V0 @ V0 / 2 - mu / np.linalg.norm(R0)
+    e = np.sum(v * v, axis=1) / 2 - mu / np.linalg.norm(r, axis=1)
+    h = np.cross(r, v)
+    assert np.allclose(e, e0, rtol=1e-11)
+    assert np.allclose(h, np.cross(R0, V0), rtol=1e-10)
+
+
+def test_stm_matches_finite_differences():
+    _, _, phi = kepler_stm(R0, V0, 3600.0)
+    assert abs(np.linalg.det(phi) - 1.0) < 1e-8  # iki cisim akışı hacim korur
+    h = 1e-7
+    for j in range(3):
+        dv = np.zeros(3)
+        dv[j] = h
+        rp, _ = propagate_kepler(R0, V0 + dv, 3600.0)
+        rm, _ = propagate_kepler(R0, V0 - dv, 3600.0)
+        assert np.allclose((rp - rm) / (2 * h), phi[:3, 3 + j], rtol=1e-5, atol=1e-3)
+
+
+def test_linear_min_dv_reaches_target_on_boundary():
+    rng = np.random.default_rng(7)
+    phi = rng.normal(size=(3, 3)) * 1000.0
+    rho0 = rng.normal(size=3) * 0.2
+    dv = solve_linear_min_dv(rho0, phi, 1.0)
+    assert abs(np.linalg.norm(rho0 + phi @ dv) - 1.0) < 1e-9
+
+    # Doğrudan çarpışmada çözüm en büyük tekil değer yönündedir: |dv| = d / s_max
+    dv_hit = solve_linear_min_dv(np.zeros(3), phi, 1.0)
+    assert np.isclose(np.linalg.norm(dv_hit), 1.0 / np.linalg.svd(phi)[1][0])
+
+    # Zaten güvenli mesafede ise manevra gerekmez
+    assert not np.any(solve_linear_min_dv(np.array([5.0, 0.0, 0.0]), phi, 1.0))
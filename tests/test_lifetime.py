@@ -0,0 +1,28 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from processing.lifetime import estimate_lifetime
+
+
+def test_lifetime_scaling_and_windows():
+    # ~400 km, ~330 km, ~330 km iki kat BSTAR, yörüngesi atmosfere girmiş, sürüklenme bilgisi yok
+    n = np.array([15.50, 15.90, 15.90, 15.50, 15.50])
+    ecc = np.array([4e-4, 4e-4, 4e-4, 0.2, 4e-4])
+    bstar = np.array([3e-4, 3e-4, 6e-4, 3e-4, 0.0])
+    est = estimate_lifetime(n, ecc, bstar, np.zeros(5))
+
+    life = est.lifetime_days
+    assert 200 < life[0] < 3000  # ISS benzeri yörünge, itki olmadan birkaç yıl
+    assert life[1] < life[0]
+    assert np.isclose(life[1] / life[2], 2.0)  # ömür balistik katsayı ile ters orantılı
+    assert life[3] == 0.0
+    assert np.isnan(life[4])
+    assert np.all(est.early_days[:3] < life[:3]) and np.all(est.late_days[:3] > life[:3])
+
+
+def test_ndot_fallback_when_bstar_unusable():
+    est = estimate_lifetime(np.array([15.9]), np.array([1e-3]), np.array([-1e-5]), np.array([2e-4]))
+    assert np.isfinite(est.lifetime_days[0]) and est.lifetime_days[0] > 0
@@ -0,0 +1,74 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json
+from datetime import datetime, timezone
+import numpy as np
+from fastapi.testclient import TestClient
+from processing.position_codec import PositionDecoder, FRAME_KEY
+
+
+def _next_frame(ws):
+    while True:
+        message = ws.receive()
+        if message.get("bytes"):
+            return message["bytes"]
+
+
+def _next_json(ws):
+    # Abonelik değişirken önceki aboneliğin yoldaki çerçeveleri gelebilir
+    while True:
+        message = ws.receive()
+        if message.get("text"):
+            return json.loads(message["text"])
+
+
+def test_subscribers_share_frames(catalog_db, monkeypatch):
+    monkeypatch.setenv("ASTM_PREWARM", "0")
+    import main
+    from service.live_position_service import live_position_service
+    monkeypatch.setattr(live_position_service, "rate_hz", 20.0)
+
+    with TestClient(main.app) as client:
+        epoch = datetime.now(timezone.utc).replace(microsecond=0)
+        catalog_db(200, epoch=epoch, n_planted=0)
+        with client.websocket_connect("/orbit/live") as ws_a, client.websocket_connect("/orbit/live") as ws_b:
+            ws_a.send_json({"subscribe": "all"})
+            assert _next_json(ws_a)["objects"] == "all"
+            dec_a = PositionDecoder()
+            for _ in range(2):
+                dec_a.feed(_next_frame(ws_a))
+
+            # Sonradan katılan istemci önce anahtar çerçeve, ardından diğeriyle aynı farkları alır
+            ws_b.send_json({"subscribe": "all"})
+            dec_b = PositionDecoder()
+            first_b = _next_frame(ws_b)
+            assert first_b[0] == FRAME_KEY
+            dec_b.feed(first_b)
+            frame_b = _next_frame(ws_b)
+            ids, lat_b, _, _ = dec_b.feed(frame_b)
+            frames_a = [_next_frame(ws_a) for _ in range(4)]
+            assert frame_b in frames_a
+            assert len(ids) == 200 and np.isfinite(lat_b).all()
+
+            ws_b.send_json({"subscribe": [1, 2, 10 ** 6]})
+            assert _next_json(ws_b)["objects"] == 3
+            frame = _next_frame(ws_b)
+            while frame[0] != FRAME_KEY:
+                frame = _next_frame(ws_b)
+            ids, lat, lon, alt = PositionDecoder().feed(frame)
+            assert list(ids) == [1, 2, 10 ** 6]
+            assert np.isfinite(lat[:2]).all() and np.isnan(lat[2])
+
+            ws_a.send_json({"subscribe": "nope"})
+            assert _next_json(ws_a)["type"] == "error"
+
+            # Bozuk JSON ve ikili mesaj hata çerçevesi döner, bağlantı ve abonelik sürer
+            ws_a.send_text("{bozuk")
+            assert _next_json(ws_a) == {"type": "error", "detail": "Geçersiz JSON mesajı"}
+            ws_a.send_bytes(b"\x00")
+            assert _next_json(ws_a)["type"] == "error"
+            ws_a.send_json({"subscribe": [1]})
+            assert _next_json(ws_a)["objects"] == 1
@@ -0,0 +1,80 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from processing.maneuver_detection import consecutive_pairs, evaluate_pairs, raan_rate_deg_day
+
+
+def _history(n_sets=10, step_days=1.0, n0=15.5, ndot_half=1e-4):
+    """ Doğal sönümleme ve J2 kaymasıyla üretilmiş tek nesne geçmişi. """
+    t = np.arange(n_sets) * step_days
+    incl = np.full(n_sets, 51.6)
+    ecc = np.full(n_sets, 0.0005)
+    n = n0 + 2 * ndot_half * t
+    raan = (100.0 + raan_rate_deg_day(n0, ecc[0], incl[0]) * t) % 360
+    return t, n, np.full(n_sets, ndot_half), incl, raan, ecc
+
+
+def _evaluate(t, n, ndot, incl, raan, ecc):
+    prev, nxt = consecutive_pairs(np.full(len(t), 25544), t)
+    return evaluate_pairs(prev, nxt, t, n, ndot, incl, raan, ecc)
+
+
+def test_natural_drift_not_flagged():
+    pairs = _evaluate(*_history())
+    assert len(pairs) == 9
+    assert not pairs.flagged.any()
+
+
+def test_altitude_and_plane_changes_flagged():
+    t, n, ndot, incl, raan, ecc = _history()
+    n[5:] -= 0.01  # ~ +3 km yükseltme manevrası
+    incl[8:] += 0.1  # düzlem değişikliği
+    pairs = _evaluate(t, n, ndot, incl, raan, ecc)
+
+    flagged = pairs.next_index[pairs.flagged]
+    assert list(flagged) == [5, 8]
+    assert pairs.components[pairs.next_index == 5][0] & 1
+    assert pairs.components[pairs.next_index == 8][0] & 2
+
+
+def test_duplicate_epochs_skipped():
+    norad = np.array([1, 1, 1, 2])
+    epochs = np.array([10.0, 10.0, 11.0, 10.0])
+    prev, nxt = consecutive_pairs(norad, epochs)
+    assert list(prev) == [0] and list(nxt) == [2]
+
+
+def test_incremental_detection_parses_only_new_rows(catalog_db, monkeypatch):
+    from datetime import timedelta
+    import backend.models.db as db
+    from benchmarks.synthetic_catalog import DEFAULT_EPOCH, generate_catalog
+    from ingest.tle_fetcher import save_tles
+    from service import ssa_service as ss
+
+    catalog_db(30, seed=1, n_planted=0)
+    assert ss.ssa_service.detect_maneuvers() == 0
+
+    parsed = []
+    real_parse = ss.parse_tle_arrays
+    with monkeypatch.context() as m:
+        m.setattr(ss, "parse_tle_arrays", lambda l1, l2: parsed.append(len(l1)) or real_parse(l1, l2))
+        m.setattr(ss.tle_service, "get_catalog_elements", lambda: None)
+
+        # Aynı nesnelerin bir ve iki gün sonraki setleri; ilk partide yalnızca 10 nesne güncellenir
+        later = [generate_catalog(30, seed=s, epoch=DEFAULT_EPOCH + timedelta(days=d), n_planted=0).tles
+                 for s, d in ((1, 1), (2, 2))]
+        save_tles(later[0][:10], source="test")
+        first = ss.ssa_service.detect_maneuvers()
+        save_tles(later[1], source="test")
+        second = ss.ssa_service.detect_maneuvers()
+        assert parsed == [20, 60] and first > 0 and second > 0
+
+    conn = db.get_conn()
+    query = "SELECT norad_id, sat_id, prev_sat_id, score FROM maneuver_events ORDER BY sat_id"
+    incremental = [tuple(r) for r in conn.execute(query).fetchall()]
+    assert ss.ssa_service.detect_maneuvers(full=True) == first + second
+    assert [tuple(r) for r in conn.execute(query).fetchall()] == incremental
+    conn.close()
@@ -0,0 +1,172 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from datetime import datetime, timedelta
+import numpy as np
+from sgp4.exporter import export_tle
+from planner.optimizer import linearize_burn, post_burn_ephemeris, state_at_burn
+from processing.breakup import fit_satrecs
+from processing.propagate_wrapper import propagate_satrec_single
+from processing.propagator import propagate_satrec_array
+
+
+def _planted_case(catalog_db):
+    """ Sentetik katalogdaki en yakın yakınlaşma ve iki cisim modelinin manevrasız mesafesinin üstünde hedef. """
+    import backend.models.db as db
+    from service.maneuver_service import BURN_LEAD_TIME_S
+    from service.tle_service import tle_service
+
+    catalog = catalog_db(60, seed=3, n_planted=3)
+    conn = db.get_conn()
+    ids = {int(r["line2"][2:7]): r["id"] for r in conn.execute("SELECT id, line2 FROM raw_tles").fetchall()}
+    conn.close()
+    p = min(catalog.planted, key=lambda x: x.miss_distance_km)
+    lin = linearize_burn(tle_service.get_satrec_by_id(ids[p.norad_b]), tle_service.get_satrec_by_id(ids[p.norad_a]),
+                         p.tca - timedelta(seconds=BURN_LEAD_TIME_S), p.tca, propagate_satrec_single)
+    return ids[p.norad_a], ids[p.norad_b], p.tca, float(np.linalg.norm(lin.rho0_km)) + 2.0
+
+
+def test_rescreen_reports_conjunction_created_by_burn(catalog_db):
+    from ingest.tle_fetcher import save_tles
+    from service.maneuver_service import maneuver_service
+    from service.tle_service import tle_service
+
+    primary, secondary, tca, target = _planted_case(catalog_db)
+    plan = maneuver_service.calculate_avoidance_maneuver(primary, secondary, tca, target_miss_km=target,
+                                                         rescreen=False)
+    assert plan["success"] and plan["dv_magnitude_m_s"] > 0 and plan["rescreen_status"] == "skipped"
+
+    # Manevra sonrası yörüngenin 3 saat sonra geçeceği noktanın 0.5 km yanından kesişen bir nesne
+    sat = tle_service.get_satrec_by_id(primary)
+    burn_time = tca - timedelta(hours=1)
+    t_meet = burn_time + timedelta(hours=3, seconds=17)
+    offsets = np.array([(t_meet - burn_time).total_seconds()])
+    r_nom, v_nom, _ = propagate_satrec_array([sat], [t_meet])
+    r_b, v_b = state_at_burn(sat, burn_time, propagate_satrec_single)
+    r_post, v_post = post_burn_ephemeris(r_nom[0], v_nom[0], offsets, r_b, v_b,
+                                         np.array(plan["dv_vector_m_s"]) / 1000.0)
+    radial = r_post[0] / np.linalg.norm(r_post[0])
+    angle = np.radians(60.0)  # yörünge düzlemine 60 derece açıyla kesişen hız
+    along = v_post[0] - radial * (radial @ v_post[0])
+    v_cross = along * np.cos(angle) + np.cross(radial, along) * np.sin(angle)
+    planted, _ = fit_satrecs((r_post[0] + 0.5 * radial)[None], v_cross[None], t_meet, np.array([1e-5]), 90000)
+    line1, line2 = export_tle(planted[0])
+    save_tles([("PLANTED", line1, line2)], source="test")
+
+    plan = maneuver_service.calculate_avoidance_maneuver(primary, secondary, tca, target_miss_km=target)
+    assert plan["rescreen_status"] == "completed" and plan["rescreen_error"] is None
+    found = [c for c in plan["new_conjunctions"] if c["sat_name"] == "PLANTED"]
+    assert len(found) == 1
+    assert abs(found[0]["miss_distance_km"] - 0.5) < 0.05
+    assert abs((datetime.fromisoformat(found[0]["tca"]) - t_meet).total_seconds()) < 2.0
+
+
+def test_rescreen_failure_and_failed_plan_do_not_break_response(catalog_db, monkeypatch):
+    from service import maneuver_service as ms
+
+    primary, secondary, tca, target = _planted_case(catalog_db)
+
+    def broken(*args, **kwargs):
+        raise RuntimeError("katalog okunamadı")
+
+    monkeypatch.setattr(ms.maneuver_service, "rescreen_post_burn", broken)
+    plan = ms.maneuver_service.calculate_avoidance_maneuver(primary, secondary, tca, target_miss_km=target)
+    assert plan["success"] and plan["dv_magnitude_m_s"] > 0
+    assert plan["rescreen_status"] == "failed" and plan["rescreen_error"] == "katalog okunamadı"
+
+    # Başarısız önerinin yörüngesi taranmaz
+    real = ms.find_minimal_dv
+
+    def unsuccessful(*args, **kwargs):
+        proposal = real(*args, **kwargs)
+        proposal.success = False
+        return proposal
+
+    monkeypatch.setattr(ms, "find_minimal_dv", unsuccessful)
+    plan = ms.maneuver_service.calculate_avoidance_maneuver(primary, secondary, tca, target_miss_km=target)
+    assert not plan["success"] and plan["rescreen_status"] == "skipped"
+
+
+def test_robustness_matches_per_sample_simulation_and_endpoint(catalog_db, monkeypatch):
+    monkeypatch.setenv("ASTM_PREWARM", "0")
+    import main
+    from fastapi.testclient import TestClient
+    from planner.optimizer import compute_miss_distances_after_burns, sample_burn_errors
+    from service.maneuver_service import maneuver_service
+    from service.tle_service import tle_service
+
+    primary, secondary, tca, target = _planted_case(catalog_db)
+    plan = maneuver_service.calculate_avoidance_maneuver(primary, secondary, tca, target_miss_km=target,
+                                                         rescreen=False)
+    result = maneuver_service.assess_burn_robustness(primary, secondary, tca, plan["dv_vector_m_s"],
+                                                     target_miss_km=target, n_samples=400, seed=7)
+
+    # Tek çağrıdaki toplu sonuç, nominal ve hatalı örneklerin ayrı ayrı simülasyonuyla aynı olmalı
+    sat1, sat2 = tle_service.get_satrec_by_id(primary), tle_service.get_satrec_by_id(secondary)
+    burn_time = tca - timedelta(hours=1)
+    dv = np.array(plan["dv_vector_m_s"]) / 1000.0
+    nominal, _ = compute_miss_distances_after_burns(sat2, sat1, burn_time, dv, tca, propagate_satrec_single)
+    mag, pointing = sample_burn_errors(400, 0.02, np.radians(1.0), seed=7)
+    miss, rel_vel = compute_miss_distances_after_burns(sat2, sat1, burn_time, dv, tca, propagate_satrec_single,
+                                                       mag, pointing)
+    assert abs(result["nominal_miss_km"] - nominal[0]) < 1e-9
+    assert abs(result["nominal_miss_km"] - plan["predicted_miss_km"]) < 0.05
+    assert abs(result["miss_at_confidence_km"] - np.quantile(miss[0], 0.01)) < 1e-9
+    assert abs(result["rel_velocity_mean_km_s"] - np.mean(rel_vel)) < 1e-9
+    assert 0.0 < result["probability_below_target"] < 1.0
+
+    with TestClient(main.app) as client:
+        body = {"sat_id_primary": primary, "sat_id_secondary": secondary, "tca": tca.isoformat(),
+                "dv_vector_m_s": plan["dv_vector_m_s"], "target_miss_km": target, "n_samples": 400, "seed": 7}
+        response = client.post("/maneuver/robustness", json=body)
+        assert response.status_code == 200 and response.json()["n_samples"] == 400
+        assert response.json()["miss_percentiles_km"] == result["miss_percentiles_km"]
+        assert client.post("/maneuver/robustness", json={**body, "dv_vector_m_s": [1.0, 0.0]}).status_code == 422
+        assert client.post("/maneuver/robustness", json={**body, "confidence": 1.0}).status_code == 422
+        assert client.post("/maneuver/robustness", json={**body, "sat_id_primary": 10 ** 9}).status_code == 404
+
+
+def test_batch_plan_cache_follows_tle_changes(catalog_db, monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+    import backend.models.db as db
+    from ingest.tle_fetcher import save_tles
+    from service import maneuver_service as ms
+
+    primary, secondary, tca, _ = _planted_case(catalog_db)
+    conn = db.get_conn()
+    with conn:
+        alert_id = conn.execute("INSERT INTO conjunction_alerts (sat1_id, sat2_id, tca, score, event_type) "
+                                "VALUES (?, ?, ?, 1.0, 'COLLISION')", (primary, secondary, tca.isoformat())).lastrowid
+
+    # Havuz yerine iş parçacığı; planlar hesaplama sayacı döner
+    calls = []
+    monkeypatch.setattr(ms.maneuver_service, "_get_pool", lambda: ThreadPoolExecutor(1))
+    monkeypatch.setattr(ms.maneuver_service, "calculate_avoidance_maneuver",
+                        lambda **kwargs: calls.append(kwargs) or {"plan": len(calls)})
+
+    def plan(rescreen=False):
+        [item] = ms.maneuver_service.plan_batch(alert_ids=[alert_id], rescreen=rescreen)
+        return item["cached"], item["result"]["plan"]
+
+    stored = lambda: conn.execute("SELECT COUNT(*) FROM maneuver_plans WHERE alert_id = ?", (alert_id,)).fetchone()[0]
+    line1, line2 = conn.execute("SELECT line1, line2 FROM raw_tles WHERE id = ?", (primary,)).fetchone()
+    assert plan() == (False, 1) and plan() == (True, 1)
+
+    # Yeni ingest yalnızca yeniden taramalı planı geçersiz kılar
+    save_tles([("NEW", line1, line2)], source="test")
+    assert plan() == (True, 1)
+    assert plan(rescreen=True) == (False, 2) and plan(rescreen=True) == (True, 2)
+    save_tles([("NEW", line1, line2)], source="test")
+    assert plan(rescreen=True) == (False, 3)
+
+    # Alarm başına yalnızca son plan saklanır, farklı parametreli istek öncekinin yerini alır
+    assert stored() == 1 and plan() == (False, 4) and stored() == 1
+
+    # Alarmın işaret ettiği TLE satırı değişirse (ör. yeniden kurulan veritabanı) plan yeniden hesaplanır
+    _, other = conn.execute("SELECT line1, line2 FROM raw_tles WHERE id NOT IN (?, ?)", (primary, secondary)).fetchone()
+    with conn:
+        conn.execute("UPDATE raw_tles SET line2 = ? WHERE id = ?", (other, secondary))
+    assert plan() == (False, 5) and plan() == (True, 5) and stored() == 1
+    conn.close()
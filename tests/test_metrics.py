@@ -0,0 +1,41 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from concurrent.futures import Future
+from backend.metrics import MetricsRegistry, StageTimer, track_pool_task, POOL_QUEUE_DEPTH
+
+
+def test_histogram_exposition_is_cumulative():
+    registry = MetricsRegistry()
+    h = registry.histogram("job_seconds", "test", ("stage",), buckets=(0.1, 1.0))
+    for v in (0.05, 0.5, 0.7, 3.0):
+        h.observe(v, stage="load")
+
+    text = registry.render()
+    assert '# TYPE job_seconds histogram' in text
+    assert 'job_seconds_bucket{stage="load",le="0.1"} 1' in text
+    assert 'job_seconds_bucket{stage="load",le="1.0"} 3' in text
+    assert 'job_seconds_bucket{stage="load",le="+Inf"} 4' in text
+    assert 'job_seconds_count{stage="load"} 4' in text
+
+
+def test_stage_timer_accumulates_repeated_stages():
+    registry = MetricsRegistry()
+    h = registry.histogram("stage_seconds", "test", ("stage",))
+    timer = StageTimer(h)
+    for _ in range(3):
+        with timer.stage("refinement"):
+            pass
+    timings = timer.publish()
+    assert set(timings) == {"refinement"}
+    assert h.count(stage="refinement") == 1  # tekrarlar tek gözlem olarak yazılır
+
+
+def test_pool_queue_depth_tracks_unfinished_tasks():
+    futures = [track_pool_task("test_pool", Future()) for _ in range(3)]
+    assert POOL_QUEUE_DEPTH.value(pool="test_pool") == 3
+    futures[0].set_result(1)
+    futures[1].cancel()
+    assert POOL_QUEUE_DEPTH.value(pool="test_pool") == 1
@@ -0,0 +1,59 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pytest
+from service.model_registry import ModelRegistry
+
+
+def _models(scale):
+    # Gerçek modeller yerine yüklenip karşılaştırılabilen diziler yeterli
+    return tuple(np.full(4, scale * k, dtype=float) for k in range(1, 6))
+
+
+def test_publish_activate_and_switch(tmp_path):
+    registry = ModelRegistry(tmp_path / "models", legacy_path=tmp_path / "none.joblib")
+    assert registry.get_active() is None
+
+    v1 = registry.publish(_models(1.0), {"metrics": {"accuracy": 0.5}})
+    held = registry.get_active()  # devam eden bir isteğin elindeki paket
+    v2 = registry.publish(_models(2.0), {"metrics": {"accuracy": 0.7}})
+
+    assert registry.get_active().version == v2
+    assert held.version == v1 and np.allclose(held.model, 1.0)
+    assert [m["active"] for m in registry.list_versions()] == [True, False]
+
+    # Yeni bir süreç etkin sürümü diskten bulur
+    fresh = ModelRegistry(tmp_path / "models")
+    assert fresh.get_active_version_name() == v2
+    assert np.allclose(fresh.get_active().kmeans, 8.0)
+
+    registry.activate(v1)
+    assert registry.get_active().version == v1
+    assert registry.get_metadata(v1)["metrics"]["accuracy"] == 0.5
+
+
+def test_activate_rejects_paths_outside_registry(tmp_path, monkeypatch):
+    import joblib
+    registry = ModelRegistry(tmp_path / "models", legacy_path=tmp_path / "none.joblib")
+    v1 = registry.publish(_models(1.0), {})
+
+    # Registry dışındaki bir model dosyası sürüm adı üzerinden yüklenmez
+    (tmp_path / "outside").mkdir()
+    joblib.dump(_models(9.0), tmp_path / "outside" / "model.joblib")
+    for version in ("../outside", "..", "/" + str(tmp_path / "outside"), v1 + "/.."):
+        with pytest.raises(ValueError):
+            registry.activate(version)
+        assert registry.get_metadata(version) is None
+    assert registry.get_active().version == v1
+
+    monkeypatch.setenv("ASTM_PREWARM", "0")
+    import main
+    from fastapi.testclient import TestClient
+    from service.ssa_service import ssa_service
+    monkeypatch.setattr(ssa_service, "registry", registry)
+    with TestClient(main.app) as client:
+        assert client.post("/ssa/models/..%2Foutside/activate").status_code == 404
+        assert client.post(f"/ssa/models/{v1}/activate").json() == {"active_version": v1}
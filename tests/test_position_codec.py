@@ -0,0 +1,64 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from processing.position_codec import (quantize, dequantize, encode_keyframe, encode_delta, PositionDecoder,
+                                       FRAME_KEY, FRAME_DELTA8, FRAME_DELTA16, HEADER)
+
+
+def _positions(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(-89, 89, n), rng.uniform(0, 360, n), rng.uniform(200, 36000, n)
+
+
+def test_quantization_error_is_bounded():
+    lat, lon, alt = _positions(1000)
+    lat2, lon2, alt2 = dequantize(quantize(lat, lon, alt))
+    assert np.abs(lat2 - lat).max() < 0.0015
+    assert np.abs((lon2 - lon + 180) % 360 - 180).max() < 0.003
+    assert np.abs(alt2 - alt).max() <= 0.5
+
+
+def test_delta_stream_matches_keyframes_without_drift():
+    lat, lon, alt = _positions(500)
+    ids = np.arange(500) + 100
+    invalid = np.zeros(500, dtype=bool)
+    invalid[7] = True
+    q = quantize(lat, lon, alt, ~invalid)
+    decoder = PositionDecoder()
+    decoder.feed(encode_keyframe(0, 0.0, ids, q))
+
+    for step in range(1, 30):
+        # Küçük hareket + boylamda 360 -> 0 geçişi + birkaç büyük sıçrama (kaçış kodu)
+        lon = (lon + 0.07) % 360
+        lat = np.clip(lat + 0.05 * np.sin(step + np.arange(500)), -89, 89)
+        lon[step] = (lon[step] + 90) % 360
+        new_q = quantize(lat, lon, alt, ~invalid)
+        frame = encode_delta(step, float(step), q, new_q)
+        assert frame[0] == FRAME_DELTA8
+        got_ids, *_ = decoder.feed(frame)
+        assert np.array_equal(decoder.q, new_q)
+        q = new_q
+
+    assert np.array_equal(got_ids, ids)
+    assert len(frame) < HEADER.size + 3 * 500 + 16  # ~3 bayt/nesne
+    assert np.isnan(dequantize(decoder.q)[0][7])
+
+
+def test_large_deltas_fall_back_to_int16_and_validity_change_needs_keyframe():
+    lat, lon, alt = _positions(100)
+    q = quantize(lat, lon, alt)
+    far = quantize(-lat, (lon + 180) % 360, alt)
+    decoder = PositionDecoder()
+    decoder.feed(encode_keyframe(0, 0.0, np.arange(100), q))
+    frame = encode_delta(1, 1.0, q, far)
+    assert frame[0] == FRAME_DELTA16
+    decoder.feed(frame)
+    assert np.array_equal(decoder.q, far)
+
+    valid = np.ones(100, dtype=bool)
+    valid[3] = False
+    assert encode_delta(2, 2.0, far, quantize(-lat, (lon + 180) % 360, alt, valid)) is None
+    assert encode_keyframe(2, 2.0, np.arange(100), far)[0] == FRAME_KEY
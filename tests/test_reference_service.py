@@ -0,0 +1,54 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from service.reference_service import ReferenceService
+
+HEADER = "Name of Satellite, Alternate Names;Country of Operator/Owner;Operator/Owner;Purpose;NORAD Number;" \
+         "Launch Mass (kg.);Inclination (degrees);Eccentricity;Period (minutes);Perigee (km);Apogee (km)\n"
+
+
+def _write(path, rows):
+    path.write_text(HEADER + "".join(";".join(r) + "\n" for r in rows), encoding="latin-1")
+
+
+def test_csv_parsed_once_and_reloaded_on_change(catalog_db, tmp_path, monkeypatch):
+    csv_path = tmp_path / "ucs.csv"
+    _write(csv_path, [("ISS (Zarya)", "Multinational", "NASA", "Space Science", "25544", '"1,200"',
+                       "51.6", "0.0004", "92.7", "408", "418"),
+                      ("Sentinel-2A", "ESA", "ESA", "Earth Observation", "40697", "1130", "98.6", "0.0001",
+                       "100.6", "786", "786")])
+    service = ReferenceService(csv_path=csv_path)
+    reads = []
+    real_read = service._read_csv
+    monkeypatch.setattr(service, "_read_csv", lambda: reads.append(1) or real_read())
+
+    assert service.ensure_loaded() and len(reads) == 1
+    assert service.lookup(25544) == {"norad_id": 25544, "name": "ISS (Zarya)", "country": "Multinational",
+                                     "operator": "NASA", "purpose": "Space Science", "launch_mass_kg": 1200.0}
+    assert service.get_country_map() == {25544: "Multinational", 40697: "ESA"}
+    assert set(service.lookup_many([40697, 99999])) == {40697}
+    frame = service.get_training_frame()
+    assert list(frame["Purpose"]) == ["Space Science", "Earth Observation"] and frame["Perigee"][1] == 786
+
+    # Dokunulmuş ama aynı içerikli dosya ve yeni bir süreç (boş bellek) CSV'yi yeniden ayrıştırmaz
+    os.utime(csv_path, ns=(1, 1))
+    assert service.ensure_loaded() and len(reads) == 1
+    fresh = ReferenceService(csv_path=csv_path)
+    monkeypatch.setattr(fresh, "_read_csv", lambda: reads.append(1) or real_read())
+    assert fresh.lookup(40697)["country"] == "ESA" and len(reads) == 1
+
+    # İçerik değişince tablo ve bellekteki sözlük yenilenir
+    _write(csv_path, [("Sentinel-2A", "European Space Agency", "ESA", "Earth Observation", "40697", "1130",
+                       "98.6", "0.0001", "100.6", "786", "786")])
+    assert service.lookup(40697)["country"] == "European Space Agency" and len(reads) == 2
+    assert service.lookup(25544) is None
+    # Tabloyu başka bir süreç yeniden yükledi: bu süreç CSV'yi okumadan yeni kayıtları görür
+    assert fresh.lookup(40697)["country"] == "European Space Agency" and len(reads) == 2
+    assert fresh.lookup(25544) is None
+
+    # Dosya silinse de daha önce yüklenen veri kullanılır
+    csv_path.unlink()
+    assert fresh.ensure_loaded()
+    assert ReferenceService(csv_path=tmp_path / "yok.csv").get_training_frame() is not None
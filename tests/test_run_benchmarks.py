@@ -0,0 +1,23 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.run_benchmarks import compare
+
+
+def _result(**stages):
+    return {"stages": {name: {"seconds": s} for name, s in stages.items()}, "peak_rss_mb": 100.0}
+
+
+def test_compare_reports_slower_missing_and_failed_sizes():
+    base = {"results": {"1000": _result(ingest=1.0, screening=2.0), "5000": _result(ingest=3.0),
+                        "20000": {"error": "MemoryError"}}}
+    new = {"results": {"1000": _result(ingest=1.5), "5000": {"error": "MemoryError"}, "20000": _result(ingest=1.0)}}
+    rows, regressions = compare(base, new, threshold=0.25, min_seconds=0.05, min_mb=25.0)
+
+    flagged = {(r["size"], r["metric"]) for r in regressions}
+    assert flagged == {(1000, "ingest.seconds"), (1000, "screening.seconds"), (5000, "*")}
+    assert next(r for r in regressions if r["size"] == 5000)["missing"] == "MemoryError"
+    # Temelde hatalı boyut karşılaştırılamaz
+    assert all(r["size"] != 20000 for r in rows)
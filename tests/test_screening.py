@@ -0,0 +1,66 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from datetime import datetime, timedelta, timezone
+import numpy as np
+from processing.screening import radial_band_filter, find_close_samples, screen_runs, screen_trajectories
+
+START = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def _linear(r0, v, n_steps, step_s):
+    t = np.arange(n_steps) * step_s
+    return np.asarray(r0) + t[:, None] * np.asarray(v), np.broadcast_to(np.asarray(v, dtype=float), (n_steps, 3))
+
+
+def test_radial_band_filter_and_close_samples():
+    perigee = np.array([300.0, 540.0, 560.0, 900.0])
+    apogee = np.array([320.0, 545.0, 800.0, 950.0])
+    assert radial_band_filter(perigee, apogee, 550.0, 555.0, 10.0).tolist() == [False, True, True, False]
+
+    query = np.zeros((1, 3, 3))
+    catalog = np.array([[[5.0, 0, 0]] * 3, [[50.0, 0, 0]] * 3])
+    catalog[0, 2] = [100.0, 0, 0]
+    w, n, k = find_close_samples(query, catalog, 10.0)
+    assert (w.tolist(), n.tolist(), k.tolist()) == ([0, 0], [0, 0], [0, 1])
+
+
+def test_screen_trajectories_finds_tca_between_samples():
+    # Doğrusal harekette Hermite modeli kesindir: TCA ve mesafe analitik değerle aynı olmalı
+    step_s, n_steps = 60.0, 20
+    q_r, q_v = _linear([7000.0, 0, 0], [0, 7.5, 0], n_steps, step_s)
+    t_ca, miss = 437.0, 0.8
+    v_c = np.array([0, 0, 7.5])
+    r_c0 = q_r[0] + np.array([miss, 0, 0]) + q_v[0] * t_ca - v_c * t_ca
+    c_r, c_v = _linear(r_c0, v_c, n_steps, step_s)
+    far_r, far_v = _linear([7000.0, 0, 500.0], [0, 7.5, 0], n_steps, step_s)
+
+    approaches = screen_trajectories(q_r[None], q_v[None], np.stack([far_r, c_r]), np.stack([far_v, c_v]),
+                                     START, step_s, threshold_km=5.0)
+    assert len(approaches) == 1
+    a = approaches[0]
+    assert a.catalog_index == 1 and a.query_index == 0
+    assert abs((a.tca - START).total_seconds() - t_ca) < 1e-6
+    assert abs(a.miss_distance_km - miss) < 1e-9
+    assert abs(a.rel_velocity_km_s - np.hypot(7.5, 7.5)) < 1e-9
+
+
+def test_screen_runs_reports_only_local_minima():
+    step_s, v = 60.0, np.array([0, 7.5, 0])
+
+    def run(steps, t_ca, miss=1.0):
+        t = np.asarray(steps) * step_s - t_ca
+        return np.array([miss, 0, 0]) + t[:, None] * v, np.broadcast_to(v, (len(steps), 3))
+
+    # 0: TCA içeride; 1: TCA parçanın dışında (uçtaki minimum sayılmaz); 2: TCA ızgaranın bitiminden sonra
+    parts = [(range(0, 10), 4.3 * step_s), (range(0, 5), 7.0 * step_s), (range(5, 10), 12.0 * step_s)]
+    rel_r, rel_v = (np.concatenate(x) for x in zip(*(run(steps, t_ca) for steps, t_ca in parts)))
+    runs, tca_step, miss, rel_vel = screen_runs(rel_r, rel_v, np.repeat([0, 1, 2], [10, 5, 5]),
+                                                np.concatenate([np.arange(10), np.arange(5), np.arange(5, 10)]),
+                                                step_s, threshold_km=5000.0, last_step=9)
+    assert runs.tolist() == [0, 2]
+    assert abs(tca_step[0] - 4.3) < 1e-9 and abs(miss[0] - 1.0) < 1e-9
+    assert tca_step[1] == 9.0 and abs(miss[1] - np.hypot(1.0, 3 * step_s * 7.5)) < 1e-9
+    assert np.allclose(rel_vel, 7.5)
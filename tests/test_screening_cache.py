@@ -0,0 +1,121 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from datetime import timedelta
+import pytest
+import backend.models.db as db
+
+
+def _active_alerts():
+    conn = db.get_conn()
+    rows = conn.execute("SELECT id, run_id, tca, miss_distance_km FROM conjunction_alerts ORDER BY id").fetchall()
+    conn.close()
+    return [tuple(r) for r in rows]
+
+
+def test_repeat_screening_is_served_from_stored_run(catalog_db, monkeypatch):
+    from service import conjunction_service as cs
+    catalog = catalog_db(400, seed=2)
+    service = cs.ConjunctionService(max_workers=1)
+
+    first = service.run_conjunction_screening(analysis_start_time=catalog.epoch)
+    assert not first["cached"] and first["alerts_saved"] > 0
+    alerts = _active_alerts()
+    assert {a[1] for a in alerts} == {first["run_id"]}
+
+    # Aynı zaman dilimi: hesaplama yapılmaz, aynı alarmlar (aynı id'lerle) güncel kalır
+    repeat = service.run_conjunction_screening(analysis_start_time=catalog.epoch + timedelta(minutes=3))
+    assert repeat["cached"] and repeat["run_id"] == first["run_id"]
+    assert repeat["alerts_saved"] == first["alerts_saved"]
+    assert _active_alerts() == alerts
+
+    # Yeni dilim: önceki alarmlar silinmez, arşive taşınır; eski dilim tekrar istenirse geri gelir
+    later = service.run_conjunction_screening(analysis_start_time=catalog.epoch + timedelta(hours=1))
+    assert not later["cached"] and later["run_id"] != first["run_id"]
+    conn = db.get_conn()
+    archived = conn.execute("SELECT COUNT(*) FROM conjunction_alerts_archive WHERE run_id = ?",
+                            (first["run_id"],)).fetchone()[0]
+    conn.close()
+    assert archived == len(alerts)
+    assert service.run_conjunction_screening(analysis_start_time=catalog.epoch)["cached"]
+    assert _active_alerts() == alerts
+
+    # Zorla yeniden hesaplama aynı anahtarın eski taramasının yerini alır
+    forced = service.run_conjunction_screening(analysis_start_time=catalog.epoch, use_cache=False)
+    assert not forced["cached"] and forced["alerts_saved"] == first["alerts_saved"]
+    assert [a[2:] for a in _active_alerts()] == [a[2:] for a in alerts]
+
+    # Saklama politikası: en son N tarama tutulur
+    monkeypatch.setattr(cs, "SCREENING_RUN_RETENTION", 1)
+    service.run_conjunction_screening(analysis_start_time=catalog.epoch + timedelta(hours=2))
+    conn = db.get_conn()
+    assert conn.execute("SELECT COUNT(*) FROM screening_runs").fetchone()[0] == 1
+    assert conn.execute("SELECT COUNT(*) FROM conjunction_alerts_archive").fetchone()[0] == 0
+    conn.close()
+
+
+def test_provisional_alerts_are_streamed_during_run(catalog_db, monkeypatch):
+    from service import conjunction_service as cs
+    catalog = catalog_db(400, seed=2)
+    service = cs.ConjunctionService(max_workers=1)
+
+    # Alarm, tarama commit edilmeden, üretildiği anda ve taramanın run_id'siyle yayınlanır
+    events = []
+
+    def publish(event_type, data):
+        if event_type == "alert":
+            conn = db.get_conn()
+            committed = conn.execute("SELECT COUNT(*) FROM conjunction_alerts WHERE id = ?",
+                                     (data["id"],)).fetchone()[0]
+            conn.close()
+            assert committed == 0 and data["provisional"]
+        events.append((event_type, data))
+
+    monkeypatch.setattr(cs.alert_broker, "publish", publish)
+    result = service.run_conjunction_screening(analysis_start_time=catalog.epoch)
+    alerts = [d for e, d in events if e == "alert"]
+    assert [e for e, _ in events][-1] == "screening_completed" and len(alerts) == result["alerts_saved"] > 0
+    assert {d["run_id"] for d in alerts} == {result["run_id"]}
+    assert [d["id"] for d in alerts] == [a[0] for a in _active_alerts()]
+
+    # Başarısız taramanın yayınlanan alarmları kaydedilmez; screening_failed bunları geçersiz kılar
+    def broken(cur, saved):
+        raise RuntimeError("Pc hesaplanamadı")
+
+    events.clear()
+    monkeypatch.setattr(service, "_store_collision_probabilities", broken)
+    with pytest.raises(RuntimeError):
+        service.run_conjunction_screening(analysis_start_time=catalog.epoch + timedelta(hours=1))
+    failed = [d for e, d in events if e == "alert"]
+    assert failed and [e for e, _ in events][-1] == "screening_failed"
+    assert {d["run_id"] for d in failed} != {result["run_id"]}
+    assert [a[1] for a in _active_alerts()] == [result["run_id"]] * len(alerts)
+
+
+def test_failed_run_keeps_previous_alerts_active(catalog_db, monkeypatch):
+    from service import conjunction_service as cs
+    catalog = catalog_db(400, seed=2)
+    service = cs.ConjunctionService(max_workers=1)
+    first = service.run_conjunction_screening(analysis_start_time=catalog.epoch)
+    alerts = _active_alerts()
+
+    def broken(cur, saved):
+        raise RuntimeError("Pc hesaplanamadı")
+
+    with monkeypatch.context() as m:
+        m.setattr(service, "_store_collision_probabilities", broken)
+        for start, use_cache in ((catalog.epoch + timedelta(hours=1), True), (catalog.epoch, False)):
+            with pytest.raises(RuntimeError):
+                service.run_conjunction_screening(analysis_start_time=start, use_cache=use_cache)
+            # Kısmi alarmlar kaydedilmez, önceki tarama (zorla yeniden hesaplananınki dahil) güncel kalır
+            assert _active_alerts() == alerts
+    conn = db.get_conn()
+    statuses = conn.execute("SELECT id, status FROM screening_runs ORDER BY id").fetchall()
+    assert conn.execute("SELECT COUNT(*) FROM conjunction_alerts_archive").fetchone()[0] == 0
+    conn.close()
+    assert [tuple(r) for r in statuses][0] == (first["run_id"], "completed")
+    assert [r["status"] for r in statuses[1:]] == ["failed", "failed"]
+
+    assert service.run_conjunction_screening(analysis_start_time=catalog.epoch)["cached"]
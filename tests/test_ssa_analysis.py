@@ -0,0 +1,162 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import backend.models.db as db
+from benchmarks.synthetic_catalog import generate_catalog
+from processing.tle_arrays import parse_tle_arrays
+from service.model_registry import ModelRegistry
+
+
+def _publish_models(registry):
+    # Gerçek UCS verisi yerine sentetik özelliklerle küçük modeller
+    from sklearn.cluster import KMeans
+    from sklearn.ensemble import IsolationForest, RandomForestClassifier
+    from sklearn.preprocessing import LabelEncoder, StandardScaler
+    import pandas as pd
+
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.uniform([0, 0, 90, 300, 300], [100, 0.1, 120, 1500, 1500], size=(60, 5)),
+                     columns=['Inclination', 'Eccentricity', 'Period_minutes', 'Perigee', 'Apogee'])
+    le = LabelEncoder()
+    y = le.fit_transform(np.where(X['Inclination'] > 50, "Earth Observation", "Communications"))
+    scaler = StandardScaler().fit(X)
+    models = (RandomForestClassifier(n_estimators=5, random_state=0).fit(X, y), le, scaler,
+              KMeans(n_clusters=2, n_init=1, random_state=0).fit(scaler.transform(X)),
+              IsolationForest(n_estimators=5, random_state=0).fit(scaler.transform(X)))
+    return registry.publish(models, {"metrics": {}})
+
+
+def test_catalog_cache_follows_database_content(tmp_path, monkeypatch):
+    from ingest.tle_fetcher import save_tles
+    from service.tle_service import tle_service
+
+    snapshots = []
+    for seed in (2, 3):
+        monkeypatch.setattr(db, "DB_PATH", tmp_path / f"catalog_{seed}.db")
+        db.init_db()
+        save_tles(generate_catalog(30, seed=seed, n_planted=0).tles, source="test")
+        snapshots.append((tle_service.get_catalog(), tle_service.get_catalog_elements()))
+
+    # Aynı satır sayısı ve id'ler, farklı içerik: önbellek yeniden kurulmalı
+    (cat_a, el_a), (cat_b, el_b) = snapshots
+    assert len(cat_a) == len(cat_b) and cat_a.version != cat_b.version
+    assert not np.array_equal(cat_a.perigee_km, cat_b.perigee_km)
+    assert not np.array_equal(el_a.elements.mean_motion_rev_day, el_b.elements.mean_motion_rev_day)
+    assert tle_service.get_catalog() is cat_b
+
+    # Aynı yolda yeniden oluşturulan veritabanı
+    (tmp_path / "catalog_3.db").unlink()
+    db.init_db()
+    save_tles(generate_catalog(30, seed=4, n_planted=0).tles, source="test")
+    assert tle_service.get_catalog().version != cat_b.version
+
+    tle_service.reset_caches()
+    assert tle_service.get_catalog() is not cat_b
+
+
+def test_analysis_scores_only_changed_rows(catalog_db, tmp_path, monkeypatch):
+    from ingest.tle_fetcher import save_tles
+    from service.reference_service import reference_service
+    from service.ssa_service import ssa_service
+
+    registry = ModelRegistry(tmp_path / "models", legacy_path=tmp_path / "none.joblib")
+    _publish_models(registry)
+    monkeypatch.setattr(ssa_service, "registry", registry)
+    monkeypatch.setattr(reference_service, "get_country_map", lambda: {})
+
+    tles = generate_catalog(20, seed=1, n_planted=0).tles
+    save_tles(tles + [("BOZUK", "1 bozuk satır", "2 bozuk satır")], source="test")
+    assert ssa_service.analyze_all_satellites() == 21
+    assert ssa_service.last_analysis == {"pending": 21, "reused": 0, "scored": 20, "invalid": 1}
+
+    # Geçersiz satır tahminsiz kaydedildi ve sonraki çalıştırmada yeniden seçilmez
+    assert ssa_service.analyze_all_satellites() == 0
+    assert ssa_service.last_analysis["pending"] == 0
+
+    # Değişmeden yeniden çekilen eleman setleri kopyalanır, yalnızca yeni set skorlanır
+    changed = generate_catalog(1, seed=9, n_planted=0).tles
+    save_tles(tles[:5] + changed, source="test")
+    assert ssa_service.analyze_all_satellites() == 6
+    assert ssa_service.last_analysis == {"pending": 6, "reused": 5, "scored": 1, "invalid": 0}
+
+    # Yeni model sürümü tüm satırları yeniden skorlar
+    _publish_models(registry)
+    assert ssa_service.analyze_all_satellites() == 27
+    conn = db.get_conn()
+    rows = conn.execute("SELECT COUNT(*) FROM satellite_intelligence "
+                        "WHERE predicted_category IS NOT NULL AND model_version = ?",
+                        (registry.get_active_version_name(),)).fetchone()[0]
+    conn.close()
+    assert rows == 26
+
+
+def test_regime_heatmap_counts_latest_sets_and_follows_catalog(catalog_db):
+    from ingest.tle_fetcher import save_tles
+    from service.ssa_service import ssa_service
+
+    catalog = catalog_db(300, seed=5, n_planted=0)
+    # Aynı nesnelerin yeniden çekilmesi yoğunluğu değiştirmez
+    save_tles(catalog.tles[:100], source="test")
+    result = ssa_service.get_regime_heatmap_data(incl_bin_deg=5.0, alt_bin_km=100.0)
+    assert ssa_service.get_regime_heatmap_data(incl_bin_deg=5.0, alt_bin_km=100.0) is result
+
+    arrays = parse_tle_arrays([t[1] for t in catalog.tles], [t[2] for t in catalog.tles])
+    incl, alt = arrays.inclination_deg, arrays.altitude_km
+    inside = (alt > 200.0) & (alt < 40000.0)
+    expected, _, _ = np.histogram2d(incl[inside], alt[inside],
+                                    bins=[np.arange(0.0, 185.0, 5.0), np.arange(0.0, 40100.0, 100.0)])
+    assert result["total"] == int(inside.sum()) == sum(b["count"] for b in result["bins"])
+    assert sorted((b["x"], b["y"], b["count"]) for b in result["bins"]) == sorted(
+        ((i + 0.5) * 5.0, (a + 0.5) * 100.0, int(expected[i, a])) for i, a in zip(*np.nonzero(expected)))
+
+    # Yeni ingest sonrası yeniden hesaplanır
+    save_tles(generate_catalog(10, seed=6, n_planted=0, first_norad=90000).tles, source="test")
+    updated = ssa_service.get_regime_heatmap_data(incl_bin_deg=5.0, alt_bin_km=100.0)
+    assert updated is not result and updated["total"] == result["total"] + 10
+
+    # Farklı bin ayarları önbelleği büyütmez: en son kullanılanlar tutulur
+    from service.ssa_service import HEATMAP_CACHE_SIZE
+    for k in range(3 * HEATMAP_CACHE_SIZE):
+        ssa_service.get_regime_heatmap_data(incl_bin_deg=1.0 + k, alt_bin_km=100.0)
+        assert ssa_service.get_regime_heatmap_data(incl_bin_deg=5.0, alt_bin_km=100.0) is updated
+    assert len(ssa_service._heatmap_cache) == HEATMAP_CACHE_SIZE
+
+
+def test_lifetimes_update_only_analyzed_rows(catalog_db, tmp_path, monkeypatch):
+    from ingest.tle_fetcher import save_tles
+    from service.reference_service import reference_service
+    from service.ssa_service import ssa_service
+
+    catalog_db(20, seed=1, n_planted=0)
+    conn = db.get_conn()
+    count = lambda: conn.execute("SELECT COUNT(*), COUNT(lifetime_days), COUNT(predicted_category) "
+                                 "FROM satellite_intelligence").fetchone()
+    # Model yokken satır açılmaz, yalnızca mevcut satırlar güncellenir
+    assert ssa_service.update_lifetimes() == 0 and tuple(count()) == (0, 0, 0)
+
+    registry = ModelRegistry(tmp_path / "models", legacy_path=tmp_path / "none.joblib")
+    _publish_models(registry)
+    monkeypatch.setattr(ssa_service, "registry", registry)
+    monkeypatch.setattr(reference_service, "get_country_map", lambda: {})
+    assert ssa_service.analyze_all_satellites() == 20
+    # Sönümlenmeyen (yüksek yörünge) nesnelerin ömrü NULL kalır
+    rows, with_lifetime, categorized = count()
+    assert rows == categorized == 20 and 0 < with_lifetime < 20
+    forecast = ssa_service.get_reentry_forecast(max_days=1e9, limit=100)
+    assert len(forecast) == with_lifetime
+
+    with conn:
+        conn.execute("UPDATE satellite_intelligence SET lifetime_days = NULL, reentry_epoch = NULL")
+    assert ssa_service.update_lifetimes() == 20
+    assert ssa_service.get_reentry_forecast(max_days=1e9, limit=100) == forecast
+
+    # NORAD numarası okunamayan satır tahminden atlanır
+    save_tles([("BOZUK", "1 bozuk satır", "2 bozuk satır")], source="test")
+    with conn:
+        conn.execute("INSERT INTO satellite_intelligence (sat_id, lifetime_days, reentry_epoch) "
+                     "SELECT MAX(id), 1.0, '2025-01-02' FROM raw_tles")
+    conn.close()
+    assert ssa_service.get_reentry_forecast(max_days=1e9, limit=100) == forecast
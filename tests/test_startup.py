@@ -0,0 +1,18 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import subprocess
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def test_importing_main_is_light():
+    # Ağır bağımlılıklar ilk kullanımda yüklenir; 'import main' onları çekmemeli ve DB kurmamalı
+    probe = ("import sys, main; "
+             "print(','.join(sorted({m.split('.')[0] for m in sys.modules} & "
+             "{'astropy', 'poliastro', 'scipy', 'pandas', 'sklearn', 'joblib'})))")
+    out = subprocess.run([sys.executable, "-c", probe], cwd=ROOT, capture_output=True, text=True,
+                         env=dict(os.environ, ASTM_PREWARM="0"), check=True)
+    assert out.stdout.strip() == ""
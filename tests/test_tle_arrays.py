@@ -0,0 +1,29 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from processing.tle_arrays import parse_tle_arrays
+
+ISS_L1 = "1 25544U 98067A   25334.50000000  .00016717  00000-0  30306-3 0  9995"
+ISS_L2 = "2 25544  51.6416 247.4627 0006703 130.5360 325.0288 15.72125391563537"
+NEG_L1 = "1 43013U 17073A   25334.12345678 -.00000050  00000-0 -11606-4 0  9991"
+NEG_L2 = "2 43013  98.7240 270.1234 0001234  90.0000 270.1234 14.19512345 12345"
+
+
+def test_parse_matches_fixed_width_fields():
+    tle = parse_tle_arrays([ISS_L1, NEG_L1], [ISS_L2, NEG_L2])
+    assert tle.valid.all()
+    assert tle.norad_id.tolist() == [25544, 43013]
+    assert np.allclose(tle.inclination_deg, [51.6416, 98.7240])
+    assert np.allclose(tle.eccentricity, [0.0006703, 0.0001234])
+    assert np.allclose(tle.mean_motion_rev_day, [15.72125391, 14.19512345])
+    assert np.allclose(tle.bstar, [0.30306e-3, -0.11606e-4])
+    assert np.allclose(tle.epoch_yyddd, [25334.5, 25334.12345678])
+    assert 340 < tle.altitude_km[0] < 370
+
+
+def test_malformed_lines_are_flagged_not_raised():
+    tle = parse_tle_arrays([ISS_L1, "1 xx", None], [ISS_L2, "2 garbage", ISS_L2[:40]])
+    assert tle.valid.tolist() == [True, False, False]
@@ -0,0 +1,58 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pytest
+import backend.models.db as db
+from benchmarks.synthetic_catalog import generate_catalog
+from processing.collision_probability import ric_rotation
+from processing.propagator import tle_to_satrec, propagate_satrec_array
+from processing.tle_uncertainty import sample_satrecs
+
+
+def test_sampled_elements_match_ric_sigma():
+    catalog = generate_catalog(5, seed=4, n_planted=0)
+    satrec = tle_to_satrec(catalog.tles[0][1], catalog.tles[0][2])
+    r0, v0, _ = propagate_satrec_array([satrec], [catalog.epoch])
+    # İkinci durumda radyal hatanın yörünge boyunca katkısı (2σ_R) düşülmezse in-track sapma ~%28 büyük çıkar
+    for sigma in ((0.1, 2.0, 0.3), (0.4, 1.0, 0.2)):
+        samples = sample_satrecs(satrec, 4000, np.random.default_rng(0), sigma, intrack_growth_km_per_day=0.0)
+        r, _, err = propagate_satrec_array(samples, [catalog.epoch])
+        assert np.all(err == 0)
+        # Örneklerin nominal konuma göre farkı nominal RIC çerçevesinde
+        ric = (r[:, 0] - r0[0, 0]) @ ric_rotation(r0[:, 0], v0[:, 0])[0]
+        assert np.allclose(np.std(ric, axis=0), sigma, rtol=0.05)
+        assert np.all(np.abs(np.mean(ric, axis=0)) < 0.1 * np.array(sigma))
+
+
+def test_monte_carlo_is_reproducible_and_matches_analytic_pc(catalog_db, monkeypatch):
+    from service import conjunction_service as cs
+
+    catalog = catalog_db(40, seed=3, n_planted=4)
+    conn = db.get_conn()
+    ids = {int(row["line2"][2:7]): row["id"] for row in conn.execute("SELECT id, line2 FROM raw_tles").fetchall()}
+    planted = min(catalog.planted, key=lambda p: p.miss_distance_km)
+    cur = conn.execute("INSERT INTO conjunction_alerts (sat1_id, sat2_id, tca, miss_distance_km, event_type) "
+                       "VALUES (?, ?, ?, ?, 'COLLISION')",
+                       (ids[planted.norad_a], ids[planted.norad_b], planted.tca.isoformat(), planted.miss_distance_km))
+    alert_id = cur.lastrowid
+    conn.commit()
+    conn.close()
+
+    monkeypatch.setattr(cs, "MC_CHUNK_SAMPLES", 2000)
+    params = dict(n_samples=6000, seed=7, hbr_km=0.2)
+    inline = cs.ConjunctionService(max_workers=1).run_monte_carlo(alert_id, **params)
+    pooled = cs.ConjunctionService(max_workers=2).run_monte_carlo(alert_id, **params)
+    assert inline["chunks"] == pooled["chunks"] == 3
+    for key in ("hits", "pc", "miss_km", "tca_offset_s", "histogram"):
+        assert inline[key] == pooled[key]
+
+    assert inline["valid_samples"] == 6000 and inline["outside_window"] == 0
+    assert abs(inline["miss_km"]["p50"] - planted.miss_distance_km) < 2.0
+    # Örnekleme Gauss varsayımının doğrusal karşılığını vermeli (4 standart hata içinde)
+    assert abs(inline["pc"] - inline["analytic_pc"]) < 4 * inline["pc_std_err"]
+
+    with pytest.raises(ValueError):
+        cs.ConjunctionService(max_workers=1).run_monte_carlo(10 ** 9)
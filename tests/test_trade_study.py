@@ -0,0 +1,79 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from datetime import timedelta
+import numpy as np
+from benchmarks.synthetic_catalog import generate_catalog
+from planner.optimizer import find_minimal_dv
+from planner.trade_study import pareto_front_mask, run_burn_trade_study
+from processing.propagate_wrapper import propagate_satrec_single
+from processing.propagator import tle_to_satrec
+
+
+def test_pareto_front_mask():
+    # (dv, lead time, miss): 1, 2'ye baskın; 3 daha büyük mesafe sağladığı için cephede
+    dv = np.array([1.0, 2.0, 1.0, 3.0])
+    lead = np.array([600.0, 600.0, 1200.0, 600.0])
+    miss = np.array([2.0, 2.0, 2.0, 5.0])
+    assert pareto_front_mask(dv, lead, miss).tolist() == [True, False, False, True]
+
+
+def test_trade_study_matches_single_case_optimizer():
+    catalog = generate_catalog(20, seed=3, n_planted=2)
+    satrecs = {int(line2[2:7]): tle_to_satrec(line1, line2) for _, line1, line2 in catalog.tles}
+    p = catalog.planted[0]
+    ours, target = satrecs[p.norad_a], satrecs[p.norad_b]
+
+    leads, targets = [1200.0, 3600.0, 5400.0], [2.0, 5.0]
+    cases = run_burn_trade_study(target, ours, p.tca, propagate_satrec_single, leads, targets,
+                                 dv_bound_km_s=0.002)
+    assert [(c.lead_time_s, c.target_miss_km) for c in cases] == [(lt, m) for lt in leads for m in targets]
+    assert all(c.success and c.predicted_miss_km >= c.target_miss_km - 0.001 for c in cases)
+    assert any(c.pareto_optimal for c in cases)
+
+    # Toplu çözüm, tek durumluk find_minimal_dv ile aynı minimum deltaV'yi bulur
+    for c in cases:
+        single = find_minimal_dv(target, ours, p.tca - timedelta(seconds=c.lead_time_s), p.tca,
+                                 propagate_satrec_single, target_miss_km=c.target_miss_km, dv_bound_km_s=0.002)
+        assert c.burn_time == single.burn_time
+        assert abs(c.dv_mag_m_s - single.dv_mag_m_s) < 1e-3 * max(single.dv_mag_m_s, 1.0)
+
+    # Cephedeki hiçbir durum başka bir başarılı durum tarafından baskın değildir
+    front = [c for c in cases if c.pareto_optimal]
+    for a in front:
+        assert not any(b.dv_mag_m_s < a.dv_mag_m_s and b.lead_time_s <= a.lead_time_s
+                       and b.predicted_miss_km >= a.predicted_miss_km for b in cases if b.success)
+
+
+def test_trade_study_endpoint_caps_case_count(catalog_db, monkeypatch):
+    monkeypatch.setenv("ASTM_PREWARM", "0")
+    import main
+    import backend.models.db as db
+    from fastapi.testclient import TestClient
+    from service.maneuver_service import maneuver_service, MAX_TRADE_STUDY_CASES
+
+    catalog = catalog_db(20, seed=3, n_planted=2)
+    conn = db.get_conn()
+    ids = {int(r["line2"][2:7]): r["id"] for r in conn.execute("SELECT id, line2 FROM raw_tles").fetchall()}
+    conn.close()
+    p = catalog.planted[0]
+    body = {"sat_id_primary": ids[p.norad_a], "sat_id_secondary": ids[p.norad_b], "tca": p.tca.isoformat(),
+            "target_miss_km": [2.0, 5.0], "max_lead_orbits": 0.5, "step_minutes": 15.0}
+
+    # Sayım, hesaplanan senaryolarla aynı
+    calls = []
+    monkeypatch.setattr("service.maneuver_service.run_burn_trade_study",
+                        lambda **kwargs: calls.append(kwargs) or [])
+    with TestClient(main.app) as client:
+        assert client.post("/maneuver/trade-study", json=body).status_code == 200
+        n_cases = maneuver_service.count_trade_study_cases(ids[p.norad_a], 2, 10.0, 0.5, 15.0)
+        assert n_cases == len(calls[0]["lead_times_s"]) * 2 > 0
+
+        # Çok küçük adım hesaplamaya başlamadan reddedilir
+        response = client.post("/maneuver/trade-study", json={**body, "step_minutes": 1e-6})
+        assert response.status_code == 422 and str(MAX_TRADE_STUDY_CASES) in response.json()["detail"]
+        assert client.post("/maneuver/trade-study", json={**body, "target_miss_km": []}).status_code == 422
+        assert client.post("/maneuver/trade-study", json={**body, "sat_id_primary": 10 ** 9}).status_code == 404
+    assert len(calls) == 1
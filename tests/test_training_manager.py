@@ -0,0 +1,117 @@
+import sys
+import os
+import threading
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pytest
+from service.ssa_training import TrainingManager
+
+
+def _prepare():
+    return np.zeros((4, 2)), np.array([0, 1, 0, 1]), None
+
+
+def _fake_search(release=None, fail=False):
+    # Gerçek arama yerine olay üreten ve sürüm yazan hafif bir yedek
+    def search(job, X, y, label_encoder, features, registry_root, search_space, n_folds):
+        job.total_tasks = 3
+        job.emit({"type": "started", "total_tasks": 3})
+        if release is not None:
+            release.wait(5)
+        for k in range(1, 3):
+            job.done_tasks = k
+            job.emit({"type": "progress", "done": k})
+        if fail:
+            raise RuntimeError("arama hatası")
+        job.version = "v-test"
+        return {"accuracy": 1.0}
+    return search
+
+
+def _run_to_end(manager, job):
+    events = list(manager.iter_events(job.job_id, timeout_s=0.05))
+    return [e for e in events if e["type"] != "heartbeat"]
+
+
+def test_completed_event_is_always_yielded_last(tmp_path, monkeypatch):
+    manager = TrainingManager(max_workers=1)
+    monkeypatch.setattr(manager, "_search_and_publish", _fake_search())
+    activated = []
+    for _ in range(50):
+        job = manager.start(_prepare, ["a", "b"], tmp_path, on_complete=activated.append)
+        events = _run_to_end(manager, job)
+        assert [e["type"] for e in events] == ["started", "progress", "progress", "completed"]
+        assert events[-1]["version"] == "v-test" and job.status == "completed"
+        assert job.finished_at is not None
+    assert activated == ["v-test"] * 50
+
+
+def test_failures_finish_job_with_failed_event(tmp_path, monkeypatch):
+    manager = TrainingManager(max_workers=1)
+    monkeypatch.setattr(manager, "_search_and_publish", _fake_search())
+
+    def bad_prepare():
+        raise ValueError("UCS verisi yok")
+
+    # Veri hazırlığı arka planda; hatası isteği değil işi düşürür
+    job = manager.start(bad_prepare, [], tmp_path)
+    assert _run_to_end(manager, job) == [{"type": "failed", "error": "UCS verisi yok"}]
+    assert job.status == "failed" and job.error == "UCS verisi yok"
+
+    monkeypatch.setattr(manager, "_search_and_publish", _fake_search(fail=True))
+    job = manager.start(_prepare, [], tmp_path)
+    events = _run_to_end(manager, job)
+    assert events[-1] == {"type": "failed", "error": "arama hatası"} and job.status == "failed"
+
+    def bad_activate(version):
+        raise OSError("etkinleştirilemedi")
+
+    monkeypatch.setattr(manager, "_search_and_publish", _fake_search())
+    job = manager.start(_prepare, [], tmp_path, on_complete=bad_activate)
+    events = _run_to_end(manager, job)
+    assert [e["type"] for e in events][-1] == "failed" and job.error == "etkinleştirilemedi"
+
+
+def test_only_one_job_runs_at_a_time(tmp_path, monkeypatch):
+    manager = TrainingManager(max_workers=1)
+    release = threading.Event()
+    monkeypatch.setattr(manager, "_search_and_publish", _fake_search(release))
+    job = manager.start(_prepare, [], tmp_path)
+    assert manager.active_job() is job
+    with pytest.raises(RuntimeError):
+        manager.start(_prepare, [], tmp_path)
+    release.set()
+    assert _run_to_end(manager, job)[-1]["type"] == "completed"
+    assert manager.active_job() is None
+
+
+def test_partial_search_space_trains_and_publishes(tmp_path):
+    from sklearn.preprocessing import LabelEncoder
+    from service.model_registry import ModelRegistry
+
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(100, 3))
+    le = LabelEncoder()
+    y = le.fit_transform(np.where(X[:, 0] > 0, "LEO", "GEO"))
+    manager = TrainingManager(max_workers=2)
+
+    # Boş ızgara ve bilinmeyen model iş başlamadan reddedilir
+    with pytest.raises(ValueError):
+        manager.start(lambda: (X, y, le), ["a", "b", "c"], tmp_path, search_space={"kmeans": {"n_clusters": []}})
+    with pytest.raises(ValueError):
+        manager.start(lambda: (X, y, le), ["a", "b", "c"], tmp_path, search_space={"svm": {"C": [1.0]}})
+
+    # Yalnızca orman ızgarası (1x1) verilir, diğer modeller varsayılan ızgarayla aranır
+    space = {"forest": {"n_estimators": [5], "max_depth": [3]}, "kmeans": {"n_clusters": [2]},
+             "iso_forest": {"n_estimators": [10]}}
+    for search_space in (space, {"forest": space["forest"]}):
+        job = manager.start(lambda: (X, y, le), ["a", "b", "c"], tmp_path, search_space=search_space, n_folds=2)
+        events = _run_to_end(manager, job)
+        assert events[-1]["type"] == "completed", events[-1]
+        assert job.done_tasks == job.total_tasks
+        metadata = ModelRegistry(tmp_path).get_metadata(job.version)
+        assert metadata["metrics"]["best_params"]["forest"] == {"max_depth": 3, "n_estimators": 5}
+        assert metadata["metrics"]["accuracy"] > 0.8
+    assert len(metadata["search"]["kmeans"]) == 3 and len(metadata["search"]["iso_forest"]) == 4
@@ -0,0 +1,93 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pytest
+from datetime import datetime, timedelta
+
+
+@pytest.fixture
+def catalog(catalog_db):
+    return catalog_db(300, seed=3, n_planted=4)
+
+
+def test_watchlist_screen_finds_planted_approaches(catalog, monkeypatch):
+    from service import watchlist_service as ws
+    service = ws.watchlist_service
+    for p in catalog.planted:
+        service.add(norad_id=p.norad_a)
+    service.add(norad_id=catalog.planted[0].norad_b)  # iki izlenen nesne arasındaki geçiş bir kez sayılmalı
+
+    window = dict(start_time=catalog.epoch, days=0.1, step_s=60.0, threshold_km=5.0)
+    result = service.screen(**window)
+    assert result["assets"] == len(catalog.planted) + 1
+    assert result["catalog_objects"] < len(catalog)  # irtifa bandı filtresi
+
+    events = {}
+    for e in result["conjunctions"]:
+        events.setdefault(frozenset((e["asset_norad_id"], e["other_norad_id"])), []).append(e)
+    for p in catalog.planted:
+        matches = [e for e in events.get(frozenset((p.norad_a, p.norad_b)), [])
+                   if abs(datetime.fromisoformat(e["tca"]) - p.tca).total_seconds() < 1.0]
+        assert len(matches) == 1
+        assert abs(matches[0]["miss_distance_km"] - p.miss_distance_km) < 0.05
+
+    # Çapa yayılımı küçük nesne gruplarıyla (her grupta 5 nesne) aynı sonucu verir
+    monkeypatch.setattr(ws, "ANCHOR_CHUNK_STATES", 10)
+    chunked = service.screen(**window)
+    assert [(e["asset_norad_id"], e["other_norad_id"], e["tca"][:19]) for e in chunked["conjunctions"]] == \
+           [(e["asset_norad_id"], e["other_norad_id"], e["tca"][:19]) for e in result["conjunctions"]]
+    assert len(service.get_conjunctions()) == len(result["conjunctions"])
+
+
+def test_watchlist_add_and_remove(catalog):
+    from service.watchlist_service import watchlist_service
+    entry = watchlist_service.add(sat_id=1, label="Bizim uydu")
+    assert entry["sat_id"] == 1 and entry["label"] == "Bizim uydu"
+    assert watchlist_service.add(norad_id=entry["norad_id"])["label"] == "Bizim uydu"
+    watchlist_service.screen(start_time=catalog.epoch, days=0.1, threshold_km=500.0)
+    assert watchlist_service.get_conjunctions(norad_id=entry["norad_id"])
+
+    # Listeden çıkarılan nesnenin eski yakınlaşmaları da silinir
+    watchlist_service.remove(entry["norad_id"])
+    assert watchlist_service.get_watchlist() == []
+    assert watchlist_service.get_conjunctions() == []
+    with pytest.raises(ValueError):
+        watchlist_service.remove(entry["norad_id"])
+
+
+def test_watchlist_screen_matches_full_grid_screening(catalog):
+    # Düğüm filtresi, tüm kataloğun ince ızgarada taranmasıyla aynı yerel en yakın geçişleri bulmalı
+    from processing.propagator import propagate_satrec_array
+    from processing.screening import screen_runs
+    from service.tle_service import tle_service
+    from service.watchlist_service import watchlist_service
+
+    snapshot = tle_service.get_catalog()
+    assets = [0, 40, 80, 120, 160]
+    for i in assets:
+        watchlist_service.add(norad_id=int(snapshot.norad_ids[i]))
+    step_s, days, threshold_km = 60.0, 0.5, 50.0
+    result = watchlist_service.screen(start_time=catalog.epoch, days=days, step_s=step_s, threshold_km=threshold_km)
+
+    n_steps = int(np.ceil(days * 86400.0 / step_s)) + 1
+    r, v, err = propagate_satrec_array(snapshot.satrecs, [catalog.epoch + timedelta(seconds=k * step_s)
+                                                          for k in range(n_steps)])
+    expected = set()
+    for q in assets:
+        ok = ((err == 0) & (err[q] == 0)).reshape(-1)
+        run_id = np.repeat(np.arange(len(snapshot)), n_steps)[ok]
+        steps = np.tile(np.arange(n_steps), len(snapshot))[ok]
+        runs, tca_step, _, _ = screen_runs((r - r[q]).reshape(-1, 3)[ok], (v - v[q]).reshape(-1, 3)[ok], run_id,
+                                           steps, step_s, threshold_km, n_steps - 1)
+        for c, t in zip(runs, tca_step):
+            if c != q and not (c in assets and c < q):
+                expected.add((int(snapshot.norad_ids[q]), int(snapshot.norad_ids[c]), round(t * step_s)))
+
+    found = {(e["asset_norad_id"], e["other_norad_id"],
+              round((datetime.fromisoformat(e["tca"]) - catalog.epoch).total_seconds()))
+             for e in result["conjunctions"]}
+    assert len(expected) > 10
+    assert found == expected